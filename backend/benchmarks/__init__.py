@@ -0,0 +1 @@
+"""Benchmarks for the Course Companion API (run from the backend directory)."""
@@ -0,0 +1,180 @@
+"""
+Concurrency load test for ChatGPTService.
+
+Drives ``chat_completion`` against the fake OpenAI server at increasing
+concurrency levels and reports throughput, latency percentiles, how many
+calls the fake saw in flight at once and how many were turned away as busy.
+With a 1s fake latency, throughput should grow with concurrency up to
+OPENAI_MAX_CONCURRENCY; a client that blocked the event loop would stay at
+about one call per second.
+
+By default the fake runs in-process through httpx's ASGI transport, so the
+test needs no network. ``--base-url`` targets a served fake instead (see
+benchmarks/fake_openai.py) to include real connection pooling. ``--stream``
+uses ``stream_completion`` and also reports time to first token; with
+``--mock`` the service streams its mock reply without any upstream. httpx's
+ASGI transport buffers whole response bodies, so measure upstream time to
+first token against a served fake.
+
+Usage (from the backend directory):
+    python -m benchmarks.chat_load_test --levels 1,8,32,64 --requests 64
+    python -m benchmarks.chat_load_test --base-url http://127.0.0.1:8099/v1
+    python -m benchmarks.chat_load_test --stream --mock --levels 1,32
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+# Keep the per-student chat rate limit out of the way
+os.environ.setdefault("MAX_REQUESTS_PER_MINUTE", "1000000")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+
+from benchmarks.fake_openai import create_app
+from services.chatgpt_service import ChatGPTService
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_level(service: ChatGPTService, requests: int, concurrency: int,
+                    stream: bool = False) -> dict:
+    """Issue ``requests`` chats from ``concurrency`` students at once."""
+    durations: List[float] = []
+    first_tokens: List[float] = []
+    outcomes = {"ok": 0, "busy": 0, "error": 0}
+    remaining = requests
+
+    async def complete(student_id: str, start: float) -> dict:
+        if not stream:
+            return await service.chat_completion("How does recursion work?", student_id=student_id)
+        result: dict = {}
+        async for event in service.stream_completion("How does recursion work?", student_id=student_id):
+            if event["type"] == "token":
+                if not result:
+                    first_tokens.append(time.perf_counter() - start)
+                    result["started"] = True
+            else:
+                result = event
+        return result
+
+    async def student(worker_id: int) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            result = await complete(f"load-student-{worker_id}", start)
+            durations.append(time.perf_counter() - start)
+            if result.get("success"):
+                outcomes["ok"] += 1
+            elif result.get("error") == "busy":
+                outcomes["busy"] += 1
+            else:
+                outcomes["error"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(student(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(durations)
+    summary = {
+        **outcomes,
+        "throughput_rps": round(len(ordered) / elapsed, 2),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+    if first_tokens:
+        first_tokens.sort()
+        summary["ttft_p50_ms"] = round(_percentile(first_tokens, 50) * 1000, 1)
+        summary["ttft_p95_ms"] = round(_percentile(first_tokens, 95) * 1000, 1)
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict:
+    fake = None if args.base_url or args.mock else create_app(args.latency, args.jitter)
+    service = ChatGPTService()
+    service.api_key = None if args.mock else "fake"
+    service.max_concurrent = args.max_concurrency
+    service.queue_timeout = args.queue_timeout
+    # Every simulated student asks the same question; measure upstream calls,
+    # not the cache or coalescing
+    service.response_cache = None
+    service.single_flight = None
+
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "base_url": "mock" if args.mock else args.base_url or "in-process",
+            "stream": args.stream,
+            "latency": args.latency if fake else None,
+            "requests": args.requests,
+            "max_concurrency": args.max_concurrency,
+            "queue_timeout": args.queue_timeout,
+        },
+        "levels": {},
+    }
+
+    if fake is not None:
+        # Route the service's client to the in-process fake
+        service._bind_loop()
+        service._client = AsyncOpenAI(
+            api_key="fake",
+            base_url="http://fake-openai/v1",
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake)),
+        )
+    elif args.base_url:
+        service.base_url = args.base_url
+
+    try:
+        for level in args.levels:
+            if fake is not None:
+                fake.state.peak_in_flight = 0
+            result = await run_level(service, args.requests, level, args.stream)
+            if fake is not None:
+                result["peak_in_flight"] = fake.state.peak_in_flight
+            results["levels"][str(level)] = result
+    finally:
+        await service.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", default="1,8,32,64",
+                        type=lambda value: [int(level) for level in value.split(",")],
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="Chats per level")
+    parser.add_argument("--latency", type=float, default=1.0, help="In-process fake latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--queue-timeout", type=float, default=30.0)
+    parser.add_argument("--base-url", default=None, help="Served fake, e.g. http://127.0.0.1:8099/v1")
+    parser.add_argument("--stream", action="store_true", help="Measure stream_completion")
+    parser.add_argument("--mock", action="store_true", help="Use the mock reply, no upstream")
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
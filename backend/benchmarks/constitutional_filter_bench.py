@@ -0,0 +1,139 @@
+"""
+Throughput benchmark for the constitutional filter's rule scan.
+
+Generates a seeded corpus of synthetic student queries (mostly ordinary
+questions, with some that should be flagged or blocked), then times the
+previous per-pattern loop (``re.search`` with raw patterns on lowercased
+text) against the compiled RuleSet scan, and checks both reach the same
+decision for every query. Only the scan is timed; approval files and
+logging are not involved.
+
+Usage (from the backend directory):
+    python -m benchmarks.constitutional_filter_bench --queries 100000
+"""
+import argparse
+import json
+import platform
+import random
+import re
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from middleware.constitutional_filter import ConstitutionalFilter
+from middleware.constitutional_rules import RuleSet
+
+TOPICS = [
+    "recursion", "for loops", "list comprehensions", "binary search", "hash maps",
+    "big O notation", "linked lists", "closures", "decorators", "exceptions",
+    "sorting algorithms", "classes and objects", "generators", "SQL joins", "git branches",
+]
+ALLOWED = [
+    "Can you explain how {topic} work?",
+    "I'm confused about {topic}, where should I start?",
+    "Why does my code using {topic} raise an error on line 12?",
+    "What is the difference between {topic} and {other}?",
+    "Could you give me an example that shows {topic} step by step?",
+    "I tried reading about {topic} twice but I still don't get when to use it. "
+    "My notes say it is related to {other}. Is that right, and what should I practise first?",
+]
+FLAGGED = [
+    "I have a quiz tomorrow on {topic}, help!",
+    "The project on {topic} is due in 3 hours",
+    "I urgently need to understand {topic}",
+    "Deadline is tonight and I have no time to read about {topic}",
+]
+BLOCKED = [
+    "Solve my homework problem about {topic}",
+    "Just give me the code for {topic}",
+    "Write the code for me, it's about {topic}",
+    "Do my assignment on {topic}",
+]
+
+
+def make_corpus(size: int, flagged: float = 0.05, blocked: float = 0.05, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        templates = BLOCKED if roll < blocked else FLAGGED if roll < blocked + flagged else ALLOWED
+        topic, other = rng.sample(TOPICS, 2)
+        corpus.append(rng.choice(templates).format(topic=topic, other=other))
+    return corpus
+
+
+def legacy_decision(query: str) -> str:
+    """The filter's previous check: each raw pattern searched in turn"""
+    query_lower = query.lower()
+    for pattern in ConstitutionalFilter.PROHIBITED_PATTERNS:
+        if re.search(pattern, query_lower, re.IGNORECASE):
+            return "block"
+    for pattern in ConstitutionalFilter.SUSPICIOUS_PATTERNS:
+        if re.search(pattern, query_lower, re.IGNORECASE):
+            return "flag"
+    return "allow"
+
+
+def _time(fn, corpus: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in corpus:
+            fn(query)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args: argparse.Namespace) -> dict:
+    corpus = make_corpus(args.queries, args.flagged, args.blocked, args.seed)
+    rules = RuleSet({
+        "block": ConstitutionalFilter.PROHIBITED_PATTERNS,
+        "flag": ConstitutionalFilter.SUSPICIOUS_PATTERNS,
+    })
+
+    decisions = {"allow": 0, "block": 0, "flag": 0}
+    mismatches = 0
+    for query in corpus:
+        decision = rules.scan(query).decision
+        decisions[decision] += 1
+        mismatches += decision != legacy_decision(query)
+
+    legacy = _time(legacy_decision, corpus, args.repeat)
+    compiled = _time(rules.scan, corpus, args.repeat)
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {"queries": args.queries, "repeat": args.repeat, "seed": args.seed},
+        "decisions": decisions,
+        "mismatches": mismatches,
+        "pattern_loop": {
+            "seconds": round(legacy, 4),
+            "queries_per_second": round(len(corpus) / legacy),
+        },
+        "compiled_scan": {
+            "seconds": round(compiled, 4),
+            "queries_per_second": round(len(corpus) / compiled),
+        },
+        "speedup": round(legacy / compiled, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--flagged", type=float, default=0.05, help="Share of queries to flag")
+    parser.add_argument("--blocked", type=float, default=0.05, help="Share of queries to block")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes; the best is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
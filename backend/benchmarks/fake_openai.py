@@ -0,0 +1,110 @@
+"""
+Fake OpenAI-compatible chat completions server for load tests.
+
+Answers POST /v1/chat/completions after a configurable latency (plus
+jitter) without doing any work, so it stands in for the real API when
+measuring how many chats one worker keeps in flight. The response shape
+matches what the openai client parses, including usage. With
+``"stream": true`` the reply is sent as server-sent chunks, one word at a
+time, spread evenly over the same latency.
+
+Serve it and point the backend at it:
+    uvicorn benchmarks.fake_openai:app --port 8099
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+FAKE_OPENAI_LATENCY and FAKE_OPENAI_JITTER (seconds) set the delay.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+LATENCY = float(os.getenv("FAKE_OPENAI_LATENCY", "1.0"))
+JITTER = float(os.getenv("FAKE_OPENAI_JITTER", "0.1"))
+
+
+def create_app(latency: float = LATENCY, jitter: float = JITTER) -> FastAPI:
+    fake = FastAPI(title="Fake OpenAI")
+    fake.state.in_flight = 0
+    fake.state.peak_in_flight = 0
+
+    @fake.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        content = f"What have you tried so far with: {prompt[:80]}?"
+        delay = latency + random.uniform(0, jitter)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(completion_id, created, model, content, delay),
+                media_type="text/event-stream",
+            )
+
+        fake.state.in_flight += 1
+        fake.state.peak_in_flight = max(fake.state.peak_in_flight, fake.state.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            fake.state.in_flight -= 1
+
+        prompt_tokens = sum(len(m.get("content", "")) for m in body["messages"]) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    async def _stream(completion_id, created, model, content, delay):
+        words = content.split(" ")
+        fake.state.in_flight += 1
+        fake.state.peak_in_flight = max(fake.state.peak_in_flight, fake.state.in_flight)
+        try:
+            for i, word in enumerate(words):
+                await asyncio.sleep(delay / len(words))
+                text = word if i == len(words) - 1 else word + " "
+                yield _chunk(completion_id, created, model, {"content": text}, None)
+            yield _chunk(completion_id, created, model, {}, "stop")
+            yield "data: [DONE]\n\n"
+        finally:
+            fake.state.in_flight -= 1
+
+    @fake.get("/stats")
+    async def stats():
+        return {"in_flight": fake.state.in_flight, "peak_in_flight": fake.state.peak_in_flight}
+
+    return fake
+
+
+def _chunk(completion_id, created, model, delta, finish_reason) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+app = create_app()
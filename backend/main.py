@@ -7,6 +7,7 @@ Enforces constitutional rules for academic integrity
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import time
 import logging
 from dotenv import load_dotenv
@@ -23,13 +24,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import routers
-from routers import chat, progress
+from routers import chat, progress, review
 
 # Import middleware
 from middleware.constitutional_filter import ConstitutionalFilter
+from middleware.rate_limit import RateLimitMiddleware
 
 # Import Dapr service
 from services.dapr_service import get_dapr_service
+from services.logger_service import get_conversation_logger
+from services.chatgpt_service import get_chatgpt_service
+from services.approval_writer import get_approval_writer
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -38,6 +43,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Rate limiting per student (method, path regex, cost); unmatched requests cost 1
+RATE_LIMIT_COSTS = [
+    ("GET", r"^/(health)?$", 0),
+    ("POST", r"^/api/chat(/stream)?$", 2),
+]
+app.add_middleware(RateLimitMiddleware, costs=RATE_LIMIT_COSTS)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -56,7 +68,7 @@ dapr_service = get_dapr_service()
 
 @app.on_event('startup')
 async def startup_event():
-    """Initialize Dapr service on application startup"""
+    """Initialize Dapr service and migrate legacy conversation logs on startup"""
     try:
         dapr_service.initialize()
         logger.info("Dapr service initialized successfully")
@@ -64,6 +76,27 @@ async def startup_event():
         logger.error(f"Failed to initialize Dapr service: {str(e)}")
         # Continue without Dapr if initialization fails
 
+    try:
+        migrated = get_conversation_logger().migrate()
+        if migrated:
+            logger.info(f"Migrated {migrated} legacy conversation log file(s) to JSONL")
+    except OSError as e:
+        logger.error(f"Failed to migrate conversation logs: {str(e)}")
+
+    if review.REVIEW_RECONCILE_SECONDS > 0:
+        app.state.review_reconciler = asyncio.create_task(review.reconcile_periodically())
+
+
+@app.on_event('shutdown')
+async def shutdown_event():
+    """Flush queued approval files and log entries and close pooled OpenAI connections"""
+    reconciler = getattr(app.state, "review_reconciler", None)
+    if reconciler is not None:
+        reconciler.cancel()
+    get_approval_writer().close()
+    get_conversation_logger().close()
+    await get_chatgpt_service().close()
+
 
 @app.middleware("http")
 async def constitutional_middleware(request: Request, call_next):
@@ -110,6 +143,7 @@ async def health_check():
 # Include routers with /api prefix
 app.include_router(chat.router, prefix="/api", tags=["chat"])
 app.include_router(progress.router, prefix="/api", tags=["progress"])
+app.include_router(review.router, prefix="/api", tags=["review"])
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 """Middleware package for Course Companion API"""
 
 from .constitutional_filter import ConstitutionalFilter
+from .constitutional_rules import RuleSet, RulesFile
+from .rate_limit import RateLimitMiddleware
 
-__all__ = ["ConstitutionalFilter"]
+__all__ = ["ConstitutionalFilter", "RateLimitMiddleware", "RuleSet", "RulesFile"]
@@ -3,13 +3,17 @@ Constitutional Filter Middleware
 Enforces academic integrity rules by detecting prohibited queries
 """
 
-import re
+import os
 import logging
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from datetime import datetime
 import json
 from pathlib import Path
 
+from middleware.constitutional_rules import RuleSet, RulesFile
+from services.approval_writer import get_approval_writer
+from services.review_queue import get_review_queue
+
 logger = logging.getLogger(__name__)
 
 class ConstitutionalFilter:
@@ -38,10 +42,28 @@ class ConstitutionalFilter:
         r"no\s+time",
     ]
 
-    def __init__(self, vault_path: str = "../vault"):
+    def __init__(self, vault_path: str = "../vault", rules_file: Optional[str] = None):
         self.vault_path = Path(vault_path)
+        # Created by the approval writer on first use, not at import time
         self.pending_approval_dir = self.vault_path / "Pending_Approval"
-        self.pending_approval_dir.mkdir(parents=True, exist_ok=True)
+        self.approval_writer = get_approval_writer()
+
+        # Patterns are compiled once; a rules file, if set, replaces them and is hot-reloaded
+        self._default_rules = RuleSet({
+            "block": self.PROHIBITED_PATTERNS,
+            "flag": self.SUSPICIOUS_PATTERNS,
+        })
+        rules_file = rules_file or os.getenv("CONSTITUTIONAL_RULES_FILE")
+        self._rules_file = RulesFile(
+            rules_file,
+            self._default_rules,
+            reload_interval=float(os.getenv("CONSTITUTIONAL_RULES_RELOAD", "5")),
+        ) if rules_file else None
+
+    @property
+    def rules(self) -> RuleSet:
+        """The rules in effect"""
+        return self._rules_file.current() if self._rules_file else self._default_rules
 
     def check_query(self, query: str, student_id: str = "unknown") -> Tuple[str, str, Dict]:
         """
@@ -54,40 +76,39 @@ class ConstitutionalFilter:
             metadata: additional context
         """
 
-        query_lower = query.lower()
-
-        # Check prohibited patterns
-        for pattern in self.PROHIBITED_PATTERNS:
-            if re.search(pattern, query_lower, re.IGNORECASE):
-                reason = f"Query matches prohibited pattern: academic dishonesty detected"
-                logger.warning(f"BLOCKED query from {student_id}: {query[:100]}")
-                return ("block", reason, {
-                    "pattern_matched": pattern,
-                    "timestamp": datetime.now().isoformat()
-                })
-
-        # Check suspicious patterns
-        for pattern in self.SUSPICIOUS_PATTERNS:
-            if re.search(pattern, query_lower, re.IGNORECASE):
-                reason = f"Query flagged as suspicious: time pressure or urgency detected"
-                logger.warning(f"FLAGGED query from {student_id}: {query[:100]}")
-
-                # Create approval request
-                self._create_approval_request(query, student_id, pattern)
-
-                return ("flag", reason, {
-                    "pattern_matched": pattern,
-                    "timestamp": datetime.now().isoformat(),
-                    "requires_human_review": True
-                })
+        scan = self.rules.scan(query)
+        timestamp = datetime.now().isoformat()
+
+        if scan.decision == "block":
+            reason = f"Query matches prohibited pattern: academic dishonesty detected"
+            logger.warning(f"BLOCKED query from {student_id}: {query[:100]}")
+            return ("block", reason, {
+                "pattern_matched": scan.pattern,
+                "patterns_matched": list(scan.patterns),
+                "timestamp": timestamp
+            })
+
+        if scan.decision == "flag":
+            reason = f"Query flagged as suspicious: time pressure or urgency detected"
+            logger.warning(f"FLAGGED query from {student_id}: {query[:100]}")
+
+            # Create approval request
+            self._create_approval_request(query, student_id, scan.pattern)
+
+            return ("flag", reason, {
+                "pattern_matched": scan.pattern,
+                "patterns_matched": list(scan.patterns),
+                "timestamp": timestamp,
+                "requires_human_review": True
+            })
 
         # Query is allowed
         return ("allow", "Query approved", {
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         })
 
     def _create_approval_request(self, query: str, student_id: str, pattern: str):
-        """Create approval request file for HITL review"""
+        """Queue an approval request file for HITL review (written off the request path)"""
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"APPROVAL_QUERY_{student_id}_{timestamp}.md"
@@ -135,11 +156,13 @@ _Add notes here after review_
 **Date:** _________________
 """
 
-        try:
-            filepath.write_text(content)
-            logger.info(f"Created approval request: {filename}")
-        except Exception as e:
-            logger.error(f"Failed to create approval request: {e}")
+        def record(path: Path) -> None:
+            get_review_queue(str(self.vault_path)).enqueue(
+                path.stem, "query_approval", student_id=student_id, reason=pattern
+            )
+            logger.info(f"Created approval request: {path.name}")
+
+        self.approval_writer.write(filepath, content, on_written=record)
 
     def get_socratic_response(self, blocked_reason: str) -> str:
         """
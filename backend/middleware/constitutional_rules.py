@@ -0,0 +1,159 @@
+"""
+Compiled constitutional rules
+
+The filter's patterns are compiled once into a RuleSet, together with one
+alternation of every rule. Checking a query is a single search with that
+alternation; most queries match nothing and are allowed after it. On a
+hit, only the individual rules are tried from the first match onward (no
+rule can match earlier), to report every matched pattern and the most
+severe decision.
+
+Matching is case-insensitive. When every pattern is written in lowercase
+(the usual case), the query is lowercased once and matched without
+re.IGNORECASE, which is several times faster in Python's regex engine;
+a pattern with uppercase characters (e.g. ``\\S``) makes the set fall back
+to re.IGNORECASE.
+
+Rules can also come from a JSON file, set with CONSTITUTIONAL_RULES_FILE:
+
+    {"block": ["give\\s+me\\s+the\\s+answer", ...], "flag": ["no\\s+time", ...]}
+
+RulesFile re-reads it when its modification time changes, checking at
+most every ``reload_interval`` seconds. A file that can't be read or
+compiled is logged and the rules already in effect are kept.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Decisions a rule can make, most severe first
+DECISIONS = ("block", "flag")
+
+
+@dataclass(frozen=True)
+class Rule:
+    decision: str
+    pattern: str
+    regex: Pattern
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    decision: str  # "allow", "block" or "flag"
+    patterns: Tuple[str, ...] = ()  # every matched pattern, deciding ones first
+
+    @property
+    def pattern(self) -> Optional[str]:
+        """The pattern that decided, or None when allowed"""
+        return self.patterns[0] if self.patterns else None
+
+
+class RuleSet:
+    """Patterns compiled once and scanned together"""
+
+    def __init__(self, rules: Dict[str, Sequence[str]], source: str = "built-in"):
+        unknown = set(rules) - set(DECISIONS)
+        if unknown:
+            raise ValueError(f"Unknown rule decisions: {', '.join(sorted(unknown))}")
+        self.source = source
+        patterns = [
+            (decision, pattern) for decision in DECISIONS for pattern in rules.get(decision, ())
+        ]
+        self.lowercase = all(pattern == pattern.lower() for _, pattern in patterns)
+        flags = 0 if self.lowercase else re.IGNORECASE
+        self.rules: List[Rule] = [
+            Rule(decision, pattern, re.compile(pattern, flags)) for decision, pattern in patterns
+        ]
+        self._combined: Optional[Pattern] = None
+        if self.rules:
+            try:
+                self._combined = re.compile(
+                    "|".join(f"(?:{rule.pattern})" for rule in self.rules), flags
+                )
+            except re.error:
+                # e.g. numbered backreferences; fall back to trying each rule
+                logger.warning(f"Rules from {source} can't be combined; scanning them one by one")
+
+    def scan(self, text: str) -> ScanResult:
+        """Decision for the text and every pattern it matched"""
+        if not self.rules:
+            return ScanResult("allow")
+        if self.lowercase:
+            text = text.lower()
+        start = 0
+        if self._combined is not None:
+            first = self._combined.search(text)
+            if first is None:
+                return ScanResult("allow")
+            start = first.start()
+
+        matched = [rule for rule in self.rules if rule.regex.search(text, start)]
+        if not matched:
+            return ScanResult("allow")
+        return ScanResult(matched[0].decision, tuple(rule.pattern for rule in matched))
+
+    def patterns(self, decision: str) -> List[str]:
+        return [rule.pattern for rule in self.rules if rule.decision == decision]
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        with open(path) as f:
+            rules = json.load(f)
+        if not isinstance(rules, dict) or not all(
+            isinstance(patterns, list) and all(isinstance(p, str) for p in patterns)
+            for patterns in rules.values()
+        ):
+            raise ValueError("Rules file must map decisions to lists of patterns")
+        return cls(rules, source=path)
+
+
+class RulesFile:
+    """A RuleSet loaded from a file and reloaded when the file changes"""
+
+    def __init__(self, path: str, fallback: RuleSet, reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._rules = fallback
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def current(self) -> RuleSet:
+        now = time.monotonic()
+        if now - self._checked >= self.reload_interval and self._lock.acquire(blocking=False):
+            try:
+                self._checked = now
+                self.reload()
+            finally:
+                self._lock.release()
+        return self._rules
+
+    def reload(self) -> bool:
+        """Load the file if it changed; True when new rules took effect"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            if self._mtime is None:
+                logger.warning(f"Rules file {self.path} not found; using {self._rules.source} rules")
+                self._mtime = -1.0
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            rules = RuleSet.from_file(self.path)
+        except (OSError, ValueError, re.error) as e:
+            logger.error(f"Failed to load rules from {self.path}, keeping {self._rules.source} rules: {e}")
+            return False
+        self._rules = rules
+        logger.info(f"Loaded {len(rules.rules)} constitutional rules from {self.path}")
+        return True
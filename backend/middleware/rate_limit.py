@@ -0,0 +1,378 @@
+"""
+Per-user and per-team rate limiting.
+
+Limits use GCRA (the generic cell rate algorithm): each key stores a single
+"theoretical arrival time", so memory is O(1) per key regardless of the
+limit, and a key whose arrival time has passed is indistinguishable from a
+key never seen, so idle keys can be evicted without losing anything.
+
+State lives in a pluggable backend:
+
+- ``memory``: a per-process dict, bounded by ``RATE_LIMIT_MAX_KEYS`` and
+  pruned of idle keys as it goes. Limits apply per replica.
+- ``dapr``: the Dapr state store (``RATE_LIMIT_STATE_STORE``, e.g. backed by
+  Redis), updated with ETag compare-and-set so limits are shared across
+  replicas; idle keys expire through the store's TTL. If the sidecar is
+  unreachable requests are allowed rather than failing the API.
+
+``RateLimitMiddleware`` charges each request against its user bucket and,
+when the request names a team, the team bucket, once both have room. Routes can cost more than one
+token; routes with a cost of 0 are never limited.
+
+Neither API authenticates callers, so anything a client sends (an
+``X-User-Id`` header, a ``user_id`` query parameter) could name someone
+else's bucket and drain it. By default requests are therefore limited per
+client address only, with no team buckets. Identity headers are trusted only
+from the proxies in ``RATE_LIMIT_TRUSTED_PROXIES`` (addresses or CIDR
+ranges), which are expected to authenticate the caller and set them:
+
+- ``X-User-Id`` names the user bucket; without it the client address is
+  taken from ``X-Forwarded-For``
+- ``X-Team-Id``, or the team in an ``/api/teams/{id}`` path, names the team
+  bucket for an identified user
+
+Behind an ingress, set ``RATE_LIMIT_TRUSTED_PROXIES`` to its addresses;
+otherwise every request appears to come from the ingress and shares one
+bucket.
+
+The H4 todo API (``hackathons/h4-cloud-native/backend/rate_limit.py``) and
+the course companion backend (``backend/middleware/rate_limit.py``) each
+ship an identical copy of this file, so either app deploys on its own; the
+companion backend's tests fail if the copies differ, so change both
+together. Each app passes its own route costs (``RATE_LIMIT_COSTS`` in its
+``main.py``).
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from ipaddress import ip_address, ip_network
+from typing import Callable, Optional, Sequence, Tuple
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "30"))
+RATE_LIMIT_TEAM_PER_MINUTE = float(os.getenv("RATE_LIMIT_TEAM_PER_MINUTE", "600"))
+RATE_LIMIT_TEAM_BURST = int(os.getenv("RATE_LIMIT_TEAM_BURST", "100"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_STATE_STORE = os.getenv("RATE_LIMIT_STATE_STORE", "statestore")
+RATE_LIMIT_TRUSTED_PROXIES = os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "")
+DAPR_HTTP_PORT = os.getenv("DAPR_HTTP_PORT", "3500")
+
+TEAM_PATH = re.compile(r"^/api/teams/([^/]+)")
+
+
+@dataclass(frozen=True)
+class Limit:
+    """``rate`` requests per ``period`` seconds, with up to ``burst`` at once."""
+    rate: float
+    period: float = 60.0
+    burst: int = 1
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        return self.emission_interval * self.burst
+
+
+@dataclass
+class Decision:
+    """Outcome of charging a key; ``retry_after`` is 0 when allowed."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+def gcra(tat: Optional[float], now: float, limit: Limit, cost: int) -> Tuple[float, Decision]:
+    """Charge ``cost`` tokens; returns the new arrival time and the decision."""
+    tat = max(tat or now, now)
+    new_tat = tat + limit.emission_interval * cost
+    allow_at = new_tat - limit.tolerance
+    if now < allow_at:
+        return tat, Decision(False, limit.burst, 0, allow_at - now)
+    remaining = int((now - allow_at) / limit.emission_interval)
+    return new_tat, Decision(True, limit.burst, remaining)
+
+
+class MemoryBackend:
+    """In-process GCRA state: one float per key, idle keys evicted."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def apply(self, key: str, limit: Limit, cost: int, now: float, charge: bool = True) -> Decision:
+        with self._lock:
+            new_tat, decision = gcra(self._tats.get(key), now, limit, cost)
+            if not charge:
+                return decision
+            if new_tat > now:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+            else:
+                self._tats.pop(key, None)
+            self._evict(now)
+            return decision
+
+    def _evict(self, now: float) -> None:
+        # Least recently charged first; an expired key carries no state
+        while self._tats:
+            key, tat = next(iter(self._tats.items()))
+            if tat > now and len(self._tats) <= self.max_keys:
+                break
+            del self._tats[key]
+
+
+class DaprStateBackend:
+    """GCRA state in a Dapr state store, shared by every replica."""
+
+    blocking = True
+
+    def __init__(self, store: str = RATE_LIMIT_STATE_STORE,
+                 base_url: str = f"http://localhost:{DAPR_HTTP_PORT}", attempts: int = 3):
+        self.url = f"{base_url}/v1.0/state/{store}"
+        self.attempts = attempts
+
+    def apply(self, key: str, limit: Limit, cost: int, now: float, charge: bool = True) -> Decision:
+        try:
+            for _ in range(self.attempts):
+                tat, etag = self._get(key)
+                new_tat, decision = gcra(tat, now, limit, cost)
+                if not decision.allowed or cost == 0 or not charge:
+                    return decision
+                if self._set(key, new_tat, etag, ttl=math.ceil(new_tat - now) + 1):
+                    return decision
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+        return Decision(True, limit.burst, limit.burst)
+
+    def _get(self, key: str) -> Tuple[Optional[float], Optional[str]]:
+        response = urlopen(Request(f"{self.url}/{quote(key, safe='')}"), timeout=2)
+        data = response.read().decode()
+        if not data:
+            return None, None
+        return json.loads(data).get("tat"), response.headers.get("ETag")
+
+    def _set(self, key: str, tat: float, etag: Optional[str], ttl: int) -> bool:
+        item = {
+            "key": key,
+            "value": {"tat": tat},
+            "options": {"concurrency": "first-write"},
+            "metadata": {"ttlInSeconds": str(ttl)},
+        }
+        if etag:
+            item["etag"] = etag
+        request = Request(
+            self.url,
+            data=json.dumps([item]).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urlopen(request, timeout=2)
+            return True
+        except HTTPError as e:
+            if e.code == 409:  # Lost the compare-and-set race; re-read and retry
+                return False
+            raise
+
+
+def backend_from_env(name: str = RATE_LIMIT_BACKEND):
+    if name == "dapr":
+        return DaprStateBackend()
+    if name != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND {name!r}, using memory")
+    return MemoryBackend()
+
+
+class KeyedRateLimiter:
+    """Applies one ``Limit`` to many keys stored in a backend."""
+
+    def __init__(self, limit: Limit, backend=None, prefix: str = "ratelimit"):
+        self.limit = limit
+        self.backend = MemoryBackend() if backend is None else backend
+        self.prefix = prefix
+
+    def check(self, key: str, cost: int = 1, now: Optional[float] = None) -> Decision:
+        """Charge ``cost`` against ``key``; a cost of 0 only reports the state."""
+        now = time.time() if now is None else now
+        return self.backend.apply(f"{self.prefix}:{key}", self.limit, cost, now)
+
+    def peek(self, key: str, cost: int = 1, now: Optional[float] = None) -> Decision:
+        """Decision ``check`` would make for ``cost``, without charging it."""
+        now = time.time() if now is None else now
+        return self.backend.apply(f"{self.prefix}:{key}", self.limit, cost, now, charge=False)
+
+
+class RequestIdentity:
+    """
+    Works out the (user, team) a request is charged to.
+
+    Requests from ``trusted_proxies`` are charged to the identity headers
+    the proxy sets; any other request to its client address alone.
+    """
+
+    def __init__(self, trusted_proxies: Sequence[str] = ()):
+        self.trusted = [
+            ip_network(proxy.strip(), strict=False) for proxy in trusted_proxies if proxy.strip()
+        ]
+
+    def is_trusted(self, address: Optional[str]) -> bool:
+        if not address or not self.trusted:
+            return False
+        try:
+            ip = ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted)
+
+    def __call__(self, scope) -> Tuple[str, Optional[str]]:
+        client = scope.get("client")
+        address = client[0] if client else None
+        if not self.is_trusted(address):
+            return (f"ip:{address}" if address else "anonymous"), None
+
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        user = headers.get("x-user-id")
+        if not user:
+            return f"ip:{self.forwarded_client(headers.get('x-forwarded-for'), address)}", None
+        team = headers.get("x-team-id")
+        if not team:
+            match = TEAM_PATH.match(scope["path"])
+            team = match.group(1) if match else None
+        return user, team
+
+    def forwarded_client(self, forwarded_for: Optional[str], address: str) -> str:
+        """The nearest address in ``X-Forwarded-For`` that isn't a trusted proxy."""
+        hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self.is_trusted(hop):
+                return hop
+        return hops[0] if hops else address
+
+
+default_identify = RequestIdentity(RATE_LIMIT_TRUSTED_PROXIES.split(","))
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware enforcing per-user and per-team request budgets.
+
+    ``costs`` is a sequence of ``(method, path_regex, cost)``; the first match
+    sets the cost of a request, otherwise it costs 1.
+    """
+
+    def __init__(
+        self,
+        app,
+        costs: Sequence[Tuple[str, str, int]] = (),
+        user_limit: Optional[Limit] = None,
+        team_limit: Optional[Limit] = None,
+        backend=None,
+        identify: Callable = default_identify,
+        enabled: Optional[bool] = None,
+    ):
+        self.app = app
+        self.enabled = RATE_LIMIT_ENABLED if enabled is None else enabled
+        self.costs = [(method, re.compile(pattern), cost) for method, pattern, cost in costs]
+        backend = backend_from_env() if backend is None else backend
+        self.users = KeyedRateLimiter(
+            user_limit or Limit(RATE_LIMIT_PER_MINUTE, 60, RATE_LIMIT_BURST), backend, "ratelimit:user"
+        )
+        self.teams = KeyedRateLimiter(
+            team_limit or Limit(RATE_LIMIT_TEAM_PER_MINUTE, 60, RATE_LIMIT_TEAM_BURST),
+            backend,
+            "ratelimit:team",
+        )
+        self.identify = identify
+
+    def cost(self, method: str, path: str) -> int:
+        for rule_method, pattern, cost in self.costs:
+            if rule_method in (method, "*") and pattern.match(path):
+                return cost
+        return 1
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        cost = self.cost(scope["method"], scope["path"])
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        if self.users.backend.blocking:
+            decision = await run_in_threadpool(self._charge, scope, cost)
+        else:
+            decision = self._charge(scope, cost)
+
+        if not decision.allowed:
+            await self._reject(send, decision)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-ratelimit-limit", str(decision.limit).encode()))
+                headers.append((b"x-ratelimit-remaining", str(decision.remaining).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _charge(self, scope, cost: int) -> Decision:
+        user, team = self.identify(scope)
+        # Both budgets are checked before either is charged, so a request the
+        # team budget refuses doesn't use up the user's
+        decision = self.users.peek(user, cost)
+        if not decision.allowed:
+            return decision
+        if team:
+            team_decision = self.teams.peek(team, cost)
+            if not team_decision.allowed:
+                return team_decision
+            self.teams.check(team, cost)
+        return self.users.check(user, cost)
+
+    @staticmethod
+    async def _reject(send, decision: Decision) -> None:
+        retry_after = math.ceil(decision.retry_after)
+        body = json.dumps({"detail": "Rate limit exceeded", "retry_after": retry_after}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+                (b"x-ratelimit-limit", str(decision.limit).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -2,6 +2,6 @@
 Routers package for Course Companion API
 """
 
-from . import chat, progress
+from . import chat, progress, review
 
-__all__ = ["chat", "progress"]
+__all__ = ["chat", "progress", "review"]
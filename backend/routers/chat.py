@@ -4,8 +4,12 @@ Handles chat interactions with constitutional filtering
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List, Dict, Any
+import json
 import logging
 import time
 import uuid
@@ -14,8 +18,11 @@ from pathlib import Path
 
 from middleware.constitutional_filter import ConstitutionalFilter
 from services.chatgpt_service import get_chatgpt_service
+from services.context_builder import turns_to_history
 from services.logger_service import get_conversation_logger
 from services.dapr_service import get_dapr_service
+from services.approval_writer import get_approval_writer
+from services.review_queue import get_review_queue
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +39,7 @@ class ChatRequest(BaseModel):
     message: str
     student_id: str = "anonymous"
     conversation_id: Optional[str] = None
+    course_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
@@ -67,35 +75,7 @@ async def chat(request: ChatRequest):
     )
 
     if decision == "block":
-        # Return Socratic response instead of direct answer
-        socratic_response = constitutional_filter.get_socratic_response(reason)
-
-        # Log the blocked interaction
-        conversation_logger.log_conversation(
-            student_id=request.student_id,
-            query=request.message,
-            response=socratic_response,
-            decision=decision,
-            conversation_id=conv_id,
-            metadata={"reason": reason, "pattern_matched": metadata.get("pattern_matched")}
-        )
-
-        # Publish event to Dapr pub/sub
-        event_data = {
-            "type": "chat_blocked",
-            "student_id": request.student_id,
-            "conversation_id": conv_id,
-            "query": request.message,
-            "response": socratic_response,
-            "reason": reason,
-            "timestamp": time.time()
-        }
-
-        try:
-            await dapr_service.publish_event("chat-events", event_data)
-        except Exception as e:
-            logger.error(f"Failed to publish chat_blocked event: {str(e)}")
-
+        socratic_response = await _handle_blocked(request, conv_id, reason, metadata)
         return ChatResponse(
             response=socratic_response,
             conversation_id=conv_id,
@@ -104,39 +84,7 @@ async def chat(request: ChatRequest):
         )
 
     elif decision == "flag":
-        # Return notice that human review is required
-        flagged_response = (
-            "Your request has been flagged for review. "
-            "A human instructor will review your question shortly. "
-            "In the meantime, I can help with general learning concepts."
-        )
-
-        # Log the flagged interaction
-        conversation_logger.log_conversation(
-            student_id=request.student_id,
-            query=request.message,
-            response=flagged_response,
-            decision=decision,
-            conversation_id=conv_id,
-            metadata={"reason": reason, "requires_human_review": True}
-        )
-
-        # Publish event to Dapr pub/sub
-        event_data = {
-            "type": "chat_flagged",
-            "student_id": request.student_id,
-            "conversation_id": conv_id,
-            "query": request.message,
-            "response": flagged_response,
-            "reason": reason,
-            "timestamp": time.time()
-        }
-
-        try:
-            await dapr_service.publish_event("chat-events", event_data)
-        except Exception as e:
-            logger.error(f"Failed to publish chat_flagged event: {str(e)}")
-
+        flagged_response = await _handle_flagged(request, conv_id, reason)
         return ChatResponse(
             response=flagged_response,
             conversation_id=conv_id,
@@ -145,24 +93,18 @@ async def chat(request: ChatRequest):
         )
 
     else:  # decision == "allow"
-        # Process with ChatGPT service
+        # Process with ChatGPT service, with the conversation so far
+        history = await _load_history(request)
         result = await chatgpt_service.chat_completion(
             message=request.message,
-            student_id=request.student_id
+            conversation_history=history,
+            student_id=request.student_id,
+            course_id=request.course_id
         )
 
         if not result.get("success"):
             # Handle rate limiting or API errors
-            error_response = result.get("message", "Service temporarily unavailable")
-
-            conversation_logger.log_conversation(
-                student_id=request.student_id,
-                query=request.message,
-                response=error_response,
-                decision="error",
-                conversation_id=conv_id,
-                metadata={"error": result.get("error")}
-            )
+            error_response = _log_error(request, conv_id, result)
 
             if result.get("error") == "rate_limit_exceeded":
                 return ChatResponse(
@@ -172,39 +114,17 @@ async def chat(request: ChatRequest):
                     logged=True
                 )
 
+            if result.get("error") == "busy":
+                raise HTTPException(
+                    status_code=503,
+                    detail=error_response,
+                    headers={"Retry-After": str(result.get("wait_seconds", 1))}
+                )
+
             raise HTTPException(status_code=500, detail=error_response)
 
         ai_response = result.get("response", "")
-
-        # Log the allowed interaction
-        conversation_logger.log_conversation(
-            student_id=request.student_id,
-            query=request.message,
-            response=ai_response,
-            decision=decision,
-            conversation_id=conv_id,
-            metadata={
-                "tokens_used": result.get("tokens_used"),
-                "mock": result.get("mock", False)
-            }
-        )
-
-        # Publish event to Dapr pub/sub
-        event_data = {
-            "type": "chat_completed",
-            "student_id": request.student_id,
-            "conversation_id": conv_id,
-            "query": request.message,
-            "response": ai_response,
-            "decision": decision,
-            "tokens_used": result.get("tokens_used", 0),
-            "timestamp": time.time()
-        }
-
-        try:
-            await dapr_service.publish_event("chat-events", event_data)
-        except Exception as e:
-            logger.error(f"Failed to publish chat_completed event: {str(e)}")
+        await _record_completion(request, conv_id, decision, ai_response, result)
 
         return ChatResponse(
             response=ai_response,
@@ -214,12 +134,257 @@ async def chat(request: ChatRequest):
         )
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Process a chat message like POST /chat, streaming the reply
+
+    The constitutional filter runs before anything is sent upstream. The
+    response is a text/event-stream of:
+    - start: conversation_id and constitutional_decision
+    - token: {"text": ...} for each piece of the reply as it is generated
+    - done: tokens_used and mock, or error: error, message (and wait_seconds)
+
+    Blocked and flagged queries stream their fixed reply as one token.
+    Allowed replies are logged and published once the stream has ended,
+    after the last byte is sent.
+    """
+    conv_id = request.conversation_id or str(uuid.uuid4())
+
+    decision, reason, metadata = constitutional_filter.check_query(
+        request.message,
+        request.student_id
+    )
+    start = {"conversation_id": conv_id, "constitutional_decision": decision}
+
+    if decision in ("block", "flag"):
+        if decision == "block":
+            text = await _handle_blocked(request, conv_id, reason, metadata)
+        else:
+            text = await _handle_flagged(request, conv_id, reason)
+        return _event_stream(_fixed_events(start, text))
+
+    history = await _load_history(request)
+    state: Dict[str, Any] = {"parts": [], "result": None}
+
+    async def events():
+        yield _sse("start", start)
+        async for event in chatgpt_service.stream_completion(
+            message=request.message,
+            conversation_history=history,
+            student_id=request.student_id,
+            course_id=request.course_id
+        ):
+            kind = event.pop("type")
+            if kind == "token":
+                state["parts"].append(event["text"])
+                yield _sse("token", {"text": event["text"]})
+            elif kind == "done":
+                state["result"] = event
+                yield _sse("done", {
+                    "tokens_used": event.get("tokens_used", 0),
+                    "mock": event.get("mock", False)
+                })
+            else:
+                state["result"] = event
+                yield _sse("error", {
+                    key: event[key] for key in ("error", "message", "wait_seconds") if key in event
+                })
+
+    return _event_stream(events(), BackgroundTask(_finish_stream, request, conv_id, decision, state))
+
+
+async def _load_history(request: ChatRequest) -> List[Dict[str, str]]:
+    """Earlier answered turns of the request's conversation, as chat messages"""
+    if not request.conversation_id:
+        return []
+    entries = await run_in_threadpool(
+        conversation_logger.get_conversation_turns,
+        request.conversation_id,
+        chatgpt_service.context_turns
+    )
+    return turns_to_history(entries)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _fixed_events(start: Dict[str, Any], text: str):
+    yield _sse("start", start)
+    yield _sse("token", {"text": text})
+    yield _sse("done", {"tokens_used": 0, "mock": False})
+
+
+def _event_stream(events, background: Optional[BackgroundTask] = None) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background
+    )
+
+
+async def _finish_stream(request: ChatRequest, conv_id: str, decision: str, state: Dict[str, Any]):
+    """Log and publish a streamed reply; runs after the response has been sent"""
+    result = state["result"]
+    if result is None:
+        # Client went away mid-stream; keep what was generated
+        result = {"success": True, "interrupted": True}
+    if not result.get("success"):
+        _log_error(request, conv_id, result)
+        return
+    ai_response = result.get("response", "".join(state["parts"]))
+    await _record_completion(request, conv_id, decision, ai_response, result)
+
+
+async def _handle_blocked(request: ChatRequest, conv_id: str, reason: str, metadata: Dict) -> str:
+    """Log and publish a blocked query; returns the Socratic reply"""
+    # Return Socratic response instead of direct answer
+    socratic_response = constitutional_filter.get_socratic_response(reason)
+
+    # Log the blocked interaction
+    conversation_logger.log_conversation(
+        student_id=request.student_id,
+        course_id=request.course_id,
+        query=request.message,
+        response=socratic_response,
+        decision="block",
+        conversation_id=conv_id,
+        metadata={"reason": reason, "pattern_matched": metadata.get("pattern_matched")}
+    )
+
+    # Publish event to Dapr pub/sub
+    event_data = {
+        "type": "chat_blocked",
+        "student_id": request.student_id,
+        "conversation_id": conv_id,
+        "query": request.message,
+        "response": socratic_response,
+        "reason": reason,
+        "timestamp": time.time()
+    }
+
+    try:
+        await dapr_service.publish_event("chat-events", event_data)
+    except Exception as e:
+        logger.error(f"Failed to publish chat_blocked event: {str(e)}")
+
+    return socratic_response
+
+
+async def _handle_flagged(request: ChatRequest, conv_id: str, reason: str) -> str:
+    """Log and publish a flagged query; returns the waiting notice"""
+    # Return notice that human review is required
+    flagged_response = (
+        "Your request has been flagged for review. "
+        "A human instructor will review your question shortly. "
+        "In the meantime, I can help with general learning concepts."
+    )
+
+    # Log the flagged interaction
+    conversation_logger.log_conversation(
+        student_id=request.student_id,
+        course_id=request.course_id,
+        query=request.message,
+        response=flagged_response,
+        decision="flag",
+        conversation_id=conv_id,
+        metadata={"reason": reason, "requires_human_review": True}
+    )
+
+    # Publish event to Dapr pub/sub
+    event_data = {
+        "type": "chat_flagged",
+        "student_id": request.student_id,
+        "conversation_id": conv_id,
+        "query": request.message,
+        "response": flagged_response,
+        "reason": reason,
+        "timestamp": time.time()
+    }
+
+    try:
+        await dapr_service.publish_event("chat-events", event_data)
+    except Exception as e:
+        logger.error(f"Failed to publish chat_flagged event: {str(e)}")
+
+    return flagged_response
+
+
+def _log_error(request: ChatRequest, conv_id: str, result: Dict[str, Any]) -> str:
+    """Log a failed completion; returns the message shown to the student"""
+    error_response = result.get("message", "Service temporarily unavailable")
+
+    conversation_logger.log_conversation(
+        student_id=request.student_id,
+        course_id=request.course_id,
+        query=request.message,
+        response=error_response,
+        decision="error",
+        conversation_id=conv_id,
+        metadata={"error": result.get("error")}
+    )
+    return error_response
+
+
+async def _record_completion(
+    request: ChatRequest,
+    conv_id: str,
+    decision: str,
+    ai_response: str,
+    result: Dict[str, Any]
+):
+    """Log an answered query and publish chat_completed"""
+    metadata = {
+        "tokens_used": result.get("tokens_used"),
+        "mock": result.get("mock", False)
+    }
+    if result.get("cached"):
+        metadata["cached"] = result["cached"]
+    if result.get("coalesced"):
+        metadata["coalesced"] = True
+    if result.get("interrupted"):
+        metadata["interrupted"] = True
+
+    # Log the allowed interaction
+    conversation_logger.log_conversation(
+        student_id=request.student_id,
+        course_id=request.course_id,
+        query=request.message,
+        response=ai_response,
+        decision=decision,
+        conversation_id=conv_id,
+        metadata=metadata
+    )
+
+    # Publish event to Dapr pub/sub
+    event_data = {
+        "type": "chat_completed",
+        "student_id": request.student_id,
+        "conversation_id": conv_id,
+        "query": request.message,
+        "response": ai_response,
+        "decision": decision,
+        "tokens_used": result.get("tokens_used", 0),
+        "timestamp": time.time()
+    }
+
+    try:
+        await dapr_service.publish_event("chat-events", event_data)
+    except Exception as e:
+        logger.error(f"Failed to publish chat_completed event: {str(e)}")
+
+
 @router.get("/conversations/{student_id}")
 async def get_conversations(student_id: str):
     """
     Get conversation history for a student from logs
     """
-    conversations = conversation_logger.get_student_conversations(student_id)
+    # Reads wait for queued log writes, so keep them off the event loop
+    conversations = await run_in_threadpool(
+        conversation_logger.get_student_conversations, student_id
+    )
     return {
         "student_id": student_id,
         "conversations": conversations,
@@ -231,12 +396,11 @@ async def get_conversations(student_id: str):
 async def flag_conversation(conversation_id: str, request: FlagRequest):
     """
     Manually flag a conversation for review
-    Creates an approval request in Pending_Approval folder
+    Queues an approval request for the Pending_Approval folder
     """
-    # Create flag file in Pending_Approval
+    # Flag file for Pending_Approval; the approval writer creates the folder
     vault_path = Path("../vault")
     pending_dir = vault_path / "Pending_Approval"
-    pending_dir.mkdir(parents=True, exist_ok=True)
 
     from datetime import datetime
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -276,17 +440,18 @@ _Add notes here after review_
 **Date:** _________________
 """
 
-    try:
-        filepath.write_text(content)
-        logger.info(f"Created manual flag: {filename}")
-        return {
-            "status": "flagged",
-            "conversation_id": conversation_id,
-            "message": "Conversation flagged for review"
-        }
-    except Exception as e:
-        logger.error(f"Failed to create flag: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to flag conversation: {str(e)}")
+    def record(path: Path) -> None:
+        get_review_queue(str(vault_path)).enqueue(
+            path.stem, "manual_flag", conversation_id=conversation_id, reason=request.reason
+        )
+        logger.info(f"Created manual flag: {path.name}")
+
+    get_approval_writer().write(filepath, content, on_written=record)
+    return {
+        "status": "flagged",
+        "conversation_id": conversation_id,
+        "message": "Conversation flagged for review"
+    }
 
 
 @router.get("/chat/status")
@@ -296,6 +461,15 @@ async def chat_status():
         "status": "operational",
         "constitutional_filter": "active",
         "openai_api_configured": bool(os.getenv("OPENAI_API_KEY")),
-        "blocked_patterns_count": len(constitutional_filter.PROHIBITED_PATTERNS),
-        "suspicious_patterns_count": len(constitutional_filter.SUSPICIOUS_PATTERNS)
+        "blocked_patterns_count": len(constitutional_filter.rules.patterns("block")),
+        "suspicious_patterns_count": len(constitutional_filter.rules.patterns("flag")),
+        "rules_source": constitutional_filter.rules.source,
+        "openai_concurrency": chatgpt_service.limiter.stats(),
+        "response_cache": (
+            chatgpt_service.response_cache.stats() if chatgpt_service.response_cache else None
+        ),
+        "coalescing": (
+            chatgpt_service.single_flight.stats() if chatgpt_service.single_flight else None
+        ),
+        "approval_writer": get_approval_writer().stats()
     }
\ No newline at end of file
@@ -4,19 +4,31 @@ Tracks student learning progress and analytics
 """
 
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 import os
 
 from services.logger_service import get_conversation_logger
+from services.progress_rollups import get_progress_rollups
 
 router = APIRouter()
 
+VAULT_PATH = Path("../vault")
+PROGRESS_DIR = VAULT_PATH / "Student_Progress"
+
 # Initialize conversation logger for stats
-conversation_logger = get_conversation_logger(vault_path="../vault")
+conversation_logger = get_conversation_logger(vault_path=str(VAULT_PATH))
+
+# Running per-student and per-course aggregates, updated on every write
+progress_rollups = get_progress_rollups(vault_path=str(VAULT_PATH))
+
+# Updates run in the threadpool; each rewrites the whole student file
+_progress_lock = threading.Lock()
 
 class ProgressUpdate(BaseModel):
     student_id: str
@@ -44,7 +56,8 @@ async def get_student_progress(student_id: str):
         last_active: str (ISO timestamp)
     """
     # Get stats from conversation logger
-    stats = conversation_logger.get_student_stats(student_id)
+    # Reads wait for queued log writes, so keep them off the event loop
+    stats = await run_in_threadpool(conversation_logger.get_student_stats, student_id)
 
     return {
         "student_id": student_id,
@@ -58,50 +71,65 @@ async def get_student_progress(student_id: str):
 @router.post("/progress/update")
 async def update_progress(data: ProgressUpdate):
     """Update student progress for a specific lesson"""
-
-    # Create progress directory if it doesn't exist
-    vault_path = Path("../vault")
-    progress_dir = vault_path / "Student_Progress"
-    progress_dir.mkdir(parents=True, exist_ok=True)
-
-    # Create student-specific file
-    student_file = progress_dir / f"{data.student_id}_progress.json"
-
-    # Load existing progress or create new
-    if student_file.exists():
-        with open(student_file, 'r') as f:
-            progress_data = json.load(f)
-    else:
-        progress_data = {}
-
-    # Update progress record
-    key = f"{data.course_id}:{data.lesson_id}"
-    progress_data[key] = {
-        "course_id": data.course_id,
-        "lesson_id": data.lesson_id,
-        "completed": data.completed,
-        "score": data.score,
-        "time_spent": data.time_spent,
-        "updated_at": datetime.now().isoformat()
-    }
-
-    # Save updated progress
-    with open(student_file, 'w') as f:
-        json.dump(progress_data, f, indent=2)
+    # The progress file and the rollups are disk IO, so keep them off the event loop
+    record = await run_in_threadpool(_save_progress, data)
 
     return {
         "status": "success",
         "message": f"Progress updated for student {data.student_id}",
-        "record": progress_data[key]
+        "record": record
     }
 
+
+def _save_progress(data: ProgressUpdate) -> Dict[str, Any]:
+    """Write one lesson record to the student's file and the rollups"""
+    with _progress_lock:
+        # Create progress directory if it doesn't exist
+        PROGRESS_DIR.mkdir(parents=True, exist_ok=True)
+
+        # Create student-specific file
+        student_file = PROGRESS_DIR / f"{data.student_id}_progress.json"
+
+        # Load existing progress or create new
+        if student_file.exists():
+            with open(student_file, 'r') as f:
+                progress_data = json.load(f)
+        else:
+            progress_data = {}
+
+        # Update progress record
+        key = f"{data.course_id}:{data.lesson_id}"
+        progress_data[key] = {
+            "course_id": data.course_id,
+            "lesson_id": data.lesson_id,
+            "completed": data.completed,
+            "score": data.score,
+            "time_spent": data.time_spent,
+            "updated_at": datetime.now().isoformat()
+        }
+
+        # Save updated progress
+        with open(student_file, 'w') as f:
+            json.dump(progress_data, f, indent=2)
+
+        record = progress_data[key]
+        progress_rollups.record_lesson(
+            data.student_id,
+            data.course_id,
+            data.lesson_id,
+            completed=data.completed,
+            score=data.score,
+            time_spent=data.time_spent,
+            updated_at=record["updated_at"],
+        )
+        return record
+
+
 @router.get("/progress/details/{student_id}")
 async def get_progress_details(student_id: str, course_id: Optional[str] = None):
     """Get detailed progress for a specific student"""
 
-    vault_path = Path("../vault")
-    progress_dir = vault_path / "Student_Progress"
-    student_file = progress_dir / f"{student_id}_progress.json"
+    student_file = PROGRESS_DIR / f"{student_id}_progress.json"
 
     if not student_file.exists():
         return {
@@ -116,24 +144,21 @@ async def get_progress_details(student_id: str, course_id: Optional[str] = None)
 
     # Filter by course if specified
     if course_id:
-        filtered_data = {k: v for k, v in progress_data.items() if k.startswith(course_id)}
+        filtered_data = {k: v for k, v in progress_data.items() if v.get("course_id") == course_id}
     else:
         filtered_data = progress_data
 
-    # Calculate statistics
-    total_lessons = len(filtered_data)
-    completed_lessons = sum(1 for v in filtered_data.values() if v.get('completed', False))
-    scores = [v['score'] for v in filtered_data.values() if v.get('score') is not None]
-    avg_score = sum(scores) / len(scores) if scores else None
+    # Totals come from the running rollup rather than the records
+    summary = progress_rollups.student(student_id, course_id) or {}
 
     return {
         "student_id": student_id,
         "course_id": course_id,
         "progress_records": filtered_data,
-        "total_lessons": total_lessons,
-        "completed_lessons": completed_lessons,
-        "completion_percentage": (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0,
-        "average_score": avg_score
+        "total_lessons": summary.get("total_lessons", 0),
+        "completed_lessons": summary.get("completed_lessons", 0),
+        "completion_percentage": summary.get("completion_rate", 0),
+        "average_score": summary.get("average_score")
     }
 
 
@@ -141,39 +166,50 @@ async def get_progress_details(student_id: str, course_id: Optional[str] = None)
 async def get_student_analytics(student_id: str):
     """Get detailed analytics for a student"""
 
-    vault_path = Path("../vault")
-    progress_dir = vault_path / "Student_Progress"
-    student_file = progress_dir / f"{student_id}_progress.json"
+    summary = progress_rollups.student(student_id)
 
-    if not student_file.exists():
+    if summary is None:
         return {
             "student_id": student_id,
             "analytics": {},
             "message": "No progress data found for this student"
         }
 
-    with open(student_file, 'r') as f:
-        progress_data = json.load(f)
-
-    # Calculate analytics
-    total_lessons = len(progress_data)
-    completed_lessons = sum(1 for v in progress_data.values() if v.get('completed', False))
-    scores = [v['score'] for v in progress_data.values() if v.get('score') is not None]
-
     analytics = {
-        "total_lessons": total_lessons,
-        "completed_lessons": completed_lessons,
-        "completion_rate": (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0,
-        "average_score": sum(scores) / len(scores) if scores else None,
-        "highest_score": max(scores) if scores else None,
-        "lowest_score": min(scores) if scores else None,
-        "total_time_spent": sum(v.get('time_spent', 0) for v in progress_data.values()),
-        "last_updated": max(
-            v.get('updated_at', '') for v in progress_data.values()
-        ) if progress_data else None
+        "total_lessons": summary["total_lessons"],
+        "completed_lessons": summary["completed_lessons"],
+        "completion_rate": summary["completion_rate"],
+        "average_score": summary["average_score"],
+        "score_stddev": summary["score_stddev"],
+        "highest_score": summary["highest_score"],
+        "lowest_score": summary["lowest_score"],
+        "total_time_spent": summary["total_time_spent"],
+        "last_updated": summary["last_updated"],
+        "conversations": summary["conversations"],
+        "distinct_concepts": summary["distinct_concepts"],
+        "last_active": summary["last_active"]
     }
 
     return {
         "student_id": student_id,
         "analytics": analytics
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/progress/course/{course_id}")
+async def get_course_analytics(course_id: str):
+    """Get aggregate progress across every student in a course"""
+
+    summary = progress_rollups.course(course_id)
+
+    if summary is None:
+        return {
+            "course_id": course_id,
+            "analytics": {},
+            "message": "No progress data found for this course"
+        }
+
+    return {
+        "course_id": course_id,
+        "analytics": summary
+    }
@@ -0,0 +1,97 @@
+"""
+Review Router for Course Companion API
+HITL dashboard endpoints backed by the review queue
+"""
+
+import asyncio
+import logging
+import os
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from pathlib import Path
+
+from services.review_queue import get_review_queue, STATUS_DIRS, APPROVED, REJECTED
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+VAULT_PATH = Path("../vault")
+# Seconds between checks for requests reviewed by moving files in the vault
+REVIEW_RECONCILE_SECONDS = float(os.getenv("REVIEW_RECONCILE_SECONDS", "30"))
+
+review_queue = get_review_queue(vault_path=str(VAULT_PATH))
+
+class ReviewDecision(BaseModel):
+    reviewer: Optional[str] = None
+
+
+@router.get("/review/queue")
+async def get_review_queue_page(
+    status: Optional[str] = "pending",
+    student_id: Optional[str] = None,
+    date: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 50,
+):
+    """
+    List approval requests, newest first
+
+    Filter by status (pending, approved, rejected or all), student and
+    day (YYYY-MM-DD). Requests approved or rejected by moving files in the
+    vault show up once the queue is reconciled (in the background, or with
+    POST /review/reconcile).
+    """
+    if status == "all":
+        status = None
+    elif status not in STATUS_DIRS:
+        raise HTTPException(status_code=400, detail=f"Unknown status: {status}")
+    if offset < 0 or not 1 <= limit <= 200:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit 1-200")
+
+    page = review_queue.list(status=status, student_id=student_id, day=date,
+                             offset=offset, limit=limit)
+    page["counts"] = review_queue.counts()
+    return page
+
+
+@router.post("/review/reconcile")
+async def reconcile_review_queue():
+    """Pick up requests approved or rejected by moving files in the vault now"""
+    return {"moved": await run_in_threadpool(review_queue.reconcile)}
+
+
+async def reconcile_periodically(interval: float = REVIEW_RECONCILE_SECONDS) -> None:
+    """Reconcile the review queue every ``interval`` seconds, off the event loop"""
+    while True:
+        try:
+            moved = await run_in_threadpool(review_queue.reconcile)
+            if moved:
+                logger.info(f"Picked up {moved} review request(s) moved in the vault")
+        except OSError as e:
+            logger.error(f"Failed to reconcile the review queue: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+@router.post("/review/{item_id}/{action}")
+async def review_request(item_id: str, action: str, decision: Optional[ReviewDecision] = None):
+    """
+    Approve or reject a pending request
+    Moves its file to Approved/ or Rejected/ in the vault
+    """
+    statuses = {"approve": APPROVED, "reject": REJECTED}
+    if action not in statuses:
+        raise HTTPException(status_code=404, detail=f"Unknown review action: {action}")
+
+    try:
+        item = review_queue.transition(
+            item_id, statuses[action], reviewed_by=decision.reviewer if decision else None
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Review request {item_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return item.to_dict()
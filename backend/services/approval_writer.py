@@ -0,0 +1,180 @@
+"""
+Background writer for HITL approval files
+
+Flagged queries and manual flags each produce a Markdown approval request
+in vault/Pending_Approval. Writing it inside the request put a file create
+(and a mkdir) on the flagged path only, so flagged requests took longer
+than allowed ones. Requests now only queue the rendered file:
+
+- one writer thread drains the queue in batches, creating each directory
+  once and syncing each directory once per batch
+- each file is written to a hidden temporary file next to it and renamed
+  into place, so reviewers and watchers never see a partial request
+- ``on_written`` callbacks (recording the request in the review queue) run
+  after the rename, so the queue never lists a file that isn't there yet
+- the queue is bounded; when it is full the caller writes the file itself
+  rather than drop an approval request
+"""
+
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WRITER_BATCH_SIZE = 64
+WRITER_MAX_QUEUE = 1000
+
+_Item = Tuple[Path, str, Optional[Callable[[Path], Any]]]
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Write a file through a temporary sibling and rename it into place"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _sync_dir(directory: Path) -> None:
+    # Makes the renames durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ApprovalWriter:
+    """Single background writer for approval request files"""
+
+    def __init__(self, batch_size: int = WRITER_BATCH_SIZE, max_queue: int = WRITER_MAX_QUEUE):
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._dirs: set = set()
+        self._counters = {"queued": 0, "inline": 0, "written": 0, "failed": 0, "batches": 0}
+
+    def write(self, path: Path, content: str,
+              on_written: Optional[Callable[[Path], Any]] = None) -> None:
+        """Queue a file; ``on_written(path)`` runs once it is in place"""
+        item = (Path(path), content, on_written)
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            logger.warning(f"Approval writer queue full, writing {item[0].name} inline")
+            self._count("inline")
+            self._write_batch([item])
+            return
+        self._count("queued")
+
+    def flush(self) -> None:
+        """Block until every queued file has been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Flush and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._counters)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="approval-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            items = [item for item in batch if item is not None]
+            if items:
+                self._write_batch(items)
+            for _ in batch:
+                self._queue.task_done()
+            if len(items) < len(batch):
+                return
+
+    def _write_batch(self, items: List[_Item]) -> None:
+        written: List[_Item] = []
+        for item in items:
+            path = item[0]
+            try:
+                if path.parent not in self._dirs:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    self._dirs.add(path.parent)
+                write_atomic(path, item[1])
+            except OSError as e:
+                logger.error(f"Failed to write approval file {path}: {e}")
+                self._count("failed")
+                continue
+            written.append(item)
+
+        for directory in {item[0].parent for item in written}:
+            _sync_dir(directory)
+        self._count("written", len(written))
+        self._count("batches")
+
+        for path, _, on_written in written:
+            if on_written is None:
+                continue
+            try:
+                on_written(path)
+            except Exception as e:
+                logger.error(f"Failed to record approval request {path.name}: {e}")
+
+
+_writer_instance: Optional[ApprovalWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_approval_writer() -> ApprovalWriter:
+    """Get or create the shared ApprovalWriter"""
+    global _writer_instance
+    if _writer_instance is None:
+        with _writer_lock:
+            if _writer_instance is None:
+                _writer_instance = ApprovalWriter()
+    return _writer_instance
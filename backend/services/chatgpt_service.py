@@ -4,12 +4,21 @@ Integrates with OpenAI API with constitutional rules embedded in system prompt
 """
 
 import os
-import time
+import re
+import math
+import asyncio
 import logging
-from typing import List, Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
-from collections import deque
-from openai import OpenAI, OpenAIError
+
+import httpx
+from openai import AsyncOpenAI, APITimeoutError, OpenAIError
+
+from middleware.rate_limit import KeyedRateLimiter, Limit, backend_from_env
+from services.context_builder import ContextBuilder, TokenCounter
+from services.response_cache import ALL_COURSES, ResponseCache, normalize_question
+from services.single_flight import CoalesceTimeout, SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -39,12 +48,22 @@ If asked for direct solutions, politely redirect to learning.
 
 
 class RateLimiter:
-    """Simple rate limiter using timestamp tracking"""
+    """
+    Per-student chat rate limiter
+
+    Uses GCRA from the rate limiting middleware: constant memory per student,
+    idle students are evicted, and with RATE_LIMIT_BACKEND=dapr the limit is
+    shared by every replica.
+    """
 
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60, backend=None):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, deque] = {}
+        self._limiter = KeyedRateLimiter(
+            Limit(rate=max_requests, period=window_seconds, burst=max_requests),
+            backend if backend is not None else backend_from_env(),
+            prefix="ratelimit:chat",
+        )
 
     def is_allowed(self, student_id: str) -> Tuple[bool, int]:
         """
@@ -53,45 +72,103 @@ class RateLimiter:
         Returns:
             (is_allowed, seconds_until_reset)
         """
-        current_time = time.time()
+        decision = self._limiter.check(student_id)
+        if decision.allowed:
+            return True, 0
+        return False, math.ceil(decision.retry_after)
+
+    def get_remaining(self, student_id: str) -> int:
+        """Get remaining requests for student"""
+        return self._limiter.check(student_id, cost=0).remaining
 
-        if student_id not in self.requests:
-            self.requests[student_id] = deque()
 
-        # Remove expired timestamps
-        while (self.requests[student_id] and
-               current_time - self.requests[student_id][0] > self.window_seconds):
-            self.requests[student_id].popleft()
+class QueueTimeout(Exception):
+    """Raised when a call waited longer than the queue deadline for a slot"""
 
-        # Check if under limit
-        if len(self.requests[student_id]) < self.max_requests:
-            self.requests[student_id].append(current_time)
-            return True, 0
 
-        # Calculate wait time
-        oldest_request = self.requests[student_id][0]
-        wait_time = int(self.window_seconds - (current_time - oldest_request)) + 1
-        return False, wait_time
+async def _acquire(semaphore: asyncio.Semaphore, timeout: float) -> None:
+    # A free semaphore is taken without scheduling a task, even with no time left
+    if not semaphore.locked():
+        await semaphore.acquire()
+        return
+    if timeout <= 0:
+        raise QueueTimeout()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise QueueTimeout()
 
-    def get_remaining(self, student_id: str) -> int:
-        """Get remaining requests for student"""
-        current_time = time.time()
 
-        if student_id not in self.requests:
-            return self.max_requests
+class ConcurrencyLimiter:
+    """
+    Caps in-flight OpenAI calls per worker and per student
 
-        # Remove expired timestamps
-        while (self.requests[student_id] and
-               current_time - self.requests[student_id][0] > self.window_seconds):
-            self.requests[student_id].popleft()
+    Callers over either cap wait in FIFO order until a slot frees up or
+    ``queue_timeout`` seconds pass, then get QueueTimeout. Per-student
+    semaphores exist only while that student has calls waiting or running.
+    """
 
-        return self.max_requests - len(self.requests[student_id])
+    def __init__(self, max_concurrent: int = 32, per_student: int = 2, queue_timeout: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.per_student = per_student
+        self.queue_timeout = queue_timeout
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._students: Dict[str, asyncio.Semaphore] = {}
+        self._student_calls: Dict[str, int] = {}
+        self.in_flight = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self, student_id: str):
+        """Hold one global and one per-student slot for the duration of a call"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+        semaphore = self._students.get(student_id)
+        if semaphore is None:
+            semaphore = self._students[student_id] = asyncio.Semaphore(self.per_student)
+        self._student_calls[student_id] = self._student_calls.get(student_id, 0) + 1
+        try:
+            self.waiting += 1
+            try:
+                await _acquire(semaphore, deadline - loop.time())
+                try:
+                    await _acquire(self._global, deadline - loop.time())
+                except BaseException:
+                    semaphore.release()
+                    raise
+            finally:
+                self.waiting -= 1
+
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                self._global.release()
+                semaphore.release()
+        finally:
+            self._student_calls[student_id] -= 1
+            if self._student_calls[student_id] == 0:
+                del self._student_calls[student_id]
+                del self._students[student_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "per_student": self.per_student,
+        }
 
 
 class ChatGPTService:
     """
     Service for interacting with OpenAI ChatGPT API
     Includes rate limiting and constitutional system prompt
+
+    Calls go through one AsyncOpenAI client per event loop whose HTTP
+    connections are pooled and kept alive, so a worker serves many chats at
+    once; ConcurrencyLimiter keeps that bounded.
     """
 
     def __init__(self):
@@ -104,17 +181,92 @@ class ChatGPTService:
         max_rpm = int(os.getenv("MAX_REQUESTS_PER_MINUTE", "10"))
         self.rate_limiter = RateLimiter(max_requests=max_rpm, window_seconds=60)
 
-        self._client: Optional[OpenAI] = None
+        # OPENAI_BASE_URL points at any OpenAI-compatible server, e.g. the load test fake
+        self.base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", "30"))
+        self.connect_timeout = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+        self.max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        self.max_concurrent = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+        self.per_student_concurrent = int(os.getenv("OPENAI_PER_STUDENT_CONCURRENCY", "2"))
+        self.queue_timeout = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "10"))
+        # Seconds between streamed mock words, to benchmark time-to-first-token locally
+        self.mock_stream_delay = float(os.getenv("MOCK_STREAM_DELAY", "0.02"))
+
+        # Prompt token budget for system prompt, earlier turns and the message
+        self.token_counter = TokenCounter(self.model)
+        self.context_builder = ContextBuilder(
+            SYSTEM_PROMPT,
+            self.token_counter,
+            budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")),
+            summary_tokens=int(os.getenv("CONTEXT_SUMMARY_TOKENS", "200")),
+        )
+        # Earlier turns of a conversation loaded for follow-up questions
+        self.context_turns = int(os.getenv("CONTEXT_MAX_TURNS", "10"))
+
+        # Answers to repeated questions, per course; only real completions are cached
+        self.response_cache: Optional[ResponseCache] = None
+        if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"):
+            self.response_cache = ResponseCache(
+                max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000")),
+                ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", "21600")),
+                similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.8")),
+            )
+
+        # Concurrent identical questions (same course, no history) share one call
+        self.single_flight: Optional[SingleFlight] = None
+        if os.getenv("COALESCE_ENABLED", "true").lower() in ("1", "true", "yes"):
+            self.single_flight = SingleFlight(
+                timeout=float(os.getenv("COALESCE_TIMEOUT", str(self.timeout + self.queue_timeout)))
+            )
+
+        self._client: Optional[AsyncOpenAI] = None
+        self._limiter: Optional[ConcurrencyLimiter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        # Pooled connections and semaphores belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._client = None
+            self._limiter = ConcurrencyLimiter(
+                self.max_concurrent, self.per_student_concurrent, self.queue_timeout
+            )
 
     @property
-    def client(self) -> OpenAI:
-        """Lazy-load OpenAI client"""
+    def client(self) -> AsyncOpenAI:
+        """Lazy-load the AsyncOpenAI client for the running event loop"""
+        self._bind_loop()
         if self._client is None:
             if not self.api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set")
-            self._client = OpenAI(api_key=self.api_key)
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrent,
+                    max_keepalive_connections=self.max_concurrent,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=self.max_retries,
+                http_client=http_client,
+            )
         return self._client
 
+    @property
+    def limiter(self) -> ConcurrencyLimiter:
+        """Concurrency caps for the running event loop"""
+        self._bind_loop()
+        return self._limiter
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
     @property
     def is_configured(self) -> bool:
         """Check if API key is configured"""
@@ -122,16 +274,17 @@ class ChatGPTService:
 
     def estimate_tokens(self, text: str) -> int:
         """
-        Estimate token count for text
-        Rough estimation: ~4 characters per token for English
+        Token count for text
+        Exact with tiktoken installed, otherwise ~4 characters per token
         """
-        return len(text) // 4
+        return self.token_counter.count(text)
 
     async def chat_completion(
         self,
         message: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        student_id: str = "anonymous"
+        student_id: str = "anonymous",
+        course_id: Optional[str] = None
     ) -> Dict:
         """
         Generate chat completion with constitutional system prompt
@@ -140,36 +293,30 @@ class ChatGPTService:
             message: User message
             conversation_history: Previous messages in conversation
             student_id: Student identifier for rate limiting
+            course_id: Course the question is about; scopes the response cache
 
         Returns:
             Dict with response, tokens_used, rate_limit_remaining
+            (and cached, the cache match, when answered from the cache, or
+            coalesced when another student's identical in-flight call answered it)
         """
 
-        # Check rate limit
-        is_allowed, wait_time = self.rate_limiter.is_allowed(student_id)
-        if not is_allowed:
-            logger.warning(f"Rate limit exceeded for student {student_id}")
+        limited = self._check_rate_limit(student_id)
+        if limited:
+            return limited
+
+        cached = self._cached(message, conversation_history, course_id)
+        if cached:
             return {
-                "success": False,
-                "error": "rate_limit_exceeded",
-                "message": f"Rate limit exceeded. Please wait {wait_time} seconds before trying again.",
-                "wait_seconds": wait_time,
-                "rate_limit_remaining": 0
+                "success": True,
+                "response": cached["response"],
+                "tokens_used": 0,
+                "rate_limit_remaining": self.rate_limiter.get_remaining(student_id),
+                "mock": False,
+                "cached": cached["match"]
             }
 
-        # Build messages with system prompt
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-
-        # Add conversation history if provided
-        if conversation_history:
-            for msg in conversation_history:
-                messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                })
-
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        messages, prompt_tokens = self.context_builder.build(message, conversation_history)
 
         # Check if API key is configured
         if not self.is_configured:
@@ -184,43 +331,204 @@ class ChatGPTService:
             }
 
         try:
-            # Make API call
-            response = self.client.chat.completions.create(
+            if conversation_history or self.single_flight is None:
+                (ai_response, tokens_used), shared = await self._complete(messages, student_id), False
+            else:
+                # Identical questions asked at the same time share one upstream call
+                key = (course_id or ALL_COURSES, normalize_question(message))
+                (ai_response, tokens_used), shared = await self.single_flight.do(
+                    key, lambda: self._complete(messages, student_id)
+                )
+
+            if shared:
+                logger.info(f"ChatGPT response shared with student {student_id} (coalesced)")
+            else:
+                logger.info(f"ChatGPT response generated for student {student_id}, tokens: {tokens_used}")
+                self._store(message, conversation_history, course_id, ai_response, tokens_used)
+
+            result = {
+                "success": True,
+                "response": ai_response,
+                "tokens_used": 0 if shared else tokens_used,
+                "rate_limit_remaining": self.rate_limiter.get_remaining(student_id),
+                "mock": False
+            }
+            if shared:
+                result["coalesced"] = True
+            return result
+
+        except Exception as e:
+            return self._error_result(e, student_id)
+
+    async def _complete(self, messages: List[Dict[str, str]], student_id: str) -> Tuple[str, int]:
+        """One upstream completion once a slot is free; returns (response, tokens used)"""
+        async with self.limiter.slot(student_id):
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 max_tokens=self.max_tokens,
-                temperature=self.temperature
+                temperature=self.temperature,
+                timeout=self.timeout
             )
+        tokens_used = response.usage.total_tokens if response.usage else 0
+        return response.choices[0].message.content, tokens_used
 
-            ai_response = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if response.usage else 0
-
-            logger.info(f"ChatGPT response generated for student {student_id}, tokens: {tokens_used}")
-
-            return {
+    async def stream_completion(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        student_id: str = "anonymous",
+        course_id: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream a chat completion as it is generated
+
+        Yields {"type": "token", "text": ...} for each piece of the reply,
+        then one final event: {"type": "done", ...} with the same fields as
+        a successful chat_completion result, or {"type": "error", ...} with
+        the same fields as a failed one. Tokens already sent are not
+        retracted when an error follows them. A cached answer is sent as a
+        single token.
+        """
+        limited = self._check_rate_limit(student_id)
+        if limited:
+            yield {"type": "error", **limited}
+            return
+
+        cached = self._cached(message, conversation_history, course_id)
+        if cached:
+            yield {"type": "token", "text": cached["response"]}
+            yield {
+                "type": "done",
                 "success": True,
-                "response": ai_response,
-                "tokens_used": tokens_used,
+                "response": cached["response"],
+                "tokens_used": 0,
                 "rate_limit_remaining": self.rate_limiter.get_remaining(student_id),
-                "mock": False
+                "mock": False,
+                "cached": cached["match"]
             }
+            return
+
+        messages, prompt_tokens = self.context_builder.build(message, conversation_history)
+        mock = not self.is_configured
+        parts: List[str] = []
 
-        except OpenAIError as e:
-            logger.error(f"OpenAI API error: {str(e)}")
+        try:
+            if mock:
+                logger.info("No API key configured, streaming mock response")
+                async for text in self._stream_mock_response(message):
+                    parts.append(text)
+                    yield {"type": "token", "text": text}
+            else:
+                async with self.limiter.slot(student_id):
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                        timeout=self.timeout,
+                        stream=True
+                    )
+                    async for chunk in stream:
+                        text = chunk.choices[0].delta.content if chunk.choices else None
+                        if text:
+                            parts.append(text)
+                            yield {"type": "token", "text": text}
+        except Exception as e:
+            yield {"type": "error", **self._error_result(e, student_id)}
+            return
+
+        ai_response = "".join(parts)
+        # Streamed responses carry no usage, so count both sides
+        tokens_used = self.estimate_tokens(ai_response)
+        if not mock:
+            tokens_used += prompt_tokens
+            self._store(message, conversation_history, course_id, ai_response, tokens_used)
+        yield {
+            "type": "done",
+            "success": True,
+            "response": ai_response,
+            "tokens_used": tokens_used,
+            "rate_limit_remaining": self.rate_limiter.get_remaining(student_id),
+            "mock": mock
+        }
+
+    def _cached(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        course_id: Optional[str]
+    ) -> Optional[Dict]:
+        """Cached answer for the question, if the cache is on and has one"""
+        if self.response_cache is None or not self.is_configured:
+            return None
+        cached = self.response_cache.get(course_id, message, has_history=bool(conversation_history))
+        if cached:
+            logger.info(f"Answered from response cache ({cached['match']} match), "
+                        f"saved {cached['tokens']} tokens")
+        return cached
+
+    def _store(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        course_id: Optional[str],
+        response: str,
+        tokens_used: int
+    ) -> None:
+        if self.response_cache is not None and response:
+            self.response_cache.put(
+                course_id, message, response, tokens_used, has_history=bool(conversation_history)
+            )
+
+    def _check_rate_limit(self, student_id: str) -> Optional[Dict]:
+        """Charge the student; returns the error result when over the limit"""
+        is_allowed, wait_time = self.rate_limiter.is_allowed(student_id)
+        if is_allowed:
+            return None
+        logger.warning(f"Rate limit exceeded for student {student_id}")
+        return {
+            "success": False,
+            "error": "rate_limit_exceeded",
+            "message": f"Rate limit exceeded. Please wait {wait_time} seconds before trying again.",
+            "wait_seconds": wait_time,
+            "rate_limit_remaining": 0
+        }
+
+    def _error_result(self, error: Exception, student_id: str) -> Dict:
+        """Failed result for an exception raised while calling the API"""
+        if isinstance(error, QueueTimeout):
+            logger.warning(f"No ChatGPT slot free within {self.queue_timeout}s for student {student_id}")
             return {
                 "success": False,
-                "error": "api_error",
-                "message": f"AI service error: {str(e)}",
+                "error": "busy",
+                "message": "The AI tutor is busy right now. Please try again in a few seconds.",
+                "wait_seconds": math.ceil(self.queue_timeout),
                 "rate_limit_remaining": self.rate_limiter.get_remaining(student_id)
             }
-        except Exception as e:
-            logger.error(f"Unexpected error in chat_completion: {str(e)}")
+        if isinstance(error, (APITimeoutError, CoalesceTimeout)):
+            logger.error(f"OpenAI API timeout: {str(error)}")
+            return {
+                "success": False,
+                "error": "timeout",
+                "message": "AI service timed out. Please try again.",
+                "rate_limit_remaining": self.rate_limiter.get_remaining(student_id)
+            }
+        if isinstance(error, OpenAIError):
+            logger.error(f"OpenAI API error: {str(error)}")
             return {
                 "success": False,
-                "error": "internal_error",
-                "message": f"Internal error: {str(e)}",
+                "error": "api_error",
+                "message": f"AI service error: {str(error)}",
                 "rate_limit_remaining": self.rate_limiter.get_remaining(student_id)
             }
+        logger.error(f"Unexpected error in chat_completion: {str(error)}")
+        return {
+            "success": False,
+            "error": "internal_error",
+            "message": f"Internal error: {str(error)}",
+            "rate_limit_remaining": self.rate_limiter.get_remaining(student_id)
+        }
 
     def _generate_mock_response(self, message: str) -> str:
         """Generate a mock Socratic response when API key is not available"""
@@ -235,6 +543,12 @@ class ChatGPTService:
             f"[Note: This is a mock response - configure OPENAI_API_KEY for full functionality]"
         )
 
+    async def _stream_mock_response(self, message: str) -> AsyncIterator[str]:
+        """The mock response one word at a time, paced like a model (MOCK_STREAM_DELAY)"""
+        for word in re.findall(r"\S+\s*", self._generate_mock_response(message)):
+            await asyncio.sleep(self.mock_stream_delay)
+            yield word
+
 
 # Singleton instance
 _service_instance: Optional[ChatGPTService] = None
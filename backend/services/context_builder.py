@@ -0,0 +1,177 @@
+"""
+Token-budgeted conversation context for chat completions
+
+Follow-up questions need the earlier turns of their conversation, but
+sending every turn makes each request more expensive than the last.
+ContextBuilder fits the prompt to a token budget:
+
+- the system prompt is encoded once and its count reused
+- the current message is always sent
+- earlier turns are added newest first while they fit; the turn that
+  crosses the budget is truncated when enough room is left, and the
+  student questions of every older turn are folded into one short
+  "earlier in this conversation" note
+
+Tokens are counted with tiktoken when it is installed (falling back to
+about four characters per token), and counts are cached per message text,
+so a turn is encoded once however many requests resend it.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # Optional; counts are estimated without it
+    tiktoken = None
+
+# Per-message framing tokens in the chat format, and the reply primer
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+TRUNCATION_MARK = "... "
+SUMMARY_PREFIX = "Earlier in this conversation the student asked: "
+
+
+class TokenCounter:
+    """Counts tokens for a model, caching counts per text"""
+
+    def __init__(self, model: str = "gpt-3.5-turbo", cache_size: int = 4096):
+        self.model = model
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:  # e.g. encoding files can't be downloaded
+                logger.warning(f"tiktoken unavailable, estimating token counts: {e}")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            return cached
+        if self._encoding is not None:
+            tokens = len(self._encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = (len(text) + 3) // 4
+        self._cache[text] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        return MESSAGE_OVERHEAD + self.count(message.get("content", ""))
+
+    def truncate(self, text: str, max_tokens: int, keep_end: bool = True) -> str:
+        """Cut text to about ``max_tokens``, keeping its end (or start)"""
+        if self.count(text) <= max_tokens:
+            return text
+        max_tokens = max(max_tokens - self.count(TRUNCATION_MARK), 0)
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            kept = tokens[len(tokens) - max_tokens:] if keep_end else tokens[:max_tokens]
+            text = self._encoding.decode(kept)
+        else:
+            chars = max_tokens * 4
+            text = text[len(text) - chars:] if keep_end else text[:chars]
+        return TRUNCATION_MARK + text if keep_end else text + TRUNCATION_MARK.rstrip()
+
+
+class ContextBuilder:
+    """Builds the message list for a completion within a token budget"""
+
+    def __init__(
+        self,
+        system_prompt: str,
+        counter: TokenCounter,
+        budget: int = 3000,
+        summary_tokens: int = 200,
+        min_truncated_tokens: int = 50,
+    ):
+        self.counter = counter
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.min_truncated_tokens = min_truncated_tokens
+        self.system_message = {"role": "system", "content": system_prompt}
+        # Constant for the life of the process
+        self.system_tokens = counter.count_message(self.system_message)
+
+    def build(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Messages to send and their prompt token count"""
+        current = {"role": "user", "content": message}
+        used = self.system_tokens + self.counter.count_message(current) + REPLY_OVERHEAD
+        history = [
+            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+            for msg in history or []
+        ]
+
+        # Reserve room for the note about older turns only if some will be left out
+        total = sum(self.counter.count_message(msg) for msg in history)
+        reserve = self.summary_tokens + MESSAGE_OVERHEAD if used + total > self.budget else 0
+
+        kept: List[Dict[str, str]] = []
+        index = len(history)
+        while index > 0:
+            msg = history[index - 1]
+            cost = self.counter.count_message(msg)
+            room = self.budget - reserve - used
+            if cost > room:
+                if room - MESSAGE_OVERHEAD >= self.min_truncated_tokens:
+                    content = self.counter.truncate(msg["content"], room - MESSAGE_OVERHEAD)
+                    msg = {"role": msg["role"], "content": content}
+                    kept.append(msg)
+                    used += self.counter.count_message(msg)
+                    index -= 1
+                break
+            kept.append(msg)
+            used += cost
+            index -= 1
+
+        messages = [self.system_message]
+        dropped = history[:index]
+        if dropped:
+            note = self._summarize(dropped, self.budget - used - MESSAGE_OVERHEAD)
+            if note:
+                messages.append(note)
+                used += self.counter.count_message(note)
+        messages.extend(reversed(kept))
+        messages.append(current)
+        return messages, used
+
+    def _summarize(self, dropped: List[Dict[str, str]], room: int) -> Optional[Dict[str, str]]:
+        """One system note listing what the student asked in the dropped turns"""
+        room = min(room, self.summary_tokens) - self.counter.count(SUMMARY_PREFIX)
+        questions = [
+            " ".join(msg["content"].split())
+            for msg in dropped if msg["role"] == "user" and msg["content"].strip()
+        ]
+        if not questions or room < self.min_truncated_tokens // 2:
+            return None
+        # Keep the most recent of the older questions
+        text = self.counter.truncate(" | ".join(questions), room)
+        return {"role": "system", "content": SUMMARY_PREFIX + text}
+
+
+def turns_to_history(entries: List[Dict]) -> List[Dict[str, str]]:
+    """Chat messages for logged conversation entries (query, then response)"""
+    history: List[Dict[str, str]] = []
+    for entry in entries:
+        if entry.get("query"):
+            history.append({"role": "user", "content": entry["query"]})
+        if entry.get("response"):
+            history.append({"role": "assistant", "content": entry["response"]})
+    return history
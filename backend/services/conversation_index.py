@@ -0,0 +1,252 @@
+"""
+Per-student index over the JSONL conversation logs
+
+An embedded SQLite database records, for every logged entry, the student,
+the day file and the byte offset and length of its line, plus the concepts
+each student has discussed. History lookups for one student read only that
+student's rows and lines instead of every log ever written, and running
+totals (conversation count, last activity) make stats a single-row read.
+Entries are indexed by filter decision and conversation id too, so
+finding flagged conversations or the last turns of one conversation reads
+only those lines.
+
+The index is maintained by tailing the log files: after each append the
+writer indexes the file from the last indexed byte to the end, so entries
+written by other processes are picked up too. A day file that shrinks
+(rewritten by a migration) is reindexed from the start.
+
+Rebuild it from the logs with:
+
+    python -m services.logger_service rebuild-index [vault_path]
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".student_index.sqlite3"
+# Bump when a change needs the index rebuilt from the logs
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_files (
+    day TEXT PRIMARY KEY,
+    indexed_bytes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS student_entries (
+    day TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    student_id TEXT NOT NULL,
+    timestamp TEXT,
+    decision TEXT,
+    conversation_id TEXT,
+    PRIMARY KEY (day, offset)
+);
+CREATE INDEX IF NOT EXISTS ix_student_entries_student
+    ON student_entries (student_id, day, offset);
+CREATE INDEX IF NOT EXISTS ix_student_entries_decision
+    ON student_entries (decision, day, offset);
+CREATE INDEX IF NOT EXISTS ix_student_entries_conversation
+    ON student_entries (conversation_id, day, offset);
+CREATE TABLE IF NOT EXISTS student_totals (
+    student_id TEXT PRIMARY KEY,
+    conversations INTEGER NOT NULL,
+    last_active TEXT
+);
+CREATE TABLE IF NOT EXISTS student_concepts (
+    student_id TEXT NOT NULL,
+    concept TEXT NOT NULL,
+    PRIMARY KEY (student_id, concept)
+);
+"""
+
+
+class ConversationIndex:
+    """SQLite index of log entries by student"""
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.index_path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self.stale = self._migrate_schema()
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Maintenance ---
+
+    def sync_file(self, path: Path) -> int:
+        """Index entries appended to a day file since the last sync; returns how many"""
+        path = Path(path)
+        day = path.stem
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT indexed_bytes FROM log_files WHERE day = ?", (day,)
+                ).fetchone()
+                start = row[0] if row else 0
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    size = 0
+                if size < start:
+                    self._drop_day(day)
+                    start = 0
+
+                indexed, offset = 0, start
+                if size > start:
+                    with open(path, "rb") as f:
+                        f.seek(start)
+                        for line in f:
+                            if not line.endswith(b"\n"):
+                                break  # torn tail; picked up once the line is complete
+                            indexed += self._index_line(day, offset, line)
+                            offset += len(line)
+                conn.execute(
+                    "INSERT OR REPLACE INTO log_files (day, indexed_bytes) VALUES (?, ?)",
+                    (day, offset),
+                )
+                conn.execute("COMMIT")
+                return indexed
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def sync_all(self, paths: Iterable[Path]) -> int:
+        """Catch up on every day file, e.g. at startup"""
+        return sum(self.sync_file(path) for path in paths)
+
+    def rebuild(self, paths: Iterable[Path]) -> int:
+        """Drop the index and rebuild it from the log files"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for table in ("log_files", "student_entries", "student_totals", "student_concepts"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("COMMIT")
+        return self.sync_all(paths)
+
+    def _migrate_schema(self) -> bool:
+        """Drop an index built by an older schema; returns True if it must be rebuilt"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return False
+        existing = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'student_entries'"
+        ).fetchone()
+        for table in ("log_files", "student_entries", "student_totals", "student_concepts"):
+            self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return existing is not None
+
+    def _drop_day(self, day: str) -> None:
+        # Concepts are kept as a set per student; a stale one lingers until a rebuild
+        students = [
+            row[0] for row in self._conn.execute(
+                "SELECT DISTINCT student_id FROM student_entries WHERE day = ?", (day,)
+            )
+        ]
+        self._conn.execute("DELETE FROM student_entries WHERE day = ?", (day,))
+        for student_id in students:
+            count, last_active = self._conn.execute(
+                "SELECT COUNT(*), MAX(timestamp) FROM student_entries WHERE student_id = ?",
+                (student_id,),
+            ).fetchone()
+            self._conn.execute(
+                "UPDATE student_totals SET conversations = ?, last_active = ? WHERE student_id = ?",
+                (count, last_active, student_id),
+            )
+
+    def _index_line(self, day: str, offset: int, line: bytes) -> int:
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 0
+        student_id = entry.get("student_id") if isinstance(entry, dict) else None
+        if not student_id:
+            return 0
+        self._conn.execute(
+            "INSERT OR REPLACE INTO student_entries "
+            "(day, offset, length, student_id, timestamp, decision, conversation_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (day, offset, len(line), student_id, entry.get("timestamp"), entry.get("decision"),
+             entry.get("conversation_id")),
+        )
+        self._conn.execute(
+            "INSERT INTO student_totals (student_id, conversations, last_active) VALUES (?, 1, ?) "
+            "ON CONFLICT (student_id) DO UPDATE SET conversations = conversations + 1, "
+            "last_active = CASE WHEN excluded.last_active > COALESCE(last_active, '') "
+            "THEN excluded.last_active ELSE last_active END",
+            (student_id, entry.get("timestamp")),
+        )
+        concepts = (entry.get("metadata") or {}).get("concepts") or []
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO student_concepts (student_id, concept) VALUES (?, ?)",
+            [(student_id, str(concept)) for concept in concepts],
+        )
+        return 1
+
+    # --- Lookups ---
+
+    def locations(self, student_id: str, day: Optional[str] = None) -> List[Tuple[str, int, int]]:
+        """(day, offset, length) of a student's entries in log order"""
+        query = "SELECT day, offset, length FROM student_entries WHERE student_id = ?"
+        params: Tuple[Any, ...] = (student_id,)
+        if day is not None:
+            query += " AND day = ?"
+            params += (day,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY day, offset", params).fetchall()
+
+    def decision_locations(self, decision: str, day: Optional[str] = None) -> List[Tuple[str, int, int]]:
+        """(day, offset, length) of every entry with a filter decision, in log order"""
+        query = "SELECT day, offset, length FROM student_entries WHERE decision = ?"
+        params: Tuple[Any, ...] = (decision,)
+        if day is not None:
+            query += " AND day = ?"
+            params += (day,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY day, offset", params).fetchall()
+
+    def conversation_locations(
+        self, conversation_id: str, limit: int, decision: Optional[str] = None
+    ) -> List[Tuple[str, int, int]]:
+        """(day, offset, length) of a conversation's last ``limit`` entries, in log order"""
+        query = "SELECT day, offset, length FROM student_entries WHERE conversation_id = ?"
+        params: Tuple[Any, ...] = (conversation_id,)
+        if decision is not None:
+            query += " AND decision = ?"
+            params += (decision,)
+        with self._lock:
+            rows = self._conn.execute(
+                query + " ORDER BY day DESC, offset DESC LIMIT ?", params + (limit,)
+            ).fetchall()
+        return rows[::-1]
+
+    def stats(self, student_id: str) -> Dict[str, Any]:
+        """Conversation count, last timestamp and concepts for a student"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT conversations, last_active FROM student_totals WHERE student_id = ?",
+                (student_id,),
+            ).fetchone()
+            count, last_active = row if row else (0, None)
+            concepts = [
+                row[0] for row in self._conn.execute(
+                    "SELECT concept FROM student_concepts WHERE student_id = ? ORDER BY concept",
+                    (student_id,),
+                )
+            ]
+        return {"count": count, "last_active": last_active, "concepts": concepts}
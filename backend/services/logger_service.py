@@ -1,57 +1,307 @@
 """
 Conversation Logger Service for Course Companion
 Logs all conversations to vault/Conversation_Logs/
+
+Daily logs are append-only JSONL, indexed per student (see
+conversation_index). Legacy YYYY-MM-DD.json files are migrated when the
+app starts (ConversationLogger.migrate), not when the logger is created,
+so importing the routers never rewrites the vault. Both can be run by hand:
+
+    python -m services.logger_service migrate [vault_path]
+    python -m services.logger_service rebuild-index [vault_path]
 """
 
 import json
 import logging
+import os
+import queue
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+
+from .conversation_index import INDEX_FILENAME, ConversationIndex
+from .progress_rollups import get_progress_rollups
 
 logger = logging.getLogger(__name__)
 
+# Daily logs are YYYY-MM-DD.jsonl: one JSON object per line, only ever appended
+LOG_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+MIGRATED_SUFFIX = ".json.migrated"
+DAY_STEM = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+WRITER_BATCH_SIZE = 256
+
+
+def _append_lines(path: Path, data: bytes) -> None:
+    """Append whole lines with O_APPEND so concurrent writers never interleave"""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+class LogWriter:
+    """
+    Single background writer for the daily log files
+
+    log_conversation only queues a serialized line; the writer thread drains
+    the queue and appends each file's pending lines in one write, so a busy
+    day costs O(1) per entry and request handlers never wait on disk.
+    on_append runs once per file written and on_written once per entry, both
+    on the writer thread.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = WRITER_BATCH_SIZE,
+        on_append: Optional[Callable[[Path], Any]] = None,
+        on_written: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
+        self.batch_size = batch_size
+        self.on_append = on_append
+        self.on_written = on_written
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Entries are numbered as they are queued; flush waits for a number
+        self._progress = threading.Condition()
+        self._queued = 0
+        self._written = 0
+
+    def append(self, path: Path, entry: Dict[str, Any]) -> None:
+        """Queue one entry for appending to path"""
+        line = json.dumps(entry, default=str, ensure_ascii=False) + "\n"
+        self._ensure_started()
+        with self._progress:
+            self._queued += 1
+            self._queue.put((path, line.encode("utf-8"), entry))
+
+    def flush(self) -> None:
+        """
+        Block until every entry queued before the call has been written
+
+        Entries queued while waiting aren't waited for, so a reader can't
+        be held up indefinitely by a steady stream of writes.
+        """
+        with self._progress:
+            target = self._queued
+            self._progress.wait_for(lambda: self._written >= target or self._thread is None)
+
+    def close(self) -> None:
+        """Flush and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="conversation-log-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending: Dict[Path, List[bytes]] = {}
+            entries: Dict[Path, List[Dict[str, Any]]] = {}
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                path, line, entry = item
+                pending.setdefault(path, []).append(line)
+                entries.setdefault(path, []).append(entry)
+            for path, lines in pending.items():
+                try:
+                    _append_lines(path, b"".join(lines))
+                except OSError as e:
+                    logger.error(f"Failed to append {len(lines)} log entries to {path}: {e}")
+                    continue
+                if self.on_append is not None:
+                    try:
+                        self.on_append(path)
+                    except Exception as e:
+                        logger.error(f"Failed to index {path}: {e}")
+                if self.on_written is not None:
+                    for entry in entries[path]:
+                        try:
+                            self.on_written(entry)
+                        except Exception as e:
+                            logger.error(f"Failed to process a log entry for {path}: {e}")
+            with self._progress:
+                self._written += sum(len(lines) for lines in pending.values())
+                self._progress.notify_all()
+            if stop:
+                return
+
+
+def iter_log_file(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream the entries of one daily log, skipping torn or corrupt lines"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line in {path}")
+    except FileNotFoundError:
+        return
+    except IOError as e:
+        logger.warning(f"Failed to read log file {path}: {e}")
+
+
+def migrate_json_logs(logs_dir: Path) -> int:
+    """
+    One-shot migration of legacy YYYY-MM-DD.json arrays to JSONL
+
+    Migrated entries go before anything already appended to the day's
+    .jsonl file; the original is kept as YYYY-MM-DD.json.migrated so a
+    rerun is a no-op. Returns the number of files migrated.
+    """
+    migrated = 0
+    for legacy in sorted(Path(logs_dir).glob(f"*{LEGACY_SUFFIX}")):
+        if not DAY_STEM.match(legacy.stem):
+            continue
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Not migrating unreadable log file {legacy}: {e}")
+            continue
+        if not isinstance(entries, list):
+            logger.warning(f"Not migrating {legacy}: expected a list of entries")
+            continue
+
+        target = legacy.with_suffix(LOG_SUFFIX)
+        tmp = legacy.with_suffix(".jsonl.tmp")
+        with open(tmp, "w", encoding="utf-8") as out:
+            for entry in entries:
+                out.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+            if target.exists():
+                with open(target, "r", encoding="utf-8") as existing:
+                    for line in existing:
+                        out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, target)
+        legacy.rename(legacy.with_name(legacy.stem + MIGRATED_SUFFIX))
+        migrated += 1
+        logger.info(f"Migrated {len(entries)} log entries from {legacy.name}")
+    return migrated
+
 
 class ConversationLogger:
     """
     Logs conversations to the Obsidian vault for review and analytics
-    Stores logs in vault/Conversation_Logs/YYYY-MM-DD.json format
+    Stores logs in vault/Conversation_Logs/YYYY-MM-DD.jsonl format
     """
 
-    def __init__(self, vault_path: str = "../vault"):
+    def __init__(
+        self,
+        vault_path: str = "../vault",
+        migrate: bool = False,
+        index_path: Optional[str] = None,
+        on_logged: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
         self.vault_path = Path(vault_path)
         self.logs_dir = self.vault_path / "Conversation_Logs"
         self._ensure_directories()
 
+        self.index = ConversationIndex(Path(index_path) if index_path else self.logs_dir / INDEX_FILENAME)
+        if self.index.stale:
+            self.index.rebuild(self._log_files())
+        else:
+            self.index.sync_all(self._log_files())
+        # on_logged sees each entry once it is on disk, e.g. to update progress rollups
+        self.writer = LogWriter(on_append=self.index.sync_file, on_written=on_logged)
+        if migrate:
+            self.migrate()
+
+    def migrate(self) -> int:
+        """Migrate legacy .json logs and reindex; returns the number of files migrated"""
+        self.flush()
+        migrated = migrate_json_logs(self.logs_dir)
+        if migrated:
+            self.index.rebuild(self._log_files())
+        return migrated
+
     def _ensure_directories(self) -> None:
         """Ensure required directories exist"""
         self.logs_dir.mkdir(parents=True, exist_ok=True)
 
+    def _get_log_file(self, date: Optional[str] = None) -> Path:
+        """Get path to a day's log file (defaults to today)"""
+        day = date or datetime.now().strftime("%Y-%m-%d")
+        return self.logs_dir / f"{day}{LOG_SUFFIX}"
+
     def _get_today_log_file(self) -> Path:
         """Get path to today's log file"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        return self.logs_dir / f"{today}.json"
-
-    def _load_daily_logs(self) -> List[Dict[str, Any]]:
-        """Load existing logs for today"""
-        log_file = self._get_today_log_file()
-        if log_file.exists():
-            try:
-                with open(log_file, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                logger.warning(f"Failed to load daily logs: {e}")
-                return []
-        return []
-
-    def _save_daily_logs(self, logs: List[Dict[str, Any]]) -> None:
-        """Save logs to today's file"""
-        log_file = self._get_today_log_file()
+        return self._get_log_file()
+
+    def _log_files(self, newest_first: bool = False) -> List[Path]:
+        """All daily log files in date order"""
+        files = [
+            path for path in self.logs_dir.glob(f"*{LOG_SUFFIX}")
+            if DAY_STEM.match(path.stem)
+        ]
+        return sorted(files, reverse=newest_first)
+
+    def iter_logs(self, date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream logged entries for one day, or every day oldest first"""
+        self.flush()
+        files = [self._get_log_file(date)] if date else self._log_files()
+        for log_file in files:
+            yield from iter_log_file(log_file)
+
+    def _read_entries(self, locations: List[Tuple[str, int, int]]) -> List[Dict[str, Any]]:
+        """Read indexed entries by seeking straight to their lines"""
+        entries: List[Dict[str, Any]] = []
+        handles: Dict[str, Any] = {}
         try:
-            with open(log_file, "w") as f:
-                json.dump(logs, f, indent=2, default=str)
+            for day, offset, length in locations:
+                f = handles.get(day)
+                if f is None:
+                    f = handles[day] = open(self._get_log_file(day), "rb")
+                f.seek(offset)
+                try:
+                    entries.append(json.loads(f.read(length)))
+                except json.JSONDecodeError:
+                    logger.warning(f"Index points at an unreadable line in {day}; rebuild the index")
         except IOError as e:
-            logger.error(f"Failed to save daily logs: {e}")
+            logger.warning(f"Failed to read indexed conversations: {e}")
+        finally:
+            for f in handles.values():
+                f.close()
+        return entries
+
+    def flush(self) -> None:
+        """Wait for queued entries to reach disk"""
+        self.writer.flush()
+
+    def close(self) -> None:
+        """Flush pending entries and stop the writer"""
+        self.writer.close()
 
     def log_conversation(
         self,
@@ -60,7 +310,8 @@ class ConversationLogger:
         response: str,
         decision: str,
         conversation_id: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        course_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Log a conversation interaction
@@ -72,6 +323,7 @@ class ConversationLogger:
             decision: Filter decision (allow/block/flag)
             conversation_id: Optional conversation thread ID
             metadata: Optional additional metadata
+            course_id: Optional course the conversation belongs to
 
         Returns:
             The logged entry with timestamp
@@ -85,13 +337,11 @@ class ConversationLogger:
             "query": query,
             "response": response,
             "decision": decision,
+            "course_id": course_id,
             "metadata": metadata or {}
         }
 
-        # Add to daily logs
-        daily_logs = self._load_daily_logs()
-        daily_logs.append(log_entry)
-        self._save_daily_logs(daily_logs)
+        self.writer.append(self._get_today_log_file(), log_entry)
 
         logger.info(
             f"Logged conversation for student {student_id}, "
@@ -115,21 +365,29 @@ class ConversationLogger:
         Returns:
             List of conversation entries for the student
         """
-        if date:
-            log_file = self.logs_dir / f"{date}.json"
-        else:
-            log_file = self._get_today_log_file()
+        self.flush()
+        day = date or datetime.now().strftime("%Y-%m-%d")
+        return self._read_entries(self.index.locations(student_id, day))
+
+    def get_conversation_turns(
+        self,
+        conversation_id: str,
+        limit: int = 10,
+        decision: Optional[str] = "allow"
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the last entries of a conversation, oldest first
 
-        if not log_file.exists():
-            return []
+        Args:
+            conversation_id: Conversation identifier
+            limit: Maximum number of entries
+            decision: Only entries with this filter decision (None for all)
 
-        try:
-            with open(log_file, "r") as f:
-                all_logs = json.load(f)
-            return [log for log in all_logs if log.get("student_id") == student_id]
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Failed to load student conversations: {e}")
-            return []
+        Returns:
+            List of conversation entries
+        """
+        self.flush()
+        return self._read_entries(self.index.conversation_locations(conversation_id, limit, decision))
 
     def get_student_stats(self, student_id: str) -> Dict[str, Any]:
         """
@@ -141,38 +399,14 @@ class ConversationLogger:
         Returns:
             Dict with total_conversations, concepts_discussed, time_spent, last_active
         """
-        total_conversations = 0
-        concepts = set()
-        last_active = None
-
-        # Scan all log files
-        for log_file in sorted(self.logs_dir.glob("*.json"), reverse=True):
-            try:
-                with open(log_file, "r") as f:
-                    daily_logs = json.load(f)
-
-                for log in daily_logs:
-                    if log.get("student_id") == student_id:
-                        total_conversations += 1
-
-                        # Track last active timestamp
-                        if last_active is None:
-                            last_active = log.get("timestamp")
-
-                        # Extract concepts from metadata if available
-                        metadata = log.get("metadata", {})
-                        if "concepts" in metadata:
-                            concepts.update(metadata["concepts"])
-
-            except (json.JSONDecodeError, IOError) as e:
-                logger.warning(f"Failed to read log file {log_file}: {e}")
-                continue
+        self.flush()
+        stats = self.index.stats(student_id)
 
         return {
-            "total_conversations": total_conversations,
-            "concepts_discussed": list(concepts),
-            "time_spent": total_conversations * 2,  # Estimate 2 minutes per conversation
-            "last_active": last_active
+            "total_conversations": stats["count"],
+            "concepts_discussed": stats["concepts"],
+            "time_spent": stats["count"] * 2,  # Estimate 2 minutes per conversation
+            "last_active": stats["last_active"]
         }
 
     def get_flagged_conversations(
@@ -188,26 +422,8 @@ class ConversationLogger:
         Returns:
             List of flagged conversation entries
         """
-        if date:
-            log_files = [self.logs_dir / f"{date}.json"]
-        else:
-            log_files = list(self.logs_dir.glob("*.json"))
-
-        flagged = []
-        for log_file in log_files:
-            if not log_file.exists():
-                continue
-            try:
-                with open(log_file, "r") as f:
-                    daily_logs = json.load(f)
-                flagged.extend([
-                    log for log in daily_logs
-                    if log.get("decision") == "flag"
-                ])
-            except (json.JSONDecodeError, IOError) as e:
-                logger.warning(f"Failed to read log file {log_file}: {e}")
-
-        return flagged
+        self.flush()
+        return self._read_entries(self.index.decision_locations("flag", date))
 
 
 # Singleton instance
@@ -215,8 +431,27 @@ _logger_instance: Optional[ConversationLogger] = None
 
 
 def get_conversation_logger(vault_path: str = "../vault") -> ConversationLogger:
-    """Get or create singleton ConversationLogger instance"""
+    """Get or create singleton ConversationLogger instance, feeding the progress rollups"""
     global _logger_instance
     if _logger_instance is None:
-        _logger_instance = ConversationLogger(vault_path=vault_path)
+        rollups = get_progress_rollups(vault_path=vault_path)
+        _logger_instance = ConversationLogger(vault_path=vault_path, on_logged=rollups.record_entry)
     return _logger_instance
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the conversation logs")
+    parser.add_argument("command", choices=["migrate", "rebuild-index"])
+    parser.add_argument("vault_path", nargs="?", default="../vault")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    conv_logger = ConversationLogger(vault_path=args.vault_path)
+    if args.command == "migrate":
+        count = conv_logger.migrate()
+        print(f"Migrated {count} daily log file(s) to JSONL")
+    else:
+        count = conv_logger.index.rebuild(conv_logger._log_files())
+        print(f"Indexed {count} conversation(s)")
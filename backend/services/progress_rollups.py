@@ -0,0 +1,420 @@
+"""
+Running progress aggregates per student and per course
+
+update_progress keeps each student's lesson records in the vault
+(Student_Progress/<student>_progress.json). This module mirrors those
+records into an embedded SQLite database and maintains rollups next to
+them, so the progress endpoints and an instructor dashboard read one row
+instead of recomputing from every record:
+
+- per student and course, and per student across all courses (``*``)
+- per course, including how many students have progress or conversations
+  in it
+
+Each rollup holds lesson/completed/scored counts, the sum and sum of
+squares of scores, min, max, total time spent and last update. Recording
+a lesson applies the difference between its old and new record, which is
+O(1); the only exception is replacing the current min or max score, which
+re-reads it through an index.
+
+Logged conversations feed the same rollups: the conversation logger hands
+each entry to record_entry once it is on disk, which counts it, keeps the
+last activity and adds its concepts to a per-rollup set so the distinct
+concept count stays O(1) per concept. Entries carry a course_id when the
+chat request named one; the rest only count towards the student's
+all-courses rollup.
+
+Rebuild the database from the vault (progress files and conversation
+logs) with:
+
+    python -m services.progress_rollups rebuild [vault_path]
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS_FILENAME = ".rollups.sqlite3"
+ALL_COURSES = "*"
+# Bump when a change needs the rollups rebuilt from the vault
+SCHEMA_VERSION = 2
+TABLES = ("lesson_progress", "progress_rollups", "rollup_concepts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lesson_progress (
+    student_id TEXT NOT NULL,
+    course_id TEXT NOT NULL,
+    lesson_id TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    score REAL,
+    time_spent INTEGER NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (student_id, course_id, lesson_id)
+);
+CREATE INDEX IF NOT EXISTS ix_lesson_progress_course_score
+    ON lesson_progress (course_id, score);
+CREATE TABLE IF NOT EXISTS progress_rollups (
+    scope TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    course_id TEXT NOT NULL,
+    students INTEGER NOT NULL DEFAULT 0,
+    lessons INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    score_sumsq REAL NOT NULL DEFAULT 0,
+    score_min REAL,
+    score_max REAL,
+    time_spent INTEGER NOT NULL DEFAULT 0,
+    last_updated TEXT,
+    conversations INTEGER NOT NULL DEFAULT 0,
+    concepts INTEGER NOT NULL DEFAULT 0,
+    last_active TEXT,
+    PRIMARY KEY (scope, student_id, course_id)
+);
+CREATE TABLE IF NOT EXISTS rollup_concepts (
+    scope TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    course_id TEXT NOT NULL,
+    concept TEXT NOT NULL,
+    PRIMARY KEY (scope, student_id, course_id, concept)
+);
+"""
+
+STUDENT = "student"
+COURSE = "course"
+
+
+def _as_record(completed: bool, score: Optional[float], time_spent: Optional[int],
+               updated_at: Optional[str]) -> Dict[str, Any]:
+    return {
+        "completed": 1 if completed else 0,
+        "score": score,
+        "time_spent": time_spent or 0,
+        "updated_at": updated_at,
+    }
+
+
+class ProgressRollups:
+    """SQLite mirror of lesson progress with incrementally maintained rollups"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate_schema()
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM progress_rollups LIMIT 1").fetchone() is None
+
+    # --- Writes ---
+
+    def record_lesson(
+        self,
+        student_id: str,
+        course_id: str,
+        lesson_id: str,
+        completed: bool,
+        score: Optional[float] = None,
+        time_spent: Optional[int] = None,
+        updated_at: Optional[str] = None,
+    ) -> None:
+        """Insert or replace one lesson record and update every rollup it feeds"""
+        new = _as_record(completed, score, time_spent, updated_at)
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT completed, score, time_spent, updated_at FROM lesson_progress "
+                    "WHERE student_id = ? AND course_id = ? AND lesson_id = ?",
+                    (student_id, course_id, lesson_id),
+                ).fetchone()
+                old = dict(row) if row else None
+                new_to_course = old is None and not self._has_rollup(STUDENT, student_id, course_id)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO lesson_progress "
+                    "(student_id, course_id, lesson_id, completed, score, time_spent, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (student_id, course_id, lesson_id, new["completed"], new["score"],
+                     new["time_spent"], new["updated_at"]),
+                )
+                self._apply(STUDENT, student_id, course_id, old, new)
+                self._apply(STUDENT, student_id, ALL_COURSES, old, new)
+                self._apply(COURSE, "", course_id, old, new, new_student=new_to_course)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def record_conversation(
+        self,
+        student_id: str,
+        course_id: Optional[str] = None,
+        concepts: Iterable[str] = (),
+        timestamp: Optional[str] = None,
+    ) -> None:
+        """Count one logged conversation and its concepts in every rollup it feeds"""
+        concepts = sorted({str(concept) for concept in concepts})
+        rollups = [(STUDENT, student_id, ALL_COURSES)]
+        if course_id:
+            rollups += [(STUDENT, student_id, course_id), (COURSE, "", course_id)]
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                new_to_course = bool(course_id) and not self._has_rollup(STUDENT, student_id, course_id)
+                for scope, student, course in rollups:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO progress_rollups (scope, student_id, course_id) "
+                        "VALUES (?, ?, ?)",
+                        (scope, student, course),
+                    )
+                    added = conn.executemany(
+                        "INSERT OR IGNORE INTO rollup_concepts (scope, student_id, course_id, concept) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(scope, student, course, concept) for concept in concepts],
+                    ).rowcount if concepts else 0
+                    conn.execute(
+                        "UPDATE progress_rollups SET conversations = conversations + 1, "
+                        "concepts = concepts + ?, students = students + ?, "
+                        "last_active = CASE WHEN ? > COALESCE(last_active, '') "
+                        "THEN ? ELSE last_active END "
+                        "WHERE scope = ? AND student_id = ? AND course_id = ?",
+                        (added, 1 if scope == COURSE and new_to_course else 0,
+                         timestamp, timestamp, scope, student, course),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def record_entry(self, entry: Dict[str, Any]) -> None:
+        """Count a conversation log entry; the conversation logger's on_logged hook"""
+        student_id = entry.get("student_id")
+        if not student_id:
+            return
+        self.record_conversation(
+            student_id,
+            entry.get("course_id"),
+            (entry.get("metadata") or {}).get("concepts") or [],
+            entry.get("timestamp"),
+        )
+
+    def rebuild(self, progress_dir: Path, conversations: Iterable[Dict[str, Any]] = ()) -> int:
+        """
+        Reload every Student_Progress file and replay logged conversations
+
+        Returns how many lessons were loaded.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for table in TABLES:
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("COMMIT")
+
+        loaded = 0
+        for student_file in sorted(Path(progress_dir).glob("*_progress.json")):
+            student_id = student_file.name[: -len("_progress.json")]
+            try:
+                with open(student_file, "r") as f:
+                    records = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning(f"Skipping unreadable progress file {student_file}: {e}")
+                continue
+            for record in records.values():
+                self.record_lesson(
+                    student_id,
+                    record.get("course_id", ""),
+                    record.get("lesson_id", ""),
+                    record.get("completed", False),
+                    record.get("score"),
+                    record.get("time_spent"),
+                    record.get("updated_at"),
+                )
+                loaded += 1
+        for entry in conversations:
+            self.record_entry(entry)
+        return loaded
+
+    def _migrate_schema(self) -> None:
+        """Drop rollups built by an older schema; they are rebuilt while empty"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        for table in TABLES:
+            self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _has_rollup(self, scope: str, student_id: str, course_id: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM progress_rollups WHERE scope = ? AND student_id = ? AND course_id = ?",
+            (scope, student_id, course_id),
+        ).fetchone() is not None
+
+    def _apply(self, scope: str, student_id: str, course_id: str,
+               old: Optional[Dict[str, Any]], new: Dict[str, Any], new_student: bool = False) -> None:
+        """Replace ``old``'s contribution to one rollup with ``new``'s"""
+        conn = self._conn
+        conn.execute(
+            "INSERT OR IGNORE INTO progress_rollups (scope, student_id, course_id) VALUES (?, ?, ?)",
+            (scope, student_id, course_id),
+        )
+        rollup = dict(conn.execute(
+            "SELECT * FROM progress_rollups WHERE scope = ? AND student_id = ? AND course_id = ?",
+            (scope, student_id, course_id),
+        ).fetchone())
+
+        old_score = old["score"] if old else None
+        new_score = new["score"]
+        rollup["students"] += 1 if new_student else 0
+        rollup["lessons"] += 0 if old else 1
+        rollup["completed"] += new["completed"] - (old["completed"] if old else 0)
+        rollup["time_spent"] += new["time_spent"] - (old["time_spent"] if old else 0)
+        for score, sign in ((old_score, -1), (new_score, 1)):
+            if score is not None:
+                rollup["scored"] += sign
+                rollup["score_sum"] += sign * score
+                rollup["score_sumsq"] += sign * score * score
+        if new["updated_at"] and (rollup["last_updated"] or "") < new["updated_at"]:
+            rollup["last_updated"] = new["updated_at"]
+
+        if old_score is not None and old_score in (rollup["score_min"], rollup["score_max"]) \
+                and old_score != new_score:
+            # The extreme may have been removed; the lesson row is already updated
+            rollup["score_min"], rollup["score_max"] = self._score_range(scope, student_id, course_id)
+        elif new_score is not None:
+            if rollup["score_min"] is None or new_score < rollup["score_min"]:
+                rollup["score_min"] = new_score
+            if rollup["score_max"] is None or new_score > rollup["score_max"]:
+                rollup["score_max"] = new_score
+
+        conn.execute(
+            "UPDATE progress_rollups SET students = ?, lessons = ?, completed = ?, scored = ?, "
+            "score_sum = ?, score_sumsq = ?, score_min = ?, score_max = ?, time_spent = ?, "
+            "last_updated = ? WHERE scope = ? AND student_id = ? AND course_id = ?",
+            (rollup["students"], rollup["lessons"], rollup["completed"], rollup["scored"],
+             rollup["score_sum"], rollup["score_sumsq"], rollup["score_min"], rollup["score_max"],
+             rollup["time_spent"], rollup["last_updated"], scope, student_id, course_id),
+        )
+
+    def _score_range(self, scope: str, student_id: str, course_id: str):
+        if scope == COURSE:
+            where, params = "course_id = ?", (course_id,)
+        elif course_id == ALL_COURSES:
+            where, params = "student_id = ?", (student_id,)
+        else:
+            where, params = "student_id = ? AND course_id = ?", (student_id, course_id)
+        row = self._conn.execute(
+            f"SELECT MIN(score), MAX(score) FROM lesson_progress WHERE {where}", params
+        ).fetchone()
+        return row[0], row[1]
+
+    # --- Reads ---
+
+    def student(self, student_id: str, course_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Rollup for a student in one course, or across all courses"""
+        return self._read(STUDENT, student_id, course_id or ALL_COURSES)
+
+    def course(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """Rollup for every student's progress in a course"""
+        return self._read(COURSE, "", course_id)
+
+    def _read(self, scope: str, student_id: str, course_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM progress_rollups WHERE scope = ? AND student_id = ? AND course_id = ?",
+                (scope, student_id, course_id),
+            ).fetchone()
+        if row is None or (row["lessons"] == 0 and row["conversations"] == 0):
+            return None
+        return summarize(dict(row))
+
+
+def summarize(rollup: Dict[str, Any]) -> Dict[str, Any]:
+    """Derived statistics for a rollup row"""
+    lessons, scored = rollup["lessons"], rollup["scored"]
+    average = rollup["score_sum"] / scored if scored else None
+    stddev = None
+    if scored:
+        variance = max(rollup["score_sumsq"] / scored - average * average, 0.0)
+        stddev = math.sqrt(variance)
+    summary = {
+        "total_lessons": lessons,
+        "completed_lessons": rollup["completed"],
+        "completion_rate": rollup["completed"] / lessons * 100 if lessons else 0,
+        "scored_lessons": scored,
+        "average_score": average,
+        "score_stddev": stddev,
+        "highest_score": rollup["score_max"] if scored else None,
+        "lowest_score": rollup["score_min"] if scored else None,
+        "total_time_spent": rollup["time_spent"],
+        "last_updated": rollup["last_updated"],
+        "conversations": rollup["conversations"],
+        "distinct_concepts": rollup["concepts"],
+        "last_active": rollup["last_active"],
+    }
+    if rollup["scope"] == COURSE:
+        summary["students"] = rollup["students"]
+    return summary
+
+
+# Singleton instance
+_rollups_instance: Optional[ProgressRollups] = None
+
+
+def logged_conversations(vault_path: str) -> Iterable[Dict[str, Any]]:
+    """Every entry in the vault's conversation logs, oldest first"""
+    from .logger_service import DAY_STEM, LOG_SUFFIX, iter_log_file
+
+    logs_dir = Path(vault_path) / "Conversation_Logs"
+    for log_file in sorted(logs_dir.glob(f"*{LOG_SUFFIX}")):
+        if DAY_STEM.match(log_file.stem):
+            yield from iter_log_file(log_file)
+
+
+def get_progress_rollups(vault_path: str = "../vault") -> ProgressRollups:
+    """Get or create the singleton ProgressRollups, loading existing progress once"""
+    global _rollups_instance
+    if _rollups_instance is None:
+        progress_dir = Path(vault_path) / "Student_Progress"
+        progress_dir.mkdir(parents=True, exist_ok=True)
+        rollups = ProgressRollups(progress_dir / ROLLUPS_FILENAME)
+        if rollups.empty:
+            rollups.rebuild(progress_dir, logged_conversations(vault_path))
+        _rollups_instance = rollups
+    return _rollups_instance
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the progress rollups")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("vault_path", nargs="?", default="../vault")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    progress_dir = Path(args.vault_path) / "Student_Progress"
+    count = ProgressRollups(progress_dir / ROLLUPS_FILENAME).rebuild(
+        progress_dir, logged_conversations(args.vault_path)
+    )
+    print(f"Loaded {count} lesson record(s)")
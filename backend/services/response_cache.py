@@ -0,0 +1,236 @@
+"""
+Response cache for repeated student questions
+
+Students in the same course ask the same questions over and over, often
+worded slightly differently. Answers are cached per course in two tiers:
+
+- exact: a hash of the normalized question (lowercased, punctuation and
+  extra whitespace removed), one dict lookup
+- near-duplicate: a MinHash signature over character 4-grams of the
+  question without filler words, bucketed with locality-sensitive
+  hashing, so a lookup only compares the few cached questions that share
+  a band; the best one is used if its estimated Jaccard similarity
+  reaches the threshold
+
+Entries expire after a TTL and the least recently used ones are evicted
+past ``max_entries``. Questions asked with conversation history are never
+served from or stored in the cache, since the answer depends on the
+earlier turns. Hit rate and tokens saved are reported by ``stats()``.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+ALL_COURSES = "*"
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+# Words that change how a question is phrased but not what it asks
+STOPWORDS = frozenset(
+    "a an the is are was do does did can could would you me please i my to of in on "
+    "it this that and what how explain tell".split()
+)
+SHINGLE_SIZE = 4
+
+
+def _stem(word: str) -> str:
+    # Plural and third-person "s" only; enough for "works" to match "work"
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def _shingles(normalized: str) -> List[str]:
+    # Character n-grams tolerate typos and small changes in wording
+    text = " " + " ".join(_stem(w) for w in normalized.split() if w not in STOPWORDS) + " "
+    return [text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), "big")
+
+
+class MinHasher:
+    """MinHash signatures using ``num_perm`` universal hash functions"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, normalized: str) -> Tuple[int, ...]:
+        hashes = [_hash(shingle) for shingle in _shingles(normalized)] or [0]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the two shingle sets"""
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+@dataclass
+class CacheEntry:
+    response: str
+    tokens: int
+    expires_at: float
+    signature: Tuple[int, ...]
+    bands: Tuple[Tuple[int, Tuple[int, ...]], ...]
+
+
+class ResponseCache:
+    """Per-course answer cache with exact and near-duplicate lookup"""
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl_seconds: float = 6 * 3600,
+        similarity_threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.hasher = MinHasher(num_perm)
+        self.band_count = bands
+        self.rows = num_perm // bands
+
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], set] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "lookups": 0, "exact_hits": 0, "near_hits": 0, "misses": 0,
+            "bypassed": 0, "saved_tokens": 0, "evictions": 0,
+        }
+
+    # --- Lookups ---
+
+    def get(self, course_id: Optional[str], question: str,
+            has_history: bool = False) -> Optional[Dict[str, Any]]:
+        """Cached answer for a question, or None; ``match`` is exact or near"""
+        if has_history:
+            with self._lock:
+                self._counters["bypassed"] += 1
+            return None
+
+        course = course_id or ALL_COURSES
+        normalized = normalize_question(question)
+        key = (course, self._digest(normalized))
+        now = time.time()
+        with self._lock:
+            self._counters["lookups"] += 1
+            entry = self._live(key, now)
+            match = "exact"
+            if entry is None:
+                key, entry = self._nearest(course, self.hasher.signature(normalized), now)
+                match = "near"
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters[f"{match}_hits"] += 1
+            self._counters["saved_tokens"] += entry.tokens
+            return {"response": entry.response, "tokens": entry.tokens, "match": match}
+
+    def put(self, course_id: Optional[str], question: str, response: str, tokens: int = 0,
+            has_history: bool = False) -> None:
+        """Cache an answer; ``tokens`` is what the upstream call cost"""
+        if has_history or self.max_entries <= 0:
+            return
+        course = course_id or ALL_COURSES
+        normalized = normalize_question(question)
+        key = (course, self._digest(normalized))
+        signature = self.hasher.signature(normalized)
+        entry = CacheEntry(
+            response=response,
+            tokens=tokens,
+            expires_at=time.time() + self.ttl_seconds,
+            signature=signature,
+            bands=self._bands(signature),
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for band in entry.bands:
+                self._buckets.setdefault((course,) + band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        hits = stats["exact_hits"] + stats["near_hits"]
+        stats["hit_rate"] = round(hits / stats["lookups"], 4) if stats["lookups"] else 0.0
+        return stats
+
+    # --- Internals (called with the lock held) ---
+
+    @staticmethod
+    def _digest(normalized: str) -> str:
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
+    def _bands(self, signature: Tuple[int, ...]) -> Tuple[Tuple[int, Tuple[int, ...]], ...]:
+        return tuple(
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.band_count)
+        )
+
+    def _live(self, key: Tuple[str, str], now: float) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            return None
+        return entry
+
+    def _nearest(self, course: str, signature: Tuple[int, ...], now: float):
+        candidates = set()
+        for band in self._bands(signature):
+            candidates |= self._buckets.get((course,) + band, set())
+        best_key, best_entry, best_score = None, None, self.similarity_threshold
+        for key in candidates:
+            entry = self._live(key, now)
+            if entry is None:
+                continue
+            score = MinHasher.similarity(signature, entry.signature)
+            if score >= best_score:
+                best_key, best_entry, best_score = key, entry, score
+        return best_key, best_entry
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        for band in entry.bands:
+            bucket = self._buckets.get((key[0],) + band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(key[0],) + band]
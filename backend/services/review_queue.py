@@ -0,0 +1,327 @@
+"""
+Review queue for HITL approval requests
+
+Approval requests are Markdown files in vault/Pending_Approval; reviewers
+approve or reject them by moving the file to Approved/ or Rejected/. The
+queue records every request and status change in an append-only journal
+(vault/.review_queue.jsonl) and keeps an in-memory index by status,
+student and day, so the dashboard never has to glob the vault:
+
+- enqueue and status transitions are one journal append, O(1)
+- listings are newest first and paged, walking only the smallest of the
+  matching status/student/day sets
+
+Each process replays the journal at startup and tails it before every
+operation, so several API workers share one queue. Files moved by hand in
+Obsidian are picked up by ``reconcile()``, which only checks pending items
+and stats their files without holding the queue lock. The API runs it in
+the background every ``REVIEW_RECONCILE_SECONDS`` and on
+``POST /api/review/reconcile``; listings never touch the vault.
+
+Compact the journal (while the API is stopped) with:
+
+    python -m services.review_queue compact [vault_path]
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = ".review_queue.jsonl"
+
+PENDING = "pending"
+APPROVED = "approved"
+REJECTED = "rejected"
+STATUS_DIRS = {
+    PENDING: "Pending_Approval",
+    APPROVED: "Approved",
+    REJECTED: "Rejected",
+}
+
+
+@dataclass
+class ReviewItem:
+    """One approval request; ``item_id`` is its file name without .md"""
+    item_id: str
+    kind: str
+    created: str
+    student_id: Optional[str] = None
+    conversation_id: Optional[str] = None
+    reason: Optional[str] = None
+    status: str = PENDING
+    reviewed_at: Optional[str] = None
+    reviewed_by: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def day(self) -> str:
+        return self.created[:10]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.item_id}.md"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["file"] = f"{STATUS_DIRS[self.status]}/{self.filename}"
+        return data
+
+
+class ReviewQueue:
+    """Journal-backed queue of approval requests with in-memory indexes"""
+
+    def __init__(self, vault_path: str = "../vault"):
+        self.vault_path = Path(vault_path)
+        self.journal_path = self.vault_path / JOURNAL_FILENAME
+        for folder in STATUS_DIRS.values():
+            (self.vault_path / folder).mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._reset()
+        with self._lock:
+            self._catch_up()
+
+    def _reset(self) -> None:
+        self.items: Dict[str, ReviewItem] = {}
+        # Each index maps a key to item ids in enqueue order (dicts keep order)
+        self.by_status: Dict[str, Dict[str, None]] = {status: {} for status in STATUS_DIRS}
+        self.by_student: Dict[str, Dict[str, None]] = {}
+        self.by_day: Dict[str, Dict[str, None]] = {}
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+    # --- Journal ---
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        line = (json.dumps(event, default=str) + "\n").encode("utf-8")
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Apply journal lines written since the last read, by any process"""
+        try:
+            stat = self.journal_path.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Compacted or replaced; replay from the start
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping bad review journal line: {e}")
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        op = event.pop("op")
+        if op == "enqueue":
+            item = ReviewItem(**event)
+            if item.item_id in self.items:
+                self._unindex(self.items[item.item_id])
+            self.items[item.item_id] = item
+            self._index(item)
+        elif op == "status":
+            item = self.items.get(event["item_id"])
+            if item is None:
+                return
+            self.by_status[item.status].pop(item.item_id, None)
+            item.status = event["status"]
+            item.reviewed_at = event.get("at")
+            item.reviewed_by = event.get("by")
+            self.by_status[item.status][item.item_id] = None
+
+    def _index(self, item: ReviewItem) -> None:
+        self.by_status[item.status][item.item_id] = None
+        if item.student_id:
+            self.by_student.setdefault(item.student_id, {})[item.item_id] = None
+        self.by_day.setdefault(item.day, {})[item.item_id] = None
+
+    def _unindex(self, item: ReviewItem) -> None:
+        self.by_status[item.status].pop(item.item_id, None)
+        if item.student_id:
+            self.by_student.get(item.student_id, {}).pop(item.item_id, None)
+        self.by_day.get(item.day, {}).pop(item.item_id, None)
+
+    # --- Operations ---
+
+    def enqueue(
+        self,
+        item_id: str,
+        kind: str,
+        student_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        reason: Optional[str] = None,
+        created: Optional[str] = None,
+        **extra: Any,
+    ) -> ReviewItem:
+        """Record a new approval request (its file is already in Pending_Approval)"""
+        event = {
+            "op": "enqueue",
+            "item_id": item_id,
+            "kind": kind,
+            "created": created or datetime.now().isoformat(),
+            "student_id": student_id,
+            "conversation_id": conversation_id,
+            "reason": reason,
+            "extra": extra,
+        }
+        with self._lock:
+            self._append(event)
+            return self.items[item_id]
+
+    def transition(self, item_id: str, status: str, reviewed_by: Optional[str] = None,
+                   move_file: bool = True) -> ReviewItem:
+        """
+        Approve or reject a request, moving its file to the matching folder
+
+        Raises KeyError for an unknown item and ValueError for an unknown
+        status or an item that has already been reviewed.
+        """
+        if status not in STATUS_DIRS or status == PENDING:
+            raise ValueError(f"Unknown review status: {status}")
+        with self._lock:
+            self._catch_up()
+            item = self.items[item_id]
+            if item.status != PENDING:
+                raise ValueError(f"Request {item_id} is already {item.status}")
+            if move_file:
+                source = self.vault_path / STATUS_DIRS[PENDING] / item.filename
+                if source.exists():
+                    source.rename(self.vault_path / STATUS_DIRS[status] / item.filename)
+            self._append({
+                "op": "status",
+                "item_id": item_id,
+                "status": status,
+                "at": datetime.now().isoformat(),
+                "by": reviewed_by,
+            })
+            return item
+
+    def reconcile(self) -> int:
+        """Record pending requests whose files were moved by hand; returns how many"""
+        with self._lock:
+            self._catch_up()
+            pending = [(item_id, self.items[item_id].filename) for item_id in self.by_status[PENDING]]
+
+        moved = 0
+        for item_id, filename in pending:
+            if (self.vault_path / STATUS_DIRS[PENDING] / filename).exists():
+                continue
+            for status in (APPROVED, REJECTED):
+                if (self.vault_path / STATUS_DIRS[status] / filename).exists():
+                    try:
+                        self.transition(item_id, status, move_file=False)
+                    except ValueError:
+                        pass  # Reviewed through the API meanwhile
+                    else:
+                        moved += 1
+                    break
+        return moved
+
+    def get(self, item_id: str) -> Optional[ReviewItem]:
+        with self._lock:
+            self._catch_up()
+            return self.items.get(item_id)
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        student_id: Optional[str] = None,
+        day: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """A page of matching requests, newest first, with the total count"""
+        with self._lock:
+            self._catch_up()
+            candidates = [self.items]
+            if status is not None:
+                candidates.append(self.by_status.get(status, {}))
+            if student_id is not None:
+                candidates.append(self.by_student.get(student_id, {}))
+            if day is not None:
+                candidates.append(self.by_day.get(day, {}))
+            smallest = min(candidates, key=len)
+
+            def matches(item: ReviewItem) -> bool:
+                return (
+                    (status is None or item.status == status)
+                    and (student_id is None or item.student_id == student_id)
+                    and (day is None or item.day == day)
+                )
+
+            if len(candidates) <= 2:
+                # With at most one filter the index is exactly the result set
+                total = len(smallest)
+                matching = (self.items[item_id] for item_id in reversed(smallest))
+            else:
+                matched = [self.items[i] for i in reversed(smallest) if matches(self.items[i])]
+                total = len(matched)
+                matching = iter(matched)
+            page = [item.to_dict() for item in itertools.islice(matching, offset, offset + limit)]
+        return {"items": page, "total": total, "offset": offset, "limit": limit}
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            self._catch_up()
+            return {status: len(ids) for status, ids in self.by_status.items()}
+
+    def compact(self) -> int:
+        """Rewrite the journal as one entry per request; returns the line count"""
+        with self._lock:
+            self._catch_up()
+            tmp = self.journal_path.with_suffix(".jsonl.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for item in self.items.values():
+                    f.write(json.dumps({"op": "enqueue", **asdict(item)}, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_path)
+            self._reset()
+            self._catch_up()
+            return len(self.items)
+
+
+# One queue per vault
+_queues: Dict[Path, ReviewQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_review_queue(vault_path: str = "../vault") -> ReviewQueue:
+    """Get or create the ReviewQueue for a vault"""
+    key = Path(vault_path).resolve()
+    with _queues_lock:
+        if key not in _queues:
+            _queues[key] = ReviewQueue(vault_path=vault_path)
+        return _queues[key]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the HITL review queue")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("vault_path", nargs="?", default="../vault")
+    args = parser.parse_args()
+
+    count = ReviewQueue(vault_path=args.vault_path).compact()
+    print(f"Compacted review journal to {count} request(s)")
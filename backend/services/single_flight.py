@@ -0,0 +1,67 @@
+"""
+Request coalescing for identical concurrent completions
+
+When many students paste the same question at once, only the first call
+for a key (the leader) goes upstream; calls for the same key that arrive
+while it is in flight wait for its result instead of starting their own.
+Followers give up after ``timeout`` seconds. If the leader fails or is
+cancelled, each follower runs the call itself, so one bad upstream call
+never fails the others outright.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class CoalesceTimeout(Exception):
+    """Raised when a follower waited longer than the timeout for the leader"""
+
+
+class _LeaderFailed(Exception):
+    pass
+
+
+class SingleFlight:
+    """Shares one in-flight call per key among concurrent callers"""
+
+    def __init__(self, timeout: float = 60.0):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._counters = {"leaders": 0, "coalesced": 0, "timeouts": 0, "leader_failures": 0}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of ``call`` for ``key`` and whether it came from another caller's call"""
+        pending = self._calls.get(key)
+        if pending is not None:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(pending), self.timeout)
+            except asyncio.TimeoutError:
+                self._counters["timeouts"] += 1
+                raise CoalesceTimeout()
+            except _LeaderFailed:
+                return await call(), False
+            self._counters["coalesced"] += 1
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._counters["leaders"] += 1
+        try:
+            result = await call()
+        except BaseException:
+            self._counters["leader_failures"] += 1
+            future.set_exception(_LeaderFailed())
+            future.exception()  # retrieved, even when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats["in_flight"] = len(self._calls)
+        total = stats["leaders"] + stats["coalesced"]
+        stats["coalesced_rate"] = round(stats["coalesced"] / total, 4) if total else 0.0
+        return stats
@@ -0,0 +1 @@
+"""Benchmarks for the H4 Todo API (run from the backend directory)."""
@@ -0,0 +1,96 @@
+"""
+Cold-start import profile of the API.
+
+Imports ``main`` in a fresh interpreter with ``python -X importtime`` and
+reports total import time, the modules with the highest self time, and
+time grouped by top-level package (third-party vs. this app's own modules).
+Pass ``--disable`` to measure the effect of ``DISABLED_ROUTERS``.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_profile --top 15
+    python -m benchmarks.import_profile --disable calendar,suggestions
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+APP_PACKAGES = {
+    "main", "database", "models", "routers", "services", "metrics",
+    "seeds", "serialization", "startup",
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def profile_once(disabled: str = "") -> list:
+    """Return ``(module, self_us, cumulative_us, depth)`` rows for one cold import."""
+    env = dict(os.environ, DISABLED_ROUTERS=disabled)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def summarize(rows: list, top: int) -> dict:
+    total_us = next(cum for module, _, cum, _ in rows if module == "main")
+    by_package = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+
+    app_us = sum(us for pkg, us in by_package.items() if pkg in APP_PACKAGES)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "app_modules_self_ms": round(app_us / 1000, 1),
+        "modules_imported": len(rows),
+        "top_packages_ms": {
+            pkg: round(us / 1000, 1)
+            for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]
+        },
+        "top_modules_self_ms": {
+            module: round(self_us / 1000, 1)
+            for module, self_us, _, _ in sorted(rows, key=lambda r: -r[1])[:top]
+        },
+        "app_modules_cumulative_ms": {
+            module: round(cum / 1000, 1)
+            for module, _, cum, _ in rows
+            if module.split(".")[0] in APP_PACKAGES and module != "main"
+        },
+    }
+
+
+def run(top: int, repeat: int, disabled: str) -> dict:
+    runs = [profile_once(disabled) for _ in range(repeat)]
+    totals = [next(cum for m, _, cum, _ in rows if m == "main") / 1000 for rows in runs]
+    # Report the breakdown of the median run so one noisy import doesn't skew it
+    median_run = sorted(zip(totals, range(repeat)))[repeat // 2][1]
+    result = summarize(runs[median_run], top)
+    result["repeat"] = repeat
+    result["disabled_routers"] = disabled or None
+    result["total_ms_median"] = round(statistics.median(totals), 1)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--disable", default="", help="Value for DISABLED_ROUTERS")
+    args = parser.parse_args()
+    print(json.dumps(run(args.top, args.repeat, args.disable), indent=2))
+
+
+if __name__ == "__main__":
+    main()
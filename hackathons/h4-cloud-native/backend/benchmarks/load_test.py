@@ -0,0 +1,361 @@
+"""
+Load test for the Todo API.
+
+Seeds a database with configurable volumes of users, teams, todos, recurring
+patterns, templates and calendar connections, then drives the FastAPI app
+in-process through httpx's ASGI transport with concurrent workers. Each
+scenario (list/filter/search, create, stats, template use, calendar sync,
+suggestion generation) is run on its own and reported as throughput plus
+p50/p95/p99 latency so runs can be diffed over time.
+
+Runs fully offline: Dapr publish/health calls are stubbed and vault writes go
+to a temporary directory. Rate limiting is off, since every worker shares
+one client address and would be throttled as a single user. Without ``--database-url`` a throwaway SQLite file
+is used; any SQLAlchemy URL (e.g. PostgreSQL) works, but its tables are
+created and dropped by the run.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --todos 20000 --requests 500 --concurrency 16
+    python -m benchmarks.load_test --scenarios list_filtered,stats --output run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Must be set before main builds the app and its rate limit middleware
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from database import get_db
+from main import app
+from metrics.db_metrics import instrument_engine
+from models import (
+    Base, CalendarConnection, CalendarProvider, ConnectionStatus, MemberRole,
+    RecurringTodo, Team, TeamMember, Template, Todo, TodoCategory, TodoPriority,
+    TodoStatus, User,
+)
+from services.dapr_service import get_dapr_service
+
+SEARCH_TERMS = ["report", "review", "meeting", "invoice", "deploy"]
+
+
+def _stub_dapr() -> None:
+    """Replace the Dapr sidecar calls with no-op successes."""
+    dapr = get_dapr_service()
+    dapr.check_health = lambda: True
+    dapr.publish_event = lambda topic, data: True
+    dapr.save_state = lambda key, value: True
+    dapr.get_state = lambda key: None
+
+
+def seed(session, users: int, teams: int, todos: int, recurring: int, templates: int) -> dict:
+    """Bulk-insert the dataset and return the ids the scenarios draw from."""
+    now = datetime.utcnow()
+    rng = random.Random(42)
+
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    session.bulk_insert_mappings(User, [
+        {"id": uid, "email": f"user{i}@load.test", "display_name": f"Load User {i}"}
+        for i, uid in enumerate(user_ids)
+    ])
+
+    team_ids = [str(uuid.uuid4()) for _ in range(teams)]
+    session.bulk_insert_mappings(Team, [
+        {"id": tid, "name": f"Team {i}", "owner_id": user_ids[i % users]}
+        for i, tid in enumerate(team_ids)
+    ])
+    session.bulk_insert_mappings(TeamMember, [
+        {
+            "team_id": team_ids[i % teams],
+            "user_id": uid,
+            "role": MemberRole.OWNER if i < teams else MemberRole.EDITOR,
+        }
+        for i, uid in enumerate(user_ids)
+    ] if teams else [])
+
+    categories = list(TodoCategory)
+    priorities = list(TodoPriority)
+    statuses = list(TodoStatus)
+    todo_ids = [str(uuid.uuid4()) for _ in range(todos)]
+    session.bulk_insert_mappings(Todo, [
+        {
+            "id": tid,
+            "title": f"{SEARCH_TERMS[i % len(SEARCH_TERMS)].title()} item {i}",
+            "description": f"Seeded todo {i} for the load test" if i % 2 else None,
+            "category": categories[i % len(categories)],
+            "priority": priorities[i % len(priorities)],
+            "status": statuses[i % len(statuses)],
+            "deadline": now + timedelta(days=rng.randint(-5, 30)) if i % 3 else None,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+            "constitutional_check": {"passed": True, "decision": "allow", "reason": None},
+            "owner_id": user_ids[i % users],
+            "team_id": team_ids[i % teams] if teams and i % 4 == 0 else None,
+        }
+        for i, tid in enumerate(todo_ids)
+    ])
+
+    patterns = ["daily", "weekly", "monthly"]
+    session.bulk_insert_mappings(RecurringTodo, [
+        {
+            "pattern": patterns[i % len(patterns)],
+            "interval": 1,
+            "days_of_week": [0, 2, 4] if i % 3 == 1 else None,
+            "day_of_month": (i % 28) + 1 if i % 3 == 2 else None,
+            "start_date": now,
+            "next_occurrence": now + timedelta(days=1),
+            "template_todo_id": todo_ids[i % todos],
+        }
+        for i in range(recurring)
+    ] if todos else [])
+
+    template_ids = [str(uuid.uuid4()) for _ in range(templates)]
+    session.bulk_insert_mappings(Template, [
+        {
+            "id": tid,
+            "name": f"Load template {i}",
+            "category": "work",
+            "todos": [
+                {
+                    "title": f"Template {i} step {step}",
+                    "category": "work",
+                    "priority": "medium",
+                    "relative_deadline_days": step,
+                }
+                for step in range(1, 6)
+            ],
+            "created_by": "load-test",
+            "tags": ["load-test"],
+        }
+        for i, tid in enumerate(template_ids)
+    ])
+
+    # One connected calendar per user so sync has somewhere to write
+    connection_ids = {uid: str(uuid.uuid4()) for uid in user_ids}
+    session.bulk_insert_mappings(CalendarConnection, [
+        {
+            "id": cid,
+            "user_id": uid,
+            "provider": CalendarProvider.GOOGLE,
+            "status": ConnectionStatus.CONNECTED,
+            "calendar_id": "primary",
+            "calendar_name": "Primary",
+        }
+        for uid, cid in connection_ids.items()
+    ])
+    session.commit()
+
+    return {
+        "users": user_ids,
+        "todos": todo_ids,
+        "owners": {tid: user_ids[i % users] for i, tid in enumerate(todo_ids)},
+        "templates": template_ids,
+        "connections": connection_ids,
+    }
+
+
+Scenario = Callable[[httpx.AsyncClient, random.Random, dict], Awaitable[httpx.Response]]
+
+
+async def _list_filtered(client, rng, data):
+    return await client.get("/api/todos", params={
+        "category": rng.choice(list(TodoCategory)).value,
+        "status": rng.choice(list(TodoStatus)).value,
+    })
+
+
+async def _search(client, rng, data):
+    return await client.get("/api/todos", params={"search": rng.choice(SEARCH_TERMS)})
+
+
+async def _create(client, rng, data):
+    return await client.post("/api/todos", json={
+        "title": f"Load created {rng.randrange(1_000_000)}",
+        "description": "Created by the load test",
+        "category": rng.choice(list(TodoCategory)).value,
+        "priority": rng.choice(list(TodoPriority)).value,
+    })
+
+
+async def _stats(client, rng, data):
+    return await client.get("/api/stats")
+
+
+async def _use_template(client, rng, data):
+    return await client.post(f"/api/templates/{rng.choice(data['templates'])}/use")
+
+
+async def _calendar_sync(client, rng, data):
+    todo_id = rng.choice(data["todos"])
+    connection_id = data["connections"][data["owners"][todo_id]]
+    return await client.post(
+        f"/api/calendar/todos/{todo_id}/sync", params={"connection_id": connection_id}
+    )
+
+
+async def _suggestions(client, rng, data):
+    todo_id = rng.choice(data["todos"])
+    return await client.post(
+        f"/api/suggestions/generate/{todo_id}", params={"user_id": data["owners"][todo_id]}
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list_filtered": _list_filtered,
+    "search": _search,
+    "create": _create,
+    "stats": _stats,
+    "template_use": _use_template,
+    "calendar_sync": _calendar_sync,
+    "suggestions": _suggestions,
+}
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(durations: List[float], errors: int, elapsed: float) -> dict:
+    """Throughput and latency summary for one scenario, latencies in ms."""
+    ordered = sorted(durations)
+    if not ordered:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, data: dict,
+    requests: int, concurrency: int, seed_value: int = 0,
+) -> dict:
+    """Issue ``requests`` calls spread across ``concurrency`` workers."""
+    durations: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(worker_id: int) -> None:
+        nonlocal remaining, errors
+        rng = random.Random(seed_value * 1000 + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await scenario(client, rng, data)
+            durations.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(durations, errors, time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix="todo-load-")
+    os.environ["VAULT_PATH"] = workdir
+    _stub_dapr()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    instrument_engine(engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    session = Session()
+    seed_start = time.perf_counter()
+    data = seed(session, args.users, args.teams, args.todos, args.recurring, args.templates)
+    seed_seconds = time.perf_counter() - seed_start
+    session.close()
+
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "config": {
+            "users": args.users, "teams": args.teams, "todos": args.todos,
+            "recurring": args.recurring, "templates": args.templates,
+            "requests": args.requests, "concurrency": args.concurrency,
+        },
+        "seed_seconds": round(seed_seconds, 2),
+        "scenarios": {},
+    }
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            for index, name in enumerate(scenarios):
+                scenario = SCENARIOS[name]
+                await run_scenario(client, scenario, data, args.warmup, 1, index)
+                results["scenarios"][name] = await run_scenario(
+                    client, scenario, data, args.requests, args.concurrency, index
+                )
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        if args.database_url:
+            Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None,
+                        help="SQLAlchemy URL; defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--teams", type=int, default=5)
+    parser.add_argument("--todos", type=int, default=5000)
+    parser.add_argument("--recurring", type=int, default=200)
+    parser.add_argument("--templates", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenarios", default=None,
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Per-request overhead of the Prometheus middleware.
+
+Drives a minimal FastAPI app in-process through httpx's ASGI transport and
+compares three stacks: no middleware, the previous ``BaseHTTPMiddleware``
+implementation (UUID regex over the path), and the pure ASGI
+``PrometheusMiddleware``.
+
+Usage (from the backend directory):
+    python -m benchmarks.middleware_bench --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from metrics.prometheus_metrics import (
+    PrometheusMiddleware,
+    REQUEST_COUNT,
+    REQUEST_DURATION,
+)
+
+_UUID_RE = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+
+class LegacyPrometheusMiddleware(BaseHTTPMiddleware):
+    """The pre-ASGI implementation, kept here only as a baseline."""
+
+    async def dispatch(self, request, call_next):
+        start = time.time()
+        response = await call_next(request)
+        path = re.sub(_UUID_RE, '{id}', request.url.path)
+        REQUEST_COUNT.labels(
+            method=request.method, endpoint=path,
+            status_code=response.status_code
+        ).inc()
+        REQUEST_DURATION.labels(
+            method=request.method, endpoint=path
+        ).observe(time.time() - start)
+        return response
+
+
+def _build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/bench/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def _drive(app: FastAPI, requests: int) -> list:
+    durations = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(requests):
+            start = time.perf_counter()
+            await client.get(f"/bench/item-{i % 100}")
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _summary(durations: list) -> dict:
+    ordered = sorted(durations)
+    return {
+        "mean_us": round(statistics.mean(ordered) * 1e6, 1),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 1),
+        "p99_us": round(ordered[int(len(ordered) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+async def run(requests: int) -> dict:
+    stacks = {
+        "none": _build_app(),
+        "legacy_base_http": _build_app(LegacyPrometheusMiddleware),
+        "pure_asgi": _build_app(PrometheusMiddleware),
+    }
+    results = {"requests": requests, "stacks": {}}
+    for name, app in stacks.items():
+        await _drive(app, min(requests, 200))  # warm up
+        results["stacks"][name] = _summary(await _drive(app, requests))
+
+    baseline = results["stacks"]["none"]["mean_us"]
+    for name in ("legacy_base_http", "pure_asgi"):
+        results["stacks"][name]["overhead_us"] = round(
+            results["stacks"][name]["mean_us"] - baseline, 1
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Serialization benchmark for GET /api/todos.
+
+Compares the default response path (ORM objects -> dict -> TodoResponse
+validation -> JSONResponse) with the fast path in ``serialization``
+(column projection -> dict -> orjson) over an in-memory SQLite database.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization_bench --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import serialization
+from models import Base, Todo, TodoCategory, TodoPriority, TodoStatus
+from routers.todos import TodoResponse, _format_todo_response
+
+
+def _seed(session, rows: int) -> None:
+    """Insert ``rows`` todos with realistic field shapes."""
+    categories = list(TodoCategory)
+    priorities = list(TodoPriority)
+    statuses = list(TodoStatus)
+    now = datetime.utcnow()
+    session.bulk_insert_mappings(Todo, [
+        {
+            "title": f"Benchmark todo {i}",
+            "description": f"Description for benchmark todo number {i}",
+            "category": categories[i % len(categories)],
+            "priority": priorities[i % len(priorities)],
+            "status": statuses[i % len(statuses)],
+            "deadline": now + timedelta(days=i % 30) if i % 3 else None,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+            "constitutional_check": {"passed": True, "decision": "allow", "reason": None},
+            "ai_metadata": {"source": "benchmark", "index": i} if i % 2 else None,
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> dict:
+    """Run ``fn`` ``repeat`` times and summarise wall-clock durations."""
+    durations: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        durations.append(time.perf_counter() - start)
+    return {
+        "min_ms": round(min(durations) * 1000, 2),
+        "median_ms": round(statistics.median(durations) * 1000, 2),
+        "bytes": size,
+    }
+
+
+def run(rows: int, repeat: int) -> dict:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    _seed(session, rows)
+
+    def default_fetch():
+        session.expunge_all()
+        return session.query(Todo).order_by(Todo.created_at.desc()).all()
+
+    def fast_fetch():
+        return session.query(*serialization.TODO_RESPONSE_COLUMNS).order_by(
+            Todo.created_at.desc()
+        ).all()
+
+    todos = default_fetch()
+    projected = fast_fetch()
+
+    results = {
+        "rows": rows,
+        "repeat": repeat,
+        "encoder": "orjson" if serialization.orjson is not None else "json",
+        "serialize_only": {
+            "default": _time(lambda: _default_body(todos), repeat),
+            "fast": _time(lambda: _fast_body(projected), repeat),
+        },
+        "fetch_and_serialize": {
+            "default": _time(lambda: _default_body(default_fetch()), repeat),
+            "fast": _time(lambda: _fast_body(fast_fetch()), repeat),
+        },
+    }
+    for section in ("serialize_only", "fetch_and_serialize"):
+        default_ms = results[section]["default"]["median_ms"]
+        fast_ms = results[section]["fast"]["median_ms"]
+        results[section]["speedup"] = round(default_ms / fast_ms, 2) if fast_ms else None
+        results[section]["per_10k_todos_ms"] = {
+            "default": round(default_ms * 10000 / rows, 2),
+            "fast": round(fast_ms * 10000 / rows, 2),
+        }
+
+    session.close()
+    return results
+
+
+_ADAPTER = TypeAdapter(List[TodoResponse])
+
+
+def _default_body(todos) -> bytes:
+    """Mirror FastAPI's response_model path: dict -> validate -> dump -> JSON."""
+    content = [_format_todo_response(t) for t in todos]
+    validated = _ADAPTER.validate_python(content)
+    return JSONResponse(_ADAPTER.dump_python(validated, mode="json")).body
+
+
+def _fast_body(rows) -> bytes:
+    return serialization.todo_rows_response(rows).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
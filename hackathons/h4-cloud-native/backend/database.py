@@ -1,12 +1,19 @@
 """Database configuration and session management."""
+import itertools
+import logging
 import os
-from typing import Generator
+import threading
+import time
+from typing import Generator, List, Optional
 
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
 from models import Base
+from models.todo import TODOS_SHARDED
 
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./todos.db")
@@ -25,6 +32,24 @@ else:
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+logger = logging.getLogger(__name__)
+
+# Read replicas (comma-separated URLs); empty means all reads use the primary
+READ_REPLICA_URLS = [
+    url.strip() for url in os.getenv("READ_REPLICA_URLS", "").split(",") if url.strip()
+]
+# "round_robin" or "least_connections"
+REPLICA_SELECTION = os.getenv("REPLICA_SELECTION", "round_robin")
+# Seconds after a client's write during which its reads stay on the primary
+REPLICA_LAG_WINDOW = float(os.getenv("REPLICA_LAG_WINDOW", "5"))
+# Seconds a failing replica is taken out of rotation
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", "30"))
+
+# Set by ReadYourWritesMiddleware on successful writes; clients without a
+# cookie jar can echo the response header back instead
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -40,9 +65,233 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+class Replica:
+    """A read replica engine plus the bookkeeping used to route to it."""
+
+    def __init__(self, url: str):
+        self.url = url
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.in_use = 0
+        self.ejected_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+
+class ReplicaRouter:
+    """
+    Picks a healthy replica for each read session.
+
+    Replicas that fail to hand out a connection are ejected for
+    ``eject_seconds`` and retried afterwards; when none is usable the caller
+    falls back to the primary.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        strategy: str = REPLICA_SELECTION,
+        eject_seconds: float = REPLICA_EJECT_SECONDS,
+    ):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+        self.replicas = [Replica(url) for url in urls]
+        self.strategy = strategy
+        self.eject_seconds = eject_seconds
+        self._cycle = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def candidates(self) -> List[Replica]:
+        """Available replicas in the order they should be tried."""
+        with self._lock:
+            available = [r for r in self.replicas if r.available]
+            if not available:
+                return []
+            if self.strategy == "least_connections":
+                return sorted(available, key=lambda r: r.in_use)
+            start = next(self._cycle) % len(available)
+            return available[start:] + available[:start]
+
+    def checkout(self) -> Optional[tuple]:
+        """Return ``(replica, session)`` with a live connection, or None."""
+        for replica in self.candidates():
+            session = replica.SessionLocal()
+            try:
+                session.connection()
+            except OperationalError as e:
+                session.close()
+                self.eject(replica, e)
+                continue
+            with self._lock:
+                replica.in_use += 1
+            return replica, session
+        return None
+
+    def release(self, replica: Replica, session: Session) -> None:
+        session.close()
+        with self._lock:
+            replica.in_use -= 1
+
+    def eject(self, replica: Replica, error: Exception) -> None:
+        logger.warning(f"Ejecting read replica {replica.engine.url!r}: {error}")
+        replica.ejected_until = time.monotonic() + self.eject_seconds
+
+
+replica_router = ReplicaRouter(READ_REPLICA_URLS)
+
+
+def wrote_recently(request: Request) -> bool:
+    """True if this client wrote within the replica lag window."""
+    marker = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return marker is not None and time.time() - float(marker) < REPLICA_LAG_WINDOW
+    except ValueError:
+        return False
+
+
+def get_read_db(
+    request: Request,
+    primary: Session = Depends(get_db),
+) -> Generator[Session, None, None]:
+    """
+    FastAPI dependency for read-only database sessions.
+
+    Yields a replica session when replicas are configured, healthy, and the
+    client hasn't written recently; otherwise the primary session.
+    """
+    if not replica_router or wrote_recently(request):
+        yield primary
+        return
+
+    checked_out = replica_router.checkout()
+    if checked_out is None:
+        yield primary
+        return
+
+    replica, session = checked_out
+    try:
+        yield session
+    finally:
+        replica_router.release(replica, session)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware stamping successful writes with a last-write marker.
+
+    ``get_read_db`` reads it back so that a client sees its own writes even
+    when replicas lag behind the primary.
+    """
+
+    WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.WRITE_METHODS
+            or not replica_router
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                stamp = f"{time.time():.3f}"
+                headers = list(message.get("headers", []))
+                headers.append((LAST_WRITE_HEADER.encode(), stamp.encode()))
+                headers.append((
+                    b"set-cookie",
+                    f"{LAST_WRITE_COOKIE}={stamp}; Max-Age={int(REPLICA_LAG_WINDOW) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax".encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
 def init_db() -> None:
     """Initialize database by creating all tables."""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    add_missing_indexes(engine)
+    if TODOS_SHARDED:
+        drop_todo_foreign_keys(engine)
+
+
+def add_missing_columns(bind, tables=None) -> None:
+    """
+    Add nullable columns that exist on the models but not yet in the database.
+
+    ``create_all`` never alters existing tables; this covers purely additive
+    changes (such as ``todos.deleted_at``) without a migration tool.
+    """
+    inspector = inspect(bind)
+    for table in tables or Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                ))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def drop_todo_foreign_keys(bind) -> None:
+    """
+    Drop foreign keys to ``todos`` left on a primary whose todos are now sharded.
+
+    The models leave them out when ``TODO_SHARDS`` is set, but tables created
+    before sharding still have them, and every insert referencing a todo on a
+    shard would violate them. SQLite can't drop constraints (and doesn't
+    enforce them by default), so it is skipped.
+    """
+    if bind.dialect.name == "sqlite":
+        return
+    inspector = inspect(bind)
+    for table in inspector.get_table_names():
+        for fk in inspector.get_foreign_keys(table):
+            if fk["referred_table"] != "todos" or not fk.get("name"):
+                continue
+            with bind.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT {fk["name"]}'))
+            logger.info(f"Dropped foreign key {table}.{fk['name']} to sharded todos")
+
+
+def add_missing_indexes(bind, tables=None) -> None:
+    """Create model indexes missing from tables that already existed."""
+    inspector = inspect(bind)
+    for table in tables or Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing and _index_applies(index, bind):
+                index.create(bind)
+                logger.info(f"Created index {index.name}")
+
+
+def _index_applies(index, bind) -> bool:
+    """False for indexes limited by ``ddl_if(dialect=...)`` to other databases."""
+    ddl_if = getattr(index, "_ddl_if", None)
+    if ddl_if is None or ddl_if.dialect is None:
+        return True
+    dialects = (ddl_if.dialect,) if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+    return bind.dialect.name in dialects
 
 
 def drop_db() -> None:
@@ -0,0 +1,320 @@
+"""
+Idempotency keys for retried POST requests.
+
+Clients (the Discord bot, the frontend) retry writes on timeout. A request
+carrying an ``Idempotency-Key`` header to one of ``IDEMPOTENT_ROUTES`` is
+recorded against that key: the first request runs normally and its response
+is stored; a retry with the same key and the same request gets the stored
+response back without running validation, inserts or event publishes again.
+
+Records live in the ``idempotency_records`` table on the primary for
+``IDEMPOTENCY_TTL_SECONDS``, fronted by an in-process LRU so hot retries
+don't touch the database. Reusing a key for a different request is a 422;
+retrying while the first request is still running is a 409. Server errors
+are not stored, so a retry after a 5xx runs again.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal, get_db
+from models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))
+# A first request holding its key this long without finishing is presumed dead
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_ROUTES = tuple(re.compile(pattern) for pattern in (
+    r"^/api/todos$",
+    r"^/api/templates/[^/]+/use$",
+    r"^/api/todos/[^/]+/assign$",
+    r"^/api/calendar/connections/[^/]+/sync$",
+    r"^/api/calendar/todos/[^/]+/sync$",
+))
+
+
+def request_hash(method: str, path: str, query: bytes, body: bytes) -> str:
+    """Fingerprint of a request, used to detect a key reused for another request."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredResponse:
+    """A recorded request; ``status_code`` is None while it is still running."""
+    request_hash: str
+    status_code: Optional[int] = None
+    content_type: Optional[str] = None
+    body: str = ""
+
+    @property
+    def completed(self) -> bool:
+        return self.status_code is not None
+
+    @classmethod
+    def from_record(cls, record: IdempotencyRecord) -> "StoredResponse":
+        return cls(record.request_hash, record.status_code, record.content_type, record.body or "")
+
+
+class ResponseCache:
+    """Thread-safe LRU of completed responses with per-entry expiry."""
+
+    def __init__(self, maxsize: int = IDEMPOTENCY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: datetime) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: StoredResponse, expires_at: datetime) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class IdempotencyStore:
+    """Claims keys and records responses in the database and the LRU."""
+
+    def __init__(self, cache: Optional[ResponseCache] = None,
+                 ttl: int = IDEMPOTENCY_TTL_SECONDS, lock_seconds: int = IDEMPOTENCY_LOCK_SECONDS):
+        self.cache = cache or ResponseCache()
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+
+    def claim(self, db: Session, key: str, digest: str,
+              now: Optional[datetime] = None) -> Optional[StoredResponse]:
+        """
+        Claim ``key`` for a new request.
+
+        Returns None when the caller now owns the key and should run the
+        request, otherwise the existing (possibly still running) record.
+        """
+        now = now or datetime.utcnow()
+        cached = self.cache.get(key, now)
+        if cached is not None:
+            return cached
+
+        record = db.get(IdempotencyRecord, key)
+        if record is not None and self._abandoned(record, now):
+            db.delete(record)
+            db.commit()
+            record = None
+        if record is None:
+            db.add(IdempotencyRecord(
+                key=key,
+                request_hash=digest,
+                created_at=now,
+                expires_at=now + timedelta(seconds=self.ttl),
+            ))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                # A concurrent request claimed it first
+                db.rollback()
+                record = db.get(IdempotencyRecord, key)
+                if record is None:
+                    return StoredResponse(digest)
+
+        stored = StoredResponse.from_record(record)
+        if stored.completed:
+            self.cache.put(key, stored, record.expires_at)
+        return stored
+
+    def complete(self, db: Session, key: str, status_code: int,
+                 content_type: Optional[str], body: str) -> None:
+        """Record the response of a claimed request."""
+        record = db.get(IdempotencyRecord, key)
+        if record is None:
+            return
+        record.status_code = status_code
+        record.content_type = content_type
+        record.body = body
+        db.commit()
+        self.cache.put(key, StoredResponse.from_record(record), record.expires_at)
+
+    def release(self, db: Session, key: str) -> None:
+        """Give up a claimed key so that a retry runs the request again."""
+        db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.key == key, IdempotencyRecord.status_code.is_(None)
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    def _abandoned(self, record: IdempotencyRecord, now: datetime) -> bool:
+        if record.expires_at <= now:
+            return True
+        return not record.completed and record.created_at <= now - timedelta(seconds=self.lock_seconds)
+
+
+idempotency_store = IdempotencyStore()
+
+
+def purge_expired(now: Optional[datetime] = None) -> int:
+    """Delete expired idempotency records; returns how many were removed."""
+    db = SessionLocal()
+    try:
+        removed = db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.expires_at <= (now or datetime.utcnow())
+        ).delete(synchronize_session=False)
+        db.commit()
+        return removed
+    finally:
+        db.close()
+
+
+@contextmanager
+def _session(app):
+    """Open a primary session, honouring ``get_db`` overrides (e.g. in tests)."""
+    provider = getattr(app, "dependency_overrides", {}).get(get_db, get_db)
+    sessions = provider()
+    try:
+        yield next(sessions)
+    finally:
+        sessions.close()
+
+
+def _run(app, method: str, *args):
+    with _session(app) as db:
+        return getattr(idempotency_store, method)(db, *args)
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware replaying stored responses for repeated Idempotency-Keys."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        key = _header(scope, IDEMPOTENCY_HEADER)
+        if key is None or not any(route.match(scope["path"]) for route in IDEMPOTENT_ROUTES):
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, '{"detail":"Invalid Idempotency-Key header"}')
+            return
+
+        body = await _read_body(receive)
+        digest = request_hash(scope["method"], scope["path"], scope.get("query_string", b""), body)
+        app = scope.get("app")
+
+        stored = idempotency_store.cache.get(key, datetime.utcnow())
+        if stored is None:
+            stored = await run_in_threadpool(_run, app, "claim", key, digest)
+        if stored is not None:
+            if not stored.completed:
+                await _send_json(send, 409, '{"detail":"A request with this Idempotency-Key is in progress"}')
+            elif stored.request_hash != digest:
+                await _send_json(
+                    send, 422, '{"detail":"Idempotency-Key was already used for a different request"}'
+                )
+            else:
+                await _send_json(send, stored.status_code, stored.body, stored.content_type, replayed=True)
+            return
+
+        await self._run_and_record(scope, body, send, app, key)
+
+    async def _run_and_record(self, scope, body: bytes, send, app, key: str) -> None:
+        replayed_body = False
+
+        async def receive_body():
+            nonlocal replayed_body
+            if not replayed_body:
+                replayed_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        status_code, content_type, chunks = 500, None, []
+
+        async def send_wrapper(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"").decode() or None
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_wrapper)
+        except Exception:
+            await run_in_threadpool(_run, app, "release", key)
+            raise
+
+        try:
+            text = b"".join(chunks).decode("utf-8")
+        except UnicodeDecodeError:
+            text = None
+        if status_code >= 500 or text is None:
+            await run_in_threadpool(_run, app, "release", key)
+        else:
+            await run_in_threadpool(_run, app, "complete", key, status_code, content_type, text)
+
+
+def _header(scope, name: str) -> Optional[str]:
+    encoded = name.encode()
+    for header, value in scope.get("headers", []):
+        if header.lower() == encoded:
+            return value.decode("latin-1").strip()
+    return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_json(send, status_code: int, body: str,
+                     content_type: Optional[str] = "application/json", replayed: bool = False) -> None:
+    encoded = body.encode("utf-8")
+    headers = [(b"content-length", str(len(encoded)).encode())]
+    if content_type:
+        headers.append((b"content-type", content_type.encode()))
+    if replayed:
+        headers.append((REPLAYED_HEADER.encode(), b"true"))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": encoded})
@@ -0,0 +1,246 @@
+"""
+Todo lifecycle: soft-delete tombstones, archiving and restore.
+
+Deleting a todo only sets ``deleted_at``. A background worker moves todos
+that were completed more than ``ARCHIVE_COMPLETED_AFTER_DAYS`` ago, or
+tombstoned more than ``ARCHIVE_DELETED_AFTER_DAYS`` ago, into the
+``todos_archive`` table in batches so the hot ``todos`` table (and its
+indexes) only holds live work. Archived todos can be queried and restored.
+
+When todos are sharded each shard archives into its own ``todos_archive``;
+recurring templates and references to archived todos are still resolved
+on the primary.
+
+Run one archive pass by hand (e.g. from a CronJob) with:
+    python -m lifecycle
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, inspect, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from idempotency import purge_expired
+from models import (
+    ArchivedTodo, CalendarEvent, RecurringTodo, Suggestion, Todo, TodoAssignment, TodoStatus,
+)
+import sharding
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COMPLETED_AFTER_DAYS = int(os.getenv("ARCHIVE_COMPLETED_AFTER_DAYS", "30"))
+ARCHIVE_DELETED_AFTER_DAYS = int(os.getenv("ARCHIVE_DELETED_AFTER_DAYS", "7"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Seconds between background archive passes; 0 disables the worker
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+
+def archive_candidates(db: Session, now: datetime, primary: Optional[Session] = None):
+    """Query for todos due for archiving, oldest first."""
+    completed_before = now - timedelta(days=ARCHIVE_COMPLETED_AFTER_DAYS)
+    deleted_before = now - timedelta(days=ARCHIVE_DELETED_AFTER_DAYS)
+    query = db.query(Todo).filter(or_(
+        Todo.deleted_at < deleted_before,
+        (Todo.status == TodoStatus.COMPLETED)
+        & (Todo.updated_at < completed_before)
+        & Todo.deleted_at.is_(None),
+    ))
+    # Recurring patterns clone their template todo; keep those hot
+    templates = (primary or db).query(RecurringTodo.template_todo_id)
+    if primary is not None and primary is not db:
+        templates = [template_id for (template_id,) in templates]
+    return query.filter(~Todo.id.in_(templates)).order_by(Todo.updated_at)
+
+
+def _row_data(row) -> dict:
+    """Column values of a row as JSON."""
+    data = {}
+    for attr in inspect(row).mapper.column_attrs:
+        value = getattr(row, attr.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Enum):
+            value = value.value
+        data[attr.key] = value
+    return data
+
+
+def _from_row_data(model, data: dict):
+    """Rebuild a row saved with ``_row_data``."""
+    values = {}
+    for attr in inspect(model).column_attrs:
+        if attr.key not in data:
+            continue
+        value, column_type = data[attr.key], attr.columns[0].type
+        if value is not None and isinstance(column_type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and getattr(column_type, "enum_class", None):
+            value = column_type.enum_class(value)
+        values[attr.key] = value
+    return model(**values)
+
+
+def _links(primary: Session, ids: List[str]) -> Dict[str, dict]:
+    """Rows on the primary referring to each todo, as stored in ``ArchivedTodo.links``."""
+    links = {todo_id: {"assignments": [], "suggestions": [], "calendar_events": []} for todo_id in ids}
+    for assignment in primary.query(TodoAssignment).filter(TodoAssignment.todo_id.in_(ids)):
+        links[assignment.todo_id]["assignments"].append(_row_data(assignment))
+    for model, key in ((Suggestion, "suggestions"), (CalendarEvent, "calendar_events")):
+        for row_id, todo_id in primary.query(model.id, model.todo_id).filter(model.todo_id.in_(ids)):
+            links[todo_id][key].append(row_id)
+    return links
+
+
+def archive_batch(db: Session, now: Optional[datetime] = None,
+                  batch_size: Optional[int] = None, primary: Optional[Session] = None) -> int:
+    """Move one batch of due todos into the archive; returns how many moved.
+
+    ``primary`` holds the recurring patterns, suggestions, calendar events
+    and assignments that reference todos; it defaults to ``db`` when todos
+    aren't sharded.
+    """
+    now = now or datetime.utcnow()
+    primary = primary or db
+    todos = archive_candidates(db, now, primary).limit(batch_size or ARCHIVE_BATCH_SIZE).all()
+    if not todos:
+        return 0
+
+    ids = [todo.id for todo in todos]
+    links = _links(primary, ids)
+    db.add_all([
+        ArchivedTodo.from_todo(
+            todo, "deleted" if todo.deleted_at else "completed", now, links[todo.id]
+        )
+        for todo in todos
+    ])
+    for todo in todos:
+        db.expunge(todo)
+    db.query(Todo).filter(Todo.id.in_(ids)).delete(synchronize_session=False)
+    if primary is not db:
+        # Archive on the shard first; if detaching below fails the references
+        # stay, pointing at a todo that lookups no longer find
+        db.commit()
+
+    # Detach the rows saved in the archive; restore reattaches them
+    assignment_ids = [a["id"] for todo_links in links.values() for a in todo_links["assignments"]]
+    for model, key in ((Suggestion, "suggestions"), (CalendarEvent, "calendar_events")):
+        row_ids = [row_id for todo_links in links.values() for row_id in todo_links[key]]
+        primary.query(model).filter(model.id.in_(row_ids)).update(
+            {model.todo_id: None}, synchronize_session=False
+        )
+    primary.query(TodoAssignment).filter(TodoAssignment.id.in_(assignment_ids)).delete(
+        synchronize_session=False
+    )
+    primary.commit()
+    return len(ids)
+
+
+def run_archive(now: Optional[datetime] = None, batch_size: Optional[int] = None) -> dict:
+    """Archive everything that is due, batch by batch, on every database."""
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    router = sharding.shard_router
+    # The shard directory is the primary database
+    primary = (router.directory if router else SessionLocal)()
+    targets = [(name, lambda name=name: router.open(name)) for name in router.names]
+
+    archived = {}
+    try:
+        for name, open_session in targets or [("primary", lambda: primary)]:
+            db = open_session()
+            try:
+                total = 0
+                while True:
+                    moved = archive_batch(db, now, batch_size, primary)
+                    total += moved
+                    if moved < batch_size:
+                        break
+            finally:
+                if db is not primary:
+                    db.close()
+            archived[name] = total
+    finally:
+        primary.close()
+    if any(archived.values()):
+        logger.info(f"Archived todos: {archived}")
+    return archived
+
+
+def restore(db: Session, archived_db: Session, archived: ArchivedTodo,
+            primary: Optional[Session] = None) -> Todo:
+    """
+    Move an archived todo back into the hot table on ``db``.
+
+    Assignments, suggestions and calendar events detached when it was
+    archived are reattached on ``primary`` (``db`` when unsharded).
+    """
+    primary = primary or db
+    links = archived.links or {}
+    todo = archived.to_todo()
+    db.add(todo)
+    if archived_db is db:
+        db.delete(archived)
+    if primary is not db:
+        # Insert before reattaching so references never point at a missing todo
+        db.commit()
+
+    for data in links.get("assignments", []):
+        primary.merge(_from_row_data(TodoAssignment, data))
+    for model, key in ((Suggestion, "suggestions"), (CalendarEvent, "calendar_events")):
+        if links.get(key):
+            primary.query(model).filter(
+                model.id.in_(links[key]), model.todo_id.is_(None)
+            ).update({model.todo_id: todo.id}, synchronize_session=False)
+    primary.commit()
+    if archived_db is not db:
+        # Removed from the archive last so a failure can't lose the row
+        archived_db.delete(archived)
+        archived_db.commit()
+    db.refresh(todo)
+    return todo
+
+
+class ArchiveWorker:
+    """Runs ``run_archive`` and expires idempotency keys periodically in a worker thread."""
+
+    def __init__(self, interval: float = ARCHIVE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> Optional[asyncio.Task]:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(run_archive)
+            except Exception as e:
+                logger.warning(f"Archive pass failed: {e}")
+            try:
+                await asyncio.to_thread(purge_expired)
+            except Exception as e:
+                logger.warning(f"Idempotency key purge failed: {e}")
+
+
+def main() -> None:
+    print(json.dumps({"archived": run_archive()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
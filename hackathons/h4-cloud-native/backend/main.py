@@ -19,10 +19,12 @@ import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from database import init_db, get_db
-from services.dapr_service import get_dapr_service
+import routers
+from database import engine, replica_router, ReadYourWritesMiddleware
 from metrics.prometheus_metrics import PrometheusMiddleware, metrics_endpoint
+from metrics.db_metrics import DBQueryMiddleware, instrument_engine
 from routers import (
     todos_router,
     stats_router,
@@ -31,40 +33,43 @@ from routers import (
     users_router,
     teams_router,
     assignments_router,
-    suggestions_router,
-    calendar_router,
 )
-from seeds import seed_templates
+from idempotency import IdempotencyMiddleware
+from lifecycle import ArchiveWorker
+from rate_limit import RateLimitMiddleware
+from sharding import PLACEMENT_CACHE_SECONDS, TenantMovingError
+from startup import StartupPipeline
 
 
 logger = logging.getLogger(__name__)
 
+# Optional routers to skip entirely (comma-separated, e.g. "calendar,suggestions")
+DISABLED_ROUTERS = {
+    name.strip() for name in os.getenv("DISABLED_ROUTERS", "").split(",") if name.strip()
+}
+
+# Rate limit cost per request (method, path regex, tokens); unmatched requests cost 1
+RATE_LIMIT_COSTS = [
+    ("GET", r"^/(health|ready|metrics)?$", 0),
+    ("POST", r"^/api/calendar/connections/[^/]+/sync$", 10),
+    ("POST", r"^/api/recurring/generate-all$", 10),
+    ("POST", r"^/api/suggestions/(generate|insights)/", 5),
+    ("POST", r"^/api/templates/[^/]+/use$", 5),
+    ("GET", r"^/api/stats$", 2),
+]
+
+startup = StartupPipeline()
+archive_worker = ArchiveWorker()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database, Dapr, and seed data on startup."""
-    init_db()
-
-    # Seed templates
-    db = next(get_db())
-    try:
-        seed_templates(db)
-    finally:
-        db.close()
-
-    # Initialize Dapr sidecar connection (retry for sidecar startup race)
-    import time as _time
-    dapr = get_dapr_service()
-    for attempt in range(10):
-        if dapr.check_health():
-            logger.info("Dapr sidecar connected successfully")
-            break
-        logger.info(f"Waiting for Dapr sidecar (attempt {attempt + 1}/10)...")
-        _time.sleep(2)
-    else:
-        logger.warning("Dapr sidecar not available at startup - will retry on first publish")
-
+    """Run database setup, seeding, Dapr discovery and archiving in the background."""
+    startup.start()
+    archive_worker.start()
     yield
+    await archive_worker.stop()
+    await startup.stop()
 
 
 app = FastAPI(
@@ -82,6 +87,14 @@ allowed_origins = [origin.strip() for origin in cors_origins.split(",")]
 if cors_origins == "*":
     allowed_origins = ["*"]
 
+instrument_engine(engine)
+for replica in replica_router.replicas:
+    instrument_engine(replica.engine)
+
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(DBQueryMiddleware)
+app.add_middleware(RateLimitMiddleware, costs=RATE_LIMIT_COSTS)
 app.add_middleware(PrometheusMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -89,6 +102,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -99,8 +113,19 @@ app.include_router(templates_router)
 app.include_router(users_router)
 app.include_router(teams_router)
 app.include_router(assignments_router)
-app.include_router(suggestions_router)
-app.include_router(calendar_router)
+for name in routers.OPTIONAL_ROUTERS:
+    if name not in DISABLED_ROUTERS:
+        app.include_router(routers.load_optional_router(name))
+
+
+@app.exception_handler(TenantMovingError)
+async def tenant_moving_handler(request, exc: TenantMovingError):
+    """Writes to a tenant that is moving between shards are retried later."""
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(max(1, int(PLACEMENT_CACHE_SECONDS)))},
+    )
 
 
 @app.get("/")
@@ -121,6 +146,7 @@ async def root():
             "suggestions": "/api/suggestions",
             "calendar": "/api/calendar",
             "health": "/health",
+            "ready": "/ready",
             "docs": "/docs",
         },
         "features": [
@@ -152,10 +178,22 @@ async def get_metrics():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness endpoint; fails only if startup gave up on the database."""
+    if startup.failed:
+        return JSONResponse(
+            {"status": "unhealthy", "service": "h4-cloud-native-todo-api"},
+            status_code=503,
+        )
     return {"status": "healthy", "service": "h4-cloud-native-todo-api"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint; 503 until the startup pipeline has finished."""
+    snapshot = startup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
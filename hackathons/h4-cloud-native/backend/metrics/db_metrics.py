@@ -0,0 +1,209 @@
+"""Per-request database query instrumentation.
+
+SQLAlchemy cursor events on the engine accumulate statement count, DB time
+and rows into a per-request ``QueryStats`` held in a context variable set by
+``DBQueryMiddleware``. Rows are counted as they are fetched from the cursor
+(DBAPI ``rowcount`` is -1 for SELECT on sqlite3), plus rows affected by
+statements that return none. When the request finishes the totals are exported as
+histograms labelled by route template. Statements slower than
+``SLOW_QUERY_MS`` are written to the ``slow_query`` logger with normalized
+SQL and the shape (not the values) of their bind parameters.
+
+With ``DEBUG=true`` responses carry ``X-DB-Time`` and ``Server-Timing``
+headers so N+1 patterns are visible from the client.
+"""
+import json
+import logging
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from metrics.prometheus_metrics import route_template
+
+slow_query_logger = logging.getLogger("slow_query")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request',
+    ['method', 'endpoint'],
+    buckets=[0, 1, 2, 3, 5, 10, 20, 50, 100]
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'db_time_per_request_seconds', 'Total DB time per request',
+    ['method', 'endpoint'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+DB_ROWS_PER_REQUEST = Histogram(
+    'db_rows_per_request', 'Rows returned or affected per request',
+    ['method', 'endpoint'],
+    buckets=[0, 1, 10, 100, 1_000, 10_000, 100_000]
+)
+DB_SLOW_QUERIES = Counter(
+    'db_slow_queries_total', 'Statements slower than SLOW_QUERY_MS',
+    ['endpoint']
+)
+
+
+class QueryStats:
+    """Mutable accumulator for the statements run by one request."""
+
+    __slots__ = ("statements", "duration", "rows", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.statements = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.scope = scope
+
+    @property
+    def endpoint(self) -> str:
+        """Route template of the request; routing has completed before any query runs."""
+        return route_template(self.scope) if self.scope is not None else "<background>"
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Return the stats for the request being processed, if any."""
+    return _current_stats.get()
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals and IN-lists so similar statements group together."""
+    sql = _WHITESPACE_RE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL_RE.sub("?", sql)
+    sql = _NUMBER_LITERAL_RE.sub("?", sql)
+    return _PLACEHOLDER_LIST_RE.sub("(?, ...)", sql)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Describe bind parameters by type only, never by value."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else ()
+        return {"executemany": len(parameters), "row": parameter_shape(first)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class _RowCountingCursor:
+    """DBAPI cursor proxy adding the rows fetched through it to a ``QueryStats``."""
+
+    def __init__(self, cursor, stats: QueryStats):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_stats", stats)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._db_metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_db_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.duration += elapsed
+        if cursor.description is not None:
+            # The result reads rows through context.cursor, which is set up next
+            context.cursor = _RowCountingCursor(cursor, stats)
+        elif cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        endpoint = stats.endpoint if stats is not None else "<background>"
+        DB_SLOW_QUERIES.labels(endpoint=endpoint).inc()
+        slow_query_logger.warning(json.dumps({
+            "duration_ms": round(elapsed * 1000, 2),
+            "endpoint": endpoint,
+            "sql": normalize_sql(statement),
+            "params": parameter_shape(parameters, executemany),
+        }))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query instrumentation listeners to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class DBQueryMiddleware:
+    """Pure ASGI middleware that scopes QueryStats to each HTTP request."""
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and DEBUG:
+                db_ms = stats.duration * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-time", f"{db_ms:.2f}".encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={db_ms:.2f};desc="{stats.statements} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            endpoint = stats.endpoint
+            method = scope["method"]
+            DB_QUERIES_PER_REQUEST.labels(method=method, endpoint=endpoint).observe(stats.statements)
+            DB_TIME_PER_REQUEST.labels(method=method, endpoint=endpoint).observe(stats.duration)
+            DB_ROWS_PER_REQUEST.labels(method=method, endpoint=endpoint).observe(stats.rows)
@@ -1,9 +1,7 @@
 """Prometheus metrics for Todo backend."""
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 from fastapi import Response
-from starlette.middleware.base import BaseHTTPMiddleware
 import time
-import re
 
 REQUEST_COUNT = Counter(
     'http_requests_total', 'Total HTTP requests',
@@ -22,26 +20,69 @@ REQUEST_DURATION = Histogram(
     ['method', 'endpoint'],
     buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
 )
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'HTTP requests currently being processed',
+    ['method']
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size',
+    ['method', 'endpoint'],
+    buckets=[100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+)
+
+# Label used when no route matched (404s, scanners) to keep cardinality bounded
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency, size and in-flight.
+
+    The ``endpoint`` label is the matched route template (``/api/todos/{todo_id}``)
+    taken from ``scope["route"]`` after routing, so path parameters never
+    leak into label values.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method=method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight.dec()
+            endpoint = route_template(scope)
+            REQUEST_COUNT.labels(
+                method=method, endpoint=endpoint, status_code=status_code
+            ).inc()
+            REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+            RESPONSE_SIZE.labels(method=method, endpoint=endpoint).observe(response_size)
 
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        if request.url.path == "/metrics":
-            return await call_next(request)
-        start = time.time()
-        response = await call_next(request)
-        path = re.sub(
-            r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
-            '{id}', request.url.path
-        )
-        REQUEST_COUNT.labels(
-            method=request.method, endpoint=path,
-            status_code=response.status_code
-        ).inc()
-        REQUEST_DURATION.labels(
-            method=request.method, endpoint=path
-        ).observe(time.time() - start)
-        return response
+def route_template(scope) -> str:
+    """Return the path template of the route that handled the request."""
+    return getattr(scope.get("route"), "path", UNMATCHED_ENDPOINT)
 
 
 def metrics_endpoint():
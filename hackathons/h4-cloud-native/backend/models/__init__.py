@@ -7,6 +7,7 @@ from .todo import (
     TodoStatus,
     ConstitutionalDecision,
 )
+from .todo_archive import ArchivedTodo
 from .recurring_todo import RecurringTodo, RecurrencePattern
 from .template import Template
 from .user import User
@@ -14,6 +15,9 @@ from .team import Team, TeamMember, MemberRole, TeamTodo, TodoComment, TeamRole
 from .assignment import TodoAssignment, AssignmentStatus
 from .suggestion import Suggestion, SuggestionType, SuggestionStatus
 from .calendar import CalendarConnection, CalendarEvent, CalendarProvider, ConnectionStatus, SyncDirection
+from .seed_metadata import SeedMetadata
+from .tenant_placement import TenantPlacement
+from .idempotency_record import IdempotencyRecord
 
 __all__ = [
     "Base",
@@ -22,6 +26,7 @@ __all__ = [
     "TodoPriority",
     "TodoStatus",
     "ConstitutionalDecision",
+    "ArchivedTodo",
     "RecurringTodo",
     "RecurrencePattern",
     "Template",
@@ -42,4 +47,7 @@ __all__ = [
     "CalendarProvider",
     "ConnectionStatus",
     "SyncDirection",
+    "SeedMetadata",
+    "TenantPlacement",
+    "IdempotencyRecord",
 ]
@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum as PyEnum
 import uuid
 
-from .todo import Base
+from .todo import Base, todo_foreign_key
 
 
 class AssignmentStatus(str, PyEnum):
@@ -26,7 +26,7 @@ class TodoAssignment(Base):
     __tablename__ = "todo_assignments"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    todo_id = Column(String(36), ForeignKey('todos.id'), nullable=False)
+    todo_id = Column(String(36), *todo_foreign_key(), nullable=False)
     assignee_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     assigned_by = Column(String(36), ForeignKey('users.id'), nullable=False)
     team_id = Column(String(36), ForeignKey('teams.id'), nullable=True)
@@ -38,7 +38,9 @@ class TodoAssignment(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    todo = relationship("Todo", backref="assignments")
+    todo = relationship(
+        "Todo", primaryjoin="foreign(TodoAssignment.todo_id) == Todo.id", backref="assignments"
+    )
     assignee = relationship("User", foreign_keys=[assignee_id])
     assigner = relationship("User", foreign_keys=[assigned_by])
     team = relationship("Team")
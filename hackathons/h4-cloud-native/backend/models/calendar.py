@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime, Text, Boolean, JSON, Enum, ForeignKey
 from sqlalchemy.orm import relationship
-from .todo import Base
+from .todo import Base, todo_foreign_key
 
 
 class CalendarProvider(str, enum.Enum):
@@ -86,7 +86,7 @@ class CalendarEvent(Base):
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     connection_id = Column(String(36), ForeignKey("calendar_connections.id"), nullable=False)
-    todo_id = Column(String(36), ForeignKey("todos.id"), nullable=True)
+    todo_id = Column(String(36), *todo_foreign_key(), nullable=True)
 
     # External calendar event ID
     external_event_id = Column(String(255), nullable=True)
@@ -117,7 +117,7 @@ class CalendarEvent(Base):
 
     # Relationships
     connection = relationship("CalendarConnection", foreign_keys=[connection_id])
-    todo = relationship("Todo", foreign_keys=[todo_id])
+    todo = relationship("Todo", primaryjoin="foreign(CalendarEvent.todo_id) == Todo.id")
 
     def to_dict(self):
         """Convert to dictionary."""
@@ -0,0 +1,31 @@
+"""Idempotency record model for replaying responses to retried requests."""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Integer, Text
+
+from .todo import Base
+
+
+class IdempotencyRecord(Base):
+    """
+    The stored outcome of a request sent with an ``Idempotency-Key`` header.
+
+    ``status_code`` is NULL while the first request is still running; a retry
+    arriving in that window is rejected instead of running twice.
+    """
+    __tablename__ = "idempotency_records"
+
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    @property
+    def completed(self) -> bool:
+        return self.status_code is not None
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyRecord(key={self.key}, status_code={self.status_code})>"
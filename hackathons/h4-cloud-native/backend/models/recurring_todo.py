@@ -4,10 +4,10 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import Optional, List
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON
 from sqlalchemy.orm import relationship
 
-from .todo import Base
+from .todo import Base, todo_foreign_key
 
 
 class RecurrencePattern(str, PyEnum):
@@ -52,8 +52,10 @@ class RecurringTodo(Base):
     is_active = Column(Boolean, default=True)
 
     # Template todo to clone
-    template_todo_id = Column(String(36), ForeignKey('todos.id'), nullable=False)
-    template_todo = relationship("Todo", foreign_keys=[template_todo_id])
+    template_todo_id = Column(String(36), *todo_foreign_key(), nullable=False)
+    template_todo = relationship(
+        "Todo", primaryjoin="foreign(RecurringTodo.template_todo_id) == Todo.id"
+    )
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,23 @@
+"""Seed metadata model for tracking which seed data version is applied."""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime
+
+from .todo import Base
+
+
+class SeedMetadata(Base):
+    """
+    One row per seed set, holding the fingerprint of the data last applied.
+
+    Startup compares the fingerprint of the in-code seed data with this row
+    and skips seeding entirely when they match.
+    """
+    __tablename__ = "seed_metadata"
+
+    key = Column(String(100), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SeedMetadata(key={self.key}, fingerprint={self.fingerprint[:12]})>"
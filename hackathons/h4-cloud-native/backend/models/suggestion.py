@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime, Text, Boolean, JSON, Enum, ForeignKey
 from sqlalchemy.orm import relationship
-from .todo import Base
+from .todo import Base, todo_foreign_key
 
 
 class SuggestionType(str, enum.Enum):
@@ -30,7 +30,7 @@ class Suggestion(Base):
     __tablename__ = "suggestions"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    todo_id = Column(String(36), ForeignKey("todos.id"), nullable=True)
+    todo_id = Column(String(36), *todo_foreign_key(), nullable=True)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=True)
 
     suggestion_type = Column(Enum(SuggestionType), nullable=False)
@@ -60,7 +60,7 @@ class Suggestion(Base):
     actioned_at = Column(DateTime, nullable=True)
 
     # Relationships
-    todo = relationship("Todo", foreign_keys=[todo_id])
+    todo = relationship("Todo", primaryjoin="foreign(Suggestion.todo_id) == Todo.id")
     user = relationship("User", foreign_keys=[user_id])
 
     def to_dict(self):
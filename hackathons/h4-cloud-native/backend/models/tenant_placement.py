@@ -0,0 +1,26 @@
+"""Tenant placement model for the todo shard directory."""
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, String, DateTime
+
+from .todo import Base
+
+
+class TenantPlacement(Base):
+    """
+    Explicit shard assignment for a tenant, overriding the hash ring.
+
+    Rows are written by the rebalancing tool when a tenant is pinned or
+    moved; tenants without a row live on their consistent-hash shard.
+    ``moving`` fences a tenant while its rows are copied: writes to its
+    todos are refused until the placement flips to the new shard.
+    """
+    __tablename__ = "tenant_placements"
+
+    tenant_key = Column(String(100), primary_key=True)
+    shard = Column(String(100), nullable=False)
+    moving = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TenantPlacement(tenant_key={self.tenant_key}, shard={self.shard})>"
@@ -1,14 +1,24 @@
 """Todo model with SQLAlchemy ORM."""
+import os
 import uuid
 from datetime import datetime
 from enum import Enum as PyEnum
 from typing import Optional
 
-from sqlalchemy import Column, String, DateTime, Enum, JSON, Text, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, JSON, Text, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# With TODO_SHARDS set, todos live on the shard databases and the primary's
+# todos table stays empty, so tables on the primary refer to todos by id only
+TODOS_SHARDED = bool(os.getenv("TODO_SHARDS", "").strip())
+
+
+def todo_foreign_key() -> tuple:
+    """``ForeignKey("todos.id")`` as column arguments, or none when todos are sharded."""
+    return () if TODOS_SHARDED else (ForeignKey("todos.id"),)
+
 
 class TodoCategory(str, PyEnum):
     """Categories for todos."""
@@ -85,6 +95,16 @@ class Todo(Base):
     team_id = Column(String(36), ForeignKey('teams.id'), nullable=True)
     is_shared = Column(Boolean, default=False)
 
+    # Soft-delete tombstone; tombstoned rows are hidden and later archived
+    deleted_at = Column(DateTime, nullable=True, index=True)
+
+    __table_args__ = (
+        # Supports the archiver's "completed and older than N days" scan
+        Index("ix_todos_status_updated_at", "status", "updated_at"),
+        # Keyset pagination of list_todos (newest first, id breaks ties)
+        Index("ix_todos_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"<Todo(id={self.id}, title='{self.title[:30]}...', status={self.status.value})>"
 
@@ -105,4 +125,5 @@ class Todo(Base):
             "owner_id": self.owner_id,
             "team_id": self.team_id,
             "is_shared": self.is_shared,
+            "deleted_at": self.deleted_at.isoformat() if self.deleted_at else None,
         }
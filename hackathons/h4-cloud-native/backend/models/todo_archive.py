@@ -0,0 +1,80 @@
+"""Archived todo model for cold storage of finished and deleted todos."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, String, DateTime, JSON
+
+from .todo import Base, Todo, TodoCategory, TodoPriority, TodoStatus
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class ArchivedTodo(Base):
+    """
+    A todo moved out of the hot ``todos`` table.
+
+    The full row is kept in ``data`` (``Todo.to_dict()``); the columns
+    alongside it exist only to filter the archive. ``links`` keeps the
+    assignments, suggestions and calendar events that referred to the todo,
+    so restoring it can reattach them.
+    """
+    __tablename__ = "todos_archive"
+
+    id = Column(String(36), primary_key=True)
+    title = Column(String(500), nullable=False)
+    status = Column(String(20), nullable=False)
+    owner_id = Column(String(36), nullable=True, index=True)
+    team_id = Column(String(36), nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    reason = Column(String(20), nullable=False)  # completed, deleted
+    data = Column(JSON, nullable=False)
+    links = Column(JSON, nullable=True)
+
+    @classmethod
+    def from_todo(cls, todo: Todo, reason: str, archived_at: datetime,
+                  links: Optional[dict] = None) -> "ArchivedTodo":
+        return cls(
+            id=todo.id,
+            title=todo.title,
+            status=todo.status.value,
+            owner_id=todo.owner_id,
+            team_id=todo.team_id,
+            created_at=todo.created_at,
+            archived_at=archived_at,
+            reason=reason,
+            data=todo.to_dict(),
+            links=links,
+        )
+
+    def to_todo(self) -> Todo:
+        """Rebuild a live (non-deleted) todo from the archived row."""
+        data = self.data
+        return Todo(
+            id=data["id"],
+            title=data["title"],
+            description=data["description"],
+            category=TodoCategory(data["category"]),
+            priority=TodoPriority(data["priority"]),
+            status=TodoStatus(data["status"]),
+            deadline=_parse(data["deadline"]),
+            created_at=_parse(data["created_at"]),
+            updated_at=datetime.utcnow(),
+            constitutional_check=data["constitutional_check"],
+            ai_metadata=data["ai_metadata"],
+            owner_id=data.get("owner_id"),
+            team_id=data.get("team_id"),
+            is_shared=data.get("is_shared", False),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            **self.data,
+            "archived_at": self.archived_at.isoformat(),
+            "archive_reason": self.reason,
+        }
+
+    def __repr__(self) -> str:
+        return f"<ArchivedTodo(id={self.id}, reason={self.reason})>"
@@ -1,4 +1,9 @@
-"""Routers package."""
+"""Routers package.
+
+Core routers are imported eagerly. Optional feature routers (suggestions,
+calendar) are only imported when first requested, so deployments that
+disable them via ``DISABLED_ROUTERS`` never pay their import cost.
+"""
 from .todos import router as todos_router
 from .stats import router as stats_router
 from .recurring import router as recurring_router
@@ -6,8 +11,27 @@ from .templates import router as templates_router
 from .users import router as users_router
 from .teams import router as teams_router
 from .assignments import router as assignments_router
-from .suggestions import router as suggestions_router
-from .calendar import router as calendar_router
+
+OPTIONAL_ROUTERS = ("suggestions", "calendar")
+
+
+def load_optional_router(name: str):
+    """Import an optional router module on demand and return its router."""
+    if name == "suggestions":
+        from .suggestions import router
+    elif name == "calendar":
+        from .calendar import router
+    else:
+        raise ValueError(f"Unknown optional router: {name}")
+    return router
+
+
+def __getattr__(name: str):
+    # Keep ``from routers import calendar_router`` working without eager imports
+    if name.endswith("_router") and name[:-len("_router")] in OPTIONAL_ROUTERS:
+        return load_optional_router(name[:-len("_router")])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "todos_router",
@@ -19,4 +43,6 @@ __all__ = [
     "assignments_router",
     "suggestions_router",
     "calendar_router",
+    "OPTIONAL_ROUTERS",
+    "load_optional_router",
 ]
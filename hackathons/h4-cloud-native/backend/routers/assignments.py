@@ -9,7 +9,8 @@ from typing import Optional, List
 from datetime import datetime
 
 from database import get_db
-from models import Todo, User, Team, TodoAssignment, AssignmentStatus, TeamMember, MemberRole
+from models import User, Team, TodoAssignment, AssignmentStatus, TeamMember, MemberRole
+from sharding import ShardSessions, get_todo_shards
 
 router = APIRouter(tags=["assignments"])
 
@@ -46,17 +47,31 @@ class AssignmentResponse(BaseModel):
         from_attributes = True
 
 
+def _with_todos(assignments: List[TodoAssignment], shards: ShardSessions,
+                include_assignee: bool = False) -> List[dict]:
+    """Assignment dicts with their todos, which may live on any shard."""
+    found = shards.locate_many([a.todo_id for a in assignments])
+    results = []
+    for assignment in assignments:
+        data = assignment.to_dict(include_assignee=include_assignee)
+        if assignment.todo_id in found:
+            data["todo"] = found[assignment.todo_id][1].to_dict()
+        results.append(data)
+    return results
+
+
 # Todo assignment endpoints
 @router.post("/api/todos/{todo_id}/assign", response_model=AssignmentResponse)
 async def assign_todo(
     todo_id: str,
     assignment_data: AssignmentCreate,
     assigned_by: str = Query(..., description="User making the assignment"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Assign a todo to a user."""
     # Verify todo exists
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    _, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
@@ -113,13 +128,17 @@ async def assign_todo(
     db.commit()
     db.refresh(assignment)
 
-    return assignment.to_dict(include_todo=True, include_assignee=True)
+    return _with_todos([assignment], shards, include_assignee=True)[0]
 
 
 @router.get("/api/todos/{todo_id}/assignments", response_model=List[AssignmentResponse])
-async def get_todo_assignments(todo_id: str, db: Session = Depends(get_db)):
+async def get_todo_assignments(
+    todo_id: str,
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
+):
     """Get all assignments for a todo."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    _, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
@@ -134,7 +153,8 @@ async def get_todo_assignments(todo_id: str, db: Session = Depends(get_db)):
 async def get_user_assignments(
     user_id: str,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Get all assignments for a user."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -151,14 +171,15 @@ async def get_user_assignments(
             raise HTTPException(status_code=400, detail="Invalid status")
 
     assignments = query.all()
-    return [a.to_dict(include_todo=True) for a in assignments]
+    return _with_todos(assignments, shards)
 
 
 @router.put("/api/assignments/{assignment_id}", response_model=AssignmentResponse)
 async def update_assignment(
     assignment_id: str,
     update_data: AssignmentUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Update an assignment's status, due date, or notes."""
     assignment = db.query(TodoAssignment).filter(
@@ -187,7 +208,7 @@ async def update_assignment(
     db.commit()
     db.refresh(assignment)
 
-    return assignment.to_dict(include_todo=True, include_assignee=True)
+    return _with_todos([assignment], shards, include_assignee=True)[0]
 
 
 @router.delete("/api/assignments/{assignment_id}")
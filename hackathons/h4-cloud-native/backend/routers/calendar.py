@@ -5,10 +5,10 @@ from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db
 from models.calendar import CalendarProvider, ConnectionStatus, SyncDirection
-from models.todo import Todo
 from services.calendar_service import CalendarService
+from sharding import ShardSessions, get_todo_shards
 
 router = APIRouter(prefix="/api/calendar", tags=["calendar"])
 
@@ -221,7 +221,7 @@ def get_events(
     connection_id: str,
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get calendar events for a connection."""
     start = None
@@ -307,11 +307,13 @@ def delete_event(
 def sync_todos(
     connection_id: str,
     user_id: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Sync all user's todos to the calendar."""
     result = CalendarService.sync_all_todos(
         db=db,
+        shards=shards,
         user_id=user_id,
         connection_id=connection_id
     )
@@ -326,10 +328,11 @@ def sync_todos(
 def sync_single_todo(
     todo_id: str,
     connection_id: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Sync a single todo to the calendar."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    _, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
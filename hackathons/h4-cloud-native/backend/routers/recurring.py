@@ -6,8 +6,9 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import RecurringTodo, Todo
+from models import RecurringTodo
 from services import RecurringService
+from sharding import ShardSessions, get_todo_shards
 
 router = APIRouter(prefix="/api/recurring", tags=["recurring"])
 
@@ -66,7 +67,8 @@ class TodoResponse(BaseModel):
 @router.post("", response_model=RecurringResponse, status_code=201)
 async def create_recurring(
     request: RecurringCreateRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """
     Create a recurring todo pattern.
@@ -74,7 +76,7 @@ async def create_recurring(
     The pattern will automatically generate todos based on the schedule.
     """
     # Verify template todo exists
-    template = db.query(Todo).filter(Todo.id == request.template_todo_id).first()
+    _, template = shards.locate(request.template_todo_id)
     if not template:
         raise HTTPException(status_code=404, detail="Template todo not found")
 
@@ -188,7 +190,11 @@ async def delete_recurring(recurring_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{recurring_id}/generate", response_model=TodoResponse)
-async def generate_occurrence(recurring_id: str, db: Session = Depends(get_db)):
+async def generate_occurrence(
+    recurring_id: str,
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
+):
     """
     Manually generate the next occurrence.
 
@@ -201,7 +207,7 @@ async def generate_occurrence(recurring_id: str, db: Session = Depends(get_db)):
     if not recurring.is_active:
         raise HTTPException(status_code=400, detail="Recurring pattern is not active")
 
-    todo = RecurringService.generate_occurrence(db, recurring)
+    todo = RecurringService.generate_occurrence(db, shards, recurring)
     if not todo:
         raise HTTPException(
             status_code=400,
@@ -216,14 +222,17 @@ async def generate_occurrence(recurring_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/generate-all")
-async def generate_all_due(db: Session = Depends(get_db)):
+async def generate_all_due(
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
+):
     """
     Generate all due recurring occurrences.
 
     This endpoint is intended for cron job scheduling.
     It generates todos for all recurring patterns that are due.
     """
-    generated = RecurringService.generate_due_occurrences(db)
+    generated = RecurringService.generate_due_occurrences(db, shards)
     return {
         "generated": len(generated),
         "todos": [
@@ -4,8 +4,9 @@ from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_read_db
 from models import Todo, TodoCategory, TodoPriority, TodoStatus
+from sharding import ShardSessions, get_todo_shards
 
 router = APIRouter(prefix="/api/stats", tags=["stats"])
 
@@ -20,10 +21,16 @@ class StatsResponse(BaseModel):
 
 
 @router.get("", response_model=StatsResponse)
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(
+    db: Session = Depends(get_read_db),
+    shards: ShardSessions = Depends(get_todo_shards),
+):
     """
     Get todo statistics.
 
+    When todos are sharded the counts are gathered from every shard and
+    summed.
+
     Returns:
     - total: Total number of todos
     - by_status: Count per status (pending, in_progress, completed, flagged)
@@ -31,44 +38,56 @@ async def get_stats(db: Session = Depends(get_db)):
     - by_priority: Count per priority (high, medium, low)
     - completion_rate: Ratio of completed todos to total (0.0 - 1.0)
     """
+    sessions = shards.all() if shards.sharded else [db]
+    per_shard = shards.scatter(_count_todos, sessions)
+
+    total = sum(counts["total"] for counts in per_shard)
+    by_status = {status.value: 0 for status in TodoStatus}
+    by_category = {category.value: 0 for category in TodoCategory}
+    by_priority = {priority.value: 0 for priority in TodoPriority}
+    for counts in per_shard:
+        for merged, key in ((by_status, "by_status"), (by_category, "by_category"), (by_priority, "by_priority")):
+            for value, count in counts[key].items():
+                merged[value] += count
+
+    # Completion rate
+    completed = by_status.get("completed", 0)
+    completion_rate = completed / total if total > 0 else 0.0
+
+    return {
+        "total": total,
+        "by_status": by_status,
+        "by_category": by_category,
+        "by_priority": by_priority,
+        "completion_rate": round(completion_rate, 2),
+    }
+
+
+def _count_todos(db: Session) -> dict:
+    """Total and per-status/category/priority counts on one database."""
+    live = Todo.deleted_at.is_(None)
+
     # Total count
-    total = db.query(func.count(Todo.id)).scalar() or 0
+    total = db.query(func.count(Todo.id)).filter(live).scalar() or 0
 
     # Count by status
     status_counts = db.query(
         Todo.status, func.count(Todo.id)
-    ).group_by(Todo.status).all()
-
-    by_status = {status.value: 0 for status in TodoStatus}
-    for status, count in status_counts:
-        by_status[status.value] = count
+    ).filter(live).group_by(Todo.status).all()
 
     # Count by category
     category_counts = db.query(
         Todo.category, func.count(Todo.id)
-    ).group_by(Todo.category).all()
-
-    by_category = {category.value: 0 for category in TodoCategory}
-    for category, count in category_counts:
-        by_category[category.value] = count
+    ).filter(live).group_by(Todo.category).all()
 
     # Count by priority
     priority_counts = db.query(
         Todo.priority, func.count(Todo.id)
-    ).group_by(Todo.priority).all()
-
-    by_priority = {priority.value: 0 for priority in TodoPriority}
-    for priority, count in priority_counts:
-        by_priority[priority.value] = count
-
-    # Completion rate
-    completed = by_status.get("completed", 0)
-    completion_rate = completed / total if total > 0 else 0.0
+    ).filter(live).group_by(Todo.priority).all()
 
     return {
         "total": total,
-        "by_status": by_status,
-        "by_category": by_category,
-        "by_priority": by_priority,
-        "completion_rate": round(completion_rate, 2),
+        "by_status": {status.value: count for status, count in status_counts},
+        "by_category": {category.value: count for category, count in category_counts},
+        "by_priority": {priority.value: count for priority, count in priority_counts},
     }
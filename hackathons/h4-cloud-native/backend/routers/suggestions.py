@@ -4,10 +4,10 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 
-from database import get_db
+from database import get_db, get_read_db
 from models.suggestion import Suggestion, SuggestionType, SuggestionStatus
-from models.todo import Todo
 from services.suggestion_service import SuggestionService
+from sharding import ShardSessions, get_todo_shards
 
 router = APIRouter(prefix="/api/suggestions", tags=["suggestions"])
 
@@ -50,7 +50,7 @@ def get_suggestions(
     todo_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     suggestion_type: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get suggestions with optional filters."""
     # Convert string to enum if provided
@@ -83,10 +83,11 @@ def get_suggestions(
 def generate_suggestions_for_todo(
     todo_id: str,
     user_id: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Generate AI suggestions for a specific todo."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    _, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
@@ -102,10 +103,11 @@ def generate_suggestions_for_todo(
 @router.post("/insights/{user_id}", response_model=List[SuggestionResponse])
 def generate_insights(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Generate general productivity insights for a user."""
-    insights = SuggestionService.generate_insights(db=db, user_id=user_id)
+    insights = SuggestionService.generate_insights(db=db, shards=shards, user_id=user_id)
     return [s.to_dict() for s in insights]
 
 
@@ -136,10 +138,11 @@ def update_suggestion(
 @router.post("/{suggestion_id}/apply", response_model=ApplySuggestionResponse)
 def apply_suggestion(
     suggestion_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """Apply a suggestion's changes to the associated todo."""
-    result = SuggestionService.apply_suggestion(db=db, suggestion_id=suggestion_id)
+    result = SuggestionService.apply_suggestion(db=db, shards=shards, suggestion_id=suggestion_id)
 
     if not result:
         raise HTTPException(
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import Template, Todo, TodoCategory, TodoPriority, TodoStatus
 from services import validate_todo, Decision
+from sharding import ShardSessions, get_todo_shards
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
@@ -198,7 +199,10 @@ async def delete_template(template_id: str, db: Session = Depends(get_db)):
 async def use_template(
     template_id: str,
     base_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    owner_id: Optional[str] = None,
+    team_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_todo_shards)
 ):
     """
     Create todos from a template.
@@ -208,6 +212,7 @@ async def use_template(
 
     Args:
         base_date: Base date for calculating relative deadlines (default: now)
+        owner_id / team_id: Tenant the created todos belong to
     """
     template = db.query(Template).filter(Template.id == template_id).first()
     if not template:
@@ -216,6 +221,7 @@ async def use_template(
     if base_date is None:
         base_date = datetime.utcnow()
 
+    target = shards.for_tenant(owner_id, team_id)
     created_todos = []
     blocked_todos = []
 
@@ -261,6 +267,8 @@ async def use_template(
             priority=priority,
             status=status,
             deadline=deadline,
+            owner_id=owner_id,
+            team_id=team_id,
             constitutional_check=result.to_dict(),
             ai_metadata={
                 "created_from": "template",
@@ -270,13 +278,15 @@ async def use_template(
             }
         )
 
-        db.add(todo)
+        target.add(todo)
         created_todos.append(todo)
 
     # Update usage count
     template.usage_count += 1
 
-    db.commit()
+    target.commit()
+    if target is not db:
+        db.commit()
 
     return {
         "created": len(created_todos),
@@ -1,18 +1,26 @@
 """Todo CRUD router with constitutional enforcement."""
+import base64
+import binascii
 from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field
+from sqlalchemy import and_, func, null, or_
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models import Todo, TodoCategory, TodoPriority, TodoStatus
+from database import get_read_db
+import lifecycle
+import serialization
+from models import ArchivedTodo, Todo, TodoCategory, TodoPriority, TodoStatus
 from services import validate_todo, log_decision, create_approval_request, Decision
 from services.dapr_service import publish_todo_event
+from sharding import ShardSessions, get_todo_shards, merge_newest_first
 from metrics.prometheus_metrics import TODO_OPS
 
 router = APIRouter(prefix="/api/todos", tags=["todos"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 # Pydantic schemas for request/response
 class TodoCreate(BaseModel):
@@ -23,6 +31,8 @@ class TodoCreate(BaseModel):
     priority: Optional[TodoPriority] = TodoPriority.MEDIUM
     deadline: Optional[datetime] = None
     ai_metadata: Optional[dict] = None
+    owner_id: Optional[str] = None
+    team_id: Optional[str] = None
 
 
 class TodoUpdate(BaseModel):
@@ -54,6 +64,12 @@ class TodoResponse(BaseModel):
         from_attributes = True
 
 
+class ArchivedTodoResponse(TodoResponse):
+    """Schema for an archived todo."""
+    archived_at: str
+    archive_reason: str
+
+
 class ConstitutionalBlockedError(BaseModel):
     """Error response for blocked todos."""
     error: str = "constitutional_violation"
@@ -62,7 +78,7 @@ class ConstitutionalBlockedError(BaseModel):
 
 
 @router.post("", response_model=TodoResponse, status_code=201)
-async def create_todo(todo_data: TodoCreate, db: Session = Depends(get_db)):
+async def create_todo(todo_data: TodoCreate, shards: ShardSessions = Depends(get_todo_shards)):
     """
     Create a new todo with constitutional validation.
 
@@ -90,7 +106,8 @@ async def create_todo(todo_data: TodoCreate, db: Session = Depends(get_db)):
     # Determine status based on constitutional check
     status = TodoStatus.FLAGGED if result.decision == Decision.FLAG else TodoStatus.PENDING
 
-    # Create todo
+    # Create todo on its tenant's shard
+    db = shards.for_tenant(todo_data.owner_id, todo_data.team_id)
     todo = Todo(
         title=todo_data.title,
         description=todo_data.description,
@@ -100,6 +117,8 @@ async def create_todo(todo_data: TodoCreate, db: Session = Depends(get_db)):
         deadline=todo_data.deadline,
         constitutional_check=result.to_dict(),
         ai_metadata=todo_data.ai_metadata,
+        owner_id=todo_data.owner_id,
+        team_id=todo_data.team_id,
     )
 
     db.add(todo)
@@ -123,45 +142,160 @@ async def create_todo(todo_data: TodoCreate, db: Session = Depends(get_db)):
 
 @router.get("", response_model=List[TodoResponse])
 async def list_todos(
+    response: Response,
     category: Optional[TodoCategory] = Query(None),
     status: Optional[TodoStatus] = Query(None),
     priority: Optional[TodoPriority] = Query(None),
     search: Optional[str] = Query(None, min_length=1),
-    db: Session = Depends(get_db)
+    owner_id: Optional[str] = Query(None),
+    team_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    shards: ShardSessions = Depends(get_todo_shards),
 ):
     """
-    List todos with optional filtering.
+    List todos with optional filtering, newest first.
 
     Filters:
     - category: Filter by category (work, personal, study, health, other)
     - status: Filter by status (pending, in_progress, completed, flagged)
     - priority: Filter by priority (high, medium, low)
     - search: Search in title and description
+    - owner_id / team_id: Filter by owner or team (a team filter reads only
+      the team's shard when sharded; an owner's team todos live on the team
+      shards, so an owner filter alone reads every shard)
+
+    Paging: without ``limit`` every matching todo is returned. With it, at
+    most ``limit`` todos are returned and, if there are more, the
+    ``X-Next-Cursor`` header holds a ``cursor`` for the next page. ``offset``
+    skips todos after the cursor (or from the start), for jumping ahead.
     """
-    query = db.query(Todo)
+    after = _decode_cursor(cursor) if cursor else None
+    sessions = _tenant_sessions(shards, team_id) if shards.sharded else [db]
+    filters = (category, status, priority, search, owner_id, team_id)
+
+    if serialization.FAST_JSON_RESPONSES:
+        # Column projection + direct encoding; skips ORM objects and re-validation
+        rows, next_cursor = _gather(shards, sessions, lambda s: _apply_filters(
+            s.query(*serialization.TODO_RESPONSE_COLUMNS), *filters
+        ), limit, offset, after)
+        TODO_OPS.labels(operation="list").inc()
+        response = serialization.todo_rows_response(rows)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response
+
+    todos, next_cursor = _gather(
+        shards, sessions, lambda s: _apply_filters(s.query(Todo), *filters), limit, offset, after
+    )
+    TODO_OPS.labels(operation="list").inc()
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [_format_todo_response(todo) for todo in todos]
 
-    if category:
-        query = query.filter(Todo.category == category)
-    if status:
-        query = query.filter(Todo.status == status)
-    if priority:
-        query = query.filter(Todo.priority == priority)
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            (Todo.title.ilike(search_pattern)) |
-            (Todo.description.ilike(search_pattern))
+
+@router.get("/resolve", response_model=TodoResponse)
+async def resolve_todo(
+    prefix: str = Query(..., min_length=4, max_length=36, pattern=r"^[0-9a-fA-F-]+$"),
+    shards: ShardSessions = Depends(get_todo_shards),
+):
+    """
+    Resolve a short ID (a prefix of the todo's UUID) to the todo.
+
+    Returns 404 if no todo matches and 409 if the prefix is ambiguous.
+    """
+    # A range over the primary key rather than LIKE 'prefix%', which SQLite
+    # answers with a full scan. Ids are lowercase hex with hyphens at fixed
+    # places, so a trailing hyphen adds nothing (and sorts oddly under
+    # collations that ignore punctuation); bumping the last character gives
+    # the first id past the prefix.
+    lower = prefix.lower().rstrip("-")
+    if not lower:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    upper = lower[:-1] + chr(ord(lower[-1]) + 1)
+    # deleted_at is wrapped so SQLite's planner, lacking statistics, doesn't
+    # pick the deleted_at index (nearly every row is live) over the id range
+    found = shards.scatter(lambda s: s.query(Todo).filter(
+        Todo.id >= lower, Todo.id < upper, func.coalesce(Todo.deleted_at, null()).is_(None)
+    ).limit(2).all())
+    matches = [todo for todos in found for todo in todos]
+    if not matches:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    if len(matches) > 1:
+        raise HTTPException(status_code=409, detail=f"ID prefix '{prefix}' matches more than one todo")
+    TODO_OPS.labels(operation="read").inc()
+    return _format_todo_response(matches[0])
+
+
+@router.get("/archive", response_model=List[ArchivedTodoResponse])
+async def list_archived_todos(
+    status: Optional[TodoStatus] = Query(None),
+    search: Optional[str] = Query(None, min_length=1),
+    owner_id: Optional[str] = Query(None),
+    team_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    shards: ShardSessions = Depends(get_todo_shards),
+):
+    """
+    List archived todos, most recently archived first.
+
+    Todos are archived in the background once they have been completed or
+    deleted for a while (see ``lifecycle``).
+    """
+    sessions = _tenant_sessions(shards, team_id)
+
+    def query_archive(s: Session) -> list:
+        query = s.query(ArchivedTodo)
+        if owner_id:
+            query = query.filter(ArchivedTodo.owner_id == owner_id)
+        if team_id:
+            query = query.filter(ArchivedTodo.team_id == team_id)
+        if status:
+            query = query.filter(ArchivedTodo.status == status.value)
+        if search:
+            query = query.filter(ArchivedTodo.title.ilike(f"%{search}%"))
+        # Each shard returns enough rows to cover the page after merging
+        return query.order_by(ArchivedTodo.archived_at.desc()).limit(offset + limit).all()
+
+    results = shards.scatter(query_archive, sessions)
+    archived = merge_newest_first(results, key=lambda row: row.archived_at)
+    return [row.to_dict() for row in archived[offset:offset + limit]]
+
+
+@router.post("/{todo_id}/restore", response_model=TodoResponse)
+async def restore_todo(todo_id: str, shards: ShardSessions = Depends(get_todo_shards)):
+    """Restore a deleted or archived todo."""
+    db, todo = shards.locate(todo_id, include_deleted=True)
+    if todo:
+        if todo.deleted_at is None:
+            raise HTTPException(status_code=409, detail="Todo is not deleted")
+        todo.deleted_at = None
+        todo.updated_at = datetime.utcnow()
+        db.commit()
+        db.refresh(todo)
+    else:
+        found = shards.scatter(
+            lambda s: (s, s.query(ArchivedTodo).filter(ArchivedTodo.id == todo_id).first())
         )
+        archived_db, archived = next(((s, row) for s, row in found if row), (None, None))
+        if not archived:
+            raise HTTPException(status_code=404, detail="Todo not found")
+        target = shards.for_tenant(archived.owner_id, archived.team_id)
+        todo = lifecycle.restore(target, archived_db, archived, shards.primary)
 
-    todos = query.order_by(Todo.created_at.desc()).all()
-    TODO_OPS.labels(operation="list").inc()
-    return [_format_todo_response(todo) for todo in todos]
+    TODO_OPS.labels(operation="restore").inc()
+    publish_todo_event("todo_restored", todo.id, title=todo.title)
+
+    return _format_todo_response(todo)
 
 
 @router.get("/{todo_id}", response_model=TodoResponse)
-async def get_todo(todo_id: str, db: Session = Depends(get_db)):
+async def get_todo(todo_id: str, shards: ShardSessions = Depends(get_todo_shards)):
     """Get a single todo by ID."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    _, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
     TODO_OPS.labels(operation="read").inc()
@@ -169,13 +303,17 @@ async def get_todo(todo_id: str, db: Session = Depends(get_db)):
 
 
 @router.put("/{todo_id}", response_model=TodoResponse)
-async def update_todo(todo_id: str, update_data: TodoUpdate, db: Session = Depends(get_db)):
+async def update_todo(
+    todo_id: str,
+    update_data: TodoUpdate,
+    shards: ShardSessions = Depends(get_todo_shards),
+):
     """
     Update a todo.
 
     If title or description is changed, constitutional validation is re-run.
     """
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    db, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
@@ -238,14 +376,20 @@ async def update_todo(todo_id: str, update_data: TodoUpdate, db: Session = Depen
 
 
 @router.delete("/{todo_id}")
-async def delete_todo(todo_id: str, db: Session = Depends(get_db)):
-    """Delete a todo by ID."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+async def delete_todo(todo_id: str, shards: ShardSessions = Depends(get_todo_shards)):
+    """
+    Delete a todo by ID.
+
+    The todo is tombstoned (``deleted_at`` is set) and hidden from reads; it
+    can be restored until the archive worker moves it to cold storage.
+    """
+    db, todo = shards.locate(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
     title = todo.title
-    db.delete(todo)
+    # updated_at too, so a tenant move's catch-up copies the tombstone
+    todo.deleted_at = todo.updated_at = datetime.utcnow()
     db.commit()
 
     TODO_OPS.labels(operation="delete").inc()
@@ -254,6 +398,86 @@ async def delete_todo(todo_id: str, db: Session = Depends(get_db)):
     return {"deleted": True, "id": todo_id}
 
 
+def _apply_filters(query, category, status, priority, search, owner_id=None, team_id=None):
+    """Apply the list_todos filters to a todo query."""
+    query = query.filter(Todo.deleted_at.is_(None))
+    if owner_id:
+        query = query.filter(Todo.owner_id == owner_id)
+    if team_id:
+        query = query.filter(Todo.team_id == team_id)
+    if category:
+        query = query.filter(Todo.category == category)
+    if status:
+        query = query.filter(Todo.status == status)
+    if priority:
+        query = query.filter(Todo.priority == priority)
+    if search:
+        search_pattern = f"%{search}%"
+        query = query.filter(
+            (Todo.title.ilike(search_pattern)) |
+            (Todo.description.ilike(search_pattern))
+        )
+    return query
+
+
+def _encode_cursor(row) -> str:
+    raw = f"{row.created_at.isoformat()}|{row.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, todo_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), todo_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _tenant_sessions(shards: ShardSessions, team_id: Optional[str]) -> List[Session]:
+    """Shards that can hold todos matching a tenant filter."""
+    # A team's todos all live on the team's shard; an owner's don't (their
+    # team todos are on the team shards), so owner filters scatter
+    if team_id:
+        return [shards.for_tenant(team_id=team_id)]
+    return shards.all()
+
+
+def _gather(shards: ShardSessions, sessions: List[Session], build_query,
+            limit: Optional[int] = None, offset: int = 0,
+            after: Optional[Tuple[datetime, str]] = None) -> Tuple[list, Optional[str]]:
+    """
+    Run a list query newest-first on each session and merge the results.
+
+    Returns the page and the cursor of the next page (None on the last page,
+    or when ``limit`` is None and everything is returned).
+    """
+    def run(s: Session) -> list:
+        query = build_query(s)
+        if after is not None:
+            created_at, todo_id = after
+            query = query.filter(or_(
+                Todo.created_at < created_at,
+                and_(Todo.created_at == created_at, Todo.id < todo_id),
+            ))
+        query = query.order_by(Todo.created_at.desc(), Todo.id.desc())
+        if limit is not None:
+            # One extra row tells whether there is a next page
+            query = query.limit(offset + limit + 1)
+        return query.all()
+
+    results = shards.scatter(run, sessions)
+    if len(results) == 1:
+        rows = results[0]
+    else:
+        rows = merge_newest_first(results, key=lambda row: (row.created_at, row.id))
+    if limit is None:
+        return rows, None
+    page = rows[offset:offset + limit]
+    has_more = len(rows) > offset + limit
+    return page, _encode_cursor(page[-1]) if has_more else None
+
+
 def _format_todo_response(todo: Todo) -> dict:
     """Format a todo for API response."""
     return {
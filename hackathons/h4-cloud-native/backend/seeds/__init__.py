@@ -1,4 +1,4 @@
 """Seeds package for database seeding."""
-from .templates import seed_templates, BUILTIN_TEMPLATES
+from .templates import seed_templates, seed_fingerprint, BUILTIN_TEMPLATES
 
-__all__ = ["seed_templates", "BUILTIN_TEMPLATES"]
+__all__ = ["seed_templates", "seed_fingerprint", "BUILTIN_TEMPLATES"]
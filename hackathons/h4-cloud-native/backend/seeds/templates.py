@@ -1,6 +1,16 @@
 """Seed data for built-in templates."""
+import hashlib
+import json
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from models import Template
+from models import SeedMetadata, Template
+
+SEED_KEY = "builtin_templates"
+# Arbitrary constant identifying the template seeding advisory lock
+SEED_LOCK_KEY = 4_604_031
 
 BUILTIN_TEMPLATES = [
     {
@@ -221,43 +231,95 @@ BUILTIN_TEMPLATES = [
 ]
 
 
+def seed_fingerprint(templates: Optional[List[dict]] = None) -> str:
+    """SHA-256 over the canonical JSON of a seed set (default: the built-ins)."""
+    if templates is None:
+        templates = BUILTIN_TEMPLATES
+    canonical = json.dumps(templates, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _lock_seeding(db: Session) -> None:
+    """
+    Serialize seeding across replicas for the rest of the transaction.
+
+    PostgreSQL uses a transaction-scoped advisory lock; SQLite already
+    serializes writers on the database file.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEED_LOCK_KEY})
+
+
 def seed_templates(db: Session) -> int:
     """
     Seed database with built-in templates.
 
+    A fingerprint of ``BUILTIN_TEMPLATES`` is stored in ``seed_metadata``.
+    When it matches, this is a single primary-key lookup. Otherwise the
+    missing or changed system templates are upserted and the fingerprint is
+    recorded in one transaction, under a lock so that concurrently starting
+    replicas don't seed twice.
+
     Args:
         db: Database session
 
     Returns:
-        Number of templates seeded
+        Number of templates inserted or updated
     """
-    seeded = 0
+    fingerprint = seed_fingerprint()
+    applied = db.get(SeedMetadata, SEED_KEY)
+    if applied is not None and applied.fingerprint == fingerprint:
+        return 0
 
-    for template_data in BUILTIN_TEMPLATES:
-        # Check if template already exists
-        existing = db.query(Template).filter(
-            Template.name == template_data['name'],
-            Template.created_by == "system"
-        ).first()
+    try:
+        _lock_seeding(db)
+        # Another replica may have finished while we waited for the lock
+        applied = db.query(SeedMetadata).filter(
+            SeedMetadata.key == SEED_KEY
+        ).populate_existing().first()
+        if applied is not None and applied.fingerprint == fingerprint:
+            db.rollback()
+            return 0
 
-        if existing:
-            continue
+        existing = {
+            t.name: t
+            for t in db.query(Template).filter(Template.created_by == "system")
+        }
+        seeded = 0
 
-        template = Template(
-            name=template_data['name'],
-            description=template_data['description'],
-            category=template_data.get('category'),
-            todos=template_data['todos'],
-            tags=template_data.get('tags', []),
-            is_public=True,
-            created_by="system"
-        )
+        for template_data in BUILTIN_TEMPLATES:
+            fields = {
+                "description": template_data['description'],
+                "category": template_data.get('category'),
+                "todos": template_data['todos'],
+                "tags": template_data.get('tags', []),
+            }
+            template = existing.get(template_data['name'])
 
-        db.add(template)
-        seeded += 1
+            if template is None:
+                db.add(Template(
+                    name=template_data['name'],
+                    is_public=True,
+                    created_by="system",
+                    **fields
+                ))
+                seeded += 1
+            elif any(getattr(template, k) != v for k, v in fields.items()):
+                for key, value in fields.items():
+                    setattr(template, key, value)
+                seeded += 1
 
-    if seeded > 0:
+        if applied is None:
+            db.add(SeedMetadata(key=SEED_KEY, fingerprint=fingerprint))
+        else:
+            applied.fingerprint = fingerprint
         db.commit()
+    except IntegrityError:
+        # Lost the race to insert the metadata row; the winner seeded
+        db.rollback()
+        return 0
+
+    if seeded > 0:
         print(f"✅ Seeded {seeded} templates")
 
     return seeded
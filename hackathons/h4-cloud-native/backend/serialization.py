@@ -0,0 +1,92 @@
+"""Fast JSON serialization path for high-volume todo responses.
+
+The default FastAPI path builds a dict per ORM object, re-validates it
+against the ``response_model`` and then encodes it with the stdlib JSON
+encoder. For list endpoints returning thousands of rows that dominates CPU.
+
+This module provides an opt-in alternative (``FAST_JSON_RESPONSES=true``):
+rows are fetched with column-level projection (no ORM identity map),
+converted to plain dicts without ``isoformat()`` calls, and encoded with
+orjson when it is installed. Output is byte-compatible with the default
+path for every field exposed by ``TodoResponse``.
+"""
+import json
+import os
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterable, List
+
+from fastapi.responses import Response
+
+from models import Todo
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Opt-in switch; the validated response_model path stays the default
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# Columns exposed by TodoResponse, in response order
+TODO_RESPONSE_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.description,
+    Todo.category,
+    Todo.priority,
+    Todo.status,
+    Todo.deadline,
+    Todo.created_at,
+    Todo.updated_at,
+    Todo.constitutional_check,
+    Todo.ai_metadata,
+)
+TODO_RESPONSE_FIELDS = tuple(column.key for column in TODO_RESPONSE_COLUMNS)
+
+
+def _default(value: Any) -> Any:
+    """Fallback encoder for the stdlib path when orjson is unavailable."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content to JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips jsonable_encoder and response_model validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def todo_row_to_dict(row: Iterable[Any]) -> dict:
+    """
+    Convert a projected todo row into a response dict.
+
+    Datetimes are left as-is for the encoder; enums are unwrapped so the
+    payload matches ``_format_todo_response``.
+    """
+    data = dict(zip(TODO_RESPONSE_FIELDS, row))
+    data["category"] = data["category"].value
+    data["priority"] = data["priority"].value
+    data["status"] = data["status"].value
+    return data
+
+
+def todo_rows_response(rows: Iterable[Iterable[Any]]) -> FastJSONResponse:
+    """Build a fast JSON response from projected todo rows."""
+    content: List[dict] = [todo_row_to_dict(row) for row in rows]
+    return FastJSONResponse(content)
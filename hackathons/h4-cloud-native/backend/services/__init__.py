@@ -1,4 +1,10 @@
-"""Services package."""
+"""Services package.
+
+The suggestion and calendar services back the optional routers, so they
+are only imported when first used (see ``routers.OPTIONAL_ROUTERS``).
+"""
+import importlib
+
 from .constitutional_validator import (
     check_content,
     validate_todo,
@@ -9,10 +15,23 @@ from .constitutional_validator import (
 )
 from .recurring_service import RecurringService, get_recurring_service
 from .team_service import TeamService
-from .suggestion_service import SuggestionService, get_suggestion_service
-from .calendar_service import CalendarService, get_calendar_service
 from .dapr_service import DaprService, get_dapr_service, publish_todo_event
 
+_OPTIONAL = {
+    "SuggestionService": ".suggestion_service",
+    "get_suggestion_service": ".suggestion_service",
+    "CalendarService": ".calendar_service",
+    "get_calendar_service": ".calendar_service",
+}
+
+
+def __getattr__(name: str):
+    # Keep ``from services import CalendarService`` working without eager imports
+    if name in _OPTIONAL:
+        return getattr(importlib.import_module(_OPTIONAL[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "check_content",
     "validate_todo",
@@ -9,6 +9,7 @@ from models.calendar import (
     CalendarProvider, ConnectionStatus, SyncDirection
 )
 from models.todo import Todo
+from sharding import ShardSessions
 
 
 class CalendarService:
@@ -294,6 +295,7 @@ class CalendarService:
     @staticmethod
     def sync_all_todos(
         db: Session,
+        shards: ShardSessions,
         user_id: str,
         connection_id: str
     ) -> Dict[str, Any]:
@@ -307,11 +309,8 @@ class CalendarService:
         if not connection:
             return {"error": "Connection not found or not connected"}
 
-        # Get todos with due dates
-        todos = db.query(Todo).filter(
-            Todo.owner_id == user_id,
-            Todo.deadline != None
-        ).all()
+        # Get todos with due dates, including team todos on other shards
+        todos = shards.scatter_todos(Todo.owner_id == user_id, Todo.deadline != None)
 
         synced = 0
         failed = 0
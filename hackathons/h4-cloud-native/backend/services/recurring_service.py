@@ -7,6 +7,7 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 
 from models import RecurringTodo, Todo, TodoCategory, TodoPriority, TodoStatus
+from sharding import ShardSessions
 
 
 class RecurringService:
@@ -81,13 +82,18 @@ class RecurringService:
     @staticmethod
     def generate_occurrence(
         db: Session,
+        shards: ShardSessions,
         recurring: RecurringTodo
     ) -> Optional[Todo]:
         """
         Generate next todo occurrence from recurring pattern.
 
+        The occurrence belongs to the template's owner and team, and is
+        stored on their shard.
+
         Args:
             db: Database session
+            shards: Todo shards for the request
             recurring: The recurring todo configuration
 
         Returns:
@@ -99,7 +105,7 @@ class RecurringService:
             return None
 
         # Get template todo
-        template = recurring.template_todo
+        _, template = shards.locate(recurring.template_todo_id)
         if not template:
             return None
 
@@ -111,6 +117,8 @@ class RecurringService:
             category=template.category,
             priority=template.priority,
             status=TodoStatus.PENDING,
+            owner_id=template.owner_id,
+            team_id=template.team_id,
             deadline=next_date,
             constitutional_check=template.constitutional_check,
             ai_metadata={
@@ -121,19 +129,22 @@ class RecurringService:
             }
         )
 
-        db.add(new_todo)
+        target = shards.for_tenant(template.owner_id, template.team_id)
+        target.add(new_todo)
 
         # Update recurring record
         recurring.last_generated = datetime.utcnow()
         recurring.next_occurrence = RecurringService.calculate_next_occurrence(recurring)
 
-        db.commit()
-        db.refresh(new_todo)
+        target.commit()
+        if target is not db:
+            db.commit()
+        target.refresh(new_todo)
 
         return new_todo
 
     @staticmethod
-    def generate_due_occurrences(db: Session) -> List[Todo]:
+    def generate_due_occurrences(db: Session, shards: ShardSessions) -> List[Todo]:
         """
         Generate all due recurring todo occurrences.
 
@@ -142,6 +153,7 @@ class RecurringService:
 
         Args:
             db: Database session
+            shards: Todo shards for the request
 
         Returns:
             List of newly generated todos
@@ -156,7 +168,7 @@ class RecurringService:
         ).all()
 
         for recurring in recurring_todos:
-            todo = RecurringService.generate_occurrence(db, recurring)
+            todo = RecurringService.generate_occurrence(db, shards, recurring)
             if todo:
                 generated.append(todo)
 
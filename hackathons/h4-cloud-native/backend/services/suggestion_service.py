@@ -6,6 +6,7 @@ import random
 
 from models.suggestion import Suggestion, SuggestionType, SuggestionStatus
 from models.todo import Todo, TodoPriority, TodoStatus
+from sharding import ShardSessions
 
 
 class SuggestionService:
@@ -45,12 +46,12 @@ class SuggestionService:
         return suggestions
 
     @staticmethod
-    def generate_insights(db: Session, user_id: str) -> List[Suggestion]:
+    def generate_insights(db: Session, shards: ShardSessions, user_id: str) -> List[Suggestion]:
         """Generate general productivity insights for a user."""
         insights = []
 
-        # Get user's todos
-        todos = db.query(Todo).filter(Todo.owner_id == user_id).all()
+        # Get user's todos, including team todos on other shards
+        todos = shards.scatter_todos(Todo.owner_id == user_id)
 
         if not todos:
             return insights
@@ -61,7 +62,7 @@ class SuggestionService:
         in_progress = [t for t in todos if t.status == TodoStatus.IN_PROGRESS]
 
         # Overdue analysis
-        overdue = [t for t in pending if t.due_date and t.due_date < datetime.utcnow()]
+        overdue = [t for t in pending if t.deadline and t.deadline < datetime.utcnow()]
         if overdue:
             insight = Suggestion(
                 user_id=user_id,
@@ -156,13 +157,13 @@ class SuggestionService:
         return suggestion
 
     @staticmethod
-    def apply_suggestion(db: Session, suggestion_id: str) -> Optional[dict]:
+    def apply_suggestion(db: Session, shards: ShardSessions, suggestion_id: str) -> Optional[dict]:
         """Apply a suggestion's changes to the associated todo."""
         suggestion = db.query(Suggestion).filter(Suggestion.id == suggestion_id).first()
         if not suggestion or not suggestion.todo_id:
             return None
 
-        todo = db.query(Todo).filter(Todo.id == suggestion.todo_id).first()
+        todo_db, todo = shards.locate(suggestion.todo_id)
         if not todo:
             return None
 
@@ -179,7 +180,9 @@ class SuggestionService:
         suggestion.status = SuggestionStatus.ACCEPTED
         suggestion.actioned_at = datetime.utcnow()
 
-        db.commit()
+        todo_db.commit()
+        if todo_db is not db:
+            db.commit()
         return {"suggestion_id": suggestion_id, "applied_changes": applied_changes}
 
     # Private helper methods
@@ -177,7 +177,7 @@ class TeamService:
     @staticmethod
     def get_team_todos(db: Session, team_id: str) -> List[Todo]:
         """Get all todos associated with a team."""
-        return db.query(Todo).filter(Todo.team_id == team_id).all()
+        return db.query(Todo).filter(Todo.team_id == team_id, Todo.deleted_at.is_(None)).all()
 
     @staticmethod
     def delete_team(db: Session, team_id: str, user_id: str) -> bool:
@@ -0,0 +1,519 @@
+"""
+Tenant sharding for the todos table.
+
+Todos are partitioned across N databases by tenant: ``team:<team_id>`` for
+team todos, ``owner:<owner_id>`` for personal ones, and ``unowned`` for the
+rest. A tenant's shard comes from an explicit row in ``tenant_placements``
+(kept in the primary database) or, failing that, from a consistent-hash
+ring over the shard names, so adding a shard only remaps ~1/N tenants.
+
+Shards are configured as ``TODO_SHARDS=name=url,name=url``. With no shards
+configured every call resolves to the request's primary session and
+behaviour is unchanged.
+
+Tables that reference todos (suggestions, calendar events, recurring
+patterns, assignments) stay on the primary; shard databases only hold a
+copy of the todos table without foreign keys. With TODO_SHARDS set the
+models declare no foreign keys to ``todos`` (whose primary copy stays
+empty), and ``init_db`` drops the ones an existing PostgreSQL primary
+still has, so a primary can be switched to shards by restarting with
+TODO_SHARDS set before moving any todos.
+
+Adding a shard (from the backend directory):
+    python -m sharding plan --add shard-c=postgresql://... --pin
+    # deploy with shard-c appended to TODO_SHARDS, then
+    python -m sharding apply
+
+Single tenants can be inspected or moved directly:
+    python -m sharding locate team:<team_id>
+    python -m sharding move owner:<user_id> shard-c
+"""
+import argparse
+import bisect
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Generator, List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import Column, Index, MetaData, Table, create_engine, event, or_
+from sqlalchemy.orm import Session, make_transient, sessionmaker
+
+from database import SessionLocal, add_missing_columns, add_missing_indexes, get_db
+from models import ArchivedTodo, TenantPlacement, Todo
+
+logger = logging.getLogger(__name__)
+
+PLACEMENT_CACHE_SECONDS = float(os.getenv("PLACEMENT_CACHE_SECONDS", "5"))
+RING_VNODES = 64
+UNOWNED_TENANT = "unowned"
+
+
+class TenantMovingError(Exception):
+    """A write hit a tenant that is fenced while it moves between shards."""
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        super().__init__(f"Tenant {tenant} is being moved; retry shortly")
+
+
+def parse_shards(spec: str) -> Dict[str, str]:
+    """Parse ``name=url,name=url`` into an ordered name -> URL mapping."""
+    shards = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        name, sep, url = entry.strip().partition("=")
+        if not sep or not name or not url:
+            raise ValueError(f"Invalid shard entry {entry!r}; expected name=url")
+        shards[name] = url
+    return shards
+
+
+def tenant_key(owner_id: Optional[str] = None, team_id: Optional[str] = None) -> str:
+    """Tenant a todo belongs to; team todos are co-located with their team."""
+    if team_id:
+        return f"team:{team_id}"
+    if owner_id:
+        return f"owner:{owner_id}"
+    return UNOWNED_TENANT
+
+
+def tenant_filter(tenant: str):
+    """SQLAlchemy criteria selecting all todos of a tenant."""
+    kind, _, value = tenant.partition(":")
+    if kind == "team":
+        return Todo.team_id == value
+    if kind == "owner":
+        return (Todo.owner_id == value) & Todo.team_id.is_(None)
+    return Todo.owner_id.is_(None) & Todo.team_id.is_(None)
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, nodes: List[str], vnodes: int = RING_VNODES):
+        points = sorted(
+            (self._hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def node_for(self, key: str) -> str:
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def create_shard_schema(engine) -> None:
+    """Create the todos tables on a shard, without cross-database foreign keys."""
+    metadata = MetaData()
+    todos = Table("todos", metadata, *[
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+        for c in Todo.__table__.columns
+    ])
+    for index in Todo.__table__.indexes:
+        copy = Index(index.name, *[todos.c[c.name] for c in index.columns],
+                     unique=index.unique, **dict(index.dialect_kwargs))
+        if index._ddl_if is not None:
+            copy.ddl_if(**index._ddl_if._asdict())
+    ArchivedTodo.__table__.to_metadata(metadata)
+    metadata.create_all(bind=engine)
+    add_missing_columns(engine, [todos, metadata.tables[ArchivedTodo.__tablename__]])
+    add_missing_indexes(engine, [todos])
+
+
+class ShardRouter:
+    """Maps tenants to shard engines via placements and the hash ring."""
+
+    def __init__(self, shards: Dict[str, str], directory: Callable[[], Session] = SessionLocal):
+        self.urls = dict(shards)
+        self.engines = {}
+        self.sessionmakers = {}
+        for name, url in self.urls.items():
+            connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+            self.engines[name] = create_engine(url, connect_args=connect_args, pool_pre_ping=True)
+            self.sessionmakers[name] = sessionmaker(
+                autocommit=False, autoflush=False, bind=self.engines[name]
+            )
+        self.ring = HashRing(list(self.urls)) if self.urls else None
+        self.directory = directory
+        self._placements: Dict[str, str] = {}
+        self._moving: frozenset = frozenset()
+        self._placements_loaded = 0.0
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.urls)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.urls)
+
+    def create_schema(self) -> None:
+        for engine in self.engines.values():
+            create_shard_schema(engine)
+
+    def placements(self) -> Dict[str, str]:
+        """Explicit placements, cached for ``PLACEMENT_CACHE_SECONDS``."""
+        with self._lock:
+            if time.monotonic() - self._placements_loaded > PLACEMENT_CACHE_SECONDS:
+                db = self.directory()
+                try:
+                    rows = db.query(TenantPlacement).all()
+                finally:
+                    db.close()
+                self._placements = {p.tenant_key: p.shard for p in rows}
+                self._moving = frozenset(p.tenant_key for p in rows if p.moving)
+                self._placements_loaded = time.monotonic()
+            return self._placements
+
+    def is_moving(self, tenant: str) -> bool:
+        """Whether writes to the tenant are fenced by a move in progress."""
+        self.placements()
+        return tenant in self._moving
+
+    def shard_for(self, tenant: str) -> str:
+        placed = self.placements().get(tenant)
+        if placed in self.urls:
+            return placed
+        return self.ring.node_for(tenant)
+
+    def set_placement(self, tenant: str, shard: str, moving: bool = False) -> None:
+        db = self.directory()
+        try:
+            db.merge(TenantPlacement(
+                tenant_key=tenant, shard=shard, moving=moving, updated_at=datetime.utcnow()
+            ))
+            db.commit()
+        finally:
+            db.close()
+        with self._lock:
+            self._placements_loaded = 0.0
+
+    def open(self, shard: str) -> Session:
+        return self.sessionmakers[shard]()
+
+    def dispose(self) -> None:
+        for engine in self.engines.values():
+            engine.dispose()
+
+
+shard_router = ShardRouter(parse_shards(os.getenv("TODO_SHARDS", "")))
+
+
+class ShardSessions:
+    """
+    Per-request view over the shards, opening sessions lazily.
+
+    When sharding is disabled every method resolves to ``primary``.
+    Flushing a change to a todo of a tenant that is being moved raises
+    ``TenantMovingError``.
+    """
+
+    def __init__(self, router: ShardRouter, primary: Session):
+        self.router = router
+        self.primary = primary
+        self._open: Dict[str, Session] = {}
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self.router)
+
+    def session(self, shard: str) -> Session:
+        if shard not in self._open:
+            session = self.router.open(shard)
+            event.listen(session, "before_flush", self._refuse_moving_tenants)
+            self._open[shard] = session
+        return self._open[shard]
+
+    def _refuse_moving_tenants(self, session: Session, flush_context, instances) -> None:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, Todo):
+                tenant = tenant_key(obj.owner_id, obj.team_id)
+                if self.router.is_moving(tenant):
+                    raise TenantMovingError(tenant)
+
+    def for_tenant(self, owner_id: Optional[str] = None, team_id: Optional[str] = None) -> Session:
+        if not self.sharded:
+            return self.primary
+        return self.session(self.router.shard_for(tenant_key(owner_id, team_id)))
+
+    def all(self) -> List[Session]:
+        if not self.sharded:
+            return [self.primary]
+        return [self.session(name) for name in self.router.names]
+
+    def scatter(self, fn: Callable[[Session], object], sessions: Optional[List[Session]] = None) -> list:
+        """Run ``fn`` against each session concurrently and return the results in order."""
+        sessions = self.all() if sessions is None else sessions
+        if len(sessions) == 1:
+            return [fn(sessions[0])]
+        with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+            return list(pool.map(fn, sessions))
+
+    def scatter_todos(self, *criteria) -> List[Todo]:
+        """Live todos matching ``criteria`` from every shard."""
+        results = self.scatter(lambda db: db.query(Todo).filter(
+            Todo.deleted_at.is_(None), *criteria
+        ).all())
+        return [todo for todos in results for todo in todos]
+
+    def locate(self, todo_id: str, include_deleted: bool = False) -> Tuple[Session, Optional[Todo]]:
+        """Find a todo by id on whichever shard holds it."""
+        found = self.locate_many([todo_id], include_deleted)
+        if todo_id not in found:
+            return self.primary, None
+        return found[todo_id]
+
+    def locate_many(self, todo_ids: List[str],
+                    include_deleted: bool = False) -> Dict[str, Tuple[Session, Todo]]:
+        """Find todos by id across the shards; maps each found id to (session, todo)."""
+        ids = sorted(set(todo_ids))
+        if not ids:
+            return {}
+        # Tombstones are filtered after picking a copy, so a stale copy left on
+        # a tenant's old shard mid-move can't stand in for a deleted todo
+        results = self.scatter(lambda db: db.query(Todo).filter(Todo.id.in_(ids)).all())
+        copies: Dict[str, List[Tuple[Session, Todo]]] = {}
+        for db, todos in zip(self.all(), results):
+            for todo in todos:
+                copies.setdefault(todo.id, []).append((db, todo))
+
+        found = {}
+        for todo_id, candidates in copies.items():
+            db, todo = self._home_copy(candidates)
+            if include_deleted or todo.deleted_at is None:
+                found[todo_id] = (db, todo)
+        return found
+
+    def _home_copy(self, candidates: List[Tuple[Session, Todo]]) -> Tuple[Session, Todo]:
+        # A todo is on two shards only while its tenant moves; the placement
+        # shard already takes the writes
+        if len(candidates) > 1:
+            todo = candidates[0][1]
+            home = self.session(self.router.shard_for(tenant_key(todo.owner_id, todo.team_id)))
+            for candidate in candidates:
+                if candidate[0] is home:
+                    return candidate
+        return candidates[0]
+
+    def close(self) -> None:
+        for session in self._open.values():
+            session.close()
+        self._open.clear()
+
+
+def get_todo_shards(db: Session = Depends(get_db)) -> Generator[ShardSessions, None, None]:
+    """FastAPI dependency yielding the request's ``ShardSessions``."""
+    shards = ShardSessions(shard_router, db)
+    try:
+        yield shards
+    finally:
+        shards.close()
+
+
+def merge_newest_first(results: List[list], key: Callable) -> list:
+    """Merge per-shard lists sorted newest first, dropping duplicate ids mid-move."""
+    merged, seen = [], set()
+    for row in heapq.merge(*results, key=key, reverse=True):
+        if row.id not in seen:
+            seen.add(row.id)
+            merged.append(row)
+    return merged
+
+
+# --- Rebalancing ---------------------------------------------------------
+
+def list_tenants(router: ShardRouter, shard: str) -> List[str]:
+    """Distinct tenants that currently have todos on a shard."""
+    db = router.open(shard)
+    try:
+        pairs = db.query(Todo.owner_id, Todo.team_id).distinct().all()
+    finally:
+        db.close()
+    return sorted({tenant_key(owner_id, team_id) for owner_id, team_id in pairs})
+
+
+def _written_at(updated_at: Optional[datetime], deleted_at: Optional[datetime]) -> datetime:
+    # Soft deletes count as writes even if updated_at wasn't bumped
+    return max(filter(None, (updated_at, deleted_at)), default=datetime.min)
+
+
+def _merge_newer(dst: Session, todos: List[Todo]) -> int:
+    """Merge the todos into ``dst`` unless its copy is as new or newer."""
+    current = {
+        todo_id: _written_at(updated_at, deleted_at)
+        for todo_id, updated_at, deleted_at in dst.query(
+            Todo.id, Todo.updated_at, Todo.deleted_at
+        ).filter(Todo.id.in_([todo.id for todo in todos]))
+    }
+    merged = 0
+    for todo in todos:
+        if todo.id in current and current[todo.id] >= _written_at(todo.updated_at, todo.deleted_at):
+            continue
+        dst.merge(todo)
+        merged += 1
+    dst.commit()
+    return merged
+
+
+def _copy_rows(router: ShardRouter, tenant: str, source: str, target: str,
+               since: Optional[datetime], batch_size: int) -> Tuple[int, datetime]:
+    """
+    Copy a tenant's rows that are newer on ``source`` than on ``target``.
+
+    Returns how many rows were copied and the latest write seen on the source.
+    """
+    src, dst = router.open(source), router.open(target)
+    copied, latest = 0, datetime.min
+    try:
+        query = src.query(Todo).filter(tenant_filter(tenant))
+        if since is not None:
+            query = query.filter(or_(Todo.updated_at >= since, Todo.deleted_at >= since))
+        batch: List[Todo] = []
+        for todo in query.yield_per(batch_size):
+            src.expunge(todo)
+            make_transient(todo)
+            latest = max(latest, _written_at(todo.updated_at, todo.deleted_at))
+            batch.append(todo)
+            if len(batch) == batch_size:
+                copied += _merge_newer(dst, batch)
+                batch = []
+        if batch:
+            copied += _merge_newer(dst, batch)
+    finally:
+        src.close()
+        dst.close()
+    return copied, latest
+
+
+def move_tenant(router: ShardRouter, tenant: str, target: str,
+                batch_size: int = 500, settle_seconds: Optional[float] = None) -> dict:
+    """
+    Move a tenant to ``target`` while the API keeps serving it.
+
+    Rows are copied, then the tenant is fenced: once other instances'
+    placement caches have expired no write can reach either shard, and
+    writes are refused with 503 until the placement flips to the target.
+    Rows written (or soft-deleted) on the source before the fence took hold
+    are copied again, never over a newer copy on the target, then the
+    placement flips and only source rows no newer than what was copied are
+    deleted. Reads during
+    the move may see a row on both shards; by-id lookups prefer the
+    placement shard's copy and list merging drops the duplicate.
+    """
+    if target not in router.urls:
+        raise ValueError(f"Unknown shard: {target}")
+    source = router.shard_for(tenant)
+    if source == target:
+        return {"tenant": tenant, "source": source, "target": target, "copied": 0, "deleted": 0}
+
+    started = datetime.utcnow()
+    copied, latest = _copy_rows(router, tenant, source, target, None, batch_size)
+    router.set_placement(tenant, source, moving=True)
+    time.sleep(PLACEMENT_CACHE_SECONDS if settle_seconds is None else settle_seconds)
+    caught_up, caught_latest = _copy_rows(router, tenant, source, target, started, batch_size)
+    copied += caught_up
+    latest = max(latest, caught_latest)
+    # Instances still caching the fence keep refusing writes; the rest use the target
+    router.set_placement(tenant, target)
+
+    db = router.open(source)
+    try:
+        deleted = db.query(Todo).filter(
+            tenant_filter(tenant),
+            or_(Todo.updated_at.is_(None), Todo.updated_at <= latest),
+            or_(Todo.deleted_at.is_(None), Todo.deleted_at <= latest),
+        ).delete(synchronize_session=False)
+        db.commit()
+        left = db.query(Todo).filter(tenant_filter(tenant)).count()
+    finally:
+        db.close()
+    if left:
+        logger.warning(f"{left} rows of {tenant} were written on {source} after the copy and were kept")
+
+    logger.info(f"Moved {tenant} from {source} to {target}: {copied} copied, {deleted} deleted")
+    return {"tenant": tenant, "source": source, "target": target, "copied": copied, "deleted": deleted}
+
+
+def plan_rebalance(router: ShardRouter, new_shards: Dict[str, str]) -> List[dict]:
+    """Tenants whose shard would change if the ring were rebuilt with ``new_shards``."""
+    new_ring = HashRing(list({**router.urls, **new_shards}))
+    placements = router.placements()
+    moves = []
+    for shard in router.names:
+        for tenant in list_tenants(router, shard):
+            if tenant in placements:
+                continue
+            destination = new_ring.node_for(tenant)
+            if destination != shard:
+                moves.append({"tenant": tenant, "from": shard, "to": destination})
+    return moves
+
+
+def apply_placements(router: ShardRouter, batch_size: int = 500) -> List[dict]:
+    """Move every pinned tenant that is off its ring shard back onto it."""
+    return [
+        move_tenant(router, tenant, router.ring.node_for(tenant), batch_size)
+        for tenant, shard in sorted(router.placements().items())
+        if shard != router.ring.node_for(tenant)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and rebalance todo shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    locate = commands.add_parser("locate", help="Show the shard a tenant resolves to")
+    locate.add_argument("tenant")
+
+    plan = commands.add_parser("plan", help="List tenants that would move when adding shards")
+    plan.add_argument("--add", action="append", default=[], help="name=url of a new shard")
+    plan.add_argument("--pin", action="store_true",
+                      help="Pin those tenants to their current shard so the new ring can be deployed safely")
+
+    move = commands.add_parser("move", help="Move a tenant to another shard online")
+    move.add_argument("tenant")
+    move.add_argument("target")
+    move.add_argument("--batch-size", type=int, default=500)
+
+    apply = commands.add_parser("apply", help="Move pinned tenants onto their ring shard")
+    apply.add_argument("--batch-size", type=int, default=500)
+
+    args = parser.parse_args()
+    if not shard_router:
+        raise SystemExit("TODO_SHARDS is not configured")
+
+    if args.command == "locate":
+        result = {
+            "tenant": args.tenant,
+            "shard": shard_router.shard_for(args.tenant),
+            "ring_shard": shard_router.ring.node_for(args.tenant),
+        }
+    elif args.command == "plan":
+        moves = plan_rebalance(shard_router, parse_shards(",".join(args.add)))
+        if args.pin:
+            for move_ in moves:
+                shard_router.set_placement(move_["tenant"], move_["from"])
+        result = {"moves": moves, "pinned": args.pin}
+    elif args.command == "move":
+        shard_router.create_schema()
+        result = move_tenant(shard_router, args.tenant, args.target, args.batch_size)
+    else:
+        shard_router.create_schema()
+        result = {"moves": apply_placements(shard_router, args.batch_size)}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Background startup pipeline and readiness gate.
+
+Schema creation, template seeding and Dapr sidecar discovery used to run
+inline in the lifespan, blocking for up to 20 seconds before the app served
+anything. ``StartupPipeline`` runs them as a background task instead: the
+database step runs in a worker thread (retrying while the database comes up)
+and Dapr discovery polls concurrently with ``asyncio.sleep``.
+
+``/health`` (liveness) answers as soon as the process is up; ``/ready``
+(readiness) returns 503 until the required components are ready.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from database import get_db, init_db
+from seeds import seed_templates
+from services.dapr_service import get_dapr_service
+from sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+DB_STARTUP_ATTEMPTS = int(os.getenv("DB_STARTUP_ATTEMPTS", "30"))
+DAPR_STARTUP_ATTEMPTS = int(os.getenv("DAPR_STARTUP_ATTEMPTS", "10"))
+STARTUP_RETRY_INTERVAL = float(os.getenv("STARTUP_RETRY_INTERVAL", "2"))
+# Publishing already degrades gracefully without the sidecar, so by default
+# the pod becomes ready without it
+READY_REQUIRES_DAPR = os.getenv("READY_REQUIRES_DAPR", "false").lower() in ("1", "true", "yes")
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+UNAVAILABLE = "unavailable"
+
+
+def prepare_database() -> None:
+    """Create tables (including shard tables) and seed built-in templates (blocking)."""
+    init_db()
+    shard_router.create_schema()
+    db = next(get_db())
+    try:
+        seed_templates(db)
+    finally:
+        db.close()
+
+
+class StartupPipeline:
+    """Runs startup dependencies concurrently and tracks their readiness."""
+
+    def __init__(self, require_dapr: Optional[bool] = None):
+        self.require_dapr = READY_REQUIRES_DAPR if require_dapr is None else require_dapr
+        self.components: Dict[str, str] = {"database": PENDING, "dapr": PENDING}
+        self.durations: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        if self.components["database"] != READY:
+            return False
+        return not self.require_dapr or self.components["dapr"] == READY
+
+    @property
+    def failed(self) -> bool:
+        """True when a required component gave up; liveness should fail."""
+        return self.components["database"] == FAILED
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "components": dict(self.components),
+            "durations_ms": {k: round(v * 1000, 1) for k, v in self.durations.items()},
+            "errors": dict(self.errors),
+        }
+
+    def start(self) -> asyncio.Task:
+        """Schedule the pipeline on the running loop and return immediately."""
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> None:
+        await asyncio.gather(self._prepare_database(), self._discover_dapr())
+        logger.info(f"Startup pipeline finished: {self.snapshot()}")
+
+    async def _prepare_database(self) -> None:
+        start = time.perf_counter()
+        for attempt in range(DB_STARTUP_ATTEMPTS):
+            try:
+                await asyncio.to_thread(prepare_database)
+                self.components["database"] = READY
+                self.errors.pop("database", None)
+                break
+            except Exception as e:
+                self.errors["database"] = str(e)
+                logger.warning(
+                    f"Database not ready (attempt {attempt + 1}/{DB_STARTUP_ATTEMPTS}): {e}"
+                )
+                await asyncio.sleep(STARTUP_RETRY_INTERVAL)
+        else:
+            self.components["database"] = FAILED
+            logger.error("Database initialization failed - giving up")
+        self.durations["database"] = time.perf_counter() - start
+
+    async def _discover_dapr(self) -> None:
+        start = time.perf_counter()
+        dapr = get_dapr_service()
+        for attempt in range(DAPR_STARTUP_ATTEMPTS):
+            if await asyncio.to_thread(dapr.check_health):
+                self.components["dapr"] = READY
+                logger.info("Dapr sidecar connected successfully")
+                break
+            logger.info(f"Waiting for Dapr sidecar (attempt {attempt + 1}/{DAPR_STARTUP_ATTEMPTS})...")
+            await asyncio.sleep(STARTUP_RETRY_INTERVAL)
+        else:
+            self.components["dapr"] = UNAVAILABLE
+            logger.warning("Dapr sidecar not available at startup - will retry on first publish")
+        self.durations["dapr"] = time.perf_counter() - start
@@ -6,6 +6,9 @@ import os
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+# The suite sends many requests from one client; rate limits have their own tests
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
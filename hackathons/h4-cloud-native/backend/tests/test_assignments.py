@@ -109,6 +109,15 @@ class TestAssignTodo:
         )
         assert response.status_code == 404
 
+    def test_assign_deleted_todo(self, client, test_todo, test_user, second_user):
+        """Test that a soft-deleted todo can't be assigned."""
+        client.delete(f"/api/todos/{test_todo['id']}")
+        response = client.post(
+            f"/api/todos/{test_todo['id']}/assign?assigned_by={test_user['id']}",
+            json={"assignee_id": second_user["id"]}
+        )
+        assert response.status_code == 404
+
 
 class TestGetAssignments:
     """Tests for GET /api/todos/{todo_id}/assignments endpoint."""
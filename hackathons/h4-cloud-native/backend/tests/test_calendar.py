@@ -314,3 +314,16 @@ class TestSyncTodos:
             f"/api/calendar/todos/non-existent-id/sync?connection_id={test_connection['id']}"
         )
         assert response.status_code == 404
+
+    def test_sync_deleted_todo(self, client, calendar_user, test_connection, calendar_todo):
+        """Test that soft-deleted todos aren't synced."""
+        client.delete(f"/api/todos/{calendar_todo['id']}")
+        response = client.post(
+            f"/api/calendar/todos/{calendar_todo['id']}/sync?connection_id={test_connection['id']}"
+        )
+        assert response.status_code == 404
+
+        response = client.post(
+            f"/api/calendar/connections/{test_connection['id']}/sync?user_id={calendar_user['id']}"
+        )
+        assert response.json()["total"] == 0
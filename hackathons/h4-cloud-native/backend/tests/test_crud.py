@@ -1,5 +1,9 @@
 """Tests for CRUD operations on todos."""
 import pytest
+from sqlalchemy import event
+
+from models import Todo
+from tests.conftest import TestingSessionLocal, engine
 
 
 class TestCreateTodo:
@@ -132,6 +136,80 @@ class TestReadTodos:
         assert data[0]["status"] == "completed"
 
 
+class TestResolveTodo:
+    """Tests for GET /api/todos/resolve (short ID lookup)."""
+
+    def _add(self, todo_id):
+        db = TestingSessionLocal()
+        db.add(Todo(id=todo_id, title=f"Todo {todo_id[:8]}"))
+        db.commit()
+        db.close()
+
+    def test_resolve_unique_prefix(self, client):
+        """The first 8 characters of an ID resolve to the todo."""
+        todo_id = client.post("/api/todos", json={"title": "Short ID"}).json()["id"]
+
+        response = client.get(f"/api/todos/resolve?prefix={todo_id[:8]}")
+        assert response.status_code == 200
+        assert response.json()["id"] == todo_id
+
+    def test_resolve_is_case_insensitive(self, client):
+        todo_id = client.post("/api/todos", json={"title": "Short ID"}).json()["id"]
+
+        response = client.get(f"/api/todos/resolve?prefix={todo_id[:8].upper()}")
+        assert response.json()["id"] == todo_id
+
+    def test_resolve_prefix_ending_in_hyphen(self, client):
+        """A prefix that stops at one of the ID's hyphens still resolves."""
+        todo_id = client.post("/api/todos", json={"title": "Hyphen"}).json()["id"]
+
+        response = client.get(f"/api/todos/resolve?prefix={todo_id[:9]}")
+        assert response.json()["id"] == todo_id
+        assert client.get("/api/todos/resolve?prefix=----").status_code == 404
+
+    def test_resolve_searches_id_index(self, client):
+        """The lookup is a range search on the primary key, not a table scan."""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM todos" in statement:
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            client.get("/api/todos/resolve?prefix=abcd1234")
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        statement, parameters = statements[-1]
+        with engine.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        assert "USING INDEX sqlite_autoindex_todos_1 (id>? AND id<?)" in plan[0][-1]
+
+    def test_resolve_unknown_prefix(self, client):
+        assert client.get("/api/todos/resolve?prefix=ffffffff").status_code == 404
+
+    def test_resolve_ambiguous_prefix(self, client):
+        """A prefix shared by two todos is a 409 rather than a guess."""
+        self._add("abcd1234-0000-4000-8000-000000000001")
+        self._add("abcd1234-0000-4000-8000-000000000002")
+
+        assert client.get("/api/todos/resolve?prefix=abcd1234").status_code == 409
+        response = client.get("/api/todos/resolve?prefix=abcd1234-0000-4000-8000-000000000002")
+        assert response.status_code == 200
+
+    def test_resolve_skips_deleted(self, client):
+        todo_id = client.post("/api/todos", json={"title": "Gone"}).json()["id"]
+        client.delete(f"/api/todos/{todo_id}")
+
+        assert client.get(f"/api/todos/resolve?prefix={todo_id[:8]}").status_code == 404
+
+    @pytest.mark.parametrize("prefix", ["abc", "not-hex!", "a%25"])
+    def test_resolve_invalid_prefix(self, client, prefix):
+        """Prefixes that are too short or not hex are rejected."""
+        assert client.get(f"/api/todos/resolve?prefix={prefix}").status_code == 422
+
+
 class TestUpdateTodo:
     """Tests for PUT /api/todos/{id} endpoint."""
 
@@ -174,6 +252,121 @@ class TestUpdateTodo:
         assert response.status_code == 404
 
 
+class TestFastJSONList:
+    """Tests for the opt-in fast serialization path of GET /api/todos."""
+
+    @pytest.fixture
+    def fast_json(self, monkeypatch):
+        import serialization
+        monkeypatch.setattr(serialization, "FAST_JSON_RESPONSES", True)
+
+    def test_fast_path_matches_default(self, client, monkeypatch):
+        """Fast path output is identical to the validated path."""
+        import serialization
+        client.post("/api/todos", json={
+            "title": "Write report",
+            "description": "Quarterly numbers",
+            "category": "work",
+            "priority": "high",
+            "deadline": "2026-03-01T09:00:00",
+            "ai_metadata": {"source": "test"},
+        })
+        client.post("/api/todos", json={"title": "Go running", "category": "health"})
+
+        default = client.get("/api/todos").json()
+        monkeypatch.setattr(serialization, "FAST_JSON_RESPONSES", True)
+        fast = client.get("/api/todos").json()
+
+        assert fast == default
+
+    def test_fast_path_filters(self, client, fast_json):
+        """Filters still apply on the fast path."""
+        client.post("/api/todos", json={"title": "Work task", "category": "work"})
+        client.post("/api/todos", json={"title": "Personal task", "category": "personal"})
+
+        response = client.get("/api/todos?category=work")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["category"] == "work"
+
+    def test_fast_path_empty(self, client, fast_json):
+        """Empty result encodes as an empty list."""
+        response = client.get("/api/todos?search=nothing")
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+class TestListPagination:
+    """Tests for limit/cursor paging of GET /api/todos."""
+
+    def _create(self, client, count):
+        return [
+            client.post("/api/todos", json={"title": f"Task {i}"}).json()["id"]
+            for i in range(count)
+        ]
+
+    def _walk(self, client, limit, **params):
+        """Follow X-Next-Cursor until the last page; returns titles per page."""
+        pages, cursor = [], None
+        while True:
+            query = {"limit": limit, **params}
+            if cursor:
+                query["cursor"] = cursor
+            response = client.get("/api/todos", params=query)
+            assert response.status_code == 200
+            pages.append([t["title"] for t in response.json()])
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                return pages
+
+    def test_cursor_walks_every_todo_once(self, client):
+        """Pages are newest first and together match the unpaged list."""
+        self._create(client, 7)
+        everything = [t["title"] for t in client.get("/api/todos").json()]
+
+        pages = self._walk(client, 3)
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [title for page in pages for title in page] == everything
+
+    def test_unpaged_list_has_no_cursor(self, client):
+        self._create(client, 3)
+        response = client.get("/api/todos")
+        assert len(response.json()) == 3
+        assert "x-next-cursor" not in response.headers
+
+    def test_exact_last_page_has_no_cursor(self, client):
+        self._create(client, 4)
+        response = client.get("/api/todos?limit=4")
+        assert len(response.json()) == 4
+        assert "x-next-cursor" not in response.headers
+
+    def test_offset_jumps_ahead(self, client):
+        self._create(client, 5)
+        everything = [t["title"] for t in client.get("/api/todos").json()]
+
+        response = client.get("/api/todos?limit=2&offset=2")
+        assert [t["title"] for t in response.json()] == everything[2:4]
+        assert response.headers["x-next-cursor"]
+
+    def test_cursor_with_filters_on_fast_path(self, client, monkeypatch):
+        import serialization
+        monkeypatch.setattr(serialization, "FAST_JSON_RESPONSES", True)
+        for i in range(4):
+            client.post("/api/todos", json={"title": f"Work {i}", "category": "work"})
+        client.post("/api/todos", json={"title": "Personal", "category": "personal"})
+
+        pages = self._walk(client, 3, category="work")
+        assert [len(page) for page in pages] == [3, 1]
+        assert all(title.startswith("Work") for page in pages for title in page)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "%%%"])
+    def test_invalid_cursor(self, client, cursor):
+        response = client.get("/api/todos", params={"limit": 2, "cursor": cursor})
+        assert response.status_code == 400
+
+
 class TestDeleteTodo:
     """Tests for DELETE /api/todos/{id} endpoint."""
 
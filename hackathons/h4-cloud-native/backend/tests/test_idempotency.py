@@ -0,0 +1,143 @@
+"""Tests for Idempotency-Key handling on retried POST requests."""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from idempotency import ResponseCache, StoredResponse, idempotency_store, request_hash
+from models import IdempotencyRecord
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    idempotency_store.cache.clear()
+    yield
+    idempotency_store.cache.clear()
+
+
+def _post_todo(client, key, title="Retry me"):
+    return client.post("/api/todos", json={"title": title}, headers={"Idempotency-Key": key})
+
+
+class TestIdempotencyKeys:
+    """Tests for replaying responses to repeated Idempotency-Keys."""
+
+    def test_retry_replays_create(self, client):
+        """A retry returns the first response and creates nothing new."""
+        first = _post_todo(client, "key-1")
+        with patch("routers.todos.publish_todo_event") as publish:
+            second = _post_todo(client, "key-1")
+
+        assert second.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert len(client.get("/api/todos").json()) == 1
+        publish.assert_not_called()
+
+    def test_without_key_creates_duplicates(self, client):
+        """Requests without the header are not deduplicated."""
+        client.post("/api/todos", json={"title": "Retry me"})
+        client.post("/api/todos", json={"title": "Retry me"})
+
+        assert len(client.get("/api/todos").json()) == 2
+
+    def test_distinct_keys_run_separately(self, client):
+        _post_todo(client, "key-1")
+        _post_todo(client, "key-2")
+
+        assert len(client.get("/api/todos").json()) == 2
+
+    def test_key_reused_for_different_request(self, client):
+        """Reusing a key with a different body is rejected."""
+        _post_todo(client, "key-1", title="First")
+        response = _post_todo(client, "key-1", title="Second")
+
+        assert response.status_code == 422
+        assert [t["title"] for t in client.get("/api/todos").json()] == ["First"]
+
+    def test_blocked_response_replayed_without_validation(self, client):
+        """Client errors are stored too, so validation doesn't run again."""
+        first = _post_todo(client, "key-1", title="Do my homework assignment")
+        with patch("routers.todos.validate_todo") as validate:
+            second = _post_todo(client, "key-1", title="Do my homework assignment")
+
+        assert first.status_code == second.status_code == 403
+        assert second.json() == first.json()
+        validate.assert_not_called()
+
+    def test_replay_from_database_after_cache_eviction(self, client):
+        """The table still answers once the in-memory entry is gone."""
+        first = _post_todo(client, "key-1")
+        idempotency_store.cache.clear()
+        second = _post_todo(client, "key-1")
+
+        assert second.json()["id"] == first.json()["id"]
+        assert second.headers["idempotent-replayed"] == "true"
+
+    def test_in_progress_request_conflicts(self, client):
+        """A retry while the first request still holds the key gets a 409."""
+        db = TestingSessionLocal()
+        assert idempotency_store.claim(db, "key-1", request_hash("POST", "/api/todos", b"", b"")) is None
+        db.close()
+
+        assert _post_todo(client, "key-1").status_code == 409
+        assert client.get("/api/todos").json() == []
+
+    def test_expired_key_runs_again(self, client):
+        """After the TTL the key can be used for a new request."""
+        _post_todo(client, "key-1")
+        idempotency_store.cache.clear()
+        db = TestingSessionLocal()
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        db.query(IdempotencyRecord).update({IdempotencyRecord.expires_at: expired})
+        db.commit()
+        db.close()
+
+        assert "idempotent-replayed" not in _post_todo(client, "key-1").headers
+        assert len(client.get("/api/todos").json()) == 2
+
+    def test_use_template_replayed(self, client):
+        """Using a template twice with one key instantiates it once."""
+        template_id = client.post(
+            "/api/templates", json={"name": "Sprint", "todos": [{"title": "Plan"}, {"title": "Review"}]}
+        ).json()["id"]
+        headers = {"Idempotency-Key": "use-1"}
+
+        first = client.post(f"/api/templates/{template_id}/use", headers=headers)
+        second = client.post(f"/api/templates/{template_id}/use", headers=headers)
+
+        assert second.json() == first.json()
+        assert len(client.get("/api/todos").json()) == 2
+
+    def test_other_routes_ignore_key(self, client):
+        """Only the listed routes are deduplicated."""
+        headers = {"Idempotency-Key": "user-1"}
+        client.post("/api/users", json={"email": "a@example.com", "display_name": "A"}, headers=headers)
+        response = client.post(
+            "/api/users", json={"email": "b@example.com", "display_name": "B"}, headers=headers
+        )
+
+        assert "idempotent-replayed" not in response.headers
+
+
+class TestResponseCache:
+    """Tests for the in-memory LRU in front of the table."""
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(maxsize=2)
+        expires = datetime.utcnow() + timedelta(minutes=1)
+        for key in ("a", "b"):
+            cache.put(key, StoredResponse(key, 200), expires)
+        cache.get("a", datetime.utcnow())
+        cache.put("c", StoredResponse("c", 200), expires)
+
+        assert cache.get("b", datetime.utcnow()) is None
+        assert cache.get("a", datetime.utcnow()) is not None
+
+    def test_expired_entries_dropped(self):
+        cache = ResponseCache()
+        cache.put("a", StoredResponse("a", 200), datetime.utcnow() - timedelta(seconds=1))
+
+        assert cache.get("a", datetime.utcnow()) is None
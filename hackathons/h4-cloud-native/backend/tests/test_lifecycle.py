@@ -0,0 +1,191 @@
+"""Tests for soft delete, archiving and restore of todos."""
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, Index, Integer, MetaData, Table, create_engine, inspect
+
+from database import add_missing_indexes
+from lifecycle import ARCHIVE_COMPLETED_AFTER_DAYS, ARCHIVE_DELETED_AFTER_DAYS, archive_batch
+from models import ArchivedTodo, Suggestion, Todo, TodoAssignment
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def db(client):
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
+def _age(db, todo_id, days, **fields):
+    """Backdate a todo as if it was last touched ``days`` ago."""
+    then = datetime.utcnow() - timedelta(days=days)
+    db.query(Todo).filter(Todo.id == todo_id).update(
+        {Todo.updated_at: then, **{getattr(Todo, k): then for k in fields}}
+    )
+    db.commit()
+
+
+class TestSoftDelete:
+    """Tests for tombstoning todos on DELETE."""
+
+    def test_delete_hides_todo(self, client, db):
+        """A deleted todo disappears from reads but keeps its row."""
+        todo_id = client.post("/api/todos", json={"title": "Old task"}).json()["id"]
+
+        assert client.delete(f"/api/todos/{todo_id}").status_code == 200
+        assert client.get(f"/api/todos/{todo_id}").status_code == 404
+        assert client.get("/api/todos").json() == []
+        assert client.get("/api/stats").json()["total"] == 0
+        assert db.query(Todo).filter(Todo.id == todo_id).one().deleted_at is not None
+
+    def test_delete_twice_returns_404(self, client):
+        """Deleting an already deleted todo is a 404."""
+        todo_id = client.post("/api/todos", json={"title": "Old task"}).json()["id"]
+        client.delete(f"/api/todos/{todo_id}")
+
+        assert client.delete(f"/api/todos/{todo_id}").status_code == 404
+
+    def test_restore_tombstone(self, client):
+        """Restoring clears the tombstone."""
+        todo_id = client.post("/api/todos", json={"title": "Oops"}).json()["id"]
+        client.delete(f"/api/todos/{todo_id}")
+
+        response = client.post(f"/api/todos/{todo_id}/restore")
+        assert response.status_code == 200
+        assert client.get(f"/api/todos/{todo_id}").json()["title"] == "Oops"
+
+    def test_restore_live_todo_conflicts(self, client):
+        """A todo that was never deleted can't be restored."""
+        todo_id = client.post("/api/todos", json={"title": "Alive"}).json()["id"]
+
+        assert client.post(f"/api/todos/{todo_id}/restore").status_code == 409
+
+    def test_restore_unknown_todo(self, client):
+        assert client.post("/api/todos/nonexistent-id/restore").status_code == 404
+
+
+class TestArchive:
+    """Tests for moving old todos into the archive table."""
+
+    def test_archive_old_completed_and_deleted(self, client, db):
+        """Old completed and old deleted todos move; recent and open ones stay."""
+        ids = {
+            title: client.post("/api/todos", json={"title": title}).json()["id"]
+            for title in ("done long ago", "done recently", "deleted long ago", "still open")
+        }
+        for title in ("done long ago", "done recently"):
+            client.put(f"/api/todos/{ids[title]}", json={"status": "completed"})
+        client.delete(f"/api/todos/{ids['deleted long ago']}")
+        _age(db, ids["done long ago"], ARCHIVE_COMPLETED_AFTER_DAYS + 1)
+        _age(db, ids["deleted long ago"], ARCHIVE_DELETED_AFTER_DAYS + 1, deleted_at=True)
+        _age(db, ids["still open"], ARCHIVE_COMPLETED_AFTER_DAYS + 1)
+
+        assert archive_batch(db) == 2
+
+        reasons = {row.title: row.reason for row in db.query(ArchivedTodo).all()}
+        assert reasons == {"done long ago": "completed", "deleted long ago": "deleted"}
+        remaining = {todo.title for todo in db.query(Todo).all()}
+        assert remaining == {"done recently", "still open"}
+
+    def test_archive_in_batches(self, client, db):
+        """Each pass moves at most ``batch_size`` todos."""
+        for i in range(5):
+            todo_id = client.post("/api/todos", json={"title": f"Todo {i}"}).json()["id"]
+            client.delete(f"/api/todos/{todo_id}")
+            _age(db, todo_id, ARCHIVE_DELETED_AFTER_DAYS + 1, deleted_at=True)
+
+        assert archive_batch(db, batch_size=2) == 2
+        assert archive_batch(db, batch_size=2) == 2
+        assert archive_batch(db, batch_size=2) == 1
+        assert archive_batch(db, batch_size=2) == 0
+        assert db.query(ArchivedTodo).count() == 5
+
+    def test_recurring_templates_stay_hot(self, client, db):
+        """Todos backing a recurring pattern are never archived."""
+        todo_id = client.post("/api/todos", json={"title": "Weekly review"}).json()["id"]
+        response = client.post("/api/recurring", json={"template_todo_id": todo_id, "pattern": "weekly"})
+        assert response.status_code == 201
+        client.put(f"/api/todos/{todo_id}", json={"status": "completed"})
+        _age(db, todo_id, ARCHIVE_COMPLETED_AFTER_DAYS + 1)
+
+        assert archive_batch(db) == 0
+
+    def test_restore_reattaches_references(self, client, db):
+        """Assignments and suggestions survive an archive and restore round trip."""
+        user = client.post(
+            "/api/users", json={"email": "archive@example.com", "display_name": "Archive"}
+        ).json()
+        todo_id = client.post(
+            "/api/todos", json={"title": "Urgent: ship it", "priority": "low"}
+        ).json()["id"]
+        assignment = client.post(
+            f"/api/todos/{todo_id}/assign",
+            params={"assigned_by": user["id"]},
+            json={"assignee_id": user["id"], "notes": "Keep me"},
+        ).json()
+        client.post(f"/api/suggestions/generate/{todo_id}", params={"user_id": user["id"]})
+        client.put(f"/api/todos/{todo_id}", json={"status": "completed"})
+        _age(db, todo_id, ARCHIVE_COMPLETED_AFTER_DAYS + 1)
+
+        assert archive_batch(db) == 1
+        assert db.query(TodoAssignment).count() == 0
+        assert db.query(Suggestion).filter(Suggestion.todo_id.isnot(None)).count() == 0
+
+        assert client.post(f"/api/todos/{todo_id}/restore").status_code == 200
+        restored = client.get(f"/api/todos/{todo_id}/assignments").json()
+        assert [(a["id"], a["notes"], a["status"]) for a in restored] == [
+            (assignment["id"], "Keep me", "assigned")
+        ]
+        assert db.query(Suggestion).filter(Suggestion.todo_id == todo_id).count() > 0
+
+    def test_list_archive(self, client, db):
+        """Archived todos are listed newest first and can be filtered."""
+        for title in ("Write report", "Buy milk"):
+            todo_id = client.post("/api/todos", json={"title": title}).json()["id"]
+            client.put(f"/api/todos/{todo_id}", json={"status": "completed"})
+            _age(db, todo_id, ARCHIVE_COMPLETED_AFTER_DAYS + 1)
+            archive_batch(db)
+
+        archived = client.get("/api/todos/archive").json()
+        assert [t["title"] for t in archived] == ["Buy milk", "Write report"]
+        assert archived[0]["archive_reason"] == "completed"
+
+        assert [t["title"] for t in client.get("/api/todos/archive?search=report").json()] == [
+            "Write report"
+        ]
+        assert len(client.get("/api/todos/archive?limit=1&offset=1").json()) == 1
+
+    def test_restore_from_archive(self, client, db):
+        """Restoring an archived todo moves it back into the todos table."""
+        todo_id = client.post("/api/todos", json={"title": "Bring me back"}).json()["id"]
+        client.delete(f"/api/todos/{todo_id}")
+        _age(db, todo_id, ARCHIVE_DELETED_AFTER_DAYS + 1, deleted_at=True)
+        archive_batch(db)
+
+        response = client.post(f"/api/todos/{todo_id}/restore")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Bring me back"
+        assert client.get(f"/api/todos/{todo_id}").status_code == 200
+        assert client.get("/api/todos/archive").json() == []
+
+
+class TestSchemaUpgrade:
+    """Tests for adding indexes to tables created by an older version."""
+
+    def test_dialect_specific_indexes_skipped(self, caplog):
+        """Indexes limited to another database are neither created nor logged."""
+        engine = create_engine("sqlite://")
+        table = Table(
+            "notes", MetaData(), Column("id", Integer, primary_key=True), Column("rank", Integer)
+        )
+        table.create(engine)
+        Index("ix_notes_rank", table.c.rank)
+        Index("ix_notes_rank_pg", table.c.rank).ddl_if(dialect="postgresql")
+
+        with caplog.at_level(logging.INFO, logger="database"):
+            add_missing_indexes(engine, [table])
+
+        assert [i["name"] for i in inspect(engine).get_indexes("notes")] == ["ix_notes_rank"]
+        assert "ix_notes_rank_pg" not in caplog.text
@@ -0,0 +1,138 @@
+"""Tests for Prometheus metrics middleware."""
+import pytest
+from prometheus_client import REGISTRY
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestPrometheusMiddleware:
+    """Tests for route-template labels and request metrics."""
+
+    def test_endpoint_label_uses_route_template(self, client):
+        """Path parameters are replaced by the route template."""
+        todo_id = client.post("/api/todos", json={"title": "Metrics todo"}).json()["id"]
+        before = _sample(
+            "http_requests_total",
+            method="GET", endpoint="/api/todos/{todo_id}", status_code="200",
+        )
+
+        client.get(f"/api/todos/{todo_id}")
+
+        after = _sample(
+            "http_requests_total",
+            method="GET", endpoint="/api/todos/{todo_id}", status_code="200",
+        )
+        assert after == before + 1
+        assert todo_id not in client.get("/metrics").text
+
+    def test_non_uuid_path_params_do_not_create_labels(self, client):
+        """Arbitrary path values collapse onto one label."""
+        client.get("/api/todos/not-a-uuid")
+        client.get("/api/templates/some-template-name")
+
+        metrics = client.get("/metrics").text
+        assert "not-a-uuid" not in metrics
+        assert "some-template-name" not in metrics
+        assert 'endpoint="/api/templates/{template_id}"' in metrics
+
+    def test_unmatched_path_label(self, client):
+        """Unknown paths share the unmatched label."""
+        before = _sample(
+            "http_requests_total",
+            method="GET", endpoint="<unmatched>", status_code="404",
+        )
+        client.get("/no/such/path/12345")
+        after = _sample(
+            "http_requests_total",
+            method="GET", endpoint="<unmatched>", status_code="404",
+        )
+        assert after == before + 1
+
+    def test_response_size_recorded(self, client):
+        """Response body size is observed per route."""
+        before = _sample("http_response_size_bytes_sum", method="GET", endpoint="/health")
+        response = client.get("/health")
+        after = _sample("http_response_size_bytes_sum", method="GET", endpoint="/health")
+        assert after - before == len(response.content)
+
+    def test_in_flight_returns_to_zero(self, client):
+        """In-flight gauge is decremented once the request completes."""
+        client.get("/health")
+        assert _sample("http_requests_in_flight", method="GET") == 0
+
+    def test_metrics_endpoint_not_instrumented(self, client):
+        """Scrapes of /metrics are not counted."""
+        client.get("/metrics")
+        assert 'endpoint="/metrics"' not in client.get("/metrics").text
+
+
+class TestDBQueryInstrumentation:
+    """Tests for per-request SQL instrumentation."""
+
+    @pytest.fixture
+    def instrumented(self, client, monkeypatch):
+        """Instrument the test engine and enable debug headers."""
+        from database import get_db
+        from main import app
+        from metrics import db_metrics
+
+        db = next(app.dependency_overrides[get_db]())
+        db_metrics.instrument_engine(db.get_bind())
+        db.close()
+        monkeypatch.setattr(db_metrics, "DEBUG", True)
+        return client
+
+    def test_debug_headers(self, instrumented):
+        """Debug mode adds X-DB-Time and Server-Timing headers."""
+        response = instrumented.get("/api/todos")
+        assert response.status_code == 200
+        assert float(response.headers["x-db-time"]) >= 0
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert "1 queries" in response.headers["server-timing"]
+
+    def test_query_count_histogram(self, instrumented):
+        """Statement counts are observed per route template."""
+        labels = {"method": "POST", "endpoint": "/api/todos"}
+        before = _sample("db_queries_per_request_count", **labels)
+        before_sum = _sample("db_queries_per_request_sum", **labels)
+
+        instrumented.post("/api/todos", json={"title": "Counted todo"})
+
+        assert _sample("db_queries_per_request_count", **labels) == before + 1
+        assert _sample("db_queries_per_request_sum", **labels) > before_sum
+
+    def test_rows_histogram_counts_fetched_rows(self, instrumented):
+        """Rows read by a SELECT are counted even though sqlite3 reports no rowcount."""
+        for i in range(3):
+            instrumented.post("/api/todos", json={"title": f"Row {i}"})
+        labels = {"method": "GET", "endpoint": "/api/todos"}
+        before = _sample("db_rows_per_request_sum", **labels)
+
+        assert len(instrumented.get("/api/todos").json()) == 3
+
+        assert _sample("db_rows_per_request_sum", **labels) - before == 3
+
+    def test_slow_query_log(self, instrumented, monkeypatch, caplog):
+        """Slow statements are logged with normalized SQL and parameter shape."""
+        import json as _json
+        from metrics import db_metrics
+
+        monkeypatch.setattr(db_metrics, "SLOW_QUERY_MS", 0)
+        with caplog.at_level("WARNING", logger="slow_query"):
+            instrumented.get("/api/todos?search=secret-value")
+
+        records = [_json.loads(r.getMessage()) for r in caplog.records if r.name == "slow_query"]
+        assert records
+        assert records[0]["endpoint"] == "/api/todos"
+        assert "secret-value" not in caplog.text
+        assert "str" in _json.dumps(records[0]["params"])
+
+
+def test_normalize_sql():
+    """Whitespace, literals and IN-lists are collapsed."""
+    from metrics.db_metrics import normalize_sql
+
+    sql = normalize_sql("SELECT *\n  FROM todos WHERE id IN (?, ?, ?) AND title = 'x' LIMIT 10")
+    assert sql == "SELECT * FROM todos WHERE id IN (?, ...) AND title = ? LIMIT ?"
@@ -0,0 +1,213 @@
+"""Tests for GCRA rate limiting."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from rate_limit import (
+    DaprStateBackend, KeyedRateLimiter, Limit, MemoryBackend, RateLimitMiddleware, RequestIdentity,
+)
+
+PROXY = "10.0.0.5"
+
+
+def _app(client_host=None, **kwargs):
+    app = FastAPI()
+
+    @app.get("/api/todos")
+    async def list_todos():
+        return []
+
+    @app.post("/api/templates/{template_id}/use")
+    async def use_template(template_id: str):
+        return {"used": template_id}
+
+    @app.get("/api/teams/{team_id}")
+    async def get_team(team_id: str):
+        return {"id": team_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(RateLimitMiddleware, enabled=True, backend=MemoryBackend(), **kwargs)
+    if client_host is None:
+        return TestClient(app)
+
+    async def from_host(scope, receive, send):
+        if scope["type"] == "http":
+            scope = {**scope, "client": (client_host, 40000)}
+        await app(scope, receive, send)
+
+    return TestClient(from_host)
+
+
+def _scope(client="203.0.113.7", path="/api/todos", **headers):
+    return {
+        "client": (client, 40000),
+        "path": path,
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    }
+
+
+class TestGCRA:
+    """Tests for the limiter itself."""
+
+    def test_burst_then_steady_rate(self):
+        """A burst is allowed at once, then one request per emission interval."""
+        limiter = KeyedRateLimiter(Limit(rate=60, period=60, burst=3))
+        results = [limiter.check("alice", now=100.0).allowed for _ in range(4)]
+        assert results == [True, True, True, False]
+
+        assert limiter.check("alice", now=100.5).allowed is False
+        assert limiter.check("alice", now=101.0).allowed is True
+
+    def test_retry_after_and_remaining(self):
+        limiter = KeyedRateLimiter(Limit(rate=6, period=60, burst=2))
+        assert limiter.check("alice", now=0.0).remaining == 1
+        assert limiter.check("alice", now=0.0).remaining == 0
+
+        denied = limiter.check("alice", now=0.0)
+        assert not denied.allowed
+        assert denied.retry_after == 10.0
+
+    def test_cost_weights(self):
+        """A request costing several tokens uses up the burst faster."""
+        limiter = KeyedRateLimiter(Limit(rate=60, period=60, burst=5))
+        assert limiter.check("alice", cost=4, now=0.0).allowed
+        assert not limiter.check("alice", cost=2, now=0.0).allowed
+        assert limiter.check("alice", cost=1, now=0.0).allowed
+
+    def test_keys_are_independent(self):
+        limiter = KeyedRateLimiter(Limit(rate=60, period=60, burst=1))
+        assert limiter.check("alice", now=0.0).allowed
+        assert limiter.check("bob", now=0.0).allowed
+        assert not limiter.check("alice", now=0.0).allowed
+
+    def test_peek_does_not_charge(self):
+        limiter = KeyedRateLimiter(Limit(rate=60, period=60, burst=2))
+        assert limiter.check("alice", cost=0, now=0.0).remaining == 2
+        assert limiter.check("alice", cost=0, now=0.0).remaining == 2
+        assert limiter.peek("alice", cost=2, now=0.0).allowed
+        assert limiter.peek("alice", cost=2, now=0.0).allowed
+        assert not limiter.peek("alice", cost=3, now=0.0).allowed
+
+
+class TestMemoryBackend:
+    """Tests for idle-key eviction and bounded memory."""
+
+    def test_idle_keys_evicted(self):
+        backend = MemoryBackend()
+        limiter = KeyedRateLimiter(Limit(rate=60, period=60, burst=5), backend)
+        for i in range(100):
+            limiter.check(f"student-{i}", now=0.0)
+        assert len(backend) == 100
+
+        limiter.check("latecomer", now=120.0)
+        assert len(backend) == 1
+
+    def test_max_keys(self):
+        backend = MemoryBackend(max_keys=10)
+        limiter = KeyedRateLimiter(Limit(rate=1, period=60, burst=5), backend)
+        for i in range(50):
+            limiter.check(f"student-{i}", now=0.0)
+        assert len(backend) == 10
+
+    def test_dapr_backend_fails_open(self):
+        """Requests are allowed when the shared store can't be reached."""
+        backend = DaprStateBackend(base_url="http://127.0.0.1:9", attempts=1)
+        limiter = KeyedRateLimiter(Limit(rate=60, period=60, burst=1), backend)
+        assert limiter.check("alice").allowed
+        assert limiter.check("alice").allowed
+
+
+class TestRateLimitMiddleware:
+    """Tests for charging requests per user and per team."""
+
+    def test_rejects_with_429(self):
+        client = _app(user_limit=Limit(rate=60, period=60, burst=2))
+        assert client.get("/api/todos").status_code == 200
+        response = client.get("/api/todos")
+        assert response.headers["x-ratelimit-remaining"] == "0"
+
+        response = client.get("/api/todos")
+        assert response.status_code == 429
+        assert response.json()["detail"] == "Rate limit exceeded"
+        assert int(response.headers["retry-after"]) >= 1
+
+    def test_client_identity_ignored_by_default(self):
+        """Without trusted proxies a client can't pick, or drain, another bucket."""
+        client = _app(user_limit=Limit(rate=60, period=60, burst=1))
+        assert client.get("/api/todos", headers={"X-User-Id": "alice"}).status_code == 200
+        assert client.get("/api/todos", headers={"X-User-Id": "bob"}).status_code == 429
+        assert client.get("/api/todos?owner_id=carol").status_code == 429
+
+    def test_users_limited_separately(self):
+        client = _app(
+            client_host=PROXY,
+            identify=RequestIdentity([PROXY]),
+            user_limit=Limit(rate=60, period=60, burst=1),
+        )
+        assert client.get("/api/todos", headers={"X-User-Id": "alice"}).status_code == 200
+        assert client.get("/api/todos", headers={"X-User-Id": "alice"}).status_code == 429
+        assert client.get("/api/todos", headers={"X-User-Id": "bob"}).status_code == 200
+
+    def test_team_budget_shared_by_members(self):
+        client = _app(
+            client_host=PROXY,
+            identify=RequestIdentity(["10.0.0.0/24"]),
+            user_limit=Limit(rate=60, period=60, burst=10),
+            team_limit=Limit(rate=60, period=60, burst=2),
+        )
+        assert client.get("/api/teams/t1", headers={"X-User-Id": "alice"}).status_code == 200
+        assert client.get("/api/teams/t1", headers={"X-User-Id": "bob"}).status_code == 200
+        assert client.get("/api/teams/t1", headers={"X-User-Id": "carol"}).status_code == 429
+        assert client.get("/api/teams/t2", headers={"X-User-Id": "carol"}).status_code == 200
+
+    def test_team_rejection_keeps_user_budget(self):
+        client = _app(
+            client_host=PROXY,
+            identify=RequestIdentity([PROXY]),
+            user_limit=Limit(rate=60, period=60, burst=2),
+            team_limit=Limit(rate=60, period=60, burst=1),
+        )
+        assert client.get("/api/teams/t1", headers={"X-User-Id": "bob"}).status_code == 200
+        for _ in range(3):
+            assert client.get("/api/teams/t1", headers={"X-User-Id": "alice"}).status_code == 429
+        assert client.get("/api/todos", headers={"X-User-Id": "alice"}).status_code == 200
+        assert client.get("/api/todos", headers={"X-User-Id": "alice"}).status_code == 200
+
+    def test_route_costs(self):
+        client = _app(
+            user_limit=Limit(rate=60, period=60, burst=6),
+            costs=[("POST", r"^/api/templates/[^/]+/use$", 5), ("GET", r"^/health$", 0)],
+        )
+        assert client.post("/api/templates/t1/use").status_code == 200
+        assert client.post("/api/templates/t1/use").status_code == 429
+        assert client.get("/api/todos").status_code == 200
+        for _ in range(5):
+            assert client.get("/health").status_code == 200
+
+    def test_identity_headers_trusted_only_from_proxies(self):
+        identify = RequestIdentity(["10.0.0.0/24"])
+        assert identify(_scope(x_user_id="alice")) == ("ip:203.0.113.7", None)
+        assert identify(_scope(path="/api/teams/t1")) == ("ip:203.0.113.7", None)
+        assert identify(_scope(PROXY, x_user_id="alice", x_team_id="t1")) == ("alice", "t1")
+        assert identify(_scope(PROXY, path="/api/teams/t2", x_user_id="alice")) == ("alice", "t2")
+
+    def test_forwarded_client_from_proxy(self):
+        """Anonymous requests through a proxy are charged to the forwarded address."""
+        identify = RequestIdentity(["10.0.0.0/24"])
+        forwarded = "198.51.100.1, 203.0.113.9, 10.0.0.7"
+        assert identify(_scope(PROXY, x_forwarded_for=forwarded)) == ("ip:203.0.113.9", None)
+        # Spoofed X-Forwarded-For from an untrusted client is ignored
+        assert identify(_scope(x_forwarded_for="198.51.100.1")) == ("ip:203.0.113.7", None)
+
+    def test_disabled(self):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, enabled=False, user_limit=Limit(rate=1, burst=1))
+
+        @app.get("/api/todos")
+        async def list_todos():
+            return []
+
+        client = TestClient(app)
+        assert all(client.get("/api/todos").status_code == 200 for _ in range(5))
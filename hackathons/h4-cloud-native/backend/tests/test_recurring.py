@@ -171,6 +171,21 @@ class TestGenerateOccurrence:
         response = client.post("/api/recurring/non-existent-id/generate")
         assert response.status_code == 404
 
+    def test_generate_from_deleted_template(self, client, template_todo, recurring_pattern):
+        """Test that a soft-deleted template generates no more todos."""
+        client.delete(f"/api/todos/{template_todo['id']}")
+        response = client.post(f"/api/recurring/{recurring_pattern['id']}/generate")
+        assert response.status_code == 400
+
+    def test_create_from_deleted_template(self, client, template_todo):
+        """Test that a soft-deleted todo can't become a template."""
+        client.delete(f"/api/todos/{template_todo['id']}")
+        response = client.post(
+            "/api/recurring",
+            json={"pattern": "daily", "template_todo_id": template_todo["id"]}
+        )
+        assert response.status_code == 404
+
 
 class TestPreviewOccurrences:
     """Tests for GET /api/recurring/{id}/preview endpoint."""
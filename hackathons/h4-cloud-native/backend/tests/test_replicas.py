@@ -0,0 +1,132 @@
+"""Tests for read replica routing."""
+import shutil
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import ReplicaRouter
+from models import Base, Todo
+
+
+def _make_replica(path, title):
+    """Create a SQLite file holding a single marker todo."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Todo(title=title))
+    session.commit()
+    session.close()
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    first = _make_replica(tmp_path / "replica-0.db", "From replica 0")
+    # Second replica starts as a byte copy of the first, like a fresh snapshot
+    shutil.copy(tmp_path / "replica-0.db", tmp_path / "replica-1.db")
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica-1.db'}")
+    with engine.begin() as conn:
+        conn.execute(Todo.__table__.update().values(title="From replica 1"))
+    engine.dispose()
+    return [first, f"sqlite:///{tmp_path / 'replica-1.db'}"]
+
+
+@pytest.fixture
+def use_replicas(monkeypatch):
+    """Install a ReplicaRouter for the duration of a test."""
+    routers = []
+
+    def install(urls, **kwargs):
+        router = ReplicaRouter(urls, **kwargs)
+        routers.append(router)
+        monkeypatch.setattr(database, "replica_router", router)
+        return router
+
+    yield install
+    for router in routers:
+        for replica in router.replicas:
+            replica.engine.dispose()
+
+
+def _titles(client, **kwargs):
+    return [t["title"] for t in client.get("/api/todos", **kwargs).json()]
+
+
+class TestReadReplicas:
+    """Tests for get_read_db routing, read-your-writes and ejection."""
+
+    def test_no_replicas_reads_primary(self, client):
+        """Without configured replicas reads use the primary session."""
+        client.post("/api/todos", json={"title": "Primary todo"})
+        assert _titles(client) == ["Primary todo"]
+
+    def test_round_robin(self, client, replica_urls, use_replicas):
+        """Reads alternate between replicas."""
+        use_replicas(replica_urls)
+        assert _titles(client) == ["From replica 0"]
+        assert _titles(client) == ["From replica 1"]
+        assert _titles(client) == ["From replica 0"]
+
+    def test_stats_from_replica(self, client, replica_urls, use_replicas):
+        """Stats are computed on a replica."""
+        use_replicas(replica_urls[:1])
+        assert client.get("/api/stats").json()["total"] == 1
+
+    def test_read_your_writes_cookie(self, client, replica_urls, use_replicas):
+        """A client that just wrote is pinned to the primary."""
+        use_replicas(replica_urls)
+        response = client.post("/api/todos", json={"title": "Fresh write"})
+        assert "last_write" in response.cookies
+
+        assert _titles(client) == ["Fresh write"]
+
+    def test_read_your_writes_header(self, client, replica_urls, use_replicas):
+        """The last-write header works for clients without cookies."""
+        use_replicas(replica_urls)
+        client.post("/api/todos", json={"title": "Fresh write"})
+        client.cookies.clear()
+
+        assert _titles(client) == ["From replica 0"]
+        header = {"X-Last-Write": f"{time.time():.3f}"}
+        assert _titles(client, headers=header) == ["Fresh write"]
+
+    def test_stale_marker_reads_replica(self, client, replica_urls, use_replicas):
+        """Markers older than the lag window no longer pin to the primary."""
+        use_replicas(replica_urls[:1])
+        header = {"X-Last-Write": str(time.time() - database.REPLICA_LAG_WINDOW - 1)}
+        assert _titles(client, headers=header) == ["From replica 0"]
+
+    def test_failing_replica_ejected(self, client, tmp_path, replica_urls, use_replicas):
+        """A replica that can't connect is ejected and the next one is used."""
+        bad_url = f"sqlite:///{tmp_path / 'missing-dir' / 'replica.db'}"
+        router = use_replicas([bad_url, replica_urls[0]])
+
+        assert _titles(client) == ["From replica 0"]
+        assert not router.replicas[0].available
+        assert router.replicas[1].available
+
+    def test_all_replicas_down_falls_back_to_primary(self, client, tmp_path, use_replicas):
+        """With no healthy replica reads go to the primary."""
+        use_replicas([f"sqlite:///{tmp_path / 'missing-dir' / 'replica.db'}"])
+        client.post("/api/todos", json={"title": "Primary todo"})
+        client.cookies.clear()
+
+        assert _titles(client) == ["Primary todo"]
+
+    def test_least_connections_order(self, replica_urls, use_replicas):
+        """least_connections prefers the replica with fewer sessions in use."""
+        router = use_replicas(replica_urls, strategy="least_connections")
+        router.replicas[0].in_use = 3
+
+        assert router.candidates()[0] is router.replicas[1]
+
+    def test_sessions_released(self, client, replica_urls, use_replicas):
+        """In-use counters return to zero after each request."""
+        router = use_replicas(replica_urls)
+        for _ in range(4):
+            client.get("/api/todos")
+        assert [r.in_use for r in router.replicas] == [0, 0]
@@ -0,0 +1,416 @@
+"""Tests for tenant sharding of the todos table."""
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import lifecycle
+import sharding
+from models import Base, Todo
+from sharding import HashRing, ShardRouter, move_tenant, plan_rebalance, tenant_key
+from tests.conftest import TestingSessionLocal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prints the PostgreSQL DDL for the primary's schema
+POSTGRES_DDL = (
+    "from sqlalchemy import create_mock_engine; from models import Base; "
+    "engine = create_mock_engine('postgresql://', lambda sql, *a, **kw: "
+    "print(str(sql.compile(dialect=engine.dialect)))); "
+    "Base.metadata.create_all(engine, checkfirst=False)"
+)
+
+
+def _postgres_ddl(**env) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", POSTGRES_DDL], cwd=BACKEND_DIR, env={**os.environ, **env},
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch):
+    """Two SQLite shards plus a directory database for placements."""
+    directory_engine = create_engine(f"sqlite:///{tmp_path / 'directory.db'}")
+    Base.metadata.create_all(bind=directory_engine)
+    router = ShardRouter(
+        {
+            "shard-a": f"sqlite:///{tmp_path / 'shard-a.db'}",
+            "shard-b": f"sqlite:///{tmp_path / 'shard-b.db'}",
+        },
+        directory=sessionmaker(bind=directory_engine),
+    )
+    router.create_schema()
+    monkeypatch.setattr(sharding, "shard_router", router)
+    monkeypatch.setattr(sharding, "PLACEMENT_CACHE_SECONDS", 0)
+    yield router
+    router.dispose()
+    directory_engine.dispose()
+
+
+def _tenants_on(router, shard_name):
+    """Owner ids of two tenants that hash onto different shards."""
+    owners = (f"user-{i}" for i in range(1000))
+    return next(o for o in owners if router.shard_for(tenant_key(o)) == shard_name)
+
+
+def _count(router, shard_name, **filters):
+    db = router.open(shard_name)
+    try:
+        return db.query(Todo).filter_by(**filters).count()
+    finally:
+        db.close()
+
+
+class TestHashRing:
+    """Tests for consistent hashing."""
+
+    def test_deterministic(self):
+        """The same key maps to the same node across ring instances."""
+        assert HashRing(["a", "b", "c"]).node_for("team:1") == HashRing(["a", "b", "c"]).node_for("team:1")
+
+    def test_adding_node_moves_few_keys(self):
+        """Adding a fourth node remaps roughly a quarter of the keys."""
+        keys = [f"owner:{i}" for i in range(2000)]
+        before = HashRing(["a", "b", "c"])
+        after = HashRing(["a", "b", "c", "d"])
+
+        moved = [k for k in keys if before.node_for(k) != after.node_for(k)]
+
+        assert all(after.node_for(k) == "d" for k in moved)
+        assert 0.1 < len(moved) / len(keys) < 0.4
+
+    def test_team_todos_colocated(self):
+        """Team todos use the team as tenant regardless of owner."""
+        assert tenant_key("user-1", "team-9") == tenant_key("user-2", "team-9") == "team:team-9"
+
+
+class TestShardedTodos:
+    """Tests for routing the todos API through shards."""
+
+    def test_create_routes_to_tenant_shard(self, client, shards):
+        """A todo is written to the shard owning its tenant."""
+        owner_a = _tenants_on(shards, "shard-a")
+        owner_b = _tenants_on(shards, "shard-b")
+
+        client.post("/api/todos", json={"title": "A todo", "owner_id": owner_a})
+        client.post("/api/todos", json={"title": "B todo", "owner_id": owner_b})
+
+        assert _count(shards, "shard-a", owner_id=owner_a) == 1
+        assert _count(shards, "shard-b", owner_id=owner_b) == 1
+        assert _count(shards, "shard-a", owner_id=owner_b) == 0
+
+    def test_list_scatter_gather(self, client, shards):
+        """Unfiltered lists merge all shards newest first; tenant filters read one."""
+        owner_a = _tenants_on(shards, "shard-a")
+        owner_b = _tenants_on(shards, "shard-b")
+        client.post("/api/todos", json={"title": "First", "owner_id": owner_a})
+        client.post("/api/todos", json={"title": "Second", "owner_id": owner_b})
+
+        titles = [t["title"] for t in client.get("/api/todos").json()]
+        assert titles == ["Second", "First"]
+
+        filtered = client.get("/api/todos", params={"owner_id": owner_a}).json()
+        assert [t["title"] for t in filtered] == ["First"]
+
+    def test_owner_filter_includes_team_todos(self, client, shards):
+        """An owner's team todos live on the team's shard but still list under the owner."""
+        owner = _tenants_on(shards, "shard-a")
+        teams = (f"team-{i}" for i in range(1000))
+        team = next(t for t in teams if shards.shard_for(tenant_key(team_id=t)) == "shard-b")
+        client.post("/api/todos", json={"title": "Mine", "owner_id": owner})
+        client.post("/api/todos", json={"title": "Team", "owner_id": owner, "team_id": team})
+
+        titles = [t["title"] for t in client.get("/api/todos", params={"owner_id": owner}).json()]
+        assert titles == ["Team", "Mine"]
+        team_titles = [t["title"] for t in client.get("/api/todos", params={"team_id": team}).json()]
+        assert team_titles == ["Team"]
+
+    def test_list_pages_across_shards(self, client, shards):
+        """A cursor continues the merged order on every shard."""
+        owners = [_tenants_on(shards, "shard-a"), _tenants_on(shards, "shard-b")]
+        for i in range(6):
+            client.post("/api/todos", json={"title": f"Task {i}", "owner_id": owners[i % 2]})
+
+        first = client.get("/api/todos", params={"limit": 4})
+        second = client.get(
+            "/api/todos", params={"limit": 4, "cursor": first.headers["x-next-cursor"]}
+        )
+        titles = [t["title"] for t in first.json() + second.json()]
+        assert titles == [f"Task {i}" for i in reversed(range(6))]
+        assert "x-next-cursor" not in second.headers
+
+    def test_by_id_operations_locate_shard(self, client, shards):
+        """Get, update and delete find the todo on whichever shard holds it."""
+        owner = _tenants_on(shards, "shard-b")
+        todo_id = client.post("/api/todos", json={"title": "Find me", "owner_id": owner}).json()["id"]
+
+        assert client.get(f"/api/todos/{todo_id}").json()["title"] == "Find me"
+        client.put(f"/api/todos/{todo_id}", json={"status": "completed"})
+        assert client.get(f"/api/todos/{todo_id}").json()["status"] == "completed"
+        assert client.delete(f"/api/todos/{todo_id}").status_code == 200
+        assert _count(shards, "shard-b", deleted_at=None) == 0
+        assert client.get(f"/api/todos/{todo_id}").status_code == 404
+
+    def test_archive_and_restore_on_shard(self, client, shards):
+        """Each shard archives into its own table; restore finds it there."""
+        owner = _tenants_on(shards, "shard-b")
+        todo_id = client.post("/api/todos", json={"title": "Cold", "owner_id": owner}).json()["id"]
+        client.delete(f"/api/todos/{todo_id}")
+        later = datetime.utcnow() + timedelta(days=lifecycle.ARCHIVE_DELETED_AFTER_DAYS + 1)
+
+        assert lifecycle.run_archive(now=later) == {"shard-a": 0, "shard-b": 1}
+        assert [t["title"] for t in client.get(f"/api/todos/archive?owner_id={owner}").json()] == ["Cold"]
+        assert client.post(f"/api/todos/{todo_id}/restore").status_code == 200
+        assert _count(shards, "shard-b", deleted_at=None) == 1
+
+    def test_global_stats_sum_shards(self, client, shards):
+        """Stats are summed across every shard."""
+        client.post("/api/todos", json={"title": "One", "owner_id": _tenants_on(shards, "shard-a")})
+        client.post("/api/todos", json={"title": "Two", "owner_id": _tenants_on(shards, "shard-b")})
+
+        stats = client.get("/api/stats").json()
+        assert stats["total"] == 2
+        assert stats["by_status"]["pending"] == 2
+
+
+class TestShardedRelatedRouters:
+    """Routers whose own tables stay on the primary find todos on the shards."""
+
+    @pytest.fixture
+    def user(self, client):
+        return client.post(
+            "/api/users", json={"email": "sharded@example.com", "display_name": "Sharded"}
+        ).json()
+
+    def _todo(self, client, owner_id, **fields):
+        return client.post("/api/todos", json={"title": "Sharded", "owner_id": owner_id, **fields}).json()
+
+    def test_assignments(self, client, shards, user):
+        todo = self._todo(client, user["id"])
+
+        response = client.post(
+            f"/api/todos/{todo['id']}/assign",
+            params={"assigned_by": user["id"]},
+            json={"assignee_id": user["id"]},
+        )
+        assert response.status_code == 200
+        assert response.json()["todo"]["id"] == todo["id"]
+        listed = client.get(f"/api/users/{user['id']}/assignments").json()
+        assert [a["todo"]["title"] for a in listed] == ["Sharded"]
+
+    def test_suggestions(self, client, shards, user):
+        todo = self._todo(client, user["id"], title="Urgent: ship it", priority="low")
+
+        generated = client.post(f"/api/suggestions/generate/{todo['id']}", params={"user_id": user["id"]})
+        assert generated.status_code == 200
+        priority = next(s for s in generated.json() if s["suggestion_type"] == "priority")
+        assert client.post(f"/api/suggestions/{priority['id']}/apply").status_code == 200
+        assert client.get(f"/api/todos/{todo['id']}").json()["priority"] == "high"
+
+        client.put(f"/api/todos/{todo['id']}", json={"status": "completed"})
+        insights = client.post(f"/api/suggestions/insights/{user['id']}").json()
+        assert [i["title"] for i in insights] == ["Your completion rate: 100.0%"]
+
+    def test_calendar(self, client, shards, user):
+        connection_id = client.post(
+            "/api/calendar/connections", params={"user_id": user["id"]}, json={"provider": "google"}
+        ).json()["connection_id"]
+        client.post(f"/api/calendar/connections/{connection_id}/complete", json={})
+        deadline = (datetime.utcnow() + timedelta(days=1)).isoformat()
+        todo = self._todo(client, user["id"], deadline=deadline)
+
+        single = client.post(f"/api/calendar/todos/{todo['id']}/sync", params={"connection_id": connection_id})
+        assert single.status_code == 200
+        synced = client.post(f"/api/calendar/connections/{connection_id}/sync", params={"user_id": user["id"]})
+        assert synced.json()["synced"] == 1
+
+    def test_recurring(self, client, shards):
+        owner = _tenants_on(shards, "shard-b")
+        template = self._todo(client, owner)
+        recurring = client.post(
+            "/api/recurring", json={"pattern": "daily", "template_todo_id": template["id"]}
+        )
+        assert recurring.status_code == 201
+
+        generated = client.post(f"/api/recurring/{recurring.json()['id']}/generate")
+        assert generated.status_code == 200
+        assert _count(shards, "shard-b", owner_id=owner) == 2
+        assert client.get(f"/api/todos/{generated.json()['id']}").status_code == 200
+
+    def test_templates(self, client, shards):
+        owner = _tenants_on(shards, "shard-a")
+        template_id = client.post(
+            "/api/templates", json={"name": "Sharded", "todos": [{"title": "One"}, {"title": "Two"}]}
+        ).json()["id"]
+
+        response = client.post(f"/api/templates/{template_id}/use", params={"owner_id": owner})
+        assert response.json()["created"] == 2
+        assert _count(shards, "shard-a", owner_id=owner) == 2
+
+    def test_archive_uses_primary_references(self, client, shards, user, monkeypatch):
+        """Shards keep recurring templates hot and detach assignments on the primary until restored."""
+        monkeypatch.setattr(shards, "directory", TestingSessionLocal)
+        template = self._todo(client, user["id"], title="Template")
+        client.post("/api/recurring", json={"pattern": "daily", "template_todo_id": template["id"]})
+        done = self._todo(client, user["id"], title="Done")
+        client.post(
+            f"/api/todos/{done['id']}/assign",
+            params={"assigned_by": user["id"]},
+            json={"assignee_id": user["id"]},
+        )
+        for todo in (template, done):
+            client.put(f"/api/todos/{todo['id']}", json={"status": "completed"})
+        later = datetime.utcnow() + timedelta(days=lifecycle.ARCHIVE_COMPLETED_AFTER_DAYS + 1)
+
+        assert sum(lifecycle.run_archive(now=later).values()) == 1
+        assert client.get(f"/api/todos/{template['id']}").status_code == 200
+        assert client.get(f"/api/users/{user['id']}/assignments").json() == []
+
+        assert client.post(f"/api/todos/{done['id']}/restore").status_code == 200
+        restored = client.get(f"/api/users/{user['id']}/assignments").json()
+        assert [a["todo"]["title"] for a in restored] == ["Done"]
+
+
+class TestPrimarySchema:
+    """Tables on the primary only keep foreign keys to todos when todos aren't sharded."""
+
+    def test_foreign_keys_to_todos_unsharded(self):
+        assert "REFERENCES todos (id)" in _postgres_ddl(TODO_SHARDS="")
+
+    def test_no_foreign_keys_to_todos_when_sharded(self):
+        ddl = _postgres_ddl(TODO_SHARDS="shard-a=sqlite://,shard-b=sqlite://")
+        assert "CREATE TABLE todo_assignments" in ddl
+        assert "REFERENCES todos" not in ddl
+        assert "REFERENCES users (id)" in ddl
+
+
+class TestRebalancing:
+    """Tests for moving tenants between shards."""
+
+    def test_move_tenant(self, client, shards):
+        """Rows move, the placement flips, and new writes follow it."""
+        owner = _tenants_on(shards, "shard-a")
+        tenant = tenant_key(owner)
+        for i in range(3):
+            client.post("/api/todos", json={"title": f"Todo {i}", "owner_id": owner})
+
+        result = move_tenant(shards, tenant, "shard-b", batch_size=2, settle_seconds=0)
+
+        assert result["copied"] == 3 and result["deleted"] == 3
+        assert shards.shard_for(tenant) == "shard-b"
+        assert _count(shards, "shard-a") == 0
+
+        client.post("/api/todos", json={"title": "After move", "owner_id": owner})
+        assert _count(shards, "shard-b", owner_id=owner) == 4
+        assert len(client.get("/api/todos", params={"owner_id": owner}).json()) == 4
+
+    def test_soft_delete_during_move(self, client, shards):
+        """A tombstone written on the source mid-move is carried over, and reads prefer the target."""
+        owner = _tenants_on(shards, "shard-a")
+        tenant = tenant_key(owner)
+        todo_id = client.post("/api/todos", json={"title": "Moving", "owner_id": owner}).json()["id"]
+
+        started = datetime.utcnow()
+        sharding._copy_rows(shards, tenant, "shard-a", "shard-b", None, 500)
+        # Before the fence takes hold, an instance deletes the source copy,
+        # setting only deleted_at
+        source = shards.open("shard-a")
+        source.query(Todo).filter(Todo.id == todo_id).update(
+            {Todo.deleted_at: datetime.utcnow(), Todo.updated_at: started - timedelta(minutes=1)},
+            synchronize_session=False,
+        )
+        source.commit()
+        source.close()
+        shards.set_placement(tenant, "shard-b")
+
+        sharding._copy_rows(shards, tenant, "shard-a", "shard-b", started, 500)
+        assert _count(shards, "shard-b", deleted_at=None) == 0
+        assert client.get(f"/api/todos/{todo_id}").status_code == 404
+
+    def test_fenced_tenant_refuses_writes(self, client, shards):
+        """Writes to a tenant are refused with 503 while its move is fenced."""
+        owner = _tenants_on(shards, "shard-a")
+        tenant = tenant_key(owner)
+        todo_id = client.post("/api/todos", json={"title": "Moving", "owner_id": owner}).json()["id"]
+
+        shards.set_placement(tenant, "shard-a", moving=True)
+        fenced = client.put(f"/api/todos/{todo_id}", json={"title": "Fenced"})
+        assert fenced.status_code == 503
+        assert "retry-after" in fenced.headers
+        assert client.post("/api/todos", json={"title": "New", "owner_id": owner}).status_code == 503
+
+        shards.set_placement(tenant, "shard-a")
+        assert client.put(f"/api/todos/{todo_id}", json={"title": "Done"}).status_code == 200
+
+    def test_target_writes_survive_catch_up(self, client, shards):
+        """A write on the target between the flip and a catch-up isn't overwritten."""
+        owner = _tenants_on(shards, "shard-a")
+        tenant = tenant_key(owner)
+        todo_id = client.post("/api/todos", json={"title": "Moving", "owner_id": owner}).json()["id"]
+
+        started = datetime.utcnow()
+        sharding._copy_rows(shards, tenant, "shard-a", "shard-b", None, 500)
+        shards.set_placement(tenant, "shard-b")
+        client.put(f"/api/todos/{todo_id}", json={"title": "On target"})
+        copied, _ = sharding._copy_rows(shards, tenant, "shard-a", "shard-b", started, 500)
+
+        assert copied == 0
+        assert client.get(f"/api/todos/{todo_id}").json()["title"] == "On target"
+
+    def test_move_keeps_source_rows_written_after_copy(self, client, shards, monkeypatch):
+        """Source rows newer than anything copied aren't deleted."""
+        owner = _tenants_on(shards, "shard-a")
+        tenant = tenant_key(owner)
+        todo_id = client.post("/api/todos", json={"title": "Late", "owner_id": owner}).json()["id"]
+        copy_rows = sharding._copy_rows
+
+        def copy_then_write(*args):
+            result = copy_rows(*args)
+            if args[4] is not None:
+                source = shards.open("shard-a")
+                source.query(Todo).filter(Todo.id == todo_id).update(
+                    {Todo.updated_at: datetime.utcnow() + timedelta(minutes=1)},
+                    synchronize_session=False,
+                )
+                source.commit()
+                source.close()
+            return result
+
+        monkeypatch.setattr(sharding, "_copy_rows", copy_then_write)
+        result = move_tenant(shards, tenant, "shard-b", settle_seconds=0)
+
+        assert result["deleted"] == 0
+        assert _count(shards, "shard-a") == 1
+
+    def test_locate_prefers_placement_shard(self, client, shards):
+        """A delete on the target isn't hidden by the live copy still on the source."""
+        owner = _tenants_on(shards, "shard-a")
+        tenant = tenant_key(owner)
+        todo_id = client.post("/api/todos", json={"title": "Moving", "owner_id": owner}).json()["id"]
+
+        sharding._copy_rows(shards, tenant, "shard-a", "shard-b", None, 500)
+        shards.set_placement(tenant, "shard-b")
+        assert client.delete(f"/api/todos/{todo_id}").status_code == 200
+
+        assert _count(shards, "shard-a", deleted_at=None) == 1
+        assert _count(shards, "shard-b", deleted_at=None) == 0
+        assert client.get(f"/api/todos/{todo_id}").status_code == 404
+
+    def test_plan_lists_only_remapped_tenants(self, client, shards, tmp_path):
+        """Planning a new shard reports exactly the tenants the new ring remaps."""
+        owners = [f"user-{i}" for i in range(20)]
+        for owner in owners:
+            client.post("/api/todos", json={"title": "Todo", "owner_id": owner})
+
+        moves = plan_rebalance(shards, {"shard-c": f"sqlite:///{tmp_path / 'shard-c.db'}"})
+
+        new_ring = HashRing(["shard-a", "shard-b", "shard-c"])
+        expected = {tenant_key(o) for o in owners if new_ring.node_for(tenant_key(o)) == "shard-c"}
+        assert {m["tenant"] for m in moves} == expected
+        assert all(m["to"] == "shard-c" for m in moves)
@@ -0,0 +1,158 @@
+"""Tests for the background startup pipeline and readiness endpoints."""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import startup
+from startup import StartupPipeline
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    """Shrink retry loops so failure paths finish quickly."""
+    monkeypatch.setattr(startup, "STARTUP_RETRY_INTERVAL", 0.01)
+    monkeypatch.setattr(startup, "DB_STARTUP_ATTEMPTS", 3)
+    monkeypatch.setattr(startup, "DAPR_STARTUP_ATTEMPTS", 3)
+
+
+@pytest.fixture
+def dapr_health(monkeypatch):
+    """Control the Dapr health result seen by the pipeline."""
+    state = {"healthy": False}
+    monkeypatch.setattr(
+        startup.get_dapr_service(), "check_health", lambda: state["healthy"]
+    )
+    return state
+
+
+class TestStartupPipeline:
+    """Tests for concurrent startup steps and the readiness gate."""
+
+    def test_ready_without_dapr_by_default(self, monkeypatch, fast_retries, dapr_health):
+        """Database readiness is enough unless Dapr is required."""
+        monkeypatch.setattr(startup, "prepare_database", lambda: None)
+        pipeline = StartupPipeline(require_dapr=False)
+
+        asyncio.run(pipeline.run())
+
+        assert pipeline.ready
+        assert pipeline.components == {"database": "ready", "dapr": "unavailable"}
+
+    def test_require_dapr_blocks_readiness(self, monkeypatch, fast_retries, dapr_health):
+        """With require_dapr the pipeline is not ready until the sidecar is."""
+        monkeypatch.setattr(startup, "prepare_database", lambda: None)
+        pipeline = StartupPipeline(require_dapr=True)
+
+        asyncio.run(pipeline.run())
+        assert not pipeline.ready
+
+        dapr_health["healthy"] = True
+        asyncio.run(pipeline.run())
+        assert pipeline.ready
+
+    def test_steps_run_concurrently(self, monkeypatch, fast_retries, dapr_health):
+        """Waiting on Dapr does not delay database readiness."""
+        monkeypatch.setattr(startup, "STARTUP_RETRY_INTERVAL", 0.2)
+        monkeypatch.setattr(startup, "prepare_database", lambda: time.sleep(0.2))
+        pipeline = StartupPipeline()
+
+        start = time.perf_counter()
+        asyncio.run(pipeline.run())
+        elapsed = time.perf_counter() - start
+
+        # Sequential would be 0.2s database + 3 x 0.2s Dapr polling
+        assert elapsed < 0.75
+        assert pipeline.durations["database"] < pipeline.durations["dapr"]
+
+    def test_database_retries_then_fails(self, monkeypatch, fast_retries, dapr_health):
+        """Database errors are retried and reported once attempts run out."""
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise RuntimeError("connection refused")
+
+        monkeypatch.setattr(startup, "prepare_database", broken)
+        pipeline = StartupPipeline()
+
+        asyncio.run(pipeline.run())
+
+        assert len(calls) == 3
+        assert pipeline.failed
+        assert not pipeline.ready
+        assert pipeline.snapshot()["errors"]["database"] == "connection refused"
+
+    def test_database_recovers_after_retry(self, monkeypatch, fast_retries, dapr_health):
+        """A database that comes up late still makes the pipeline ready."""
+        attempts = iter([RuntimeError("not yet"), None])
+
+        def flaky():
+            error = next(attempts)
+            if error:
+                raise error
+
+        monkeypatch.setattr(startup, "prepare_database", flaky)
+        pipeline = StartupPipeline()
+
+        asyncio.run(pipeline.run())
+
+        assert pipeline.ready
+        assert "database" not in pipeline.errors
+
+
+class TestHealthEndpoints:
+    """Tests for liveness and readiness endpoints."""
+
+    @pytest.fixture
+    def pipeline(self, monkeypatch):
+        import main
+
+        pipeline = StartupPipeline(require_dapr=False)
+        monkeypatch.setattr(main, "startup", pipeline)
+        return pipeline
+
+    def test_live_before_ready(self, client, pipeline):
+        """Liveness passes while readiness is still pending."""
+        assert client.get("/health").status_code == 200
+
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["components"]["database"] == "pending"
+
+    def test_ready_after_startup(self, client, pipeline):
+        """Readiness flips to 200 once the database step is done."""
+        pipeline.components["database"] = "ready"
+
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+
+    def test_liveness_fails_when_database_gave_up(self, client, pipeline):
+        """A failed database step fails liveness so the pod is restarted."""
+        pipeline.components["database"] = "failed"
+
+        assert client.get("/health").status_code == 503
+
+
+class TestOptionalRouters:
+    """Tests for skipping optional routers via DISABLED_ROUTERS."""
+
+    def test_disabled_routers_not_imported(self):
+        """Neither the routers nor their services load when disabled."""
+        code = (
+            "import sys, main; "
+            "print(sorted(m for m in sys.modules if m in ('routers.suggestions', 'routers.calendar',"
+            " 'services.suggestion_service', 'services.calendar_service')))"
+        )
+        env = {**os.environ, "DISABLED_ROUTERS": "suggestions,calendar"}
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -67,6 +67,14 @@ class TestGenerateSuggestions:
         )
         assert response.status_code == 404
 
+    def test_generate_suggestions_deleted_todo(self, client, test_user, test_todo):
+        """Test that soft-deleted todos get no suggestions."""
+        client.delete(f"/api/todos/{test_todo['id']}")
+        response = client.post(
+            f"/api/suggestions/generate/{test_todo['id']}?user_id={test_user['id']}"
+        )
+        assert response.status_code == 404
+
 
 class TestGenerateInsights:
     """Tests for POST /api/suggestions/insights/{user_id} endpoint."""
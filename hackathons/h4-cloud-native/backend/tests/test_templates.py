@@ -206,3 +206,57 @@ class TestDeleteTemplate:
         """Test deleting non-existent template."""
         response = client.delete("/api/templates/non-existent-id")
         assert response.status_code == 404
+
+
+class TestSeedTemplates:
+    """Tests for fingerprint-checked built-in template seeding."""
+
+    @pytest.fixture
+    def db(self, client):
+        from database import get_db
+        from main import app
+
+        sessions = app.dependency_overrides[get_db]()
+        yield next(sessions)
+        sessions.close()
+
+    def test_seed_then_skip(self, db):
+        """First run inserts all templates; a second run with same data is a no-op."""
+        from models import SeedMetadata, Template
+        from seeds import BUILTIN_TEMPLATES, seed_fingerprint, seed_templates
+
+        assert seed_templates(db) == len(BUILTIN_TEMPLATES)
+        assert db.get(SeedMetadata, "builtin_templates").fingerprint == seed_fingerprint()
+
+        assert seed_templates(db) == 0
+        assert db.query(Template).count() == len(BUILTIN_TEMPLATES)
+
+    def test_changed_seed_updates_in_place(self, db, monkeypatch):
+        """A changed seed set upserts only the differing templates."""
+        import copy
+        from models import Template
+        from seeds import BUILTIN_TEMPLATES, seed_templates
+        from seeds import templates as seed_module
+
+        seed_templates(db)
+        changed = copy.deepcopy(BUILTIN_TEMPLATES)
+        changed[0]["description"] = "Updated description"
+        monkeypatch.setattr(seed_module, "BUILTIN_TEMPLATES", changed)
+
+        assert seed_templates(db) == 1
+        assert db.query(Template).count() == len(BUILTIN_TEMPLATES)
+        updated = db.query(Template).filter(Template.name == changed[0]["name"]).one()
+        assert updated.description == "Updated description"
+
+    def test_user_template_with_builtin_name_untouched(self, db):
+        """Only system-owned templates are matched by name."""
+        from models import Template
+        from seeds import BUILTIN_TEMPLATES, seed_templates
+
+        name = BUILTIN_TEMPLATES[0]["name"]
+        db.add(Template(name=name, description="mine", todos=[], created_by="user-1"))
+        db.commit()
+
+        seed_templates(db)
+
+        assert db.query(Template).filter(Template.name == name).count() == 2
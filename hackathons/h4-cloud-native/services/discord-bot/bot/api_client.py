@@ -1,14 +1,35 @@
 """Async HTTP client for the FastAPI backend."""
 
+import asyncio
 import logging
-from typing import Any, Optional
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
 
 import aiohttp
 
-from bot.config import BACKEND_URL, API_TIMEOUT
+from bot.config import (
+    BACKEND_URL,
+    API_TIMEOUT,
+    API_MAX_CONNECTIONS,
+    API_KEEPALIVE_TIMEOUT,
+    API_DNS_CACHE_TTL,
+    API_MAX_RETRIES,
+    API_RETRY_BACKOFF,
+)
+from bot.metrics import API_LATENCY, API_RETRIES
 
 logger = logging.getLogger(__name__)
 
+# Safe to repeat; POSTs become safe too because they carry an Idempotency-Key
+RETRYABLE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "POST"})
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+# A retried POST gets this while the attempt that timed out is still running
+IN_PROGRESS_STATUS = 409
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 class APIError(Exception):
     """Raised when the backend returns a non-success status."""
@@ -19,11 +40,53 @@ class APIError(Exception):
         super().__init__(f"API error {status}: {detail}")
 
 
+@dataclass
+class TodoPage:
+    """One page of todos; ``next_cursor`` is None on the last page."""
+
+    todos: list[dict]
+    next_cursor: Optional[str] = None
+
+
 class TodoAPIClient:
-    """Thin async wrapper around the existing FastAPI backend."""
+    """
+    Thin async wrapper around the existing FastAPI backend.
 
-    def __init__(self, base_url: str = BACKEND_URL):
+    One pooled ``aiohttp.ClientSession`` is reused for every call (keep-alive
+    connections, cached DNS). Call ``start()`` when the cog loads and
+    ``close()`` when it unloads; the session is also created lazily.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BACKEND_URL,
+        *,
+        max_retries: int = API_MAX_RETRIES,
+        retry_backoff: float = API_RETRY_BACKOFF,
+    ):
         self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=API_MAX_CONNECTIONS,
+                limit_per_host=API_MAX_CONNECTIONS,
+                keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=API_DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=API_TIMEOUT),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def _request(
         self,
@@ -32,22 +95,65 @@ class TodoAPIClient:
         *,
         json: Optional[dict] = None,
         params: Optional[dict] = None,
+        endpoint: Optional[str] = None,
     ) -> Any:
+        body, _ = await self._send(
+            method, path, json=json, params=params, endpoint=endpoint
+        )
+        return body
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+        endpoint: Optional[str] = None,
+    ) -> tuple[Any, Mapping[str, str]]:
+        """Send a request with retries; returns the body and response headers."""
+        session = await self.start()
         url = f"{self.base_url}{path}"
-        timeout = aiohttp.ClientTimeout(total=API_TIMEOUT)
-        try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+        endpoint = endpoint or path
+        headers = {"Idempotency-Key": str(uuid.uuid4())} if method == "POST" else None
+        attempts = 1 + (self.max_retries if method in RETRYABLE_METHODS else 0)
+
+        for attempt in range(attempts):
+            status: Any = "error"
+            error: Optional[Exception] = None
+            start = time.perf_counter()
+            try:
                 async with session.request(
-                    method, url, json=json, params=params
+                    method, url, json=json, params=params, headers=headers
                 ) as resp:
-                    body = await resp.json()
-                    if resp.status >= 400:
-                        detail = body.get("detail", str(body))
-                        raise APIError(resp.status, detail)
-                    return body
-        except aiohttp.ClientError as exc:
-            logger.error("Backend unreachable: %s", exc)
-            raise APIError(503, "Backend service is currently unavailable") from exc
+                    status = resp.status
+                    resp_headers = resp.headers
+                    try:
+                        body = await resp.json(content_type=None)
+                    except ValueError:
+                        body = {"detail": await resp.text()}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error = exc
+            finally:
+                API_LATENCY.labels(method, endpoint, str(status)).observe(
+                    time.perf_counter() - start
+                )
+
+            in_progress = status == IN_PROGRESS_STATUS and headers is not None and attempt > 0
+            if error is None and status not in RETRYABLE_STATUSES and not in_progress:
+                break
+            if attempt + 1 < attempts:
+                API_RETRIES.labels(method, endpoint).inc()
+                # Full jitter keeps retries from many commands from lining up
+                await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+
+        if error is not None:
+            logger.error("Backend unreachable: %s", error)
+            raise APIError(503, "Backend service is currently unavailable") from error
+        if status >= 400:
+            detail = body.get("detail", str(body)) if isinstance(body, dict) else str(body)
+            raise APIError(status, detail)
+        return body, resp_headers
 
     # ── Todo CRUD ────────────────────────────────────────────────
 
@@ -79,6 +185,37 @@ class TodoAPIClient:
         category: Optional[str] = None,
         search: Optional[str] = None,
     ) -> list[dict]:
+        params = self._list_params(status, priority, category, search)
+        return await self._request("GET", "/api/todos", params=params or None)
+
+    async def list_todos_page(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> TodoPage:
+        """Fetch one page of todos, newest first, using the backend's cursor."""
+        params = self._list_params(status, priority, category, search)
+        params["limit"] = str(limit)
+        if cursor:
+            params["cursor"] = cursor
+        if offset:
+            params["offset"] = str(offset)
+        todos, headers = await self._send("GET", "/api/todos", params=params)
+        return TodoPage(todos, headers.get(NEXT_CURSOR_HEADER))
+
+    @staticmethod
+    def _list_params(
+        status: Optional[str],
+        priority: Optional[str],
+        category: Optional[str],
+        search: Optional[str],
+    ) -> dict[str, str]:
         params: dict[str, str] = {}
         if status:
             params["status"] = status
@@ -88,16 +225,28 @@ class TodoAPIClient:
             params["category"] = category
         if search:
             params["search"] = search
-        return await self._request("GET", "/api/todos", params=params or None)
+        return params
 
     async def get_todo(self, todo_id: str) -> dict:
-        return await self._request("GET", f"/api/todos/{todo_id}")
+        return await self._request(
+            "GET", f"/api/todos/{todo_id}", endpoint="/api/todos/{id}"
+        )
+
+    async def resolve_todo(self, prefix: str) -> dict:
+        """Look up a todo by a prefix of its ID (404 if none, 409 if ambiguous)."""
+        return await self._request(
+            "GET", "/api/todos/resolve", params={"prefix": prefix}
+        )
 
     async def update_todo(self, todo_id: str, **fields: Any) -> dict:
-        return await self._request("PUT", f"/api/todos/{todo_id}", json=fields)
+        return await self._request(
+            "PUT", f"/api/todos/{todo_id}", json=fields, endpoint="/api/todos/{id}"
+        )
 
     async def delete_todo(self, todo_id: str) -> dict:
-        return await self._request("DELETE", f"/api/todos/{todo_id}")
+        return await self._request(
+            "DELETE", f"/api/todos/{todo_id}", endpoint="/api/todos/{id}"
+        )
 
     async def complete_todo(self, todo_id: str) -> dict:
         return await self.update_todo(todo_id, status="completed")
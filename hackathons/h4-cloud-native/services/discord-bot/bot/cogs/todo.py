@@ -14,10 +14,15 @@ from bot.embeds.todo_embed import (
     error_embed,
     constitutional_block_embed,
 )
-from bot.utils.pagination import paginate
+from bot.utils.pagination import PaginationView, TodoPaginator
+from bot.utils.short_ids import ShortIdCache
 
 logger = logging.getLogger(__name__)
 
+FULL_ID_LENGTH = 36
+# Matches the backend's minimum for /api/todos/resolve
+MIN_PREFIX_LENGTH = 4
+
 
 class TodoCog(commands.Cog, name="Todo"):
     """Manage your todos directly from Discord."""
@@ -25,6 +30,13 @@ class TodoCog(commands.Cog, name="Todo"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.api = TodoAPIClient()
+        self.short_ids = ShortIdCache()
+
+    async def cog_load(self):
+        await self.api.start()
+
+    async def cog_unload(self):
+        await self.api.close()
 
     # ── /todo create ────────────────────────────────────────────
 
@@ -71,6 +83,7 @@ class TodoCog(commands.Cog, name="Todo"):
                         embed=constitutional_block_embed(reason)
                     )
                     return
+            self.short_ids.remember(interaction.guild_id, [todo])
             await interaction.followup.send(embed=todo_detail_embed(todo))
         except APIError as exc:
             if exc.status == 403:
@@ -108,12 +121,25 @@ class TodoCog(commands.Cog, name="Todo"):
             elif filter == "completed":
                 status_filter = "completed"
 
-            todos = await self.api.list_todos(status=status_filter)
-            page_items, current_page, total_pages = paginate(todos, page)
-            embed = todo_list_embed(
-                page_items, page=current_page, total_pages=total_pages
+            async def fetch(limit, cursor, offset):
+                return await self.api.list_todos_page(
+                    limit=limit, cursor=cursor, offset=offset, status=status_filter
+                )
+
+            guild_id = interaction.guild_id
+
+            def render(todos, current_page, has_next):
+                self.short_ids.remember(guild_id, todos)
+                return todo_list_embed(todos, page=current_page, has_next=has_next)
+
+            paginator = TodoPaginator(fetch)
+            todos = await paginator.get_page(page)
+            view = PaginationView(paginator, render, owner_id=interaction.user.id)
+            view.message = await interaction.followup.send(
+                embed=render(todos, paginator.page, paginator.has_next),
+                view=view,
+                wait=True,
             )
-            await interaction.followup.send(embed=embed)
         except APIError as exc:
             await interaction.followup.send(embed=error_embed(exc.detail))
 
@@ -124,7 +150,7 @@ class TodoCog(commands.Cog, name="Todo"):
     async def todo_show(self, interaction: discord.Interaction, todo_id: str):
         await interaction.response.defer()
         try:
-            todo = await self._resolve_todo(todo_id)
+            todo = await self._resolve_todo(interaction.guild_id, todo_id)
             await interaction.followup.send(embed=todo_detail_embed(todo))
         except APIError as exc:
             await interaction.followup.send(embed=error_embed(exc.detail))
@@ -136,7 +162,7 @@ class TodoCog(commands.Cog, name="Todo"):
     async def todo_complete(self, interaction: discord.Interaction, todo_id: str):
         await interaction.response.defer()
         try:
-            todo = await self._resolve_todo(todo_id)
+            todo = await self._resolve_todo(interaction.guild_id, todo_id)
             updated = await self.api.complete_todo(todo["id"])
             await interaction.followup.send(
                 embed=success_embed(
@@ -153,8 +179,9 @@ class TodoCog(commands.Cog, name="Todo"):
     async def todo_delete(self, interaction: discord.Interaction, todo_id: str):
         await interaction.response.defer()
         try:
-            todo = await self._resolve_todo(todo_id)
+            todo = await self._resolve_todo(interaction.guild_id, todo_id)
             await self.api.delete_todo(todo["id"])
+            self.short_ids.forget(interaction.guild_id, todo["id"])
             await interaction.followup.send(
                 embed=success_embed(
                     f"Deleted: **{todo.get('title', todo_id)}**"
@@ -165,17 +192,45 @@ class TodoCog(commands.Cog, name="Todo"):
 
     # ── Helpers ─────────────────────────────────────────────────
 
-    async def _resolve_todo(self, todo_id: str) -> dict:
-        """Try direct lookup first; fall back to searching by prefix."""
-        try:
-            return await self.api.get_todo(todo_id)
-        except APIError:
-            todos = await self.api.list_todos()
-            for t in todos:
-                if t["id"].startswith(todo_id):
-                    return t
-            raise APIError(404, f"No todo found matching `{todo_id}`")
-
+    async def _resolve_todo(self, guild_id: int | None, todo_id: str) -> dict:
+        """
+        Resolve a full or short todo ID.
+
+        Short IDs shown recently in this guild are mapped locally; anything
+        else is one indexed prefix lookup on the backend.
+        """
+        todo_id = todo_id.strip()
+        if len(todo_id) >= FULL_ID_LENGTH:
+            todo = await self.api.get_todo(todo_id)
+        else:
+            todo = None
+            full_id = self.short_ids.lookup(guild_id, todo_id)
+            if full_id is not None:
+                try:
+                    todo = await self.api.get_todo(full_id)
+                except APIError as exc:
+                    if exc.status != 404:
+                        raise
+                    self.short_ids.forget(guild_id, full_id)
+            if todo is None:
+                if len(todo_id) < MIN_PREFIX_LENGTH:
+                    raise APIError(
+                        400, f"Use at least {MIN_PREFIX_LENGTH} characters of the todo ID"
+                    )
+                try:
+                    todo = await self.api.resolve_todo(todo_id)
+                except APIError as exc:
+                    if exc.status == 404:
+                        raise APIError(404, f"No todo found matching `{todo_id}`") from exc
+                    if exc.status == 409:
+                        raise APIError(
+                            409, f"`{todo_id}` matches several todos; use more characters"
+                        ) from exc
+                    if exc.status == 422:
+                        raise APIError(422, f"`{todo_id}` is not a valid todo ID") from exc
+                    raise
+        self.short_ids.remember(guild_id, [todo])
+        return todo
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(TodoCog(bot))
@@ -12,7 +12,21 @@ BOT_STATUS = os.getenv("BOT_STATUS", "Managing todos")
 # Backend API
 BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
 API_TIMEOUT = int(os.getenv("API_TIMEOUT", "10"))
+API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "20"))
+API_KEEPALIVE_TIMEOUT = float(os.getenv("API_KEEPALIVE_TIMEOUT", "30"))
+API_DNS_CACHE_TTL = int(os.getenv("API_DNS_CACHE_TTL", "300"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.25"))
+
+# Prometheus metrics endpoint (0 disables)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9102"))
 
 # Bot behaviour
 ITEMS_PER_PAGE = int(os.getenv("ITEMS_PER_PAGE", "5"))
+# How long fetched list pages stay cached, and how long Prev/Next buttons work
+PAGE_CACHE_SECONDS = float(os.getenv("PAGE_CACHE_SECONDS", "60"))
+PAGINATION_TIMEOUT = float(os.getenv("PAGINATION_TIMEOUT", "180"))
+# Recently shown short IDs remembered per guild, and how many guilds to track
+SHORT_ID_CACHE_SIZE = int(os.getenv("SHORT_ID_CACHE_SIZE", "256"))
+SHORT_ID_CACHE_GUILDS = int(os.getenv("SHORT_ID_CACHE_GUILDS", "1000"))
 BOT_COLOR = 0x5865F2  # Discord Blurple
@@ -95,9 +95,14 @@ def todo_detail_embed(todo: dict) -> discord.Embed:
 
 
 def todo_list_embed(
-    todos: list[dict], *, page: int = 1, total_pages: int = 1
+    todos: list[dict], *, page: int = 1, total_pages: int = 1, has_next: bool = False
 ) -> discord.Embed:
-    """Build an embed for a paginated list of todos."""
+    """
+    Build an embed for a paginated list of todos.
+
+    Lists paged by cursor don't know their page count; pass ``has_next``
+    instead of ``total_pages`` and the footer shows just the page number.
+    """
     active = [t for t in todos if t.get("status") != "completed"]
     completed = [t for t in todos if t.get("status") == "completed"]
 
@@ -107,7 +112,11 @@ def todo_list_embed(
     )
 
     if not todos:
-        embed.description = "No todos found. Create one with `/todo create`!"
+        if page > 1:
+            embed.description = "No more todos."
+            embed.set_footer(text=f"Page {page}")
+        else:
+            embed.description = "No todos found. Create one with `/todo create`!"
         return embed
 
     lines: list[str] = []
@@ -121,6 +130,8 @@ def todo_list_embed(
 
     if total_pages > 1:
         embed.set_footer(text=f"Page {page}/{total_pages}")
+    elif page > 1 or has_next:
+        embed.set_footer(text=f"Page {page}")
 
     return embed
 
@@ -7,7 +7,8 @@ import os
 import discord
 from discord.ext import commands
 
-from bot.config import DISCORD_TOKEN, BOT_STATUS
+from bot.config import DISCORD_TOKEN, BOT_STATUS, METRICS_PORT
+from bot.metrics import start_metrics_server
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +31,7 @@ class TodoMasterBot(commands.Bot):
         super().__init__(command_prefix="!", intents=intents)
 
     async def setup_hook(self):
+        start_metrics_server(METRICS_PORT)
         for ext in EXTENSIONS:
             await self.load_extension(ext)
             logger.info("Loaded extension: %s", ext)
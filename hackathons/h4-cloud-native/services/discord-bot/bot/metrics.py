@@ -0,0 +1,24 @@
+"""Prometheus metrics for the bot's calls to the backend."""
+
+import logging
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+API_LATENCY = Histogram(
+    "bot_api_request_duration_seconds", "Backend API call latency seen by the bot",
+    ["method", "endpoint", "status"],
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+)
+API_RETRIES = Counter(
+    "bot_api_retries_total", "Backend API calls retried after a transient failure",
+    ["method", "endpoint"],
+)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics on ``port``; 0 disables it."""
+    if port:
+        start_http_server(port)
+        logger.info("Metrics served on :%s/metrics", port)
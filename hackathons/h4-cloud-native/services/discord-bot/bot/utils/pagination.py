@@ -1,15 +1,119 @@
 """Pagination utilities for Discord embed lists."""
 
-import math
-from typing import Any
+import time
+from typing import Awaitable, Callable, Optional
 
-from bot.config import ITEMS_PER_PAGE
+import discord
 
+from bot.api_client import APIError, TodoPage
+from bot.config import ITEMS_PER_PAGE, PAGE_CACHE_SECONDS, PAGINATION_TIMEOUT
+from bot.embeds.todo_embed import error_embed
 
-def paginate(items: list[Any], page: int = 1) -> tuple[list[Any], int, int]:
-    """Return (page_items, current_page, total_pages)."""
-    total_pages = max(1, math.ceil(len(items) / ITEMS_PER_PAGE))
-    page = max(1, min(page, total_pages))
-    start = (page - 1) * ITEMS_PER_PAGE
-    end = start + ITEMS_PER_PAGE
-    return items[start:end], page, total_pages
+# (limit, cursor, offset) -> one page from the backend
+PageFetcher = Callable[[int, Optional[str], int], Awaitable[TodoPage]]
+
+
+class TodoPaginator:
+    """
+    Fetches pages of todos from the backend as they are viewed.
+
+    The cursor returned with each page is remembered, so paging forward or
+    back is one small request; a page reached directly (``/todo-list
+    page:7``) is fetched by offset. The current page and its neighbours are
+    kept for ``cache_seconds`` so flipping back and forth costs nothing.
+    """
+
+    def __init__(
+        self,
+        fetch: PageFetcher,
+        *,
+        per_page: int = ITEMS_PER_PAGE,
+        cache_seconds: float = PAGE_CACHE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch
+        self.per_page = per_page
+        self.cache_seconds = cache_seconds
+        self._clock = clock
+        self._cursors: dict[int, Optional[str]] = {1: None}
+        self._pages: dict[int, tuple[float, TodoPage]] = {}
+        self.page = 1
+
+    @property
+    def has_next(self) -> bool:
+        return self._cursors.get(self.page + 1) is not None
+
+    async def get_page(self, page: int) -> list[dict]:
+        page = max(1, page)
+        now = self._clock()
+        cached = self._pages.get(page)
+        if cached is not None and now - cached[0] < self.cache_seconds:
+            result = cached[1]
+        else:
+            if page in self._cursors:
+                result = await self._fetch(self.per_page, self._cursors[page], 0)
+            else:
+                result = await self._fetch(self.per_page, None, (page - 1) * self.per_page)
+            self._pages[page] = (now, result)
+
+        self._cursors[page + 1] = result.next_cursor
+        self.page = page
+        for stale in [p for p in self._pages if abs(p - page) > 1]:
+            del self._pages[stale]
+        return result.todos
+
+
+class PaginationView(discord.ui.View):
+    """Prev/Next buttons that page through a ``TodoPaginator`` in place."""
+
+    def __init__(
+        self,
+        paginator: TodoPaginator,
+        render: Callable[[list[dict], int, bool], discord.Embed],
+        *,
+        owner_id: int,
+        timeout: float = PAGINATION_TIMEOUT,
+    ):
+        super().__init__(timeout=timeout)
+        self.paginator = paginator
+        self.render = render
+        self.owner_id = owner_id
+        self.message: Optional[discord.Message] = None
+        self.sync_buttons()
+
+    def sync_buttons(self) -> None:
+        self.prev_page.disabled = self.paginator.page <= 1
+        self.next_page.disabled = not self.paginator.has_next
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Only whoever ran the command can page through their list
+        return interaction.user.id == self.owner_id
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.paginator.page - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.paginator.page + 1)
+
+    async def show(self, interaction: discord.Interaction, page: int) -> None:
+        await interaction.response.defer()
+        try:
+            todos = await self.paginator.get_page(page)
+        except APIError as exc:
+            await interaction.followup.send(embed=error_embed(exc.detail), ephemeral=True)
+            return
+        self.sync_buttons()
+        await interaction.edit_original_response(
+            embed=self.render(todos, self.paginator.page, self.paginator.has_next), view=self
+        )
+
+    async def on_timeout(self) -> None:
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
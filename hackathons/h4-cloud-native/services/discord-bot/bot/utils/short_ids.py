@@ -0,0 +1,66 @@
+"""Per-guild LRU of recently shown short todo IDs."""
+
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from bot.config import SHORT_ID_CACHE_SIZE, SHORT_ID_CACHE_GUILDS
+
+SHORT_ID_LENGTH = 8
+
+
+class ShortIdCache:
+    """
+    Maps the short IDs shown in embeds back to full todo IDs.
+
+    Each guild (``None`` for DMs) keeps its own LRU of at most ``size``
+    entries, and at most ``max_guilds`` guilds are tracked.
+    """
+
+    def __init__(self, size: int = SHORT_ID_CACHE_SIZE, max_guilds: int = SHORT_ID_CACHE_GUILDS):
+        self.size = size
+        self.max_guilds = max_guilds
+        self._guilds: OrderedDict[Optional[int], OrderedDict[str, str]] = OrderedDict()
+
+    def remember(self, guild_id: Optional[int], todos: Iterable[dict]) -> None:
+        """Record the todos just shown in ``guild_id``."""
+        if self.size <= 0:
+            return
+        entries = self._guilds.get(guild_id)
+        if entries is None:
+            entries = self._guilds[guild_id] = OrderedDict()
+        self._guilds.move_to_end(guild_id)
+        for todo in todos:
+            full_id = todo.get("id")
+            if not full_id:
+                continue
+            short_id = full_id[:SHORT_ID_LENGTH].lower()
+            entries[short_id] = full_id.lower()
+            entries.move_to_end(short_id)
+        while len(entries) > self.size:
+            entries.popitem(last=False)
+        while len(self._guilds) > self.max_guilds:
+            self._guilds.popitem(last=False)
+
+    def lookup(self, guild_id: Optional[int], prefix: str) -> Optional[str]:
+        """The full ID for ``prefix`` if exactly one remembered todo matches."""
+        entries = self._guilds.get(guild_id)
+        if not entries:
+            return None
+        prefix = prefix.lower()
+        if len(prefix) >= SHORT_ID_LENGTH:
+            short_id = prefix[:SHORT_ID_LENGTH]
+            full_id = entries.get(short_id)
+            matches = [(short_id, full_id)] if full_id and full_id.startswith(prefix) else []
+        else:
+            matches = [(s, f) for s, f in entries.items() if s.startswith(prefix)]
+        if len(matches) != 1:
+            return None
+        short_id, full_id = matches[0]
+        entries.move_to_end(short_id)
+        self._guilds.move_to_end(guild_id)
+        return full_id
+
+    def forget(self, guild_id: Optional[int], todo_id: str) -> None:
+        entries = self._guilds.get(guild_id)
+        if entries is not None:
+            entries.pop(todo_id[:SHORT_ID_LENGTH].lower(), None)
@@ -1,7 +1,10 @@
 """Tests for the backend API client."""
 
+import asyncio
+
 import pytest
 from aioresponses import aioresponses
+from yarl import URL
 
 from bot.api_client import TodoAPIClient, APIError
 
@@ -10,7 +13,9 @@ BASE = "http://test-backend:8000"
 
 @pytest.fixture
 def client():
-    return TodoAPIClient(base_url=BASE)
+    api = TodoAPIClient(base_url=BASE, retry_backoff=0)
+    yield api
+    asyncio.run(api.close())
 
 
 @pytest.fixture
@@ -103,6 +108,24 @@ async def test_list_todos_with_filter(client, mock_api):
     assert result == []
 
 
+@pytest.mark.asyncio
+async def test_list_todos_page(client, mock_api):
+    mock_api.get(
+        f"{BASE}/api/todos?limit=5&status=pending",
+        payload=[{"id": "abc", "title": "First"}],
+        headers={"X-Next-Cursor": "c1"},
+    )
+    mock_api.get(f"{BASE}/api/todos?cursor=c1&limit=5", payload=[])
+
+    page = await client.list_todos_page(limit=5, status="pending")
+    assert page.todos == [{"id": "abc", "title": "First"}]
+    assert page.next_cursor == "c1"
+
+    last = await client.list_todos_page(limit=5, cursor="c1")
+    assert last.todos == []
+    assert last.next_cursor is None
+
+
 # ── get_todo ─────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -129,6 +152,30 @@ async def test_get_todo_not_found(client, mock_api):
     assert exc_info.value.status == 404
 
 
+@pytest.mark.asyncio
+async def test_resolve_todo_by_prefix(client, mock_api):
+    mock_api.get(
+        f"{BASE}/api/todos/resolve?prefix=abc12345",
+        payload={"id": "abc12345-full-uuid", "title": "Test"},
+    )
+
+    result = await client.resolve_todo("abc12345")
+    assert result["id"] == "abc12345-full-uuid"
+
+
+@pytest.mark.asyncio
+async def test_resolve_todo_ambiguous(client, mock_api):
+    mock_api.get(
+        f"{BASE}/api/todos/resolve?prefix=abcd",
+        payload={"detail": "ID prefix 'abcd' matches more than one todo"},
+        status=409,
+    )
+
+    with pytest.raises(APIError) as exc_info:
+        await client.resolve_todo("abcd")
+    assert exc_info.value.status == 409
+
+
 # ── update_todo / complete_todo ──────────────────────────────────
 
 @pytest.mark.asyncio
@@ -205,3 +252,102 @@ async def test_server_error(client, mock_api):
     with pytest.raises(APIError) as exc_info:
         await client.list_todos()
     assert exc_info.value.status == 500
+
+
+# ── session reuse and retries ────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_session_reused_across_calls(client, mock_api):
+    mock_api.get(f"{BASE}/health", payload={"status": "healthy"}, repeat=True)
+
+    await client.health()
+    session = client._session
+    await client.health()
+    assert client._session is session
+    assert not session.closed
+
+
+@pytest.mark.asyncio
+async def test_close_and_restart(client, mock_api):
+    mock_api.get(f"{BASE}/health", payload={"status": "healthy"}, repeat=True)
+
+    await client.health()
+    await client.close()
+    assert client._session is None
+
+    result = await client.health()
+    assert result["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_get_retried_after_transient_error(client, mock_api):
+    mock_api.get(f"{BASE}/api/todos", payload={"detail": "Bad gateway"}, status=502)
+    mock_api.get(f"{BASE}/api/todos", payload=[{"id": "1"}])
+
+    result = await client.list_todos()
+    assert result == [{"id": "1"}]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(client, mock_api):
+    mock_api.get(f"{BASE}/api/todos", payload={"detail": "Unavailable"}, status=503, repeat=True)
+
+    with pytest.raises(APIError) as exc_info:
+        await client.list_todos()
+    assert exc_info.value.status == 503
+    requests = mock_api.requests[("GET", URL(f"{BASE}/api/todos"))]
+    assert len(requests) == 1 + client.max_retries
+
+
+@pytest.mark.asyncio
+async def test_post_retried_with_same_idempotency_key(client, mock_api):
+    import aiohttp
+    mock_api.post(f"{BASE}/api/todos", exception=aiohttp.ClientConnectionError("reset"))
+    mock_api.post(f"{BASE}/api/todos", payload={"id": "abc", "title": "Buy milk"}, status=201)
+
+    result = await client.create_todo("Buy milk")
+    assert result["id"] == "abc"
+    requests = mock_api.requests[("POST", URL(f"{BASE}/api/todos"))]
+    keys = {call.kwargs["headers"]["Idempotency-Key"] for call in requests}
+    assert len(requests) == 2
+    assert len(keys) == 1
+
+
+@pytest.mark.asyncio
+async def test_post_retry_waits_for_request_in_progress(client, mock_api):
+    mock_api.post(f"{BASE}/api/todos", exception=asyncio.TimeoutError())
+    mock_api.post(f"{BASE}/api/todos", payload={"detail": "In progress"}, status=409)
+    mock_api.post(f"{BASE}/api/todos", payload={"id": "abc", "title": "Buy milk"}, status=201)
+
+    result = await client.create_todo("Buy milk")
+    assert result["id"] == "abc"
+    assert len(mock_api.requests[("POST", URL(f"{BASE}/api/todos"))]) == 3
+
+
+@pytest.mark.asyncio
+async def test_first_conflict_not_retried(client, mock_api):
+    mock_api.post(f"{BASE}/api/todos", payload={"detail": "Conflict"}, status=409)
+
+    with pytest.raises(APIError) as exc_info:
+        await client.create_todo("Buy milk")
+    assert exc_info.value.status == 409
+    assert len(mock_api.requests[("POST", URL(f"{BASE}/api/todos"))]) == 1
+
+
+@pytest.mark.asyncio
+async def test_latency_recorded(client, mock_api):
+    from bot.metrics import API_LATENCY
+    mock_api.get(f"{BASE}/api/todos/abc-123", payload={"id": "abc-123"})
+
+    labels = {"method": "GET", "endpoint": "/api/todos/{id}", "status": "200"}
+    before = _sample_count(API_LATENCY, labels)
+    await client.get_todo("abc-123")
+    assert _sample_count(API_LATENCY, labels) == before + 1
+
+
+def _sample_count(histogram, labels) -> float:
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == labels:
+                return sample.value
+    return 0.0
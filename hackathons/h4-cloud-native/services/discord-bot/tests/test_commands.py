@@ -1,7 +1,12 @@
 """Tests for slash command logic and embed generation."""
 
+import asyncio
+
 import pytest
 
+from bot.api_client import APIError, TodoPage
+from bot.cogs.todo import TodoCog
+
 from bot.embeds.todo_embed import (
     todo_detail_embed,
     todo_list_embed,
@@ -9,7 +14,8 @@ from bot.embeds.todo_embed import (
     error_embed,
     constitutional_block_embed,
 )
-from bot.utils.pagination import paginate
+from bot.utils.pagination import PaginationView, TodoPaginator
+from bot.utils.short_ids import ShortIdCache
 
 
 # ── Embed builders ───────────────────────────────────────────────
@@ -122,46 +128,203 @@ def test_constitutional_block_embed():
     assert any("rephrasing" in v.lower() for v in field_values)
 
 
-# ── Pagination ───────────────────────────────────────────────────
+# ── Short ID cache ───────────────────────────────────────────────
+
+def test_short_id_cache_lookup():
+    cache = ShortIdCache()
+    cache.remember(1, [SAMPLE_TODO])
+    assert cache.lookup(1, "a0f37fb4") == SAMPLE_TODO["id"]
+    assert cache.lookup(1, "A0F3") == SAMPLE_TODO["id"]
+    assert cache.lookup(1, "a0f37fb4-11ac") == SAMPLE_TODO["id"]
+    assert cache.lookup(1, "a0f37fb4-ffff") is None
+
+
+def test_short_id_cache_per_guild():
+    cache = ShortIdCache()
+    cache.remember(1, [SAMPLE_TODO])
+    assert cache.lookup(2, "a0f37fb4") is None
+    assert cache.lookup(None, "a0f37fb4") is None
+
+
+def test_short_id_cache_ambiguous_prefix():
+    cache = ShortIdCache()
+    cache.remember(1, [{"id": "abc11111-full-uuid"}, {"id": "abc22222-full-uuid"}])
+    assert cache.lookup(1, "abc") is None
+    assert cache.lookup(1, "abc2") == "abc22222-full-uuid"
+
+
+def test_short_id_cache_evicts_least_recent():
+    cache = ShortIdCache(size=2, max_guilds=2)
+    cache.remember(1, [{"id": "aaaaaaaa-1"}, {"id": "bbbbbbbb-1"}])
+    cache.lookup(1, "aaaaaaaa")
+    cache.remember(1, [{"id": "cccccccc-1"}])
+    assert cache.lookup(1, "bbbbbbbb") is None
+    assert cache.lookup(1, "aaaaaaaa") == "aaaaaaaa-1"
+
+    cache.remember(2, [SAMPLE_TODO])
+    cache.remember(3, [SAMPLE_TODO])
+    assert cache.lookup(1, "aaaaaaaa") is None
+
+
+def test_short_id_cache_forget():
+    cache = ShortIdCache()
+    cache.remember(1, [SAMPLE_TODO])
+    cache.forget(1, SAMPLE_TODO["id"])
+    assert cache.lookup(1, "a0f37fb4") is None
+
+
+# ── Resolving todo IDs ───────────────────────────────────────────
+
+class FakeAPI:
+    def __init__(self, todos):
+        self.todos = {t["id"]: t for t in todos}
+        self.calls = []
+
+    async def get_todo(self, todo_id):
+        self.calls.append(("get", todo_id))
+        if todo_id not in self.todos:
+            raise APIError(404, "Todo not found")
+        return self.todos[todo_id]
+
+    async def resolve_todo(self, prefix):
+        self.calls.append(("resolve", prefix))
+        matches = [t for i, t in self.todos.items() if i.startswith(prefix)]
+        if not matches:
+            raise APIError(404, "Todo not found")
+        if len(matches) > 1:
+            raise APIError(409, "ambiguous")
+        return matches[0]
+
+
+def _cog(todos):
+    cog = TodoCog(bot=None)
+    cog.api = FakeAPI(todos)
+    return cog
+
+
+def test_resolve_short_id_uses_backend_lookup():
+    cog = _cog([SAMPLE_TODO])
+    todo = asyncio.run(cog._resolve_todo(1, "a0f37fb4"))
+    assert todo["id"] == SAMPLE_TODO["id"]
+    assert cog.api.calls == [("resolve", "a0f37fb4")]
+
+
+def test_resolve_short_id_cache_hit():
+    """A short ID shown earlier in the guild is fetched by its full ID."""
+    cog = _cog([SAMPLE_TODO])
+    cog.short_ids.remember(1, [SAMPLE_TODO])
+    asyncio.run(cog._resolve_todo(1, "a0f37fb4"))
+    assert cog.api.calls == [("get", SAMPLE_TODO["id"])]
+
+
+def test_resolve_stale_cache_entry_falls_back():
+    cog = _cog([])
+    cog.short_ids.remember(1, [SAMPLE_TODO])
+    with pytest.raises(APIError) as exc_info:
+        asyncio.run(cog._resolve_todo(1, "a0f37fb4"))
+    assert exc_info.value.status == 404
+    assert cog.short_ids.lookup(1, "a0f37fb4") is None
+
+
+def test_resolve_full_id_and_short_prefix():
+    cog = _cog([SAMPLE_TODO])
+    asyncio.run(cog._resolve_todo(1, SAMPLE_TODO["id"]))
+    assert cog.api.calls == [("get", SAMPLE_TODO["id"])]
+    with pytest.raises(APIError) as exc_info:
+        asyncio.run(cog._resolve_todo(2, "a0f"))
+    assert exc_info.value.status == 400
+
+
+def test_resolve_ambiguous_prefix():
+    cog = _cog([{"id": "abcd1111-full-uuid"}, {"id": "abcd2222-full-uuid"}])
+    with pytest.raises(APIError) as exc_info:
+        asyncio.run(cog._resolve_todo(1, "abcd"))
+    assert exc_info.value.status == 409
+
+
+# ── Server-side paging ───────────────────────────────────────────
+
+class FakeBackendPages:
+    """Serves ``count`` todos in cursor pages, recording every request."""
+
+    def __init__(self, count):
+        self.todos = [{"id": f"{i:08x}-todo", "title": f"Task {i}"} for i in range(count)]
+        self.requests = []
+
+    async def __call__(self, limit, cursor, offset):
+        self.requests.append((limit, cursor, offset))
+        start = (int(cursor) if cursor else 0) + offset
+        end = start + limit
+        next_cursor = str(end) if end < len(self.todos) else None
+        return TodoPage(self.todos[start:end], next_cursor)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_paginator_fetches_one_page_at_a_time():
+    backend = FakeBackendPages(12)
+    paginator = TodoPaginator(backend, per_page=5)
+
+    todos = asyncio.run(paginator.get_page(1))
+    assert [t["title"] for t in todos] == [f"Task {i}" for i in range(5)]
+    assert paginator.has_next
+    assert backend.requests == [(5, None, 0)]
+
+    asyncio.run(paginator.get_page(2))
+    todos = asyncio.run(paginator.get_page(3))
+    assert len(todos) == 2
+    assert not paginator.has_next
+    assert backend.requests[1:] == [(5, "5", 0), (5, "10", 0)]
+
+
+def test_paginator_jumps_by_offset():
+    backend = FakeBackendPages(12)
+    paginator = TodoPaginator(backend, per_page=5)
 
-def test_paginate_empty():
-    items, page, total = paginate([], 1)
-    assert items == []
-    assert page == 1
-    assert total == 1
+    todos = asyncio.run(paginator.get_page(3))
+    assert [t["title"] for t in todos] == ["Task 10", "Task 11"]
+    assert backend.requests == [(5, None, 10)]
 
 
-def test_paginate_single_page():
-    data = list(range(3))
-    items, page, total = paginate(data, 1)
-    assert items == [0, 1, 2]
-    assert page == 1
-    assert total == 1
+def test_paginator_caches_adjacent_pages_briefly():
+    backend = FakeBackendPages(20)
+    clock = FakeClock()
+    paginator = TodoPaginator(backend, per_page=5, cache_seconds=60, clock=clock)
 
+    for page in (1, 2, 1, 2):
+        asyncio.run(paginator.get_page(page))
+    assert len(backend.requests) == 2
 
-def test_paginate_multiple_pages():
-    data = list(range(12))
-    items, page, total = paginate(data, 1)
-    assert len(items) == 5  # default ITEMS_PER_PAGE
-    assert total == 3
+    # Page 1 is dropped once it's no longer next to the current page
+    asyncio.run(paginator.get_page(3))
+    asyncio.run(paginator.get_page(1))
+    assert len(backend.requests) == 4
 
-    items2, page2, _ = paginate(data, 2)
-    assert len(items2) == 5
-    assert page2 == 2
+    clock.now = 61
+    asyncio.run(paginator.get_page(1))
+    assert len(backend.requests) == 5
 
-    items3, page3, _ = paginate(data, 3)
-    assert len(items3) == 2
-    assert page3 == 3
 
+def test_pagination_view_buttons():
+    async def build():
+        paginator = TodoPaginator(FakeBackendPages(7), per_page=5)
+        await paginator.get_page(1)
+        view = PaginationView(paginator, lambda *args: None, owner_id=1)
+        return view
 
-def test_paginate_out_of_range_clamped():
-    data = list(range(7))
-    items, page, total = paginate(data, 100)
-    assert page == total
-    assert len(items) == 2  # last page has 2 items (7 - 5)
+    view = asyncio.run(build())
+    assert view.prev_page.disabled
+    assert not view.next_page.disabled
 
 
-def test_paginate_negative_page():
-    data = list(range(7))
-    items, page, total = paginate(data, -1)
-    assert page == 1
+def test_todo_list_embed_cursor_footer():
+    todos = [{"id": "abc12345-full-uuid", "title": "Task", "status": "pending"}]
+    assert todo_list_embed(todos, page=1, has_next=True).footer.text == "Page 1"
+    assert todo_list_embed(todos, page=3).footer.text == "Page 3"
+    assert "No more todos" in todo_list_embed([], page=2).description
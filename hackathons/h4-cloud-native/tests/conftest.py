@@ -5,6 +5,9 @@ import os
 # Add backend to path for all tests
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
 
+# The suite sends many requests from one client; rate limits have their own tests
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -14,6 +14,8 @@ sys.path.insert(0, str(backend_path.parent))
 
 # Set test environment
 os.environ.setdefault("TESTING", "true")
+# Many tests share one client address; rate limiting has its own tests
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,73 @@
+"""
+Tests for the approval file writer
+Tests atomic background writes, the bounded queue and flagged-query requests
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from middleware.constitutional_filter import ConstitutionalFilter
+from services.approval_writer import ApprovalWriter
+from services.review_queue import get_review_queue
+
+
+class TestApprovalWriter:
+    """Test writing approval files off the request path"""
+
+    def test_written_in_place_before_callback(self, tmp_path):
+        writer = ApprovalWriter()
+        seen = []
+        for i in range(20):
+            path = tmp_path / "Pending_Approval" / f"APPROVAL_{i}.md"
+            writer.write(path, f"# Request {i}", on_written=lambda p: seen.append(p.read_text()))
+        writer.close()
+
+        assert sorted(seen) == sorted(f"# Request {i}" for i in range(20))
+        # Only the renamed files are left behind
+        assert sorted(os.listdir(tmp_path / "Pending_Approval")) == sorted(
+            f"APPROVAL_{i}.md" for i in range(20)
+        )
+        stats = writer.stats()
+        assert stats["written"] == 20 and stats["failed"] == 0 and stats["pending"] == 0
+
+    def test_full_queue_written_inline(self, tmp_path):
+        writer = ApprovalWriter(max_queue=1)
+        entered, release = threading.Event(), threading.Event()
+
+        def hold(path):
+            entered.set()
+            release.wait(5)
+
+        writer.write(tmp_path / "a.md", "a", on_written=hold)
+        assert entered.wait(5)
+        writer.write(tmp_path / "b.md", "b")  # fills the queue
+        writer.write(tmp_path / "c.md", "c")  # no room, written by the caller
+
+        assert (tmp_path / "c.md").read_text() == "c"
+        assert not (tmp_path / "b.md").exists()
+        release.set()
+        writer.close()
+        assert (tmp_path / "b.md").read_text() == "b"
+        assert writer.stats()["inline"] == 1
+
+
+class TestFlaggedQueryApproval:
+    """Test that a flagged query only queues its approval request"""
+
+    def test_approval_request_written_in_background(self, tmp_path):
+        checker = ConstitutionalFilter(vault_path=str(tmp_path))
+        checker.approval_writer = ApprovalWriter()
+        assert not (tmp_path / "Pending_Approval").exists()
+
+        decision, _, _ = checker.check_query("Deadline is tonight, please help", "s1")
+        assert decision == "flag"
+
+        checker.approval_writer.close()
+        files = list((tmp_path / "Pending_Approval").glob("APPROVAL_QUERY_s1_*.md"))
+        assert len(files) == 1
+        item = get_review_queue(str(tmp_path)).get(files[0].stem)
+        assert item is not None and item.student_id == "s1"
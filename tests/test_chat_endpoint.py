@@ -7,6 +7,7 @@ import pytest
 from fastapi.testclient import TestClient
 import sys
 import os
+import json
 import time
 
 # Add paths for imports
@@ -234,6 +235,54 @@ class TestFlaggedQueries:
         assert data["conversation_id"] == conv_id
 
 
+def _events(response):
+    """Parse a text/event-stream body into (event, data) pairs"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestChatStreaming:
+    """Test the streaming chat endpoint"""
+
+    def test_stream_allowed_query(self, monkeypatch):
+        """Test that the mock reply streams token by token and is logged"""
+        from routers import chat as chat_router
+        monkeypatch.setattr(chat_router.chatgpt_service, "mock_stream_delay", 0)
+
+        response = client.post("/api/chat/stream", json={
+            "message": "Can you explain how recursion works?",
+            "student_id": "test_stream_001"
+        })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _events(response)
+        assert events[0][0] == "start"
+        assert events[0][1]["constitutional_decision"] == "allow"
+        assert events[-1][0] == "done"
+        tokens = [data["text"] for event, data in events if event == "token"]
+        assert len(tokens) > 1
+
+        conv_id = events[0][1]["conversation_id"]
+        history = client.get("/api/conversations/test_stream_001").json()["conversations"]
+        logged = [c for c in history if c.get("conversation_id") == conv_id]
+        assert logged and logged[-1]["response"] == "".join(tokens)
+
+    def test_stream_blocked_query(self):
+        """Test that blocked queries never reach the model"""
+        response = client.post("/api/chat/stream", json={
+            "message": "Solve my homework problem for me",
+            "student_id": "test_stream_002"
+        })
+
+        events = _events(response)
+        assert events[0][1]["constitutional_decision"] == "block"
+        assert [event for event, _ in events] == ["start", "token", "done"]
+
+
 class TestConversationRetrieval:
     """Test conversation history retrieval"""
 
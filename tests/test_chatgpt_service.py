@@ -0,0 +1,303 @@
+"""
+Tests for the ChatGPT service client
+Tests concurrency limits and non-blocking calls against a fake OpenAI server
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from benchmarks.fake_openai import create_app
+from middleware.rate_limit import MemoryBackend
+from services.chatgpt_service import (
+    ChatGPTService,
+    ConcurrencyLimiter,
+    QueueTimeout,
+    RateLimiter,
+)
+from services.single_flight import CoalesceTimeout, SingleFlight
+from services.response_cache import ResponseCache
+
+
+def _service(fake, **settings):
+    """A service whose client talks to the in-process fake"""
+    service = ChatGPTService()
+    service.api_key = "fake"
+    service.rate_limiter = RateLimiter(max_requests=1000, backend=MemoryBackend())
+    for name, value in settings.items():
+        setattr(service, name, value)
+    service._bind_loop()
+    service._client = AsyncOpenAI(
+        api_key="fake",
+        base_url="http://fake-openai/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake)),
+    )
+    return service
+
+
+class TestConcurrencyLimiter:
+    """Test the global and per-student caps"""
+
+    def test_global_cap(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_concurrent=3, per_student=10, queue_timeout=5)
+            peak = 0
+
+            async def call(i):
+                nonlocal peak
+                async with limiter.slot(f"student_{i}"):
+                    peak = max(peak, limiter.in_flight)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(call(i) for i in range(10)))
+            return peak, limiter
+
+        peak, limiter = asyncio.run(scenario())
+        assert peak == 3
+        assert limiter.stats()["in_flight"] == 0
+        assert limiter._students == {}
+
+    def test_per_student_cap(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_concurrent=10, per_student=1, queue_timeout=5)
+            running = {"a": 0, "b": 0}
+            peak = {"a": 0, "b": 0}
+
+            async def call(student):
+                async with limiter.slot(student):
+                    running[student] += 1
+                    peak[student] = max(peak[student], running[student])
+                    await asyncio.sleep(0.01)
+                    running[student] -= 1
+
+            await asyncio.gather(*(call(s) for s in "aaabbb"))
+            return peak
+
+        assert asyncio.run(scenario()) == {"a": 1, "b": 1}
+
+    def test_queue_deadline(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_concurrent=1, per_student=1, queue_timeout=0.05)
+
+            async def hold():
+                async with limiter.slot("a"):
+                    await asyncio.sleep(0.2)
+
+            holder = asyncio.create_task(hold())
+            await asyncio.sleep(0)
+            with pytest.raises(QueueTimeout):
+                async with limiter.slot("b"):
+                    pass
+            await holder
+            assert limiter.waiting == 0
+            # Slots are free again once the holder finishes
+            async with limiter.slot("b"):
+                return True
+
+        assert asyncio.run(scenario())
+
+
+class TestAsyncClient:
+    """Test chat completions against the fake OpenAI server"""
+
+    def test_calls_run_concurrently(self):
+        """Ten 0.2s calls finish in well under ten times 0.2s"""
+        fake = create_app(latency=0.2, jitter=0)
+
+        async def scenario():
+            service = _service(fake)
+            results = await asyncio.gather(*(
+                service.chat_completion(f"What is recursion, part {i}?", student_id=f"student_{i}")
+                for i in range(10)
+            ))
+            await service.close()
+            return results
+
+        start = time.perf_counter()
+        results = asyncio.run(scenario())
+        elapsed = time.perf_counter() - start
+
+        assert all(result["success"] and not result["mock"] for result in results)
+        assert results[0]["tokens_used"] > 0
+        assert fake.state.peak_in_flight == 10
+        assert elapsed < 1.0
+
+    def test_busy_when_queue_deadline_passes(self):
+        fake = create_app(latency=0.3, jitter=0)
+
+        async def scenario():
+            service = _service(fake, per_student_concurrent=1, queue_timeout=0.05)
+            results = await asyncio.gather(
+                service.chat_completion("First", student_id="student_a"),
+                service.chat_completion("Second", student_id="student_a"),
+            )
+            await service.close()
+            return results
+
+        first, second = asyncio.run(scenario())
+        assert first["success"]
+        assert second["error"] == "busy"
+
+    def test_stream_completion(self):
+        fake = create_app(latency=0.05, jitter=0)
+
+        async def scenario():
+            service = _service(fake)
+            events = [e async for e in service.stream_completion("What is recursion?", student_id="s1")]
+            await service.close()
+            return events
+
+        events = asyncio.run(scenario())
+        tokens = [e["text"] for e in events if e["type"] == "token"]
+        assert len(tokens) > 1
+        assert events[-1]["type"] == "done"
+        assert events[-1]["response"] == "".join(tokens)
+        assert events[-1]["mock"] is False
+
+    def test_stream_mock_response(self):
+        async def scenario():
+            service = ChatGPTService()
+            service.api_key = None
+            service.mock_stream_delay = 0
+            service.rate_limiter = RateLimiter(max_requests=1000, backend=MemoryBackend())
+            return [e async for e in service.stream_completion("Hi", student_id="s1")]
+
+        events = asyncio.run(scenario())
+        assert events[-1]["mock"] is True
+        assert events[-1]["response"] == ChatGPTService()._generate_mock_response("Hi")
+
+
+class TestResponseCache:
+    """Test the exact and near-duplicate answer cache"""
+
+    def test_exact_and_near_matches(self):
+        cache = ResponseCache()
+        cache.put("cs101", "How does recursion work?", "Think about the base case.", tokens=120)
+
+        exact = cache.get("cs101", "how does recursion work")
+        assert exact["match"] == "exact"
+        near = cache.get("cs101", "Can you tell me how recursion works?")
+        assert near["match"] == "near"
+        assert near["response"] == "Think about the base case."
+
+        assert cache.get("cs101", "How does recursion work in Java?") is None
+        assert cache.get("cs102", "How does recursion work?") is None
+        assert cache.get("cs101", "How does recursion work?", has_history=True) is None
+
+        stats = cache.stats()
+        assert stats["exact_hits"] == 1 and stats["near_hits"] == 1
+        assert stats["saved_tokens"] == 240
+        assert stats["bypassed"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl_and_lru_eviction(self, monkeypatch):
+        cache = ResponseCache(max_entries=2, ttl_seconds=10)
+        cache.put(None, "What is a stack?", "A")
+        cache.put(None, "What is a queue?", "B")
+        assert cache.get(None, "What is a stack?")  # now most recently used
+        cache.put(None, "What is a heap?", "C")
+
+        assert cache.get(None, "What is a queue?") is None
+        assert cache.stats()["evictions"] == 1
+
+        now = time.time()
+        monkeypatch.setattr("services.response_cache.time.time", lambda: now + 11)
+        assert cache.get(None, "What is a heap?") is None
+        assert cache.stats()["entries"] == 1
+
+    def test_service_serves_repeat_from_cache(self):
+        fake = create_app(latency=0.01, jitter=0)
+
+        async def scenario():
+            service = _service(fake, response_cache=ResponseCache())
+            first = await service.chat_completion("What is recursion?", course_id="cs101")
+            second = await service.chat_completion("what is recursion", course_id="cs101")
+            other_course = await service.chat_completion("What is recursion?", course_id="cs102")
+            with_history = await service.chat_completion(
+                "What is recursion?", course_id="cs101",
+                conversation_history=[{"role": "user", "content": "Hi"}]
+            )
+            await service.close()
+            return first, second, other_course, with_history
+
+        first, second, other_course, with_history = asyncio.run(scenario())
+        assert "cached" not in first
+        assert second["cached"] == "exact"
+        assert second["response"] == first["response"]
+        assert second["tokens_used"] == 0
+        assert "cached" not in other_course
+        assert "cached" not in with_history
+
+
+class TestCoalescing:
+    """Test sharing one upstream call among identical concurrent questions"""
+
+    def test_identical_questions_share_one_call(self):
+        fake = create_app(latency=0.1, jitter=0)
+
+        async def scenario():
+            service = _service(fake, response_cache=None)
+            service.rate_limiter = RateLimiter(max_requests=5, window_seconds=3600, backend=MemoryBackend())
+            results = await asyncio.gather(*(
+                service.chat_completion("What is recursion?", student_id=f"student_{i}", course_id="cs101")
+                for i in range(5)
+            ), service.chat_completion("What is recursion?", student_id="student_x", course_id="cs102"))
+            await service.close()
+            return service, results
+
+        service, results = asyncio.run(scenario())
+        assert fake.state.peak_in_flight == 2  # one per course
+        assert len({r["response"] for r in results[:5]}) == 1
+        assert sum(1 for r in results if r.get("coalesced")) == 4
+        assert service.single_flight.stats()["coalesced"] == 4
+        # Every student was still charged
+        assert all(service.rate_limiter.get_remaining(f"student_{i}") == 4 for i in range(5))
+
+    def test_follower_timeout(self):
+        async def scenario():
+            flight = SingleFlight(timeout=0.05)
+
+            async def slow():
+                await asyncio.sleep(0.2)
+                return "done"
+
+            leader = asyncio.create_task(flight.do("key", slow))
+            await asyncio.sleep(0)
+            with pytest.raises(CoalesceTimeout):
+                await flight.do("key", slow)
+            return await leader, flight.stats()
+
+        (result, shared), stats = asyncio.run(scenario())
+        assert result == "done" and not shared
+        assert stats["timeouts"] == 1 and stats["in_flight"] == 0
+
+    def test_followers_retry_when_leader_fails(self):
+        async def scenario():
+            flight = SingleFlight()
+            calls = 0
+
+            async def flaky():
+                nonlocal calls
+                calls += 1
+                await asyncio.sleep(0.01)
+                if calls == 1:
+                    raise RuntimeError("upstream error")
+                return "ok"
+
+            results = await asyncio.gather(
+                flight.do("key", flaky), flight.do("key", flaky), return_exceptions=True
+            )
+            return results, flight.stats()
+
+        (leader, follower), stats = asyncio.run(scenario())
+        assert isinstance(leader, RuntimeError)
+        assert follower == ("ok", False)
+        assert stats["leader_failures"] == 1
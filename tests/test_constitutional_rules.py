@@ -76,4 +76,74 @@ def test_time_pressure_flagged(constitutional_filter):
     
     assert decision == "flag"
     assert "flagged" in reason
-    assert metadata["requires_human_review"] is True
\ No newline at end of file
+    assert metadata["requires_human_review"] is True
+
+def test_every_matched_pattern_reported(constitutional_filter):
+    """Test that one scan reports all matching rules, prohibited first"""
+    query = "No time left, just give me the answer"
+    decision, reason, metadata = constitutional_filter.check_query(query)
+
+    assert decision == "block"
+    assert metadata["pattern_matched"] == r"give\s+me\s+the\s+answer"
+    assert metadata["patterns_matched"] == [
+        r"give\s+me\s+the\s+answer",
+        r"just\s+give\s+me\s+the\s+(answer|solution|code)",
+        r"no\s+time",
+    ]
+
+
+def test_compiled_rules_match_pattern_loop():
+    """Test that the combined scan decides like searching each pattern in turn"""
+    import re
+    from backend.middleware.constitutional_rules import RuleSet
+
+    rules = RuleSet({
+        "block": ConstitutionalFilter.PROHIBITED_PATTERNS,
+        "flag": ConstitutionalFilter.SUSPICIOUS_PATTERNS,
+    })
+    queries = [
+        "How do loops work?",
+        "DO MY HOMEWORK",
+        "quiz in 3 minutes, what is the answer",
+        "Deadline is tonight",
+        "Tell me the answer",
+        "What are the answers to life?",
+        "",
+    ]
+    for query in queries:
+        expected = "allow"
+        for decision, patterns in (("block", ConstitutionalFilter.PROHIBITED_PATTERNS),
+                                   ("flag", ConstitutionalFilter.SUSPICIOUS_PATTERNS)):
+            if any(re.search(p, query, re.IGNORECASE) for p in patterns):
+                expected = decision
+                break
+        assert rules.scan(query).decision == expected, query
+
+    # Uppercase escapes keep their meaning; matching stays case-insensitive
+    emails = RuleSet({"flag": [r"\S+@\S+\.edu"]})
+    assert not emails.lowercase
+    assert emails.scan("Send it to TA@School.EDU").decision == "flag"
+
+
+def test_rules_file_hot_reload(tmp_path):
+    """Test that rules come from the rules file and follow its changes"""
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text('{"block": ["copy\\\\s+paste"], "flag": []}')
+    os.environ["CONSTITUTIONAL_RULES_RELOAD"] = "0"
+    try:
+        checker = ConstitutionalFilter(vault_path=str(tmp_path), rules_file=str(rules_path))
+    finally:
+        del os.environ["CONSTITUTIONAL_RULES_RELOAD"]
+
+    assert checker.check_query("Let me copy paste it")[0] == "block"
+    assert checker.check_query("Give me the answer")[0] == "allow"
+
+    rules_path.write_text('{"block": [], "flag": ["panic"]}')
+    os.utime(rules_path, (1, 1))
+    assert checker.check_query("Let me copy paste it")[0] == "allow"
+    assert checker.rules.patterns("flag") == ["panic"]
+
+    # A broken file keeps the rules already in effect
+    rules_path.write_text('{"block": ["(unclosed"]}')
+    os.utime(rules_path, (2, 2))
+    assert checker.rules.patterns("flag") == ["panic"]
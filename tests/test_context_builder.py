@@ -0,0 +1,123 @@
+"""
+Tests for the conversation context builder
+Tests token budgeting, older-turn summaries and loading turns by conversation
+"""
+
+import sys
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.context_builder import (
+    REPLY_OVERHEAD,
+    SUMMARY_PREFIX,
+    ContextBuilder,
+    TokenCounter,
+    turns_to_history,
+)
+from services.logger_service import ConversationLogger
+
+
+def _history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i} " + "about loops " * 10})
+        history.append({"role": "assistant", "content": f"Answer {i} " + "think it through " * 20})
+    return history
+
+
+@pytest.fixture
+def counter():
+    return TokenCounter()
+
+
+class TestContextBuilder:
+    """Test fitting conversation turns to a token budget"""
+
+    def test_short_history_sent_whole(self, counter):
+        builder = ContextBuilder("You are a tutor.", counter, budget=3000)
+        history = _history(2)
+
+        messages, used = builder.build("And recursion?", history)
+
+        assert messages[0]["role"] == "system"
+        assert messages[1:-1] == history
+        assert messages[-1] == {"role": "user", "content": "And recursion?"}
+        assert used == sum(counter.count_message(m) for m in messages) + REPLY_OVERHEAD
+
+    def test_long_history_fits_budget(self, counter):
+        builder = ContextBuilder("You are a tutor.", counter, budget=400, summary_tokens=80)
+        history = _history(30)
+
+        messages, used = builder.build("And recursion?", history)
+
+        assert used <= 400
+        assert used == sum(counter.count_message(m) for m in messages) + REPLY_OVERHEAD
+        # Newest turns kept verbatim, older ones folded into one note
+        assert messages[-2] == history[-1]
+        assert messages[1]["content"].startswith(SUMMARY_PREFIX)
+        assert "Question 0" not in "".join(m["content"] for m in messages[2:])
+
+    def test_system_prompt_counted_once(self, counter):
+        builder = ContextBuilder("You are a tutor. " * 50, counter)
+        assert builder.system_tokens == counter.count_message(builder.system_message)
+        assert "You are a tutor. " * 50 in counter._cache
+
+    def test_truncate_keeps_end(self, counter):
+        text = "start " + "middle " * 200 + "end"
+        truncated = counter.truncate(text, 20)
+        assert truncated.endswith("end")
+        assert counter.count(truncated) <= 20
+
+
+class TestConversationTurns:
+    """Test loading a conversation's last turns from the index"""
+
+    def test_last_allowed_turns(self, tmp_path):
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        for i in range(5):
+            conv_logger.log_conversation("s1", f"Q{i}", f"A{i}", "allow", conversation_id="c1")
+        conv_logger.log_conversation("s1", "Do my homework", "Socratic", "block", conversation_id="c1")
+        conv_logger.log_conversation("s1", "Other", "Other", "allow", conversation_id="c2")
+
+        turns = conv_logger.get_conversation_turns("c1", limit=3)
+
+        assert [t["query"] for t in turns] == ["Q2", "Q3", "Q4"]
+        assert turns_to_history(turns)[:2] == [
+            {"role": "user", "content": "Q2"},
+            {"role": "assistant", "content": "A2"},
+        ]
+        conv_logger.close()
+
+    def test_chat_passes_history(self, monkeypatch):
+        """Follow-ups in a conversation are sent with its earlier turns"""
+        from backend.main import app
+        from routers import chat as chat_router
+
+        captured = []
+        original = chat_router.chatgpt_service.chat_completion
+
+        async def capture(**kwargs):
+            captured.append(kwargs["conversation_history"])
+            return await original(**kwargs)
+
+        monkeypatch.setattr(chat_router.chatgpt_service, "chat_completion", capture)
+        client = TestClient(app)
+
+        first = client.post("/api/chat", json={
+            "message": "Can you explain how loops work?",
+            "student_id": "test_context_001"
+        }).json()
+        client.post("/api/chat", json={
+            "message": "And while loops?",
+            "student_id": "test_context_001",
+            "conversation_id": first["conversation_id"]
+        })
+
+        assert captured[0] == []
+        assert captured[1][0] == {"role": "user", "content": "Can you explain how loops work?"}
+        assert captured[1][1]["role"] == "assistant"
@@ -7,23 +7,29 @@ import pytest
 import sys
 import os
 import json
+import threading
 import time
 from datetime import datetime
-from pathlib import Path
 
 # Add paths for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
 
-from backend.services.logger_service import ConversationLogger, get_conversation_logger
+from backend.services import logger_service
+from backend.services.logger_service import (
+    ConversationLogger,
+    LogWriter,
+    get_conversation_logger,
+    migrate_json_logs,
+)
 
 
 @pytest.fixture
-def logger():
+def logger(tmp_path):
     """Create a ConversationLogger instance for testing"""
-    # Use test vault path
-    test_vault = Path(__file__).parent.parent / "vault"
-    return ConversationLogger(vault_path=str(test_vault))
+    conv_logger = ConversationLogger(vault_path=str(tmp_path))
+    yield conv_logger
+    conv_logger.close()
 
 
 @pytest.fixture
@@ -132,17 +138,19 @@ class TestDailyLogCreated:
             decision="allow"
         )
 
+        logger.flush()
+
         # Check that today's log file exists
         today = datetime.now().strftime("%Y-%m-%d")
-        log_file = logger.logs_dir / f"{today}.json"
+        log_file = logger.logs_dir / f"{today}.jsonl"
 
         assert log_file.exists()
 
-        # Verify it's valid JSON
+        # Verify every line is a JSON object
         with open(log_file, "r") as f:
-            data = json.load(f)
-        assert isinstance(data, list)
+            data = [json.loads(line) for line in f]
         assert len(data) > 0
+        assert all(isinstance(entry, dict) for entry in data)
 
     def test_multiple_logs_same_day(self, logger, unique_student_id):
         """Test multiple logs on the same day"""
@@ -155,17 +163,171 @@ class TestDailyLogCreated:
                 decision="allow"
             )
 
+        logger.flush()
+
         # Get today's file
         today = datetime.now().strftime("%Y-%m-%d")
-        log_file = logger.logs_dir / f"{today}.json"
+        log_file = logger.logs_dir / f"{today}.jsonl"
 
         with open(log_file, "r") as f:
-            data = json.load(f)
+            data = [json.loads(line) for line in f]
 
         # Should have at least 5 entries
         assert len(data) >= 5
 
 
+class TestAppendOnlyStorage:
+    """Test the append-only JSONL log files"""
+
+    def test_concurrent_logging_loses_nothing(self, tmp_path):
+        """Entries logged from many threads all reach the file"""
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+
+        def log_many(worker):
+            for i in range(50):
+                conv_logger.log_conversation(
+                    student_id=f"student_{worker}",
+                    query=f"Query {i}",
+                    response="Response",
+                    decision="allow"
+                )
+
+        threads = [threading.Thread(target=log_many, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        entries = list(conv_logger.iter_logs())
+        assert len(entries) == 400
+        assert len(conv_logger.get_student_conversations("student_3")) == 50
+        conv_logger.close()
+
+    def test_flush_ignores_later_entries(self, tmp_path):
+        """flush waits for entries queued before it, not ones queued while it waits"""
+        writer = LogWriter()
+        waiting = threading.Event()
+        wait_for = writer._progress.wait_for
+
+        def flag_wait(predicate):
+            waiting.set()
+            return wait_for(predicate)
+
+        released = threading.Event()
+
+        def on_append(path):
+            if path.name == "a.jsonl":
+                # Queue a second entry once flush is waiting, and hold it up
+                waiting.wait(5)
+                writer.append(tmp_path / "b.jsonl", {"n": 2})
+            else:
+                released.wait(5)
+
+        writer._progress.wait_for = flag_wait
+        writer.on_append = on_append
+        writer.append(tmp_path / "a.jsonl", {"n": 1})
+
+        start = time.monotonic()
+        writer.flush()
+        assert time.monotonic() - start < 2
+        released.set()
+        writer.close()
+
+    def test_torn_line_skipped(self, tmp_path):
+        """A partial last line (e.g. after a crash) doesn't hide the rest"""
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        conv_logger.log_conversation("s1", "Query", "Response", "allow")
+        conv_logger.flush()
+        with open(conv_logger._get_today_log_file(), "a") as f:
+            f.write('{"student_id": "s1", "que')
+
+        assert len(conv_logger.get_student_conversations("s1")) == 1
+        conv_logger.close()
+
+    def test_migrates_legacy_json_logs(self, tmp_path):
+        """Old YYYY-MM-DD.json arrays become JSONL, ahead of newer entries"""
+        logs_dir = tmp_path / "Conversation_Logs"
+        logs_dir.mkdir()
+        legacy = [
+            {"timestamp": "2026-01-25T10:00:00", "student_id": "s1", "decision": "flag"},
+            {"timestamp": "2026-01-25T11:00:00", "student_id": "s2", "decision": "allow"},
+        ]
+        (logs_dir / "2026-01-25.json").write_text(json.dumps(legacy, indent=2))
+        (logs_dir / "2026-01-25.jsonl").write_text(
+            json.dumps({"timestamp": "2026-01-25T12:00:00", "student_id": "s1"}) + "\n"
+        )
+
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        # Creating the logger leaves the vault alone; the app migrates on startup
+        assert (logs_dir / "2026-01-25.json").exists()
+        assert conv_logger.migrate() == 1
+
+        assert not (logs_dir / "2026-01-25.json").exists()
+        assert (logs_dir / "2026-01-25.json.migrated").exists()
+        entries = list(conv_logger.iter_logs("2026-01-25"))
+        assert [e["timestamp"][11:13] for e in entries] == ["10", "11", "12"]
+        assert len(conv_logger.get_flagged_conversations()) == 1
+        assert migrate_json_logs(logs_dir) == 0
+
+
+class TestStudentIndex:
+    """Test the per-student index over the daily logs"""
+
+    def _write_day(self, logs_dir, day, entries):
+        with open(logs_dir / f"{day}.jsonl", "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def test_existing_logs_indexed_on_startup(self, tmp_path):
+        """Logs written before the index existed are picked up"""
+        logs_dir = tmp_path / "Conversation_Logs"
+        logs_dir.mkdir()
+        self._write_day(logs_dir, "2026-01-24", [
+            {"timestamp": "2026-01-24T09:00:00", "student_id": "s1",
+             "metadata": {"concepts": ["loops"]}},
+            {"timestamp": "2026-01-24T09:05:00", "student_id": "s2"},
+        ])
+        self._write_day(logs_dir, "2026-01-25", [
+            {"timestamp": "2026-01-25T10:00:00", "student_id": "s1",
+             "metadata": {"concepts": ["recursion", "loops"]}},
+        ])
+
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        stats = conv_logger.get_student_stats("s1")
+
+        assert stats["total_conversations"] == 2
+        assert stats["concepts_discussed"] == ["loops", "recursion"]
+        assert stats["last_active"] == "2026-01-25T10:00:00"
+        history = conv_logger.get_student_conversations("s1", date="2026-01-24")
+        assert [e["timestamp"] for e in history] == ["2026-01-24T09:00:00"]
+        conv_logger.close()
+
+    def test_index_follows_appends(self, tmp_path):
+        """New entries are indexed as they are written, including other writers'"""
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        conv_logger.log_conversation("s1", "Query", "Response", "allow")
+        assert conv_logger.get_student_stats("s1")["total_conversations"] == 1
+
+        # Another process appending to the same file
+        today = datetime.now().strftime("%Y-%m-%d")
+        self._write_day(conv_logger.logs_dir, today, [{"student_id": "s1", "query": "Other"}])
+        conv_logger.log_conversation("s1", "Query", "Response", "allow")
+
+        history = conv_logger.get_student_conversations("s1")
+        assert [e["query"] for e in history] == ["Query", "Other", "Query"]
+        conv_logger.close()
+
+    def test_rebuild_index(self, tmp_path):
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        for student in ("s1", "s1", "s2"):
+            conv_logger.log_conversation(student, "Query", "Response", "allow")
+        conv_logger.flush()
+
+        assert conv_logger.index.rebuild(conv_logger._log_files()) == 3
+        assert conv_logger.get_student_stats("s1")["total_conversations"] == 2
+        conv_logger.close()
+
+
 class TestStudentStats:
     """Test student statistics calculation"""
 
@@ -220,13 +382,27 @@ class TestFlaggedConversations:
         assert len(flagged) >= 1
         assert all(conv["decision"] == "flag" for conv in flagged)
 
+    def test_flagged_read_from_index(self, tmp_path):
+        """Only flagged lines are read, optionally for one day"""
+        conv_logger = ConversationLogger(vault_path=str(tmp_path))
+        conv_logger.log_conversation("s1", "Explain loops", "Response", "allow")
+        conv_logger.log_conversation("s1", "Exam tomorrow", "Flagged", "flag")
+        conv_logger.log_conversation("s2", "Due tonight", "Flagged", "flag")
+
+        flagged = conv_logger.get_flagged_conversations()
+        assert [e["query"] for e in flagged] == ["Exam tomorrow", "Due tonight"]
+        assert conv_logger.get_flagged_conversations(date="1999-01-01") == []
+        conv_logger.close()
+
 
 class TestSingletonLogger:
     """Test singleton pattern"""
 
-    def test_singleton_instance(self):
+    def test_singleton_instance(self, tmp_path, monkeypatch):
         """Test that get_conversation_logger returns singleton"""
-        logger1 = get_conversation_logger()
+        monkeypatch.setattr(logger_service, "_logger_instance", None)
+        logger1 = get_conversation_logger(vault_path=str(tmp_path))
         logger2 = get_conversation_logger()
 
         assert logger1 is logger2
+        logger1.close()
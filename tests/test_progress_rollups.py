@@ -0,0 +1,215 @@
+"""
+Tests for incremental progress rollups
+Tests per-student and per-course aggregates and the progress endpoints
+"""
+
+import json
+import math
+import sys
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.logger_service import ConversationLogger
+from services.progress_rollups import ProgressRollups
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    store = ProgressRollups(tmp_path / "rollups.sqlite3")
+    yield store
+    store.close()
+
+
+class TestStudentRollups:
+    """Test running aggregates for one student"""
+
+    def test_aggregates(self, rollups):
+        """Counts, score statistics and time add up across lessons"""
+        rollups.record_lesson("s1", "py101", "l1", True, 80, 600, "2026-02-01T10:00:00")
+        rollups.record_lesson("s1", "py101", "l2", False, 60, 300, "2026-02-02T10:00:00")
+        rollups.record_lesson("s1", "js101", "l1", True, None, 100, "2026-02-03T10:00:00")
+
+        summary = rollups.student("s1")
+        assert summary["total_lessons"] == 3
+        assert summary["completed_lessons"] == 2
+        assert summary["average_score"] == 70
+        assert summary["score_stddev"] == 10
+        assert summary["lowest_score"] == 60
+        assert summary["highest_score"] == 80
+        assert summary["total_time_spent"] == 1000
+        assert summary["last_updated"] == "2026-02-03T10:00:00"
+
+        course = rollups.student("s1", "py101")
+        assert course["total_lessons"] == 2
+        assert course["completion_rate"] == 50
+
+    def test_updating_a_lesson_replaces_its_contribution(self, rollups):
+        rollups.record_lesson("s1", "py101", "l1", False, 40, 100)
+        rollups.record_lesson("s1", "py101", "l2", False, 70, 100)
+        rollups.record_lesson("s1", "py101", "l1", True, 90, 250)
+
+        summary = rollups.student("s1")
+        assert summary["total_lessons"] == 2
+        assert summary["completed_lessons"] == 1
+        assert summary["average_score"] == 80
+        assert summary["lowest_score"] == 70
+        assert summary["highest_score"] == 90
+        assert summary["total_time_spent"] == 350
+
+    def test_clearing_a_score(self, rollups):
+        rollups.record_lesson("s1", "py101", "l1", False, 40)
+        rollups.record_lesson("s1", "py101", "l1", False, None)
+
+        summary = rollups.student("s1")
+        assert summary["average_score"] is None
+        assert summary["lowest_score"] is None
+
+    def test_unknown_student(self, rollups):
+        assert rollups.student("nobody") is None
+
+
+class TestCourseRollups:
+    """Test aggregates across every student in a course"""
+
+    def test_course_rollup(self, rollups):
+        for student, score in (("s1", 70), ("s2", 90), ("s3", 80)):
+            rollups.record_lesson(student, "py101", "l1", True, score, 60)
+        rollups.record_lesson("s1", "py101", "l2", False, None, 30)
+        rollups.record_lesson("s1", "js101", "l1", True, 50, 10)
+
+        summary = rollups.course("py101")
+        assert summary["students"] == 3
+        assert summary["total_lessons"] == 4
+        assert summary["completed_lessons"] == 3
+        assert summary["average_score"] == 80
+        assert math.isclose(summary["score_stddev"], math.sqrt(200 / 3))
+        assert (summary["lowest_score"], summary["highest_score"]) == (70, 90)
+        assert summary["total_time_spent"] == 210
+
+    def test_rebuild_from_progress_files(self, rollups, tmp_path):
+        progress_dir = tmp_path / "Student_Progress"
+        progress_dir.mkdir()
+        records = {
+            "py101:l1": {"course_id": "py101", "lesson_id": "l1", "completed": True,
+                         "score": 75, "time_spent": 120, "updated_at": "2026-02-01T10:00:00"},
+        }
+        (progress_dir / "s1_progress.json").write_text(json.dumps(records))
+        rollups.record_lesson("stale", "py101", "l1", True, 10)
+
+        assert rollups.rebuild(progress_dir) == 1
+        assert rollups.student("stale") is None
+        assert rollups.course("py101")["average_score"] == 75
+
+
+class TestConversationRollups:
+    """Test conversation counts and distinct concepts"""
+
+    def test_conversations_and_distinct_concepts(self, rollups):
+        rollups.record_conversation("s1", "py101", ["loops", "lists"], "2026-02-01T10:00:00")
+        rollups.record_conversation("s1", "py101", ["loops"], "2026-02-02T10:00:00")
+        rollups.record_conversation("s1", None, ["closures"], "2026-02-03T10:00:00")
+        rollups.record_conversation("s2", "py101", ["loops", "recursion"], "2026-02-01T12:00:00")
+
+        summary = rollups.student("s1")
+        assert summary["conversations"] == 3
+        assert summary["distinct_concepts"] == 3
+        assert summary["last_active"] == "2026-02-03T10:00:00"
+        assert summary["total_lessons"] == 0
+        assert rollups.student("s1", "py101")["distinct_concepts"] == 2
+
+        course = rollups.course("py101")
+        assert course["students"] == 2
+        assert course["conversations"] == 3
+        assert course["distinct_concepts"] == 3
+
+    def test_students_counted_once_across_lessons_and_conversations(self, rollups):
+        rollups.record_conversation("s1", "py101", [])
+        rollups.record_lesson("s1", "py101", "l1", True, 80)
+        rollups.record_lesson("s2", "py101", "l1", True, 60)
+        rollups.record_conversation("s2", "py101", [])
+
+        assert rollups.course("py101")["students"] == 2
+
+    def test_logged_conversations_feed_rollups(self, rollups, tmp_path):
+        conv_logger = ConversationLogger(vault_path=str(tmp_path), on_logged=rollups.record_entry)
+        try:
+            conv_logger.log_conversation(
+                "s1", "What is a loop?", "...", "allow",
+                metadata={"concepts": ["loops"]}, course_id="py101",
+            )
+            conv_logger.log_conversation("s1", "And a list?", "...", "flag")
+            conv_logger.flush()
+        finally:
+            conv_logger.close()
+
+        assert rollups.student("s1")["conversations"] == 2
+        assert rollups.course("py101")["conversations"] == 1
+        assert rollups.course("py101")["distinct_concepts"] == 1
+
+    def test_rebuild_replays_conversations(self, rollups, tmp_path):
+        progress_dir = tmp_path / "Student_Progress"
+        progress_dir.mkdir()
+        entries = [
+            {"student_id": "s1", "course_id": "py101", "timestamp": "2026-02-01T10:00:00",
+             "metadata": {"concepts": ["loops"]}},
+            {"student_id": "s1", "course_id": "py101", "timestamp": "2026-02-02T10:00:00",
+             "metadata": {"concepts": ["loops", "lists"]}},
+        ]
+
+        rollups.rebuild(progress_dir, entries)
+        summary = rollups.course("py101")
+        assert summary["conversations"] == 2
+        assert summary["distinct_concepts"] == 2
+        assert summary["last_active"] == "2026-02-02T10:00:00"
+
+
+class TestProgressEndpoints:
+    """Test that the progress endpoints read the rollups"""
+
+    @pytest.fixture
+    def client(self, rollups, tmp_path, monkeypatch):
+        from main import app
+        from routers import progress
+
+        monkeypatch.setattr(progress, "PROGRESS_DIR", tmp_path / "Student_Progress")
+        monkeypatch.setattr(progress, "progress_rollups", rollups)
+        return TestClient(app)
+
+    def _update(self, client, **fields):
+        payload = {"student_id": "s1", "course_id": "py101", "lesson_id": "l1", **fields}
+        response = client.post("/api/progress/update", json=payload)
+        assert response.status_code == 200
+
+    def test_analytics_and_details(self, client):
+        self._update(client, lesson_id="l1", completed=True, score=90, time_spent=300)
+        self._update(client, lesson_id="l2", score=70, time_spent=200)
+        self._update(client, course_id="py1010", lesson_id="l1", score=10)
+
+        analytics = client.get("/api/progress/analytics/s1").json()["analytics"]
+        assert analytics["total_lessons"] == 3
+        assert analytics["highest_score"] == 90
+        assert analytics["total_time_spent"] == 500
+
+        details = client.get("/api/progress/details/s1?course_id=py101").json()
+        assert details["total_lessons"] == 2
+        assert details["completion_percentage"] == 50
+        assert details["average_score"] == 80
+        assert set(details["progress_records"]) == {"py101:l1", "py101:l2"}
+
+    def test_course_endpoint(self, client):
+        self._update(client, score=60)
+        self._update(client, student_id="s2", score=80)
+
+        analytics = client.get("/api/progress/course/py101").json()["analytics"]
+        assert analytics["students"] == 2
+        assert analytics["average_score"] == 70
+        assert analytics["conversations"] == 0
+
+    def test_no_progress(self, client):
+        assert client.get("/api/progress/analytics/nobody").json()["analytics"] == {}
+        assert client.get("/api/progress/course/nothing").json()["analytics"] == {}
@@ -0,0 +1,97 @@
+"""
+Tests for Rate Limiting
+Tests the per-student chat limiter and the rate limit middleware
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add paths for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from middleware.rate_limit import Limit, MemoryBackend, RateLimitMiddleware
+from services.chatgpt_service import RateLimiter
+
+
+class TestChatRateLimiter:
+    """Test the per-student limiter used by the ChatGPT service"""
+
+    def test_allows_max_requests_then_blocks(self):
+        """Test that the 11th request in a minute is refused with a wait time"""
+        limiter = RateLimiter(max_requests=10, window_seconds=60, backend=MemoryBackend())
+
+        results = [limiter.is_allowed("student_a") for _ in range(11)]
+
+        assert all(allowed for allowed, _ in results[:10])
+        allowed, wait = results[10]
+        assert allowed is False
+        assert 1 <= wait <= 6
+
+    def test_remaining_count(self):
+        """Test that remaining requests count down without being consumed"""
+        limiter = RateLimiter(max_requests=5, window_seconds=60, backend=MemoryBackend())
+
+        assert limiter.get_remaining("student_b") == 5
+        limiter.is_allowed("student_b")
+        assert limiter.get_remaining("student_b") == 4
+        assert limiter.get_remaining("student_b") == 4
+
+    def test_memory_bounded(self):
+        """Test that idle students are not kept forever"""
+        backend = MemoryBackend(max_keys=100)
+        limiter = RateLimiter(max_requests=10, window_seconds=60, backend=backend)
+
+        for i in range(1000):
+            limiter.is_allowed(f"student_{i}")
+
+        assert len(backend) == 100
+
+
+class TestRateLimitMiddleware:
+    """Test the rate limit middleware on a minimal app"""
+
+    def test_returns_429_when_exhausted(self):
+        """Test that requests over the budget get 429 with Retry-After"""
+        app = FastAPI()
+        app.add_middleware(
+            RateLimitMiddleware,
+            enabled=True,
+            backend=MemoryBackend(),
+            user_limit=Limit(rate=60, period=60, burst=2),
+        )
+
+        @app.get("/api/progress/{student_id}")
+        async def progress(student_id: str):
+            return {"student_id": student_id}
+
+        client = TestClient(app)
+        headers = {"X-User-Id": "student_c"}
+        assert client.get("/api/progress/student_c", headers=headers).status_code == 200
+        assert client.get("/api/progress/student_c", headers=headers).status_code == 200
+
+        response = client.get("/api/progress/student_c", headers=headers)
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
+
+    def test_chat_routes_cost_more(self):
+        """Test that both chat routes use the higher cost from main"""
+        from main import RATE_LIMIT_COSTS
+
+        middleware = RateLimitMiddleware(FastAPI(), costs=RATE_LIMIT_COSTS)
+        assert middleware.cost("POST", "/api/chat") == 2
+        assert middleware.cost("POST", "/api/chat/stream") == 2
+        assert middleware.cost("GET", "/api/progress/student_c") == 1
+
+
+def test_matches_h4_copy():
+    """Test that the vendored middleware is identical to the H4 todo API's copy"""
+    root = os.path.join(os.path.dirname(__file__), '..')
+    paths = [
+        os.path.join(root, 'backend', 'middleware', 'rate_limit.py'),
+        os.path.join(root, 'hackathons', 'h4-cloud-native', 'backend', 'rate_limit.py'),
+    ]
+    ours, theirs = (open(path, encoding='utf-8').read() for path in paths)
+    assert ours == theirs, "Change both copies of rate_limit.py together"
@@ -0,0 +1,127 @@
+"""
+Tests for the HITL review queue
+Tests the journal-backed index and the review endpoints
+"""
+
+import sys
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../backend'))
+
+from services.review_queue import ReviewQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return ReviewQueue(vault_path=str(tmp_path))
+
+
+def _request(queue, item_id, **kwargs):
+    (queue.vault_path / "Pending_Approval" / f"{item_id}.md").write_text("# Request")
+    return queue.enqueue(item_id, "query_approval", **kwargs)
+
+
+class TestReviewQueue:
+    """Test enqueueing, listing and status transitions"""
+
+    def test_list_newest_first_with_filters(self, queue):
+        _request(queue, "a", student_id="s1", created="2026-01-24T09:00:00")
+        _request(queue, "b", student_id="s2", created="2026-01-24T10:00:00")
+        _request(queue, "c", student_id="s1", created="2026-01-25T09:00:00")
+
+        page = queue.list(status="pending")
+        assert [item["item_id"] for item in page["items"]] == ["c", "b", "a"]
+        assert page["total"] == 3
+
+        page = queue.list(student_id="s1", day="2026-01-24")
+        assert [item["item_id"] for item in page["items"]] == ["a"]
+        assert page["total"] == 1
+
+        page = queue.list(offset=1, limit=1)
+        assert [item["item_id"] for item in page["items"]] == ["b"]
+
+    def test_transition_moves_file(self, queue, tmp_path):
+        _request(queue, "a", student_id="s1")
+        item = queue.transition("a", "approved", reviewed_by="instructor")
+
+        assert item.status == "approved"
+        assert not (tmp_path / "Pending_Approval" / "a.md").exists()
+        assert (tmp_path / "Approved" / "a.md").exists()
+        assert queue.counts() == {"pending": 0, "approved": 1, "rejected": 0}
+
+        with pytest.raises(ValueError):
+            queue.transition("a", "rejected")
+        with pytest.raises(KeyError):
+            queue.transition("missing", "rejected")
+
+    def test_reconcile_files_moved_by_hand(self, queue, tmp_path):
+        _request(queue, "a")
+        _request(queue, "b")
+        (tmp_path / "Pending_Approval" / "b.md").rename(tmp_path / "Rejected" / "b.md")
+
+        assert queue.reconcile() == 1
+        assert queue.get("b").status == "rejected"
+        assert queue.get("a").status == "pending"
+
+    def test_journal_shared_and_replayed(self, queue, tmp_path):
+        """Another process sees new requests and replays state after compaction"""
+        other = ReviewQueue(vault_path=str(tmp_path))
+        _request(queue, "a", student_id="s1")
+        _request(queue, "b", student_id="s1")
+        other.transition("a", "rejected")
+
+        assert queue.get("a").status == "rejected"
+        assert queue.compact() == 2
+        assert other.list(student_id="s1")["total"] == 2
+        assert ReviewQueue(vault_path=str(tmp_path)).counts() == {
+            "pending": 1, "approved": 0, "rejected": 1
+        }
+
+
+class TestReviewEndpoints:
+    """Test the review queue API"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from routers import review
+
+        monkeypatch.setattr(review, "review_queue", ReviewQueue(vault_path=str(tmp_path)))
+        app = FastAPI()
+        app.include_router(review.router, prefix="/api")
+        return TestClient(app)
+
+    def test_approve_request(self, client):
+        from routers import review
+
+        _request(review.review_queue, "APPROVAL_QUERY_s1", student_id="s1")
+        response = client.get("/api/review/queue")
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+
+        response = client.post("/api/review/APPROVAL_QUERY_s1/approve", json={"reviewer": "prof"})
+        assert response.status_code == 200
+        assert response.json()["file"] == "Approved/APPROVAL_QUERY_s1.md"
+        assert client.get("/api/review/queue").json()["counts"]["approved"] == 1
+
+        assert client.post("/api/review/APPROVAL_QUERY_s1/reject").status_code == 409
+        assert client.post("/api/review/missing/reject").status_code == 404
+        assert client.get("/api/review/queue?status=bogus").status_code == 400
+
+    def test_files_moved_by_hand_picked_up_on_reconcile(self, client, tmp_path):
+        from routers import review
+
+        _request(review.review_queue, "APPROVAL_QUERY_s2", student_id="s2")
+        (tmp_path / "Pending_Approval" / "APPROVAL_QUERY_s2.md").rename(
+            tmp_path / "Approved" / "APPROVAL_QUERY_s2.md"
+        )
+        assert client.get("/api/review/queue").json()["counts"]["pending"] == 1
+
+        assert client.post("/api/review/reconcile").json() == {"moved": 1}
+        assert client.get("/api/review/queue").json()["counts"] == {
+            "pending": 0, "approved": 1, "rejected": 0
+        }